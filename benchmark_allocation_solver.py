@@ -0,0 +1,200 @@
+"""
+Benchmark: alocação autônoma gulosa versus solver global (CP-SAT).
+
+Para cada semestre histórico (docs/Ensalamento Oferta *.csv) e cada modo da
+fase atômica (settings.ALLOCATION_SOLVER):
+
+1. Copia o banco para um arquivo temporário e apaga as alocações do
+   semestre, mantendo as demandas e o histórico dos demais semestres.
+2. Executa execute_autonomous_allocation num processo separado com o modo
+   escolhido.
+3. Reporta a taxa de alocação, o tempo total e, no modo cpsat, a pontuação
+   da fase atômica do solver e da gulosa.
+
+Sem --db, o banco é montado num diretório temporário: init_db, seed_db e
+load_historical_allocations.py para cada CSV.
+
+Uso:
+    python benchmark_allocation_solver.py
+    python benchmark_allocation_solver.py --db data/ensalamento.db \\
+        --semesters 2025-1 2025-2 --solvers greedy cpsat --time-limit 10
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+CSV_GLOB = "Ensalamento Oferta *.csv"
+CSV_SEMESTER = re.compile(r"Ensalamento Oferta (\d)-(\d{4})\.csv$")
+
+
+def discover_semesters(docs_dir: Path) -> dict:
+    """Mapeia nome do semestre ("2025-1") -> CSV histórico."""
+    semesters = {}
+    for csv_path in sorted(docs_dir.glob(CSV_GLOB)):
+        match = CSV_SEMESTER.search(csv_path.name)
+        if match:
+            semesters[f"{match.group(2)}-{match.group(1)}"] = csv_path
+    return dict(sorted(semesters.items()))
+
+
+def build_database(db_path: Path, semesters: dict) -> None:
+    """Cria o banco, aplica o seed e carrega o histórico de cada CSV."""
+    env = os.environ.copy()
+    env["DATABASE_URL"] = f"sqlite:///{db_path}"
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from src.db.migrations import init_db, seed_db; init_db(); seed_db()",
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    for name, csv_path in semesters.items():
+        subprocess.run(
+            [
+                sys.executable,
+                "load_historical_allocations.py",
+                "--semester",
+                name,
+                str(csv_path),
+            ],
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+
+
+def run_allocation(semester_name: str) -> dict:
+    """Processo filho: aloca o semestre e devolve as métricas."""
+    import logging
+    import time
+
+    logging.disable(logging.CRITICAL)
+
+    from src.config.database import get_db_session
+    from src.repositories.semestre import SemestreRepository
+    from src.services.optimized_autonomous_allocation_service import (
+        OptimizedAutonomousAllocationService,
+    )
+
+    with get_db_session() as session:
+        semester = SemestreRepository(session).get_by_name(semester_name)
+        start = time.perf_counter()
+        result = OptimizedAutonomousAllocationService(
+            session
+        ).execute_autonomous_allocation(semester.id)
+        seconds = time.perf_counter() - start
+
+    return {
+        "demands": result["total_demands_processed"],
+        "allocated": result["allocations_completed"],
+        "seconds": round(seconds, 2),
+        "solver": result.get("solver"),
+    }
+
+
+def benchmark(db_path: Path, semester_name: str, solver: str, time_limit: float):
+    """Executa um modo num semestre, sobre uma cópia do banco."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        copy_path = Path(tmp_dir) / "bench.db"
+        shutil.copy(db_path, copy_path)
+
+        conn = sqlite3.connect(copy_path)
+        conn.execute(
+            "DELETE FROM alocacoes_semestrais WHERE semestre_id = "
+            "(SELECT id FROM semestres WHERE nome = ?)",
+            (semester_name,),
+        )
+        conn.commit()
+        conn.close()
+
+        env = os.environ.copy()
+        env["DATABASE_URL"] = f"sqlite:///{copy_path}"
+        env["ALLOCATION_SOLVER"] = solver
+        env["ALLOCATION_SOLVER_TIME_LIMIT"] = str(time_limit)
+        output = subprocess.run(
+            [sys.executable, __file__, "--role", "run", "--semester", semester_name],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", help="Banco SQLite com o histórico já carregado")
+    parser.add_argument("--docs", default="docs", help="Diretório dos CSVs")
+    parser.add_argument("--semesters", nargs="+", help="Semestres (ex.: 2025-1)")
+    parser.add_argument(
+        "--solvers", nargs="+", default=["greedy", "cpsat"], help="Modos"
+    )
+    parser.add_argument(
+        "--time-limit", type=float, default=20.0, help="Limite do solver (s)"
+    )
+    parser.add_argument("--role", choices=["run"], help=argparse.SUPPRESS)
+    parser.add_argument("--semester", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role == "run":
+        print(json.dumps(run_allocation(args.semester)))
+        return
+
+    available = discover_semesters(Path(args.docs))
+    semesters = args.semesters or list(available)
+    if not semesters:
+        parser.error(f"Nenhum CSV encontrado em {args.docs}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.db:
+            db_path = Path(args.db)
+            if not db_path.exists():
+                parser.error(f"Banco não encontrado: {db_path}")
+        else:
+            missing = [name for name in semesters if name not in available]
+            if missing:
+                parser.error(f"Sem CSV para: {', '.join(missing)}")
+            db_path = Path(tmp_dir) / "historico.db"
+            print(f"Montando banco com {len(available)} semestres históricos...")
+            build_database(db_path, available)
+
+        print(
+            f"{'semestre':<10}{'modo':<8}{'demandas':>9}{'alocadas':>9}"
+            f"{'taxa':>8}{'tempo(s)':>10}  solver"
+        )
+        for semester_name in semesters:
+            for solver in args.solvers:
+                stats = benchmark(db_path, semester_name, solver, args.time_limit)
+                rate = (
+                    stats["allocated"] / stats["demands"] * 100
+                    if stats["demands"]
+                    else 100.0
+                )
+                detail = ""
+                if stats["solver"]:
+                    s = stats["solver"]
+                    detail = (
+                        f"{s['status']} {s['allocated']}/{s['greedy_allocated']} "
+                        f"pontos {s['total_score']}/{s['greedy_total_score']} "
+                        f"({s['wall_time']}s)"
+                    )
+                print(
+                    f"{semester_name:<10}{solver:<8}{stats['demands']:>9}"
+                    f"{stats['allocated']:>9}{rate:>7.1f}%{stats['seconds']:>10}"
+                    f"  {detail}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Benchmark: latência de leitura durante uma alocação autônoma.
+
+Reproduz o cenário de produção — várias sessões do Streamlit lendo o banco
+enquanto um worker de alocação escreve — para cada perfil SQLite
+(settings.SQLITE_PROFILE). Para cada perfil:
+
+1. Copia o banco informado para um arquivo temporário e apaga as alocações
+   do semestre (para que a alocação tenha o que escrever).
+2. Inicia um processo escritor que executa execute_autonomous_allocation.
+3. Enquanto ele roda, N threads leitoras repetem as consultas das páginas
+   de visualização (sessões read-only) e medem a latência de cada leitura.
+
+Uso:
+    python benchmark_db_concurrency.py --db data/ensalamento.db --semester 4
+    python benchmark_db_concurrency.py --db data/ensalamento.db --semester 4 \\
+        --profiles default production --readers 8
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def _percentile(values, fraction):
+    """Percentil por posição (valores já ordenados)."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def run_writer(semester_id: int) -> None:
+    """Processo escritor: executa a alocação autônoma do semestre."""
+    import logging
+
+    logging.disable(logging.CRITICAL)
+
+    from src.config.database import get_db_session
+    from src.services.optimized_autonomous_allocation_service import (
+        OptimizedAutonomousAllocationService,
+    )
+
+    with get_db_session() as session:
+        OptimizedAutonomousAllocationService(
+            session
+        ).execute_autonomous_allocation(semester_id)
+
+
+def run_readers(semester_id: int, readers: int) -> dict:
+    """
+    Processo leitor: mede a latência das leituras enquanto o escritor roda.
+
+    Returns:
+        Estatísticas de latência (ms) e contagem de erros
+    """
+    import logging
+
+    logging.disable(logging.CRITICAL)
+
+    from src.config.database import get_db_session
+    from src.repositories.alocacao import AlocacaoRepository
+    from src.repositories.disciplina import DisciplinaRepository
+    from src.repositories.reserva_ocorrencia import ReservaOcorrenciaRepository
+
+    def read_once():
+        # Mesmas leituras das páginas Home/Visualização
+        with get_db_session(read_only=True) as session:
+            AlocacaoRepository(session).get_by_semestre(semester_id)
+            DisciplinaRepository(session).get_by_semestre(semester_id)
+            ReservaOcorrenciaRepository(session).get_by_room_and_date(
+                1, time.strftime("%Y-%m-%d")
+            )
+
+    # Aquece o pool e o cache antes de iniciar o escritor
+    read_once()
+
+    writer = subprocess.Popen(
+        [sys.executable, __file__, "--role", "writer", "--semester", str(semester_id)],
+        env=os.environ.copy(),
+    )
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def reader_loop():
+        while writer.poll() is None:
+            start = time.perf_counter()
+            try:
+                read_once()
+            except Exception as e:
+                with lock:
+                    errors.append(type(e).__name__)
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=reader_loop) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer_seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "writer_exit": writer.returncode,
+        "writer_seconds": round(writer_seconds, 2),
+        "reads": len(latencies),
+        "errors": len(errors),
+        "p50_ms": round(_percentile(latencies, 0.50), 2),
+        "p95_ms": round(_percentile(latencies, 0.95), 2),
+        "p99_ms": round(_percentile(latencies, 0.99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+    }
+
+
+def benchmark_profile(profile: str, db_path: Path, semester_id: int, readers: int):
+    """Executa o benchmark de um perfil numa cópia do banco."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        copy_path = Path(tmp_dir) / "bench.db"
+        shutil.copy(db_path, copy_path)
+
+        conn = sqlite3.connect(copy_path)
+        # Começa sempre do modo de journal padrão (WAL é persistente no arquivo)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute(
+            "DELETE FROM alocacoes_semestrais WHERE semestre_id = ?", (semester_id,)
+        )
+        conn.commit()
+        conn.close()
+
+        env = os.environ.copy()
+        env["DATABASE_URL"] = f"sqlite:///{copy_path}"
+        env["SQLITE_PROFILE"] = profile
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--role",
+                "readers",
+                "--semester",
+                str(semester_id),
+                "--readers",
+                str(readers),
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default="data/ensalamento.db", help="Banco SQLite")
+    parser.add_argument("--semester", type=int, help="ID do semestre a alocar")
+    parser.add_argument("--readers", type=int, default=4, help="Threads leitoras")
+    parser.add_argument(
+        "--profiles", nargs="+", default=["default", "production"], help="Perfis"
+    )
+    parser.add_argument("--role", choices=["writer", "readers"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role == "writer":
+        run_writer(args.semester)
+        return
+    if args.role == "readers":
+        print(json.dumps(run_readers(args.semester, args.readers)))
+        return
+
+    if args.semester is None:
+        parser.error("--semester é obrigatório")
+    db_path = Path(args.db)
+    if not db_path.exists():
+        parser.error(f"Banco não encontrado: {db_path}")
+
+    print(
+        f"Semestre {args.semester}, {args.readers} leitores, banco {db_path}\n"
+        f"{'perfil':<12}{'escrita(s)':>11}{'leituras':>10}{'erros':>7}"
+        f"{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}  (ms)"
+    )
+    for profile in args.profiles:
+        stats = benchmark_profile(profile, db_path, args.semester, args.readers)
+        print(
+            f"{profile:<12}{stats['writer_seconds']:>11}{stats['reads']:>10}"
+            f"{stats['errors']:>7}{stats['p50_ms']:>9}{stats['p95_ms']:>9}"
+            f"{stats['p99_ms']:>9}{stats['max_ms']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark: pico de memória (RSS) do relatório PDF de ensalamento por sala.
+
+Gera o relatório de N salas sintéticas (uma página por sala, grade
+semanal cheia) num processo separado para cada combinação de modo e
+número de salas, e reporta o pico de RSS do processo e o tamanho do PDF.
+
+Modos:
+    story   comportamento anterior: story completa em memória, PDF em BytesIO
+    bytes   generate_allocation_report (salas montadas sob demanda, PDF em
+            memória)
+    file    export_allocation_report (salas montadas sob demanda, PDF
+            escrito num arquivo temporário)
+
+Uso:
+    python benchmark_pdf_report_memory.py
+    python benchmark_pdf_report_memory.py --rooms 50 200 800 --modes story file
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+DAYS = range(2, 8)
+BLOCKS = ["M1", "M2", "M3", "M4", "M5", "T1", "T2", "T3", "T4", "T5", "T6"]
+
+
+def synthetic_rooms(count: int) -> dict:
+    """Salas com uma disciplina em cada (dia, bloco) da manhã e da tarde."""
+    rooms = {}
+    for room_id in range(1, count + 1):
+        allocations = []
+        for dia in DAYS:
+            for index, bloco in enumerate(BLOCKS):
+                demanda = SimpleNamespace(
+                    codigo_disciplina=f"FUP{room_id:03d}{dia}{index:02d}",
+                    nome_disciplina=f"Disciplina sintética {room_id}-{dia}-{bloco}",
+                    turma_disciplina="A",
+                    professores_disciplina="Maria da Silva Souza, João Pereira",
+                )
+                allocations.append(
+                    SimpleNamespace(
+                        sala_id=room_id,
+                        dia_semana_id=dia,
+                        codigo_bloco=bloco,
+                        demanda=demanda,
+                    )
+                )
+        rooms[room_id] = {
+            "room_name": f"UAC: A1-{room_id:03d}",
+            "allocations": allocations,
+        }
+    return rooms
+
+
+def run_report(mode: str, rooms: int) -> dict:
+    """Processo filho: gera o relatório e devolve pico de RSS e tamanho."""
+    import logging
+    import resource
+    from itertools import chain
+
+    logging.disable(logging.CRITICAL)
+
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate
+
+    from src.services.pdf_report_service import PDFReportService
+
+    service = PDFReportService()
+    room_allocations = synthetic_rooms(rooms)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if mode == "story":
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            leftMargin=6 * mm,
+            rightMargin=6 * mm,
+            topMargin=4 * mm,
+            bottomMargin=4 * mm,
+        )
+        story = list(
+            chain.from_iterable(
+                service._iter_room_pages(
+                    room_allocations.values(), [18 * mm] + [30 * mm] * 6
+                )
+            )
+        )
+        doc.build(story)
+        size = len(buffer.getvalue())
+    elif mode == "bytes":
+        size = len(
+            service.generate_allocation_report(
+                room_allocations, "2025-1", portrait_mode=True
+            )
+        )
+    else:
+        path = service.export_allocation_report(
+            room_allocations, "2025-1", portrait_mode=True
+        )
+        size = os.path.getsize(path)
+        os.remove(path)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux
+    return {
+        "baseline_mb": baseline / 1024,
+        "peak_mb": peak / 1024,
+        "pdf_mb": size / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--rooms", nargs="+", type=int, default=[25, 100, 400], help="Salas"
+    )
+    parser.add_argument(
+        "--modes", nargs="+", default=["story", "bytes", "file"], help="Modos"
+    )
+    parser.add_argument("--role", choices=["run"], help=argparse.SUPPRESS)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role == "run":
+        print(json.dumps(run_report(args.mode, args.rooms[0])))
+        return
+
+    print(f"{'modo':<8}{'salas':>7}{'base(MB)':>10}{'pico(MB)':>10}{'PDF(MB)':>9}")
+    for mode in args.modes:
+        for rooms in args.rooms:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--role",
+                    "run",
+                    "--mode",
+                    mode,
+                    "--rooms",
+                    str(rooms),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            stats = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{mode:<8}{rooms:>7}{stats['baseline_mb']:>10.1f}"
+                f"{stats['peak_mb']:>10.1f}{stats['pdf_mb']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
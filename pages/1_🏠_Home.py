@@ -29,7 +29,6 @@ if not initialize_page(
 from pages.components.ui import page_footer
 from src.config.database import get_db_session
 from src.models.academic import Semestre
-from src.models.inventory import Predio, Sala
 from src.repositories.alocacao import AlocacaoRepository
 from src.repositories.dia_semana import DiaSemanaRepository
 from src.repositories.disciplina import DisciplinaRepository
@@ -37,6 +36,7 @@ from src.repositories.horario_bloco import HorarioBlocoRepository
 from src.repositories.professor import ProfessorRepository
 from src.repositories.reserva import ReservaRepository
 from src.repositories.sala import SalaRepository
+from src.services.semester_grid_service import get_semester_grid
 from src.utils.cache_helpers import get_sigaa_parser
 from src.utils.ui_feedback import (
     display_session_feedback,
@@ -333,7 +333,7 @@ def create_room_schedule_grid(allocations: List[Any], room_name: str) -> pd.Data
 
 
 try:
-    with get_db_session() as session:
+    with get_db_session(read_only=True) as session:
         # Initialize repositories
         aloc_repo = AlocacaoRepository(session)
         reserva_repo = ReservaRepository(session)
@@ -356,42 +356,14 @@ try:
         active_semester_id = active_semester.id
         active_semester_name = active_semester.nome
 
-        # Get rooms data
-        salas_orm = session.query(Sala).join(Predio).all()
+        # Cached grid of the semester (rebuilt only when its data changes)
+        grid = get_semester_grid(active_semester_id)
 
         # Create filter options
-        salas_options = {s.id: f"{s.predio.nome}: {s.nome}" for s in salas_orm}
-        predios_options = {p.id: p.nome for p in session.query(Predio).all()}
-
-        # Get disciplines for the active semester
-        demandas = disc_repo.get_by_semestre(active_semester_id)
-
-        # Create unique discipline options (codigo - nome format)
-        disciplina_options = {}
-        for demanda in demandas:
-            key = demanda.codigo_disciplina
-            display_name = f"{demanda.codigo_disciplina} - {demanda.nome_disciplina}"
-            if key not in disciplina_options:
-                disciplina_options[key] = display_name
-
-        # Create unique professor options from active semester allocations
-        professor_options = {}
-        for demanda in demandas:
-            if (
-                demanda.professores_disciplina
-                and demanda.professores_disciplina.strip()
-            ):
-                # Split by common separators and clean up
-                professors = [
-                    p.strip()
-                    for p in demanda.professores_disciplina.replace(";", ",")
-                    .replace("/", ",")
-                    .split(",")
-                    if p.strip()
-                ]
-                for professor in professors:
-                    if professor and professor not in professor_options:
-                        professor_options[professor] = professor
+        salas_options = grid.room_labels
+        predios_options = grid.predio_options
+        disciplina_options = grid.disciplina_options
+        professor_options = grid.professor_options
 
         st.title(f"📅 Visualizar Ensalamento {active_semester_name}")
 
@@ -458,56 +430,19 @@ try:
 
         # Get data based on filters - LOAD DATA BEFORE BUTTONS
         with st.spinner("Carregando dados..."):
-            # Get allocations for active semester
-            allocacoes = aloc_repo.get_by_semestre(active_semester_id)
+            # Slice the cached grid by the selected filters
+            room_allocations = grid.room_allocations(
+                predio_id=None if selected_predio == "all" else selected_predio,
+                sala_id=None if selected_entity == "all" else selected_entity,
+                codigo_disciplina=(
+                    None if selected_disciplina == "all" else selected_disciplina
+                ),
+                professor=None if selected_professor == "all" else selected_professor,
+            )
 
             # Get reservations only if checkbox is checked
             reservas = reserva_repo.get_all() if show_reservations else []
 
-            # Group allocations by room
-            room_allocations = {}
-            for alloc in allocacoes:
-                room_id = alloc.sala_id
-
-                # Apply entity filter (specific room)
-                if selected_entity != "all" and room_id != selected_entity:
-                    continue
-
-                # Apply building filter (selected_predio)
-                if selected_predio != "all":
-                    # Get the room to check its building
-                    room = next((s for s in salas_orm if s.id == room_id), None)
-                    if room and room.predio_id != selected_predio:
-                        continue
-
-                # Apply discipline filter
-                if selected_disciplina != "all":
-                    # Check if allocation has a demanda and matches the selected discipline
-                    if (
-                        not alloc.demanda
-                        or alloc.demanda.codigo_disciplina != selected_disciplina
-                    ):
-                        continue
-
-                # Apply professor filter
-                if selected_professor != "all":
-                    # Check if allocation has a demanda and the professor name contains the selected professor
-                    if (
-                        not alloc.demanda
-                        or not alloc.demanda.professores_disciplina
-                        or selected_professor
-                        not in alloc.demanda.professores_disciplina
-                    ):
-                        continue
-
-                if room_id not in room_allocations:
-                    room_allocations[room_id] = {
-                        "room_name": salas_options.get(room_id, f"Sala {room_id}"),
-                        "allocations": [],
-                    }
-
-                room_allocations[room_id]["allocations"].append(alloc)
-
             # Group reservations by room
             for reserva in reservas:
                 room_id = reserva.sala_id
@@ -518,9 +453,11 @@ try:
 
                 # Apply building filter (selected_predio)
                 if selected_predio != "all":
-                    # Get the room to check its building
-                    room = next((s for s in salas_orm if s.id == room_id), None)
-                    if room and room.predio_id != selected_predio:
+                    # Skip rooms of other buildings
+                    if (
+                        room_id in salas_options
+                        and room_id not in grid.rooms_by_predio.get(selected_predio, [])
+                    ):
                         continue
 
                 if room_id not in room_allocations:
@@ -30,9 +30,9 @@ if not initialize_page(
 from pages.components.ui import page_footer
 from src.config.database import get_db_session
 from src.repositories.disciplina import DisciplinaRepository
-from src.repositories.professor import ProfessorRepository
 from src.repositories.semestre import SemestreRepository
 from src.schemas.academic import DemandaCreate
+from src.services.professor_name_index import get_professor_name_index
 from src.services.semester_service import sync_semester_from_api
 from src.utils.cache_helpers import get_semester_options, get_sigaa_parser
 from src.utils.ui_feedback import display_session_feedback, set_session_feedback
@@ -176,7 +176,7 @@ cursos_ignorados = st.multiselect(
 
 with get_db_session() as session:
     dem_repo = DisciplinaRepository(session)
-    prof_repo = ProfessorRepository(session)
+    professor_index = get_professor_name_index(session)
 
     demandas = dem_repo.get_by_semestre(selected_semester_id)
     df = _demanda_dtos_to_df(demandas)
@@ -201,9 +201,8 @@ with get_db_session() as session:
     col3.metric("Slots de Horários", f"{total_slots_atomicos}")
 
     # --- Avisos Acionáveis: Professores não cadastrados ---
-    registered_profs = {p.nome_completo for p in prof_repo.get_all()}
     missing_profs = sorted(
-        [p for p in profs_from_dem if p and p not in registered_profs]
+        [p for p in profs_from_dem if p and professor_index.resolve(p) is None]
     )
 
     if missing_profs:
@@ -570,12 +569,27 @@ if st.session_state.sync_semestre_processing:
     ):
         # Complete the sync operation
         try:
-            summary = sync_semester_from_api(current_semester_name, cursos_ignorados)
+            summary = sync_semester_from_api(
+                current_semester_name,
+                cursos_ignorados,
+                incremental=True,
+                confirm_removals=st.session_state.pop("sync_confirm_removals", False),
+            )
+            # Offers missing from the payload are only removed once confirmed
+            st.session_state.sync_pending_removals = (
+                summary["diff"]["pending_removals"]
+                if summary["removal_blocked"]
+                else []
+            )
+            st.session_state.sync_removal_blocked = summary["removal_blocked"]
             # success
             set_session_feedback(
                 "sync_semestre_result",
                 True,
-                f"Sincronização concluída: {summary['demandas']} demandas importadas, {summary['professores']} professores criados.",
+                f"Sincronização concluída: {summary['demandas']} demandas importadas, "
+                f"{summary['updated']} atualizadas, {summary['removed']} removidas, "
+                f"{summary['invalidated_allocations']} alocações invalidadas, "
+                f"{summary['professores']} professores criados.",
                 ttl=8,
                 summary=summary,
             )
@@ -594,6 +608,29 @@ if st.session_state.sync_semestre_processing:
         # Rerun to refresh the page and show results
         st.rerun()
 
+# Offers missing from the last sync payload, kept until confirmed
+pending_removals = st.session_state.get("sync_pending_removals") or []
+if pending_removals:
+    if st.session_state.get("sync_removal_blocked") == "empty_payload":
+        st.warning(
+            "⚠️ A API não retornou nenhuma oferta; as demandas existentes "
+            f"({len(pending_removals)}) não foram removidas."
+        )
+    else:
+        st.warning(
+            f"⚠️ {len(pending_removals)} ofertas não constam mais na API. "
+            "Confirme para removê-las junto com suas alocações."
+        )
+        with st.expander("Ver ofertas a remover"):
+            st.dataframe(pending_removals, hide_index=True)
+        if st.button(
+            "🗑️ Confirmar remoção e sincronizar novamente",
+            disabled=st.session_state.sync_semestre_processing,
+        ):
+            st.session_state.sync_confirm_removals = True
+            st.session_state.sync_semestre_processing = True
+            st.rerun()
+
 # Check semester status before allowing sync
 semestre_status_active = False
 with get_db_session() as session:
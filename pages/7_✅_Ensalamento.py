@@ -4,6 +4,8 @@ Two-column layout page for allocating classroom demands to rooms.
 Combines demand queue with smart room suggestions and allocation controls.
 """
 
+import os
+
 import streamlit as st
 
 from pages.components.alloc_queue import render_demand_queue
@@ -11,8 +13,33 @@ from pages.components.allocation_assistant import render_allocation_assistant
 from pages.components.auth import initialize_page
 from pages.components.ui import page_footer
 from src.config.database import get_db_session
+from src.services.allocation_job_service import (
+    AllocationJobConflictError,
+    cancel_job,
+    get_active_job,
+    get_job,
+    get_latest_job,
+    submit_allocation_job,
+)
+from src.services.autonomous_allocation_report_service import (
+    AutonomousAllocationReportService,
+    decisions_payload_path,
+    decode_report_payload,
+)
 from src.utils.cache_helpers import get_semester_options
-from src.utils.ui_feedback import display_session_feedback
+from src.utils.ui_feedback import display_session_feedback, set_session_feedback
+
+# Seconds between two job status polls while an allocation job is active
+JOB_POLL_SECONDS = 2
+
+# Human-readable names of the allocation phases reported by jobs
+JOB_PHASE_LABELS = {
+    "hybrid_detection": "Detecção de disciplinas híbridas",
+    "hard_rules": "Regras obrigatórias",
+    "partial_allocation": "Alocação por dia",
+    "soft_scoring": "Pontuação de salas",
+    "atomic_allocation": "Alocação atômica",
+}
 
 
 def clear_deallocation_selection():
@@ -21,6 +48,79 @@ def clear_deallocation_selection():
     st.rerun()
 
 
+def _notify_allocation_job_finished(job) -> None:
+    """Store toast feedback describing a finished allocation job."""
+    if job.status == "failed":
+        set_session_feedback(
+            "autonomous_allocation_result",
+            False,
+            f"Erro na alocação autônoma: {job.erro or 'Erro desconhecido'}",
+            ttl=10,
+        )
+        return
+
+    if job.status == "cancelled":
+        set_session_feedback(
+            "autonomous_allocation_result",
+            False,
+            "Alocação autônoma cancelada. Alocações de fases concluídas foram mantidas.",
+            ttl=10,
+        )
+        return
+
+    result = job.resultado
+    if "message" in result:
+        # No unallocated demands to process
+        set_session_feedback(
+            "autonomous_allocation_result",
+            True,
+            f"Alocação autônoma: {result['message']}",
+            ttl=8,
+        )
+        return
+
+    allocations_done = result.get("allocations_completed", 0)
+    split_demands = result.get("demands_with_split_rooms", 0)
+    execution_time = result.get("execution_time", 0)
+
+    # Build feedback message including split allocation info
+    msg = f"Alocação autônoma concluída: {allocations_done} alocações em {execution_time:.2f}s"
+    if split_demands > 0:
+        msg += f" ({split_demands} disciplinas híbridas com salas divididas)"
+
+    set_session_feedback("autonomous_allocation_result", True, msg, ttl=10)
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_allocation_job_progress(job_id: int):
+    """Poll an allocation job, showing per-phase progress and a cancel button."""
+    job = get_job(job_id)
+    if job is None:
+        return
+
+    if not job.is_active:
+        # Finished since the last poll: refresh the whole page (queue, report)
+        _notify_allocation_job_finished(job)
+        st.rerun(scope="app")
+
+    if job.status == "queued":
+        st.info("⏳ Alocação autônoma na fila...")
+    else:
+        phase = JOB_PHASE_LABELS.get(job.fase_atual, job.fase_atual or "Preparando")
+        counters = job.progresso.get(job.fase_atual or "", {})
+        done, total = counters.get("done", 0), counters.get("total", 0)
+        st.progress(
+            done / total if total else 0.0,
+            text=f"🧠 {phase}: {done}/{total} demandas",
+        )
+
+    if job.cancelamento_solicitado:
+        st.caption("Cancelamento solicitado, aguardando a próxima demanda...")
+    elif st.button("⏹️ Cancelar alocação", key=f"cancel_allocation_job_{job.id}"):
+        cancel_job(job.id)
+        st.rerun(scope="fragment")
+
+
 @st.dialog(
     "❓Remover Alocação",
     width="large",
@@ -101,8 +201,6 @@ def show_deallocation_dialog(selected_dealloc_demand_id):
                 success = result.success
                 message = result.error_message or "Desalocação realizada com sucesso"
 
-                from src.utils.ui_feedback import set_session_feedback
-
                 set_session_feedback("deallocation_result", success, message, ttl=6)
 
                 # Clear the session state to dismiss the dialog BEFORE rerun
@@ -189,94 +287,29 @@ with col1:
     # AUTONOMOUS ALLOCATION CONTROLS
     # ============================================================================
 
-    # Autonomous Allocation Button
+    # Autonomous allocation runs as a background job; the button is disabled
+    # while this semester already has a queued or running job
+    active_job = get_active_job(selected_semester)
+
     if st.button(
         "🚀 **Executar Alocação Autônoma**",
         type="primary",
         width="stretch",
+        disabled=active_job is not None,
         help="Executa o motor de alocação automática inteligente baseado em regras obrigatórias, preferências e histórico de alocações",
     ):
-        # Execute autonomous allocation
-        with st.spinner(
-            "🧠 Executando alocação autônoma. Isso pode levar alguns minutos..."
-        ):
-            with get_db_session() as session:
-                from src.services.optimized_autonomous_allocation_service import (
-                    OptimizedAutonomousAllocationService as AutonomousAllocationService,
-                )
-
-                autonomous_service = AutonomousAllocationService(session)
-                # Use partial allocation to enable per-day scoring and split room
-                # allocation for hybrid disciplines (e.g., lab on Mon, classroom on Wed)
-                result = autonomous_service.execute_autonomous_allocation_partial(
-                    selected_semester
-                )
-
-                if result["success"]:
-                    # Use only toast-style feedback system (no st.success/st.info/st.metric)
-
-                    from src.utils.ui_feedback import set_session_feedback
-
-                    # Check if this is the "no demands" case or full results
-                    if "message" in result:
-                        # No unallocated demands to process
-                        set_session_feedback(
-                            "autonomous_allocation_result",
-                            True,
-                            f"Alocação autônoma: {result['message']}",
-                            ttl=8,
-                        )
-                    else:
-                        # Store PDF report in session state for download
-                        if "pdf_report" in result:
-                            st.session_state["autonomous_allocation_pdf"] = result[
-                                "pdf_report"
-                            ]
-                            st.session_state["autonomous_allocation_pdf_filename"] = (
-                                result.get("pdf_filename", "relatorio_alocacao.pdf")
-                            )
-
-                            # Save PDF report to data/reports folder automatically
-                            import os
-
-                            pdf_filename = result.get(
-                                "pdf_filename", "relatorio_alocacao.pdf"
-                            )
-                            reports_dir = "data/reports"
-                            os.makedirs(reports_dir, exist_ok=True)
-                            pdf_path = os.path.join(reports_dir, pdf_filename)
-
-                            with open(pdf_path, "wb") as f:
-                                f.write(result["pdf_report"])
-
-                            # Log successful save
-                            print(f"PDF report saved to: {pdf_path}")
-
-                        # Full allocation results (partial mode)
-                        allocations_done = result["allocations_completed"]
-                        split_demands = result.get("demands_with_split_rooms", 0)
-                        total_conflicts = result["phase1_hard_rules"][
-                            "conflicts"
-                        ] + result.get("conflicts_found", 0)
-                        execution_time = result.get("execution_time", 0)
-
-                        # Build feedback message including split allocation info
-                        msg = f"Alocação autônoma concluída: {allocations_done} alocações em {execution_time:.2f}s"
-                        if split_demands > 0:
-                            msg += f" ({split_demands} disciplinas híbridas com salas divididas)"
-
-                        set_session_feedback(
-                            "autonomous_allocation_result",
-                            True,
-                            msg,
-                            ttl=10,
-                        )
+        try:
+            submit_allocation_job(
+                selected_semester,
+                solicitado_por=st.session_state.get("username"),
+            )
+        except AllocationJobConflictError as e:
+            st.error(f"❌ {e}")
+        else:
+            st.rerun()
 
-                    st.rerun()
-                else:
-                    st.error(
-                        f"❌ **Erro na alocação autônoma**: {result.get('error', 'Erro desconhecido')}"
-                    )
+    if active_job is not None:
+        render_allocation_job_progress(active_job.id)
 
 
 with col2:
@@ -288,22 +321,55 @@ with col2:
         key="demandas_filter",
     )
 
-    # Show download button if PDF report is available from previous allocation
-    if st.session_state.get("autonomous_allocation_pdf"):
-        pdf_data = st.session_state["autonomous_allocation_pdf"]
-        pdf_filename = st.session_state.get(
-            "autonomous_allocation_pdf_filename", "relatorio_alocacao.pdf"
-        )
+    # Show download button for the report of the semester's latest finished job
+    latest_job = get_latest_job(selected_semester)
+    if (
+        latest_job is not None
+        and latest_job.status == "done"
+        and latest_job.pdf_path
+        and os.path.exists(latest_job.pdf_path)
+    ):
+        with open(latest_job.pdf_path, "rb") as f:
+            pdf_data = f.read()
 
         st.download_button(
             label="📄 Relatório PDF da Alocação",
             data=pdf_data,
-            file_name=pdf_filename,
+            file_name=os.path.basename(latest_job.pdf_path),
             mime="application/pdf",
             help="Baixe o relatório detalhado em PDF com todas as decisões de alocação",
             type="primary",
         )
 
+        # Detailed decisions appendix, left out of the report and rendered
+        # only when requested
+        payload_path = decisions_payload_path(latest_job.pdf_path)
+        appendix_key = f"allocation_report_appendix_{latest_job.id}"
+        if os.path.exists(payload_path):
+            if appendix_key not in st.session_state and st.button(
+                "📑 Gerar Apêndice de Decisões",
+                help="Gera o PDF com a pontuação detalhada de cada alocação realizada",
+            ):
+                with st.spinner("Gerando apêndice de decisões..."):
+                    with open(payload_path, "rb") as f:
+                        payload = decode_report_payload(f.read())
+                    report_service = AutonomousAllocationReportService()
+                    st.session_state[appendix_key] = (
+                        report_service.generate_detailed_decisions_report(
+                            payload["decisions"], payload["semester_name"]
+                        )
+                    )
+
+            if appendix_key in st.session_state:
+                st.download_button(
+                    label="📑 Apêndice: Decisões Detalhadas",
+                    data=st.session_state[appendix_key],
+                    file_name=os.path.basename(latest_job.pdf_path).replace(
+                        ".pdf", "_decisoes.pdf"
+                    ),
+                    mime="application/pdf",
+                )
+
 
 # ============================================================================
 # MAIN LAYOUT - TWO COLUMN ALLOCATION INTERFACE
@@ -341,8 +407,6 @@ if selected_demand_id:
                     message = result["feedback_message"]
                     ttl = 6 if success else 8
 
-                    from src.utils.ui_feedback import set_session_feedback
-
                     set_session_feedback(
                         "allocation_result",
                         success,
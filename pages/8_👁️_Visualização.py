@@ -4,6 +4,7 @@ Room Allocation Visualization Page
 Display and manage semester allocations.
 """
 
+import os
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta
@@ -37,12 +38,12 @@ from src.utils.ui_feedback import (
     display_session_feedback,
     set_session_feedback,
 )
-from src.models.inventory import Sala, Predio
 from src.models.academic import Professor
 from src.models.allocation import AlocacaoSemestral
 from src.utils.cache_helpers import get_sigaa_parser, get_semester_options
 from src.services.pdf_report_service import PDFReportService
 from src.services.statistics_report_service import StatisticsReportService
+from src.services.semester_grid_service import get_semester_grid
 from pages.components.ui import page_footer
 
 # ============================================================================
@@ -353,7 +354,7 @@ st.markdown("Visualize o ensalamento semestral consolidado para o semestre desej
 st.subheader("🔎 Filtrar Exibição do Ensalamento")
 
 try:
-    with get_db_session() as session:
+    with get_db_session(read_only=True) as session:
         # Initialize repositories
         aloc_repo = AlocacaoRepository(session)
         reserva_repo = ReservaRepository(session)
@@ -377,12 +378,11 @@ try:
             current_semester_id = semester_options[0][0]
             st.session_state.global_semester_id = current_semester_id
 
-        # Get rooms data
-        salas_orm = session.query(Sala).join(Predio).all()
-
-        # Create filter options
-        salas_options = {s.id: f"{s.predio.nome}: {s.nome}" for s in salas_orm}
-        predios_options = {p.id: p.nome for p in session.query(Predio).all()}
+        # Create filter options (rooms/buildings are the same in every
+        # semester's cached grid)
+        options_grid = get_semester_grid(current_semester_id)
+        salas_options = options_grid.room_labels
+        predios_options = options_grid.predio_options
 
         col1, col2 = st.columns(2)
 
@@ -444,40 +444,16 @@ try:
 
         # Get data based on filters - LOAD DATA BEFORE BUTTONS
         with st.spinner("Carregando dados..."):
-            # Get allocations for selected semester
-            allocacoes = (
-                aloc_repo.get_by_semestre(selected_semestre)
-                if selected_semestre
-                else []
+            # Cached grid of the selected semester, sliced by the filters
+            grid = get_semester_grid(selected_semestre)
+            room_allocations = grid.room_allocations(
+                predio_id=None if selected_predio == "all" else selected_predio,
+                sala_id=None if selected_entity == "all" else selected_entity,
             )
 
             # Get reservations only if checkbox is checked
             reservas = reserva_repo.get_all() if show_reservations else []
 
-            # Group allocations by room
-            room_allocations = {}
-            for alloc in allocacoes:
-                room_id = alloc.sala_id
-
-                # Apply entity filter (specific room)
-                if selected_entity != "all" and room_id != selected_entity:
-                    continue
-
-                # Apply building filter (selected_predio)
-                if selected_predio != "all":
-                    # Get the room to check its building
-                    room = next((s for s in salas_orm if s.id == room_id), None)
-                    if room and room.predio_id != selected_predio:
-                        continue
-
-                if room_id not in room_allocations:
-                    room_allocations[room_id] = {
-                        "room_name": salas_options.get(room_id, f"Sala {room_id}"),
-                        "allocations": [],
-                    }
-
-                room_allocations[room_id]["allocations"].append(alloc)
-
             # Group reservations by room
             for reserva in reservas:
                 room_id = reserva.sala_id
@@ -488,9 +464,11 @@ try:
 
                 # Apply building filter (selected_predio)
                 if selected_predio != "all":
-                    # Get the room to check its building
-                    room = next((s for s in salas_orm if s.id == room_id), None)
-                    if room and room.predio_id != selected_predio:
+                    # Skip rooms of other buildings
+                    if (
+                        room_id in salas_options
+                        and room_id not in grid.rooms_by_predio.get(selected_predio, [])
+                    ):
                         continue
 
                 if room_id not in room_allocations:
@@ -545,8 +523,9 @@ try:
                             None if selected_entity == "all" else selected_entity
                         )
 
-                        # Generate PDF
-                        pdf_content = pdf_service.generate_allocation_report(
+                        # Generate PDF into a temporary file (rooms rendered
+                        # one at a time)
+                        pdf_path = pdf_service.export_allocation_report(
                             room_allocations=room_allocations,
                             semester_name=semestres_options.get(
                                 selected_semestre, f"Semestre {selected_semestre}"
@@ -556,40 +535,42 @@ try:
                         )
 
                         # Create download button
-                        if pdf_content:
-                            from datetime import datetime
-
-                            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-                            if selected_entity == "all":
-                                filename = f"ensalamento_{semestres_options.get(selected_semestre, 'sem')}_{timestamp}.pdf"
-                                success_msg = f"✅ Relatório gerado com sucesso! ({rooms_displayed} salas)"
+                        try:
+                            if os.path.getsize(pdf_path):
+                                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+                                if selected_entity == "all":
+                                    filename = f"ensalamento_{semestres_options.get(selected_semestre, 'sem')}_{timestamp}.pdf"
+                                    success_msg = f"✅ Relatório gerado com sucesso! ({rooms_displayed} salas)"
+                                else:
+                                    room_name_clean = salas_options.get(
+                                        selected_entity, f"sala_{selected_entity}"
+                                    )
+                                    room_name_clean = (
+                                        room_name_clean.replace(":", "_")
+                                        .replace(" ", "_")
+                                        .replace("/", "-")
+                                    )
+                                    filename = (
+                                        f"ensalamento_{room_name_clean}_{timestamp}.pdf"
+                                    )
+                                    success_msg = (
+                                        f"✅ Relatório gerado com sucesso! (1 sala)"
+                                    )
+
+                                with open(pdf_path, "rb") as pdf_file:
+                                    st.download_button(
+                                        label="⬇️ Baixar Relatório PDF",
+                                        data=pdf_file,
+                                        file_name=filename,
+                                        mime="application/pdf",
+                                        key="download_pdf_report",
+                                    )
+                                st.success(success_msg)
                             else:
-                                room_name_clean = salas_options.get(
-                                    selected_entity, f"sala_{selected_entity}"
-                                )
-                                room_name_clean = (
-                                    room_name_clean.replace(":", "_")
-                                    .replace(" ", "_")
-                                    .replace("/", "-")
-                                )
-                                filename = (
-                                    f"ensalamento_{room_name_clean}_{timestamp}.pdf"
-                                )
-                                success_msg = (
-                                    f"✅ Relatório gerado com sucesso! (1 sala)"
-                                )
-
-                            st.download_button(
-                                label="⬇️ Baixar Relatório PDF",
-                                data=pdf_content,
-                                file_name=filename,
-                                mime="application/pdf",
-                                key="download_pdf_report",
-                            )
-                            st.success(success_msg)
-                        else:
-                            st.error("❌ Erro: Nenhum conteúdo gerado para o PDF")
+                                st.error("❌ Erro: Nenhum conteúdo gerado para o PDF")
+                        finally:
+                            os.remove(pdf_path)
 
                 except ImportError as e:
                     st.error(
@@ -617,18 +598,12 @@ try:
                         # Get all demands for the semester
                         demands = disc_repo.get_by_semestre(selected_semestre)
 
-                        # Build buildings mapping
-                        buildings_map = {}
-                        for sala in salas_orm:
-                            if sala.predio_id not in buildings_map:
-                                buildings_map[sala.predio_id] = sala.predio.nome
-
                         # Generate statistics PDF
                         pdf_content = stats_service.generate_statistics_report(
-                            allocations=allocacoes,
+                            allocations=grid.slots,
                             demands=demands,
-                            rooms=salas_orm,
-                            buildings=buildings_map,
+                            rooms=grid.rooms,
+                            buildings=grid.predio_options,
                             semester_name=semestres_options.get(
                                 selected_semestre, f"Semestre {selected_semestre}"
                             ),
@@ -44,6 +44,11 @@ from src.repositories.sala import SalaRepository
 from src.repositories.semestre import SemestreRepository
 from src.repositories.alocacao import AlocacaoRepository
 from src.services.reserva_evento_service import ReservaEventoService
+from src.services.reserva_view_service import (
+    format_sala_label,
+    get_reserva_facets,
+    paginate_reserva_rows,
+)
 from src.utils.ui_feedback import set_session_feedback, display_session_feedback
 from src.utils.cache_helpers import (
     get_predio_options,
@@ -289,7 +294,9 @@ def merge_adjacent_time_blocks(data_display: List[Dict]) -> List[Dict]:
     )
 
 
-def create_reservations_editor(data: List[Dict]) -> None:
+def create_reservations_editor(
+    data: List[Dict], editor_key: str = "reservas_editor"
+) -> None:
     """Create st.data_editor for reservations display with merged time blocks and CRUD operations"""
     if not data:
         st.info("Nenhuma reserva encontrada para os filtros selecionados.")
@@ -387,7 +394,7 @@ def create_reservations_editor(data: List[Dict]) -> None:
         },
         hide_index=True,
         num_rows="dynamic",
-        key="reservas_editor",
+        key=editor_key,
     )
 
     # Process deletions and updates in batch
@@ -615,33 +622,8 @@ with get_db_session() as session:
 # FILTERS
 # ============================================================================
 
-# Load ALL possible filter data across all reservations first
-ocorrencias = ocorrencia_repo.get_ocorrencias_by_date_range(
-    datetime.now().date() - timedelta(days=365),  # Load from past year
-    datetime.now().date() + timedelta(days=365),  # Load to future year
-    room_ids=None,  # Load all rooms
-)
-
-# Extract unique values for filters
-salas_unicas = set()
-predios_unicos = set()
-for ocorrencia in ocorrencias:
-    evento = ocorrencia.evento
-    sala = evento.sala
-    salas_unicas.add(f"{sala.nome}: {sala.descricao}" if sala.descricao else sala.nome)
-    if sala.predio:
-        predios_unicos.add(sala.predio.nome)
-
-salas_unicas = sorted(list(salas_unicas))
-predios_unicos = sorted(list(predios_unicos))
-
-# Extract event titles
-eventos_unicos = set()
-for ocorrencia in ocorrencias:
-    evento = ocorrencia.evento
-    eventos_unicos.add(evento.titulo_evento)
-
-eventos_unicos = sorted(list(eventos_unicos))
+# Filter options from one aggregate query, cached until the next write
+facets = get_reserva_facets()
 
 # ============================================================================
 # TABS
@@ -685,39 +667,40 @@ if selected_tab == "📅 Visualizar Reservas":
     filtro_evento_texto = st.text_input("Buscar por Evento (título)")
 
     # Room filter
-    filtro_sala = st.multiselect("Filtrar por Sala", options=salas_unicas)
+    filtro_sala = st.multiselect(
+        "Filtrar por Sala",
+        options=list(facets.sala_options.keys()),
+        format_func=lambda x: facets.sala_options.get(x, "N/A"),
+    )
 
     # Building filter
-    filtro_predio = st.multiselect("Filtrar por Prédio", options=predios_unicos)
+    filtro_predio = st.multiselect(
+        "Filtrar por Prédio",
+        options=list(facets.predio_options.keys()),
+        format_func=lambda x: facets.predio_options.get(x, "N/A"),
+    )
     # TAB 1: VISUALIZAR RESERVAS
     st.header("📅 Reservas Existentes")
 
-    # Load filtered reservations
+    # Load the reservations of the visible window (rooms filtered in SQL)
     try:
-        ocorrencias = ocorrencia_repo.get_ocorrencias_by_date_range(
-            data_inicio, data_fim, room_ids=None
-        )
+        filtro_room_ids = facets.room_ids(filtro_sala, filtro_predio)
+        if filtro_room_ids == []:
+            ocorrencias = []
+        else:
+            with get_db_session(read_only=True) as session:
+                ocorrencias = ReservaOcorrenciaRepository(
+                    session
+                ).get_ocorrencias_by_date_range(
+                    data_inicio, data_fim, room_ids=filtro_room_ids
+                )
 
-        # Format data for display
+        # Format data for display (event, room and building are preloaded)
         data_display = []
         for ocorrencia in ocorrencias:
             evento = ocorrencia.evento
             sala = evento.sala
-
-            # Get building info for display
-            predio_info = next(
-                (
-                    item["predio"]
-                    for item in salas_com_predio
-                    if item["sala"].id == sala.id
-                ),
-                None,
-            )
-            predio_nome = predio_info.nome if predio_info else "N/A"
-
-            sala_display = (
-                f"{sala.nome}: {sala.descricao}" if sala.descricao else sala.nome
-            )
+            predio_nome = sala.predio.nome if sala.predio else "N/A"
 
             data_display.append(
                 {
@@ -728,7 +711,7 @@ if selected_tab == "📅 Visualizar Reservas":
                     "sala_codigo": sala.nome,
                     "sala_descricao": sala.descricao if sala.descricao else "",
                     "predio_nome": predio_nome,
-                    "sala_display": sala_display,  # For filtering
+                    "sala_display": format_sala_label(sala.nome, sala.descricao),
                     "titulo_evento": evento.titulo_evento,
                     "padrao_recorrencia": format_recurrence_pattern(evento),
                     "nome_solicitante": evento.nome_solicitante,
@@ -738,27 +721,54 @@ if selected_tab == "📅 Visualizar Reservas":
                 }
             )
 
-        # Apply display filters before merging
+        # Apply the title filter before merging
         if filtro_evento_texto:
             term = filtro_evento_texto.lower()
             data_display = [
                 row for row in data_display if term in row["titulo_evento"].lower()
             ]
 
-        if filtro_sala:
-            data_display = [
-                row for row in data_display if row["sala_display"] in filtro_sala
-            ]
-
-        if filtro_predio:
-            data_display = [
-                row for row in data_display if row["predio_nome"] in filtro_predio
-            ]
-
         # Merge adjacent time blocks for same reservation on same date
         data_display = merge_adjacent_time_blocks(data_display)
 
-        create_reservations_editor(data_display)
+        # Back to the first page whenever the filters change
+        reservas_filters = (
+            data_inicio,
+            data_fim,
+            filtro_evento_texto,
+            tuple(filtro_sala),
+            tuple(filtro_predio),
+        )
+        if st.session_state.get("reservas_filters") != reservas_filters:
+            st.session_state.reservas_filters = reservas_filters
+            st.session_state.reservas_page = 1
+
+        table_page = paginate_reserva_rows(
+            data_display, st.session_state.get("reservas_page", 1)
+        )
+        if table_page.page_count > 1:
+            # Page selector (clamped if the list got shorter)
+            st.session_state.reservas_page = table_page.page
+            col_pager, col_range = st.columns([1, 3])
+            with col_pager:
+                st.number_input(
+                    "Página",
+                    min_value=1,
+                    max_value=table_page.page_count,
+                    step=1,
+                    key="reservas_page",
+                )
+            with col_range:
+                first = (table_page.page - 1) * table_page.page_size + 1
+                last = first + len(table_page.rows) - 1
+                st.caption(
+                    f"Mostrando {first}–{last} de {table_page.total} "
+                    f"(página {table_page.page} de {table_page.page_count})"
+                )
+
+        create_reservations_editor(
+            table_page.rows, editor_key=f"reservas_editor_{table_page.page}"
+        )
 
         # Export options
         if data_display:
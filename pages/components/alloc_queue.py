@@ -1,20 +1,29 @@
 """Reusable component for displaying the demand queue in manual allocation."""
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, Optional
 
 import streamlit as st
 
 from src.config.database import get_db_session
-from src.repositories.alocacao import AlocacaoRepository
-from src.repositories.professor import ProfessorRepository
-from src.repositories.sala import SalaRepository
-from src.services.manual_allocation_service import ManualAllocationService
-from src.utils.cache_helpers import get_sigaa_parser
+from src.services.demand_queue_service import (
+    DEFAULT_PAGE_SIZE,
+    DemandQueueFilters,
+    DemandQueueItem,
+    DemandQueueService,
+)
+from src.utils.cache_helpers import (
+    get_course_code_options,
+    get_sala_options,
+    get_sigaa_parser,
+)
 
 
 def render_demand_queue(semester_id: int, filters: Optional[Dict[str, Any]] = None):
     """
-    Render the demand queue with cards for demands based on allocation status filter.
+    Render one page of the demand queue, filtered and ordered by priority.
+
+    Filtering, ordering and paging run in SQL (DemandQueueService), so only
+    the cards of the visible page are queried and drawn.
 
     Args:
         semester_id: ID of the semester to show demands for
@@ -29,194 +38,130 @@ def render_demand_queue(semester_id: int, filters: Optional[Dict[str, Any]] = No
     if filters is None:
         filters = {}
 
-    # Apply filters from UI controls (passed in filters dict)
-    search_filter = filters.get("search_text", "")
-    professor_filter = filters.get("professor_filter", "")
-    course_filter = filters.get("course_filter", "")
     allocation_status_filter = filters.get("allocation_status", "unallocated")
 
     # Unique context identifier to avoid duplicate keys
     context_id = filters.get("context_id", f"queue_{allocation_status_filter}")
 
-    with get_db_session() as session:
-        alloc_service = ManualAllocationService(session)
-        prof_repo = ProfessorRepository(session)
-        sala_repo = SalaRepository(session)
-        alocacao_repo = AlocacaoRepository(session)
-
-        # Get allocation progress
-        progress = alloc_service.get_allocation_progress(semester_id)
-
-        # Progress bar and metrics
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total de Demandas", f"{progress['total_demands']}")
-        with col2:
-            st.metric("Alocadas", f"{progress['allocated_demands']}")
-        with col3:
-            st.metric("Pendentes", f"{progress['unallocated_demands']}")
-
-        # Progress bar
-        if progress["total_demands"] > 0:
-            progress_pct = progress["allocation_percent"] / 100
-            st.progress(progress_pct, text=f"{progress['allocation_percent']:.1f}%")
-
-        # Get demands based on allocation status filter
-        if allocation_status_filter == "allocated":
-            demandas = alloc_service.get_allocated_demands(semester_id)
-            header_title = f"Demandas Alocadas ({len(demandas)})"
-        elif allocation_status_filter == "all":
-            demandas = alloc_service.get_all_demands(semester_id)
-            header_title = f"Todas as Demandas ({len(demandas)})"
-        else:  # "unallocated" or default
-            demandas = alloc_service.get_unallocated_demands(semester_id)
-            header_title = f"Demandas Pendentes ({len(demandas)})"
-
-        # Apply filters
-        filtered_demands = _apply_filters(
-            demandas, search_filter, professor_filter, course_filter
+    # Filter controls (values passed in the filters dict take precedence).
+    # Widget keys are shared by every layout so the search and the page
+    # survive selecting a demand.
+    col_search, col_course, col_hybrid = st.columns([2, 1, 1])
+    with col_search:
+        search_text = st.text_input(
+            "🔎 Buscar disciplina",
+            placeholder="Código ou nome",
+            key="queue_search_text",
+        )
+    with col_course:
+        course_codes = get_course_code_options()
+        course = st.selectbox(
+            "🎓 Curso",
+            options=[""] + course_codes,
+            format_func=lambda x: "Todos os cursos" if x == "" else x,
+            key="queue_course_filter",
+        )
+    with col_hybrid:
+        hybrid_only = st.checkbox(
+            "🧪 Somente híbridas",
+            help="Disciplinas detectadas como híbridas no histórico de alocações",
+            key="queue_hybrid_only",
         )
 
-        if not filtered_demands:
-            st.warning("Nenhuma demanda encontrada com os filtros aplicados.", icon="⚠️")
-            return False
+    queue_filters = DemandQueueFilters(
+        allocation_status=allocation_status_filter,
+        search_text=(filters.get("search_text") or search_text).strip(),
+        professor=filters.get("professor_filter", ""),
+        codigo_curso=filters.get("course_filter") or course,
+        hybrid_only=hybrid_only,
+    )
 
-        # Create allocation info mapping for all visible demands
-        allocation_info_map = _get_allocation_info(
-            filtered_demands, alocacao_repo, sala_repo
-        )
+    # Back to the first page whenever the filters change
+    if st.session_state.get("queue_filters") != queue_filters:
+        st.session_state.queue_filters = queue_filters
+        st.session_state.queue_page = 1
 
-        # Show count with appropriate title
-        st.subheader(header_title)
+    with get_db_session() as session:
+        queue_page = DemandQueueService(session).get_page(
+            semester_id,
+            queue_filters,
+            page=st.session_state.get("queue_page", 1),
+            page_size=DEFAULT_PAGE_SIZE,
+            hybrid_codes=_get_hybrid_codes(session),
+            room_names=get_sala_options(),
+        )
 
-        # Sort demands by priority (unallocated first, then by complexity)
-        sorted_demands = _sort_demands_by_priority(
-            filtered_demands, allocation_info_map
+    progress = queue_page.progress
+
+    # Progress bar and metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total de Demandas", f"{progress['total_demands']}")
+    with col2:
+        st.metric("Alocadas", f"{progress['allocated_demands']}")
+    with col3:
+        st.metric("Pendentes", f"{progress['unallocated_demands']}")
+
+    # Progress bar
+    if progress["total_demands"] > 0:
+        progress_pct = progress["allocation_percent"] / 100
+        st.progress(progress_pct, text=f"{progress['allocation_percent']:.1f}%")
+
+    if queue_page.total == 0:
+        st.warning("Nenhuma demanda encontrada com os filtros aplicados.", icon="⚠️")
+        return False
+
+    # Show count with appropriate title
+    if allocation_status_filter == "allocated":
+        header_title = f"Demandas Alocadas ({queue_page.total})"
+    elif allocation_status_filter == "all":
+        header_title = f"Todas as Demandas ({queue_page.total})"
+    else:  # "unallocated" or default
+        header_title = f"Demandas Pendentes ({queue_page.total})"
+    st.subheader(header_title)
+
+    # Page selector (the service clamps the page if the list got shorter)
+    st.session_state.queue_page = queue_page.page
+    col_pager, col_range = st.columns([1, 3])
+    with col_pager:
+        st.number_input(
+            "Página",
+            min_value=1,
+            max_value=queue_page.page_count,
+            step=1,
+            key="queue_page",
+        )
+    with col_range:
+        first = (queue_page.page - 1) * queue_page.page_size + 1
+        last = first + len(queue_page.items) - 1
+        st.caption(
+            f"Mostrando {first}–{last} de {queue_page.total} "
+            f"(página {queue_page.page} de {queue_page.page_count})"
         )
 
-        # Display as cards
-        action_triggered = False
-        for demanda in sorted_demands:
-            demanda_id = getattr(demanda, "id")
-            allocation_info = allocation_info_map.get(demanda_id)
-            action_taken = _render_demand_card(
-                demanda, prof_repo, allocation_info, context_id
-            )
-            if action_taken:
-                action_triggered = True
-
-        return action_triggered
-
-
-def _apply_filters(
-    demandas: List[Dict], search_text: str, professor_filter: str, course_filter: str
-) -> List[Dict]:
-    """Apply text and category filters to demands."""
-    filtered = demandas.copy()
-
-    # Text search filter
-    if search_text:
-        search_lower = search_text.lower()
-        filtered = [
-            d
-            for d in filtered
-            if (
-                search_lower in str(d.get("codigo_disciplina", "")).lower()
-                or search_lower in str(d.get("nome_disciplina", "")).lower()
-            )
-        ]
-
-    # Professor filter
-    if professor_filter:
-        filtered = [
-            d
-            for d in filtered
-            if professor_filter in str(d.get("professores_disciplina", ""))
-        ]
-
-    # Course filter
-    if course_filter:
-        filtered = [
-            d for d in filtered if course_filter == str(d.get("codigo_curso", ""))
-        ]
-
-    return filtered
-
-
-def _get_allocation_info(
-    demandas, alocacao_repo: AlocacaoRepository, sala_repo: SalaRepository
-) -> Dict[int, Dict]:
-    """
-    Get allocation information for a list of demands.
-
-    Returns a dict mapping demanda_id to allocation info:
-    {
-        demanda_id: {
-            'is_allocated': bool,
-            'room_name': str or None,  # Comma-separated if multiple rooms
-            'room_names': [str, ...],  # List of all room names
-            'is_split': bool,  # True if allocated to multiple rooms
-            'allocations': [allocation_dto, ...]
-        }
-    }
-    """
-    allocation_info_map = {}
-
-    for demanda in demandas:
-        demanda_id = getattr(demanda, "id")
-        allocations = alocacao_repo.get_by_demanda(demanda_id)
-
-        if allocations:
-            # Get ALL unique room IDs from allocations
-            unique_room_ids = list(dict.fromkeys(a.sala_id for a in allocations))
-
-            # Get room names for all unique rooms
-            room_names = []
-            for room_id in unique_room_ids:
-                room_info = sala_repo.get_by_id(room_id)
-                room_name = room_info.nome if room_info else f"Sala {room_id}"
-                room_names.append(room_name)
-
-            # Join room names for display
-            room_name_display = ", ".join(room_names)
-            is_split = len(unique_room_ids) > 1
-
-            allocation_info_map[demanda_id] = {
-                "is_allocated": True,
-                "room_name": room_name_display,
-                "room_names": room_names,
-                "is_split": is_split,
-                "allocations": allocations,
-            }
-        else:
-            allocation_info_map[demanda_id] = {
-                "is_allocated": False,
-                "room_name": None,
-                "room_names": [],
-                "is_split": False,
-                "allocations": [],
-            }
-
-    return allocation_info_map
-
-
-def _render_demand_card(
-    demanda,
-    prof_repo: ProfessorRepository,
-    allocation_info: Optional[Dict] = None,
-    context_id: str = "",
-) -> bool:
+    # Display the cards of this page
+    action_triggered = False
+    for item in queue_page.items:
+        if _render_demand_card(item, context_id):
+            action_triggered = True
+
+    return action_triggered
+
+
+def _render_demand_card(item: DemandQueueItem, context_id: str = "") -> bool:
     """
     Render a single demand card.
 
     Args:
-        demanda: Demand object
-        prof_repo: Professor repository for professor info
-        allocation_info: Allocation info dict (from _get_allocation_info)
+        item: Queue item (demand, allocation summary and precomputed warnings)
+        context_id: Layout identifier used in the widget keys
 
     Returns:
         bool: True if allocation action was triggered.
     """
+    demanda = item.demanda
+    allocation_info = item.allocation_info
+
     with st.container(border=True):
         col_info, col_action = st.columns([3, 1])
 
@@ -240,11 +185,19 @@ def _render_demand_card(
                 room_name = allocation_info.get("room_name", "N/A")
                 is_split = allocation_info.get("is_split", False)
 
+                # Block coverage only when part of the schedule is pending
+                coverage = ""
+                if not allocation_info.get("is_fully_allocated", True):
+                    coverage = (
+                        f" ({allocation_info.get('allocated_blocks', 0)}/"
+                        f"{allocation_info.get('total_blocks', 0)} blocos)"
+                    )
+
                 if is_split:
                     # Multiple rooms - show with split indicator
-                    st.caption(f"🏢 **Salas Alocadas:** {room_name} 🔀")
+                    st.caption(f"🏢 **Salas Alocadas:** {room_name} 🔀{coverage}")
                 else:
-                    st.caption(f"🏢 **Sala Alocada:** {room_name}")
+                    st.caption(f"🏢 **Sala Alocada:** {room_name}{coverage}")
 
             # Schedule info
             horario_bruto = getattr(demanda, "horario_sigaa_bruto", "")
@@ -255,19 +208,14 @@ def _render_demand_card(
             else:
                 st.caption("📅 **Horário:** N/A")
 
-            # Rule warnings (simplified - would need more logic in real implementation)
-            # Could check for hard rules that apply to this discipline
-            rule_warnings = _check_rule_warnings(demanda)
-            if rule_warnings:
-                st.warning("⚠️ " + "; ".join(rule_warnings))
+            # Rule warnings (precomputed for the page by DemandQueueService)
+            if item.warnings:
+                st.warning("⚠️ " + "; ".join(item.warnings))
 
         with col_action:
             demanda_id = getattr(demanda, "id")
-            is_allocated = allocation_info and allocation_info.get(
-                "is_allocated", False
-            )
 
-            if is_allocated:
+            if item.is_allocated:
                 # Show deallocation button for allocated demands
                 button_key = f"dealloc_demand_{demanda_id}_{context_id}"
                 if st.button(
@@ -297,115 +245,29 @@ def _render_demand_card(
     return False
 
 
-def _check_rule_warnings(demanda) -> List[str]:
+def _get_hybrid_codes(session) -> FrozenSet[str]:
     """
-    Check for rule-related warnings for this demand.
+    Get the discipline codes detected as hybrid from historical data.
 
-    Checks for:
-    - Disciplines requiring specific room types (from hybrid detection)
-    - Laboratory requirements (from discipline name regex)
-    - Professor accessibility requirements
-    - High enrollment requirements
-    """
-    warnings = []
-
-    professors = str(getattr(demanda, "professores_disciplina", "")).lower()
-    discipline_name = str(getattr(demanda, "nome_disciplina", "")).lower()
-    discipline_code = str(getattr(demanda, "codigo_disciplina", ""))
-
-    # Check for accessibility needs (simplified)
-    if any(term in professors for term in ["baixa mobilidade", "cadeira de rodas"]):
-        warnings.append("Professor com restrição de mobilidade")
-
-    # Check for hybrid discipline detection (from historical data)
-    # This is the CONFIRMED detection from Phase 0
-    is_hybrid_detected = _check_hybrid_discipline(discipline_code)
-    
-    if is_hybrid_detected:
-        # Strong indication - detected from historical allocation data
-        warnings.append("🧪 Disciplina HÍBRIDA - requer laboratório em alguns dias")
-    else:
-        # Soft check for laboratory requirements (regex-based, less certain)
-        if any(term in discipline_name for term in ["laboratório", "prático", "prática"]):
-            warnings.append("Disciplina pode necessitar de laboratório")
+    The detection is materialized in the database per detection semester, so
+    it is only recomputed after that semester's allocations change.
 
-    # Check for high enrollment (may need larger rooms)
-    vagas = getattr(demanda, "vagas_disciplina", 0)
-    if vagas and vagas > 60:
-        warnings.append("Alta demanda - verificar capacidade da sala")
-
-    return warnings
-
-
-def _check_hybrid_discipline(discipline_code: str) -> bool:
-    """
-    Check if a discipline is detected as hybrid from historical data.
-    
-    Uses cached detection results from the most recent autonomous allocation run,
-    or performs fresh detection if needed.
-    
     Args:
-        discipline_code: Discipline code to check
-        
-    Returns:
-        True if discipline is detected as hybrid
-    """
-    # Check if we have cached hybrid detection in session state
-    if "hybrid_disciplines_cache" not in st.session_state:
-        # Perform fresh detection
-        try:
-            with get_db_session() as session:
-                from src.services.hybrid_discipline_service import HybridDisciplineDetectionService
-                
-                hybrid_service = HybridDisciplineDetectionService(session)
-                result = hybrid_service.detect_hybrid_disciplines()
-                
-                # Cache the results
-                st.session_state.hybrid_disciplines_cache = set(result.hybrid_disciplines)
-        except Exception:
-            # If detection fails, return empty set
-            st.session_state.hybrid_disciplines_cache = set()
-    
-    return discipline_code in st.session_state.hybrid_disciplines_cache
-
-
-def _sort_demands_by_priority(demandas, allocation_info_map) -> List:
-    """
-    Sort demands by allocation priority for better user experience.
+        session: SQLAlchemy session
 
-    Priority order:
-    1. Unallocated demands with hard rules
-    2. Unallocated demands with high enrollment
-    3. Other unallocated demands
-    4. Allocated demands
+    Returns:
+        Frozen set of hybrid discipline codes (empty if detection fails)
     """
-
-    def get_priority_score(demanda):
-        demanda_id = getattr(demanda, "id")
-        allocation_info = allocation_info_map.get(demanda_id, {})
-
-        # Already allocated - lowest priority
-        if allocation_info.get("is_allocated"):
-            return (0, 0, 0)
-
-        # Unallocated - calculate priority
-        score = 100  # Base score for unallocated
-
-        # High enrollment gets higher priority (up to +20 points)
-        # Formula: +1 point per 10 students, capped at 20
-        vagas = getattr(demanda, "vagas_disciplina", 0)
-        enrollment_priority = min((vagas // 10), 20)
-
-        # Laboratory courses get priority
-        discipline_name = str(getattr(demanda, "nome_disciplina", "")).lower()
-        lab_priority = (
-            15
-            if any(
-                term in discipline_name for term in ["laboratório", "lab", "prático"]
-            )
-            else 0
-        )
-
-        return (score, lab_priority, enrollment_priority)
-
-    return sorted(demandas, key=get_priority_score, reverse=True)
+    from src.services.hybrid_discipline_service import (
+        HybridDisciplineDetectionService,
+    )
+
+    try:
+        result = HybridDisciplineDetectionService(session).detect_hybrid_disciplines()
+        # Keep the (re)computed detection for the next render
+        session.commit()
+    except Exception:
+        # If detection fails, flag no discipline as hybrid
+        session.rollback()
+        return frozenset()
+    return frozenset(result.hybrid_disciplines)
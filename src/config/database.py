@@ -4,12 +4,14 @@ Database connection and session management.
 Provides DatabaseSession context manager for managing SQLAlchemy sessions.
 """
 
+import logging
 from contextlib import contextmanager
-from typing import Generator
+from typing import Generator, List
 
 from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from src.config.settings import settings
 
@@ -17,50 +19,127 @@ from src.config.settings import settings
 # IMPORTANT: This must happen BEFORE engine creation to resolve relationships
 from src.models import academic, allocation, inventory, horario  # noqa: F401
 
+logger = logging.getLogger(__name__)
+
+
+SQLITE_PROFILES = ("default", "production")
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    """Check whether a SQLite URL points to an in-memory database."""
+    return url == "sqlite://" or ":memory:" in url
+
+
+def _sqlite_pragmas(read_only: bool = False) -> List[str]:
+    """
+    Build the PRAGMAs run on every new SQLite connection.
+
+    The "production" profile lets the Streamlit sessions read while an
+    allocation run writes: WAL readers never block on the writer, and a busy
+    timeout makes concurrent writers wait instead of failing.
+
+    Args:
+        read_only: Add query_only, so the connection rejects any write
+
+    Returns:
+        List of PRAGMA statements
+    """
+    pragmas = ["PRAGMA foreign_keys=ON"]
+
+    if settings.SQLITE_PROFILE == "production":
+        pragmas += [
+            "PRAGMA journal_mode=WAL",
+            "PRAGMA synchronous=NORMAL",
+            f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+            f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+            f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+            "PRAGMA temp_store=MEMORY",
+        ]
+    elif settings.SQLITE_PROFILE != "default":
+        logger.warning(
+            f"Unknown SQLITE_PROFILE '{settings.SQLITE_PROFILE}', "
+            f"expected one of {SQLITE_PROFILES}; using default"
+        )
+
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+
+    return pragmas
+
 
 # Create database engine
-def get_db_engine() -> Engine:
+def get_db_engine(read_only: bool = False) -> Engine:
     """
     Create and return SQLAlchemy engine.
 
+    SQLite connections are configured by the profile selected in
+    settings.SQLITE_PROFILE; file databases use a QueuePool sized by
+    settings.DB_POOL_SIZE / DB_MAX_OVERFLOW.
+
+    Args:
+        read_only: Open every SQLite connection with query_only
+
     Returns:
         Engine: SQLAlchemy engine instance
     """
+    url = settings.DATABASE_URL
+    is_sqlite = "sqlite" in url
+
+    engine_kwargs = {}
+    if not is_sqlite or not _is_sqlite_memory(url):
+        engine_kwargs = {
+            "poolclass": QueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+        }
+
     engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args=(
-            {"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-        ),
+        url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
         echo=settings.DEBUG,
+        **engine_kwargs,
     )
 
-    # Enable foreign keys for SQLite
-    if "sqlite" in settings.DATABASE_URL:
+    if is_sqlite:
+        pragmas = _sqlite_pragmas(read_only)
 
-        @event.listens_for(Engine, "connect")
+        @event.listens_for(engine, "connect")
         def set_sqlite_pragma(dbapi_connection, connection_record):
             cursor = dbapi_connection.cursor()
-            cursor.execute("PRAGMA foreign_keys=ON")
+            for pragma in pragmas:
+                cursor.execute(pragma)
             cursor.close()
 
     return engine
 
 
-# Create session factory
+# Create session factories (read-only sessions get their own connection pool)
 _engine = get_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+_read_only_engine = get_db_engine(read_only=True)
+ReadOnlySessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=_read_only_engine
+)
 
 
 class DatabaseSession:
     """Context manager for database sessions."""
 
-    def __init__(self):
-        """Initialize database session manager."""
+    def __init__(self, read_only: bool = False):
+        """
+        Initialize database session manager.
+
+        Args:
+            read_only: Use a query_only connection (for pages that only read)
+        """
         self.session: Session | None = None
+        self.read_only = read_only
 
     def __enter__(self) -> Session:
         """Enter context and create session."""
-        self.session = SessionLocal()
+        factory = ReadOnlySessionLocal if self.read_only else SessionLocal
+        self.session = factory()
         return self.session
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
@@ -70,7 +149,7 @@ class DatabaseSession:
 
 
 @contextmanager
-def get_db_session() -> Generator[Session, None, None]:
+def get_db_session(read_only: bool = False) -> Generator[Session, None, None]:
     """
     Get a database session using context manager.
 
@@ -78,8 +157,11 @@ def get_db_session() -> Generator[Session, None, None]:
         with get_db_session() as session:
             # Use session
 
+    Args:
+        read_only: Use a query_only connection (writes raise an error)
+
     Yields:
         Session: SQLAlchemy session
     """
-    with DatabaseSession() as session:
+    with DatabaseSession(read_only) as session:
         yield session
@@ -34,6 +34,20 @@ class Settings:
         db_path = self.DATABASE_URL.replace("sqlite:///", "")
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
+        # SQLite engine profile: "production" (WAL, mmap, larger page cache,
+        # busy timeout) or "default" (SQLite defaults, foreign keys only)
+        self.SQLITE_PROFILE: str = os.getenv("SQLITE_PROFILE", "production").lower()
+        self.SQLITE_BUSY_TIMEOUT_MS: int = int(
+            os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")
+        )
+        # Negative cache_size is in KiB (per connection)
+        self.SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-20000"))
+        self.SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))
+        # Connection pool of file databases (per engine)
+        self.DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        self.DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
         # Encryption
         self.ENCRYPTION_KEY: Optional[str] = os.getenv("ENCRYPTION_KEY")
 
@@ -98,6 +112,50 @@ class Settings:
         # Project Paths
         self.PROJECT_ROOT = Path(__file__).parent.parent.parent
         self.LOGS_DIR = self.PROJECT_ROOT / "logs"
+        self.REPORTS_DIR = self.PROJECT_ROOT / "data" / "reports"
+
+        # Background allocation jobs (worker processes, dead-worker timeout)
+        self.ALLOCATION_JOB_WORKERS: int = int(
+            os.getenv("ALLOCATION_JOB_WORKERS", "2")
+        )
+        self.ALLOCATION_JOB_STALE_SECONDS: int = int(
+            os.getenv("ALLOCATION_JOB_STALE_SECONDS", "600")
+        )
+
+        # Atomic allocation phase: "greedy" (best score first) or "cpsat"
+        # (global assignment with OR-Tools, falls back to greedy)
+        self.ALLOCATION_SOLVER: str = os.getenv("ALLOCATION_SOLVER", "greedy").lower()
+        self.ALLOCATION_SOLVER_TIME_LIMIT: float = float(
+            os.getenv("ALLOCATION_SOLVER_TIME_LIMIT", "20")
+        )
+        self.ALLOCATION_SOLVER_MAX_CANDIDATES: int = int(
+            os.getenv("ALLOCATION_SOLVER_MAX_CANDIDATES", "30")
+        )
+
+        # Minimum trigram similarity (0-1) for matching demand professor names
+        # that differ by more than accents/case/spacing; 0 disables it
+        self.PROFESSOR_NAME_FUZZY_THRESHOLD: float = float(
+            os.getenv("PROFESSOR_NAME_FUZZY_THRESHOLD", "0")
+        )
+
+        # Autonomous allocation PDF report: processes rendering its sections
+        # (1 renders in the calling process; a spawned worker costs ~2 s of
+        # imports, so more only pays off for reports with the appendix on
+        # multi-core hosts) and whether the detailed decisions appendix is
+        # part of it (false: rendered on download)
+        self.REPORT_SECTION_WORKERS: int = int(
+            os.getenv("REPORT_SECTION_WORKERS", "1")
+        )
+        self.REPORT_INCLUDE_DETAILED_DECISIONS: bool = (
+            os.getenv("REPORT_INCLUDE_DETAILED_DECISIONS", "false").lower() == "true"
+        )
+
+        # Recurring reservations: store only the rule and its exceptions and
+        # expand occurrences on demand (false materializes one row per
+        # date x block, the legacy storage)
+        self.RESERVAS_OCORRENCIAS_VIRTUAIS: bool = (
+            os.getenv("RESERVAS_OCORRENCIAS_VIRTUAIS", "true").lower() == "true"
+        )
 
         # Create necessary directories
         self.LOGS_DIR.mkdir(exist_ok=True)
@@ -0,0 +1,32 @@
+-- Composite/covering indexes for the repository hot queries
+-- (guarded by tests/test_query_plans.py)
+
+-- alocacoes_semestrais: only ux_alocacoes_semestrais_unica
+-- (semestre_id, sala_id, dia_semana_id, codigo_bloco) existed
+
+-- By demand, and historical frequency joins from demandas.codigo_disciplina
+CREATE INDEX IF NOT EXISTS ix_alocacoes_semestrais_demanda
+ON alocacoes_semestrais (demanda_id, sala_id, dia_semana_id, semestre_id);
+
+-- Room lookups across semesters (get_by_sala, check_conflict)
+CREATE INDEX IF NOT EXISTS ix_alocacoes_semestrais_sala_slot
+ON alocacoes_semestrais (sala_id, dia_semana_id, codigo_bloco);
+
+-- Per-semester queries joined to the demand (hybrid detection)
+CREATE INDEX IF NOT EXISTS ix_alocacoes_semestrais_semestre_demanda
+ON alocacoes_semestrais (semestre_id, demanda_id, sala_id, dia_semana_id);
+
+-- demandas: semester listing/sync by external oferta id, and discipline code
+CREATE INDEX IF NOT EXISTS ix_demandas_semestre_oferta
+ON demandas (semestre_id, id_oferta_externo);
+
+CREATE INDEX IF NOT EXISTS ix_demandas_codigo_disciplina
+ON demandas (codigo_disciplina, semestre_id, turma_disciplina);
+
+-- reservas: conflict checks by (data_reserva, codigo_bloco) joined to the
+-- event's room
+CREATE INDEX IF NOT EXISTS ix_reservas_ocorrencias_data_bloco
+ON reservas_ocorrencias (data_reserva, codigo_bloco, evento_id);
+
+CREATE INDEX IF NOT EXISTS ix_reservas_eventos_sala_id
+ON reservas_eventos (sala_id);
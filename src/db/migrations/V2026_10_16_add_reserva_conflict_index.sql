@@ -0,0 +1,5 @@
+-- Set-based reservation conflict checks: legacy reservations of a room in a
+-- date range (covering)
+
+CREATE INDEX IF NOT EXISTS ix_reservas_esporadicas_sala_data
+ON reservas_esporadicas (sala_id, data_reserva, codigo_bloco);
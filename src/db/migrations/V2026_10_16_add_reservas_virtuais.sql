@@ -0,0 +1,24 @@
+-- Virtual recurring reservations: a series keeps its rule, first/last date and
+-- blocks, and occurrences are expanded on demand; cancelled and moved
+-- occurrences are stored in reservas_excecoes
+
+ALTER TABLE reservas_eventos ADD COLUMN ocorrencias_virtuais BOOLEAN NOT NULL DEFAULT 0;
+ALTER TABLE reservas_eventos ADD COLUMN data_inicio VARCHAR(10);
+ALTER TABLE reservas_eventos ADD COLUMN data_fim VARCHAR(10);
+ALTER TABLE reservas_eventos ADD COLUMN blocos_json TEXT;
+
+CREATE INDEX IF NOT EXISTS ix_reservas_eventos_data_fim
+ON reservas_eventos (data_fim, data_inicio);
+
+CREATE TABLE IF NOT EXISTS reservas_excecoes (
+    id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    evento_id INTEGER NOT NULL REFERENCES reservas_eventos (id),
+    data_reserva VARCHAR(10) NOT NULL,
+    codigo_bloco VARCHAR(10) NOT NULL REFERENCES horarios_bloco (codigo_bloco),
+    status_excecao VARCHAR(50) NOT NULL,
+    nova_data VARCHAR(10),
+    novo_bloco VARCHAR(10) REFERENCES horarios_bloco (codigo_bloco),
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    CONSTRAINT ux_reservas_excecoes_ocorrencia UNIQUE (evento_id, data_reserva, codigo_bloco)
+);
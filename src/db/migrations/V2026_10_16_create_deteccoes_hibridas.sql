@@ -0,0 +1,18 @@
+-- Materialized hybrid discipline detection, keyed by the detection semester.
+-- A detection is reused while (versao, versao_inventario) match versoes_dados.
+
+CREATE TABLE IF NOT EXISTS deteccoes_hibridas (
+    semestre_id INTEGER NOT NULL PRIMARY KEY,
+    versao INTEGER NOT NULL,
+    versao_inventario INTEGER NOT NULL
+);
+
+-- Distinct (discipline, day, room) allocations of the hybrid disciplines
+CREATE TABLE IF NOT EXISTS deteccoes_hibridas_salas (
+    semestre_id INTEGER NOT NULL,
+    codigo_disciplina VARCHAR(50) NOT NULL,
+    dia_semana_id INTEGER NOT NULL,
+    sala_id INTEGER NOT NULL,
+    tipo_sala_id INTEGER,
+    PRIMARY KEY (semestre_id, codigo_disciplina, dia_semana_id, sala_id)
+);
@@ -0,0 +1,28 @@
+-- Background autonomous allocation jobs (one active job per semester)
+
+CREATE TABLE IF NOT EXISTS jobs_alocacao (
+    id INTEGER NOT NULL PRIMARY KEY,
+    semestre_id INTEGER NOT NULL REFERENCES semestres (id),
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    dry_run BOOLEAN NOT NULL DEFAULT 0,
+    solicitado_por VARCHAR(100),
+    fase_atual VARCHAR(50),
+    progresso_json TEXT NOT NULL DEFAULT '{}',
+    cancelamento_solicitado BOOLEAN NOT NULL DEFAULT 0,
+    resultado_json TEXT,
+    erro TEXT,
+    pdf_path VARCHAR(500),
+    worker_pid INTEGER,
+    iniciado_em DATETIME,
+    finalizado_em DATETIME,
+    heartbeat_em DATETIME,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL
+);
+
+-- Per-semester lock: at most one queued/running job per semester
+CREATE UNIQUE INDEX IF NOT EXISTS ux_jobs_alocacao_semestre_ativo
+ON jobs_alocacao (semestre_id) WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS ix_jobs_alocacao_semestre_id
+ON jobs_alocacao (semestre_id, id);
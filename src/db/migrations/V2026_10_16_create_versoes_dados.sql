@@ -0,0 +1,92 @@
+-- Data versions for cached derived data, one row per key: 'semestre:<id>'
+-- for a semester's allocations and demands (allocation grids) and
+-- 'inventario' for rooms and buildings.
+
+CREATE TABLE IF NOT EXISTS versoes_dados (
+    chave VARCHAR(50) NOT NULL PRIMARY KEY,
+    versao INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_alocacoes_semestrais_ai AFTER INSERT ON alocacoes_semestrais
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('semestre:' || NEW.semestre_id, 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'semestre:' || NEW.semestre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_alocacoes_semestrais_ad AFTER DELETE ON alocacoes_semestrais
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('semestre:' || OLD.semestre_id, 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'semestre:' || OLD.semestre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_alocacoes_semestrais_au_new AFTER UPDATE ON alocacoes_semestrais
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('semestre:' || NEW.semestre_id, 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'semestre:' || NEW.semestre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_alocacoes_semestrais_au_old AFTER UPDATE ON alocacoes_semestrais
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('semestre:' || OLD.semestre_id, 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'semestre:' || OLD.semestre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_demandas_ai AFTER INSERT ON demandas
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('semestre:' || NEW.semestre_id, 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'semestre:' || NEW.semestre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_demandas_ad AFTER DELETE ON demandas
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('semestre:' || OLD.semestre_id, 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'semestre:' || OLD.semestre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_demandas_au_new AFTER UPDATE ON demandas
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('semestre:' || NEW.semestre_id, 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'semestre:' || NEW.semestre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_demandas_au_old AFTER UPDATE ON demandas
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('semestre:' || OLD.semestre_id, 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'semestre:' || OLD.semestre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_salas_ai AFTER INSERT ON salas
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('inventario', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'inventario';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_salas_ad AFTER DELETE ON salas
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('inventario', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'inventario';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_salas_au AFTER UPDATE ON salas
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('inventario', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'inventario';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_predios_ai AFTER INSERT ON predios
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('inventario', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'inventario';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_predios_ad AFTER DELETE ON predios
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('inventario', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'inventario';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_predios_au AFTER UPDATE ON predios
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('inventario', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'inventario';
+END;
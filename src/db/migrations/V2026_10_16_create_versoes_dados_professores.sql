@@ -0,0 +1,20 @@
+-- Professors data version (versoes_dados key 'professores'), bumped on every
+-- write to professores. Keys the cached professor name index.
+
+CREATE TRIGGER IF NOT EXISTS trg_professores_ai AFTER INSERT ON professores
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('professores', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'professores';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_professores_ad AFTER DELETE ON professores
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('professores', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'professores';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_professores_au AFTER UPDATE ON professores
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('professores', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'professores';
+END;
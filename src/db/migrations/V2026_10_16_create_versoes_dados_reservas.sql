@@ -0,0 +1,20 @@
+-- Reservations data version (versoes_dados key 'reservas'), bumped on every
+-- write to reservas_eventos. Keys the cached filter options of the Reservas page.
+
+CREATE TRIGGER IF NOT EXISTS trg_reservas_eventos_ai AFTER INSERT ON reservas_eventos
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('reservas', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'reservas';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reservas_eventos_ad AFTER DELETE ON reservas_eventos
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('reservas', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'reservas';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reservas_eventos_au AFTER UPDATE ON reservas_eventos
+BEGIN
+    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ('reservas', 0);
+    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = 'reservas';
+END;
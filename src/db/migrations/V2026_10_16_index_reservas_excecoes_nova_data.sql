@@ -0,0 +1,5 @@
+-- Virtual series keep their rule dates when an occurrence is moved outside
+-- them; moved occurrences are found by their new date instead.
+
+CREATE INDEX IF NOT EXISTS ix_reservas_excecoes_nova_data
+ON reservas_excecoes (nova_data);
@@ -2,7 +2,7 @@
 Academic domain models (Semester, Demand, Professor, User).
 """
 
-from sqlalchemy import Column, ForeignKey, Integer, String, Text, Boolean, Table
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Text, Boolean, Table
 from sqlalchemy.orm import relationship, declarative_base
 
 from src.models.base import BaseModel
@@ -92,6 +92,18 @@ class Demanda(BaseModel):
         String(50), nullable=True
     )  # Course code from API (e.g., "GEAGRO")
 
+    __table_args__ = (
+        # Semester listing and sync lookups by external oferta id
+        Index("ix_demandas_semestre_oferta", "semestre_id", "id_oferta_externo"),
+        # Lookups by discipline code (rules, history, hybrid detection)
+        Index(
+            "ix_demandas_codigo_disciplina",
+            "codigo_disciplina",
+            "semestre_id",
+            "turma_disciplina",
+        ),
+    )
+
     # Relationships
     semestre = relationship("Semestre", back_populates="demandas")
     alocacoes = relationship(
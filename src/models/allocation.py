@@ -3,15 +3,20 @@ Allocation and reservation models.
 """
 
 from sqlalchemy import (
+    DDL,
     Column,
     ForeignKey,
+    Index,
     Integer,
     String,
+    Table,
     Text,
     Boolean,
     UniqueConstraint,
     DateTime,
     JSON,
+    event,
+    text,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -76,6 +81,32 @@ class AlocacaoSemestral(BaseModel):
             "codigo_bloco",
             name="ux_alocacoes_semestrais_unica",
         ),
+        # Lookups by demand and the historical frequency queries (demandas
+        # filtered by codigo_disciplina joined on demanda_id); covering
+        Index(
+            "ix_alocacoes_semestrais_demanda",
+            "demanda_id",
+            "sala_id",
+            "dia_semana_id",
+            "semestre_id",
+        ),
+        # Room lookups across semesters (get_by_sala, check_conflict without
+        # semestre_id); the unique constraint leads with semestre_id
+        Index(
+            "ix_alocacoes_semestrais_sala_slot",
+            "sala_id",
+            "dia_semana_id",
+            "codigo_bloco",
+        ),
+        # Per-semester queries that need the demand (get_by_semestre, hybrid
+        # detection); covering for the hybrid detection join
+        Index(
+            "ix_alocacoes_semestrais_semestre_demanda",
+            "semestre_id",
+            "demanda_id",
+            "sala_id",
+            "dia_semana_id",
+        ),
         {"sqlite_autoincrement": True},
     )
 
@@ -111,6 +142,16 @@ class ReservaEsporadica(BaseModel):
         String(10), ForeignKey("horarios_bloco.codigo_bloco"), nullable=False
     )
 
+    __table_args__ = (
+        # Conflict checks by room and date range; covering
+        Index(
+            "ix_reservas_esporadicas_sala_data",
+            "sala_id",
+            "data_reserva",
+            "codigo_bloco",
+        ),
+    )
+
     # Relationships
     sala = relationship("Sala", back_populates="reservas")
 
@@ -118,12 +159,19 @@ class ReservaEsporadica(BaseModel):
         return f"<ReservaEsporadica(id={self.id}, sala={self.sala_id}, data={self.data_reserva})>"
 
 
+# Occurrence exception states (reservas_ocorrencias / reservas_excecoes)
+OCORRENCIA_CANCELADA = "Cancelada"
+OCORRENCIA_MOVIDA = "Movida"
+
+
 class ReservaEvento(BaseModel):
     """Parent event entity for recurring reservations.
 
     This is the parent table that stores the main event information
-    and recurrence rules. Individual occurrences are stored in
-    reservas_ocorrencias.
+    and recurrence rules. Occurrences are either materialized, one row per
+    date and block in reservas_ocorrencias (legacy storage), or virtual:
+    expanded on demand from the rule, data_inicio and blocos_json, with
+    cancellations and moved dates stored in reservas_excecoes.
     """
 
     __tablename__ = "reservas_eventos"
@@ -152,13 +200,31 @@ class ReservaEvento(BaseModel):
     # {"tipo": "mensal", "posicao": 1, "dia_semana": 2, "fim": "2025-12-31"} - first Monday of each month
     regra_recorrencia_json = Column(Text, nullable=False, default='{"tipo": "unica"}')
 
+    # Virtual occurrences: expanded from the rule instead of stored rows
+    ocorrencias_virtuais = Column(
+        Boolean, nullable=False, default=False, server_default=text("0")
+    )
+    data_inicio = Column(String(10), nullable=True)  # first date, YYYY-MM-DD
+    # Last date any occurrence (including moved ones) can fall on
+    data_fim = Column(String(10), nullable=True)
+    blocos_json = Column(Text, nullable=True)  # e.g. ["M1", "M2"]
+
     # Timestamps (inherited from BaseModel)
 
+    __table_args__ = (
+        Index("ix_reservas_eventos_sala_id", "sala_id"),
+        # Virtual series overlapping a date window
+        Index("ix_reservas_eventos_data_fim", "data_fim", "data_inicio"),
+    )
+
     # Relationships
     sala = relationship("Sala")
     ocorrencias = relationship(
         "ReservaOcorrencia", back_populates="evento", cascade="all, delete-orphan"
     )
+    excecoes = relationship(
+        "ReservaExcecao", back_populates="evento", cascade="all, delete-orphan"
+    )
 
     def get_regra_recorrencia(self) -> dict:
         """Get parsed recurrence rule as dictionary."""
@@ -180,6 +246,13 @@ class ReservaEvento(BaseModel):
         regra = self.get_regra_recorrencia()
         return regra.get("tipo") != "unica"
 
+    def get_blocos(self) -> list:
+        """Get the time blocks of a virtual series."""
+        try:
+            return json.loads(self.blocos_json) if self.blocos_json else []
+        except json.JSONDecodeError:
+            return []
+
     def __repr__(self) -> str:
         return f"<ReservaEvento(id={self.id}, titulo='{self.titulo_evento}', sala={self.sala_id})>"
 
@@ -213,6 +286,13 @@ class ReservaOcorrencia(BaseModel):
             "codigo_bloco",
             name="ux_reservas_ocorrencias_unica",
         ),
+        # Conflict checks by date and block, joined to the event's room
+        Index(
+            "ix_reservas_ocorrencias_data_bloco",
+            "data_reserva",
+            "codigo_bloco",
+            "evento_id",
+        ),
         {"sqlite_autoincrement": True},
     )
 
@@ -222,3 +302,216 @@ class ReservaOcorrencia(BaseModel):
 
     def __repr__(self) -> str:
         return f"<ReservaOcorrencia(id={self.id}, evento_id={self.evento_id}, data={self.data_reserva}, bloco={self.codigo_bloco})>"
+
+
+class ReservaExcecao(BaseModel):
+    """Exception to one occurrence of a virtual recurring reservation.
+
+    Identifies the occurrence by its original date and block; it is either
+    cancelled or moved to nova_data / novo_bloco.
+    """
+
+    __tablename__ = "reservas_excecoes"
+
+    evento_id = Column(Integer, ForeignKey("reservas_eventos.id"), nullable=False)
+
+    # Original occurrence
+    data_reserva = Column(String(10), nullable=False)  # DATE as YYYY-MM-DD string
+    codigo_bloco = Column(
+        String(10), ForeignKey("horarios_bloco.codigo_bloco"), nullable=False
+    )
+
+    status_excecao = Column(String(50), nullable=False)  # "Cancelada" or "Movida"
+
+    # New date/block of a moved occurrence
+    nova_data = Column(String(10), nullable=True)
+    novo_bloco = Column(
+        String(10), ForeignKey("horarios_bloco.codigo_bloco"), nullable=True
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "evento_id",
+            "data_reserva",
+            "codigo_bloco",
+            name="ux_reservas_excecoes_ocorrencia",
+        ),
+        # Occurrences moved into a date window (see expand_virtual_slots)
+        Index("ix_reservas_excecoes_nova_data", "nova_data"),
+        {"sqlite_autoincrement": True},
+    )
+
+    # Relationships
+    evento = relationship("ReservaEvento", back_populates="excecoes")
+
+    def __repr__(self) -> str:
+        return f"<ReservaExcecao(id={self.id}, evento_id={self.evento_id}, data={self.data_reserva}, bloco={self.codigo_bloco}, status={self.status_excecao})>"
+
+
+# Allocation job states (jobs_alocacao.status)
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_DONE = "done"
+JOB_STATUS_FAILED = "failed"
+JOB_STATUS_CANCELLED = "cancelled"
+JOB_ACTIVE_STATUSES = (JOB_STATUS_QUEUED, JOB_STATUS_RUNNING)
+
+
+class JobAlocacao(BaseModel):
+    """Background autonomous allocation run for a semester.
+
+    Rows are written by the page (queued) and by the worker process that runs
+    the allocation (running, progress, done/failed/cancelled). At most one job
+    per semester can be queued or running: the partial unique index below is
+    the per-semester lock.
+    """
+
+    __tablename__ = "jobs_alocacao"
+
+    semestre_id = Column(Integer, ForeignKey("semestres.id"), nullable=False)
+    status = Column(String(20), nullable=False, default=JOB_STATUS_QUEUED)
+    dry_run = Column(Boolean, nullable=False, default=False)
+    solicitado_por = Column(String(100), nullable=True)  # username
+
+    # Progress: current phase and per-phase counters as JSON
+    # e.g. {"hard_rules": {"done": 12, "total": 40}, "partial_allocation": {...}}
+    fase_atual = Column(String(50), nullable=True)
+    progresso_json = Column(Text, nullable=False, default="{}")
+
+    cancelamento_solicitado = Column(Boolean, nullable=False, default=False)
+
+    # Outcome
+    resultado_json = Column(Text, nullable=True)  # Result summary (no PDF bytes)
+    erro = Column(Text, nullable=True)
+    pdf_path = Column(String(500), nullable=True)
+
+    # Worker bookkeeping (heartbeat_em is used to detect dead workers)
+    worker_pid = Column(Integer, nullable=True)
+    iniciado_em = Column(DateTime, nullable=True)
+    finalizado_em = Column(DateTime, nullable=True)
+    heartbeat_em = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ux_jobs_alocacao_semestre_ativo",
+            "semestre_id",
+            unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+        Index("ix_jobs_alocacao_semestre_id", "semestre_id", "id"),
+    )
+
+    def get_progresso(self) -> dict:
+        """Get parsed progresso_json as dictionary."""
+        try:
+            return json.loads(self.progresso_json) if self.progresso_json else {}
+        except json.JSONDecodeError:
+            return {}
+
+    def get_resultado(self) -> dict:
+        """Get parsed resultado_json as dictionary."""
+        try:
+            return json.loads(self.resultado_json) if self.resultado_json else {}
+        except json.JSONDecodeError:
+            return {}
+
+    def __repr__(self) -> str:
+        return f"<JobAlocacao(id={self.id}, semestre={self.semestre_id}, status='{self.status}')>"
+
+
+# Data versions, bumped by triggers on every write that changes derived data.
+# Each row is keyed by what it versions: "semestre:<id>" for a semester's
+# allocations and demands (what the allocation grids show), "inventario" for
+# rooms and buildings (shared by all semesters), "reservas" for reservation
+# events and "professores" for professors.
+# Readers cache derived data keyed by these versions: the triggers make
+# invalidation exact and visible to every process, including the allocation
+# job workers.
+INVENTORY_VERSION_KEY = "inventario"
+RESERVAS_VERSION_KEY = "reservas"
+PROFESSORES_VERSION_KEY = "professores"
+
+
+def semester_version_key(semestre_id: int) -> str:
+    """versoes_dados key of a semester's allocations and demands."""
+    return f"semestre:{semestre_id}"
+
+
+versoes_dados = Table(
+    "versoes_dados",
+    BaseModel.registry.metadata,
+    Column("chave", String(50), primary_key=True),
+    Column("versao", Integer, nullable=False, default=0),
+)
+
+
+# (trigger name, table, event, chave SQL expression)
+_VERSION_TRIGGERS = [
+    ("trg_alocacoes_semestrais_ai", "alocacoes_semestrais", "INSERT", "'semestre:' || NEW.semestre_id"),
+    ("trg_alocacoes_semestrais_ad", "alocacoes_semestrais", "DELETE", "'semestre:' || OLD.semestre_id"),
+    ("trg_alocacoes_semestrais_au_new", "alocacoes_semestrais", "UPDATE", "'semestre:' || NEW.semestre_id"),
+    ("trg_alocacoes_semestrais_au_old", "alocacoes_semestrais", "UPDATE", "'semestre:' || OLD.semestre_id"),
+    ("trg_demandas_ai", "demandas", "INSERT", "'semestre:' || NEW.semestre_id"),
+    ("trg_demandas_ad", "demandas", "DELETE", "'semestre:' || OLD.semestre_id"),
+    ("trg_demandas_au_new", "demandas", "UPDATE", "'semestre:' || NEW.semestre_id"),
+    ("trg_demandas_au_old", "demandas", "UPDATE", "'semestre:' || OLD.semestre_id"),
+    ("trg_salas_ai", "salas", "INSERT", f"'{INVENTORY_VERSION_KEY}'"),
+    ("trg_salas_ad", "salas", "DELETE", f"'{INVENTORY_VERSION_KEY}'"),
+    ("trg_salas_au", "salas", "UPDATE", f"'{INVENTORY_VERSION_KEY}'"),
+    ("trg_predios_ai", "predios", "INSERT", f"'{INVENTORY_VERSION_KEY}'"),
+    ("trg_predios_ad", "predios", "DELETE", f"'{INVENTORY_VERSION_KEY}'"),
+    ("trg_predios_au", "predios", "UPDATE", f"'{INVENTORY_VERSION_KEY}'"),
+    ("trg_reservas_eventos_ai", "reservas_eventos", "INSERT", f"'{RESERVAS_VERSION_KEY}'"),
+    ("trg_reservas_eventos_ad", "reservas_eventos", "DELETE", f"'{RESERVAS_VERSION_KEY}'"),
+    ("trg_reservas_eventos_au", "reservas_eventos", "UPDATE", f"'{RESERVAS_VERSION_KEY}'"),
+    ("trg_professores_ai", "professores", "INSERT", f"'{PROFESSORES_VERSION_KEY}'"),
+    ("trg_professores_ad", "professores", "DELETE", f"'{PROFESSORES_VERSION_KEY}'"),
+    ("trg_professores_au", "professores", "UPDATE", f"'{PROFESSORES_VERSION_KEY}'"),
+]
+
+
+def version_trigger_sql(name: str, table: str, event_name: str, key: str) -> str:
+    """Build the CREATE TRIGGER statement that bumps one versoes_dados row."""
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event_name} ON {table}\n"
+        f"BEGIN\n"
+        f"    INSERT OR IGNORE INTO versoes_dados (chave, versao) VALUES ({key}, 0);\n"
+        f"    UPDATE versoes_dados SET versao = versao + 1 WHERE chave = {key};\n"
+        f"END"
+    )
+
+
+# create_all builds the triggers once every table exists (existing databases
+# get them from the V2026_10_16_create_versoes_dados.sql migration)
+for _trigger in _VERSION_TRIGGERS:
+    event.listen(
+        BaseModel.registry.metadata,
+        "after_create",
+        DDL(version_trigger_sql(*_trigger)).execute_if(dialect="sqlite"),
+    )
+
+
+# Materialized hybrid discipline detection (see HybridDisciplineDetectionService).
+# deteccoes_hibridas records the data versions (semester, inventory) each
+# detection semester was analyzed at; deteccoes_hibridas_salas holds the
+# distinct (discipline, day, room type, room) allocations of the disciplines
+# detected as hybrid. A detection is reused while both versions still match
+# versoes_dados, so it is only recomputed after the semester's allocations,
+# demands or the room inventory change.
+deteccoes_hibridas = Table(
+    "deteccoes_hibridas",
+    BaseModel.registry.metadata,
+    Column("semestre_id", Integer, primary_key=True, autoincrement=False),
+    Column("versao", Integer, nullable=False),
+    Column("versao_inventario", Integer, nullable=False),
+)
+
+deteccoes_hibridas_salas = Table(
+    "deteccoes_hibridas_salas",
+    BaseModel.registry.metadata,
+    Column("semestre_id", Integer, primary_key=True, autoincrement=False),
+    Column("codigo_disciplina", String(50), primary_key=True),
+    Column("dia_semana_id", Integer, primary_key=True, autoincrement=False),
+    Column("sala_id", Integer, primary_key=True, autoincrement=False),
+    Column("tipo_sala_id", Integer, nullable=True),
+)
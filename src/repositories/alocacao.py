@@ -5,13 +5,20 @@ Provides data access methods for course-room allocation queries with
 conflict detection and availability checking.
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-from sqlalchemy import and_
+from sqlalchemy import and_, delete, insert, select
 from sqlalchemy.orm import Session, joinedload
 
-from src.models.allocation import AlocacaoSemestral
-from src.repositories.base import BaseRepository
+from src.models.allocation import (
+    INVENTORY_VERSION_KEY,
+    AlocacaoSemestral,
+    deteccoes_hibridas,
+    deteccoes_hibridas_salas,
+    semester_version_key,
+    versoes_dados,
+)
+from src.repositories.base import IN_CLAUSE_CHUNK_SIZE, BaseRepository
 from src.schemas.academic import DemandaRead
 from src.schemas.allocation import AlocacaoSemestralCreate, AlocacaoSemestralRead
 
@@ -214,6 +221,30 @@ class AlocacaoRepository(BaseRepository[AlocacaoSemestral, AlocacaoSemestralRead
 
         return query.first() is not None
 
+    def get_room_weekday_slots(
+        self, sala_id: int, semestre_id: Optional[int] = None
+    ) -> Set[Tuple[int, str]]:
+        """Get every allocated (weekday, block) slot of a room in one query.
+
+        Set-based counterpart of check_conflict for checking many dates at
+        once (e.g. a recurring reservation).
+
+        Args:
+            sala_id: Room ID
+            semestre_id: Semester ID (optional - if not provided, covers all semesters)
+
+        Returns:
+            Set of (dia_semana_id, codigo_bloco) tuples
+        """
+        query = self.session.query(
+            AlocacaoSemestral.dia_semana_id, AlocacaoSemestral.codigo_bloco
+        ).filter(AlocacaoSemestral.sala_id == sala_id)
+
+        if semestre_id is not None:
+            query = query.filter(AlocacaoSemestral.semestre_id == semestre_id)
+
+        return {(row.dia_semana_id, row.codigo_bloco) for row in query.distinct()}
+
     def get_conflicts_in_room(
         self, sala_id: int, semestre_id: Optional[int] = None
     ) -> List[Tuple[int, str]]:
@@ -261,6 +292,217 @@ class AlocacaoRepository(BaseRepository[AlocacaoSemestral, AlocacaoSemestralRead
         )
         return [self.orm_to_dto(obj) for obj in orm_objs]
 
+    def get_occupied_slots_by_semestre(
+        self, semestre_id: int
+    ) -> List[Tuple[int, int, str]]:
+        """Get every occupied (room, day, block) slot of a semester.
+
+        Lightweight column-only query used to build in-memory occupancy indexes
+        (no ORM objects or DTOs are materialized).
+
+        Args:
+            semestre_id: Semester ID
+
+        Returns:
+            List of (sala_id, dia_semana_id, codigo_bloco) tuples
+        """
+        rows = (
+            self.session.query(
+                AlocacaoSemestral.sala_id,
+                AlocacaoSemestral.dia_semana_id,
+                AlocacaoSemestral.codigo_bloco,
+            )
+            .filter(AlocacaoSemestral.semestre_id == semestre_id)
+            .all()
+        )
+        return [(row.sala_id, row.dia_semana_id, row.codigo_bloco) for row in rows]
+
+    def get_grid_slots_by_semestre(
+        self, semestre_id: int
+    ) -> List[Tuple[int, int, int, str]]:
+        """Get every allocated slot of a semester with its demand.
+
+        Column-only query used to build the cached semester grid.
+
+        Args:
+            semestre_id: Semester ID
+
+        Returns:
+            List of (demanda_id, sala_id, dia_semana_id, codigo_bloco) tuples
+        """
+        rows = (
+            self.session.query(
+                AlocacaoSemestral.demanda_id,
+                AlocacaoSemestral.sala_id,
+                AlocacaoSemestral.dia_semana_id,
+                AlocacaoSemestral.codigo_bloco,
+            )
+            .filter(AlocacaoSemestral.semestre_id == semestre_id)
+            .all()
+        )
+        return [
+            (row.demanda_id, row.sala_id, row.dia_semana_id, row.codigo_bloco)
+            for row in rows
+        ]
+
+    def get_room_block_counts_by_semestre(
+        self, semestre_id: int, demanda_ids: Optional[List[int]] = None
+    ) -> Dict[int, List[Tuple[int, int]]]:
+        """Get the rooms and allocated block count of every allocated demand.
+
+        One grouped query for the whole semester (used by the demand queue
+        instead of one get_by_demanda call per demand).
+
+        Args:
+            semestre_id: Semester ID
+            demanda_ids: Only these demands (e.g. one queue page; None: all)
+
+        Returns:
+            Dict demanda_id -> [(sala_id, allocated blocks), ...], rooms in the
+            order they were first allocated
+        """
+        from sqlalchemy import func
+
+        query = (
+            self.session.query(
+                AlocacaoSemestral.demanda_id,
+                AlocacaoSemestral.sala_id,
+                func.count(AlocacaoSemestral.id).label("blocos"),
+            )
+            .filter(AlocacaoSemestral.semestre_id == semestre_id)
+            .group_by(AlocacaoSemestral.demanda_id, AlocacaoSemestral.sala_id)
+            .order_by(AlocacaoSemestral.demanda_id, func.min(AlocacaoSemestral.id))
+        )
+        if demanda_ids is None:
+            chunks = [query]
+        else:
+            ids = list(demanda_ids)
+            chunks = [
+                query.filter(
+                    AlocacaoSemestral.demanda_id.in_(
+                        ids[start : start + IN_CLAUSE_CHUNK_SIZE]
+                    )
+                )
+                for start in range(0, len(ids), IN_CLAUSE_CHUNK_SIZE)
+            ]
+
+        result: Dict[int, List[Tuple[int, int]]] = {}
+        for chunk in chunks:
+            for row in chunk.all():
+                result.setdefault(row.demanda_id, []).append(
+                    (row.sala_id, row.blocos)
+                )
+        return result
+
+    def count_allocated_demandas(self, semestre_id: int) -> int:
+        """Count the demands of a semester with at least one allocation.
+
+        Args:
+            semestre_id: Semester ID
+
+        Returns:
+            Number of allocated demands
+        """
+        from sqlalchemy import func
+
+        return (
+            self.session.query(func.count(func.distinct(AlocacaoSemestral.demanda_id)))
+            .filter(AlocacaoSemestral.semestre_id == semestre_id)
+            .scalar()
+        )
+
+    def get_data_version(self, semestre_id: int) -> Tuple[int, int]:
+        """Get the data versions that key caches of a semester's allocations.
+
+        The versoes_dados rows are bumped by database triggers on every write
+        to the semester's allocations/demands and to rooms/buildings.
+
+        Args:
+            semestre_id: Semester ID
+
+        Returns:
+            (semester version, inventory version); 0 when never written
+        """
+        semester_key = semester_version_key(semestre_id)
+        rows = self.session.execute(
+            select(versoes_dados.c.chave, versoes_dados.c.versao).where(
+                versoes_dados.c.chave.in_([semester_key, INVENTORY_VERSION_KEY])
+            )
+        ).all()
+        versions = {row.chave: row.versao for row in rows}
+        return (
+            versions.get(semester_key, 0),
+            versions.get(INVENTORY_VERSION_KEY, 0),
+        )
+
+    def get_slots_by_demandas(
+        self, demanda_ids: List[int]
+    ) -> List[Tuple[int, int, int, str]]:
+        """Get the allocated slots of several demands in column-only queries.
+
+        Args:
+            demanda_ids: Demand IDs
+
+        Returns:
+            List of (id, demanda_id, dia_semana_id, codigo_bloco) tuples
+        """
+        ids = list(demanda_ids)
+        slots: List[Tuple[int, int, int, str]] = []
+        for start in range(0, len(ids), IN_CLAUSE_CHUNK_SIZE):
+            rows = (
+                self.session.query(
+                    AlocacaoSemestral.id,
+                    AlocacaoSemestral.demanda_id,
+                    AlocacaoSemestral.dia_semana_id,
+                    AlocacaoSemestral.codigo_bloco,
+                )
+                .filter(
+                    AlocacaoSemestral.demanda_id.in_(
+                        ids[start : start + IN_CLAUSE_CHUNK_SIZE]
+                    )
+                )
+                .all()
+            )
+            slots.extend(
+                (row.id, row.demanda_id, row.dia_semana_id, row.codigo_bloco)
+                for row in rows
+            )
+        return slots
+
+    def delete_by_ids(self, alocacao_ids: List[int]) -> int:
+        """Delete allocations by ID with bulk DELETE statements (no commit).
+
+        Args:
+            alocacao_ids: Allocation IDs
+
+        Returns:
+            Number of rows deleted
+        """
+        return self._bulk_delete(AlocacaoSemestral.id, alocacao_ids)
+
+    def delete_by_demandas(self, demanda_ids: List[int]) -> int:
+        """Delete all allocations of several demands (no commit).
+
+        Args:
+            demanda_ids: Demand IDs
+
+        Returns:
+            Number of rows deleted
+        """
+        return self._bulk_delete(AlocacaoSemestral.demanda_id, demanda_ids)
+
+    def _bulk_delete(self, column, values: List[int]) -> int:
+        values = list(values)
+        deleted = 0
+        for start in range(0, len(values), IN_CLAUSE_CHUNK_SIZE):
+            result = self.session.execute(
+                delete(AlocacaoSemestral).where(
+                    column.in_(values[start : start + IN_CLAUSE_CHUNK_SIZE])
+                )
+            )
+            deleted += result.rowcount
+        return deleted
+
     def get_by_semestre_filtered(
         self, sala_id: int, semestre_id: int
     ) -> List[AlocacaoSemestralRead]:
@@ -442,6 +684,50 @@ class AlocacaoRepository(BaseRepository[AlocacaoSemestral, AlocacaoSemestralRead
         count = query.count()
         return count
 
+    def get_discipline_room_frequencies_bulk(
+        self,
+        disciplina_codigo: str,
+        sala_ids: List[int],
+        exclude_semester_id: Optional[int] = None,
+    ) -> Dict[int, int]:
+        """Bulk fetch historical frequencies for multiple rooms (any day).
+
+        Performance optimization: Fetches all room frequencies in a single query
+        instead of N queries for N rooms.
+
+        Args:
+            disciplina_codigo: Discipline code to count
+            sala_ids: List of room IDs to check
+            exclude_semester_id: Semester ID to exclude from count (current semester)
+
+        Returns:
+            Dict[sala_id, count]: Historical frequency for each room with allocations
+        """
+        from sqlalchemy import func
+
+        from src.models.academic import Demanda
+
+        query = (
+            self.session.query(
+                AlocacaoSemestral.sala_id,
+                func.count(AlocacaoSemestral.id).label("count"),
+            )
+            .join(Demanda, AlocacaoSemestral.demanda_id == Demanda.id)
+            .filter(
+                and_(
+                    Demanda.codigo_disciplina == disciplina_codigo,
+                    AlocacaoSemestral.sala_id.in_(sala_ids),
+                )
+            )
+            .group_by(AlocacaoSemestral.sala_id)
+        )
+
+        # Exclude current semester if provided
+        if exclude_semester_id is not None:
+            query = query.filter(AlocacaoSemestral.semestre_id != exclude_semester_id)
+
+        return {row.sala_id: row.count for row in query.all()}
+
     def get_discipline_room_day_frequencies_bulk(
         self,
         disciplina_codigo: str,
@@ -496,141 +782,184 @@ class AlocacaoRepository(BaseRepository[AlocacaoSemestral, AlocacaoSemestralRead
 
         return results
 
+    def get_discipline_room_day_frequency_matrix(
+        self, exclude_semester_id: Optional[int] = None
+    ) -> List[Tuple[str, int, int, int]]:
+        """Fetch historical frequencies for every discipline-room-day combination.
+
+        Performance optimization: a single GROUP BY replaces one COUNT query per
+        (discipline, room, day) lookup during an allocation run.
+
+        Args:
+            exclude_semester_id: Semester ID to exclude from count (current semester)
+
+        Returns:
+            List of (codigo_disciplina, sala_id, dia_semana_id, count) tuples
+        """
+        from sqlalchemy import func
+
+        from src.models.academic import Demanda
+
+        query = (
+            self.session.query(
+                Demanda.codigo_disciplina,
+                AlocacaoSemestral.sala_id,
+                AlocacaoSemestral.dia_semana_id,
+                func.count(AlocacaoSemestral.id).label("count"),
+            )
+            .join(Demanda, AlocacaoSemestral.demanda_id == Demanda.id)
+            .group_by(
+                Demanda.codigo_disciplina,
+                AlocacaoSemestral.sala_id,
+                AlocacaoSemestral.dia_semana_id,
+            )
+        )
+
+        # Exclude current semester if provided
+        if exclude_semester_id is not None:
+            query = query.filter(AlocacaoSemestral.semestre_id != exclude_semester_id)
+
+        return [
+            (row.codigo_disciplina, row.sala_id, row.dia_semana_id, row.count)
+            for row in query.all()
+        ]
+
     # ========================================================================
     # HYBRID DISCIPLINE DETECTION (Phase 0)
     # ========================================================================
 
-    def detect_hybrid_disciplines(
-        self, semester_id: int, regular_classroom_type_id: int = 2
-    ) -> List[str]:
+    def get_discipline_day_room_usage(
+        self, semester_id: int
+    ) -> List[Tuple[str, int, Optional[int], int]]:
         """
-        Detect hybrid disciplines from historical allocations.
-
-        A hybrid discipline is one that:
-        1. Has allocations in 2+ different rooms in the same semester
-        2. At least one of those rooms is NOT a regular classroom (tipo_sala_id != 2)
+        Get the distinct (discipline, day, room type, room) allocations of a semester.
 
-        This indicates the discipline uses both classrooms and specialized rooms
-        (labs, auditoriums, etc.) on different days.
+        One grouped query feeds the whole hybrid discipline detection (Phase 0):
+        which disciplines use 2+ rooms including a non-classroom one, and
+        which days used which room types.
 
         Args:
             semester_id: Semester to analyze for detection
-            regular_classroom_type_id: tipo_sala_id for regular classrooms (default: 2)
 
         Returns:
-            List of discipline codes (codigo_disciplina) classified as hybrid
+            List of (codigo_disciplina, dia_semana_id, tipo_sala_id, sala_id),
+            sorted by discipline, day and room
         """
-        from sqlalchemy import case, func
-
         from src.models.academic import Demanda
         from src.models.inventory import Sala
 
-        # Query to find disciplines with:
-        # 1. 2+ different rooms in the semester
-        # 2. At least one room that is NOT a regular classroom
+        columns = (
+            Demanda.codigo_disciplina,
+            AlocacaoSemestral.dia_semana_id,
+            Sala.tipo_sala_id,
+            AlocacaoSemestral.sala_id,
+        )
         query = (
-            self.session.query(Demanda.codigo_disciplina)
-            .join(AlocacaoSemestral, AlocacaoSemestral.demanda_id == Demanda.id)
+            self.session.query(*columns)
+            .join(Demanda, AlocacaoSemestral.demanda_id == Demanda.id)
             .join(Sala, AlocacaoSemestral.sala_id == Sala.id)
             .filter(AlocacaoSemestral.semestre_id == semester_id)
-            .group_by(Demanda.codigo_disciplina)
-            .having(
-                and_(
-                    # At least 2 different rooms
-                    func.count(func.distinct(AlocacaoSemestral.sala_id)) >= 2,
-                    # At least one non-classroom room
-                    func.max(
-                        case(
-                            (Sala.tipo_sala_id != regular_classroom_type_id, 1),
-                            else_=0,
-                        )
-                    )
-                    == 1,
-                )
+            .group_by(*columns)
+            .order_by(
+                Demanda.codigo_disciplina,
+                AlocacaoSemestral.dia_semana_id,
+                AlocacaoSemestral.sala_id,
             )
         )
+        return [
+            (row.codigo_disciplina, row.dia_semana_id, row.tipo_sala_id, row.sala_id)
+            for row in query.all()
+        ]
 
-        results = [row[0] for row in query.all()]
-        return results
-
-    def get_hybrid_discipline_day_room_types(
-        self,
-        codigo_disciplina: str,
-        semester_id: int,
-        regular_classroom_type_id: int = 2,
-    ) -> Dict[int, Dict[str, any]]:
+    def get_hybrid_detection(
+        self, semester_id: int, versao: Tuple[int, int]
+    ) -> Optional[List[Tuple[str, int, Optional[int], int]]]:
         """
-        Get room type usage per day for a hybrid discipline.
-
-        For each day of the week, returns which room types were used
-        and whether it's primarily a lab day or classroom day.
+        Get the materialized hybrid detection of a semester, if still current.
 
         Args:
-            codigo_disciplina: Discipline code
-            semester_id: Semester to analyze
-            regular_classroom_type_id: tipo_sala_id for regular classrooms (default: 2)
+            semester_id: Detection semester
+            versao: Current (semester version, inventory version), see
+                get_data_version
 
         Returns:
-            Dict[day_id, {
-                'room_types': [tipo_sala_ids used],
-                'room_ids': [sala_ids used],
-                'is_lab_day': bool,  # True if any non-classroom room used
-                'lab_room_ids': [sala_ids that are labs/specialized]
-            }]
+            Usage rows of the hybrid disciplines (same shape as
+            get_discipline_day_room_usage), or None if the semester was never
+            detected or its data changed since
         """
-        from src.models.academic import Demanda
-        from src.models.inventory import Sala
+        stored = self.session.execute(
+            select(
+                deteccoes_hibridas.c.versao, deteccoes_hibridas.c.versao_inventario
+            ).where(deteccoes_hibridas.c.semestre_id == semester_id)
+        ).first()
+        if stored is None or tuple(stored) != tuple(versao):
+            return None
 
-        # Get all allocations for this discipline in the semester
-        query = (
-            self.session.query(
-                AlocacaoSemestral.dia_semana_id,
-                Sala.id.label("sala_id"),
-                Sala.tipo_sala_id,
+        rows = self.session.execute(
+            select(
+                deteccoes_hibridas_salas.c.codigo_disciplina,
+                deteccoes_hibridas_salas.c.dia_semana_id,
+                deteccoes_hibridas_salas.c.tipo_sala_id,
+                deteccoes_hibridas_salas.c.sala_id,
             )
-            .join(Demanda, AlocacaoSemestral.demanda_id == Demanda.id)
-            .join(Sala, AlocacaoSemestral.sala_id == Sala.id)
-            .filter(
-                and_(
-                    Demanda.codigo_disciplina == codigo_disciplina,
-                    AlocacaoSemestral.semestre_id == semester_id,
-                )
+            .where(deteccoes_hibridas_salas.c.semestre_id == semester_id)
+            .order_by(
+                deteccoes_hibridas_salas.c.codigo_disciplina,
+                deteccoes_hibridas_salas.c.dia_semana_id,
+                deteccoes_hibridas_salas.c.sala_id,
             )
-            .distinct()
-        )
+        ).all()
+        return [tuple(row) for row in rows]
 
-        # Organize by day
-        day_info: Dict[int, Dict[str, any]] = {}
-        for row in query.all():
-            day_id = row.dia_semana_id
-            sala_id = row.sala_id
-            tipo_sala_id = row.tipo_sala_id
-
-            if day_id not in day_info:
-                day_info[day_id] = {
-                    "room_types": set(),
-                    "room_ids": set(),
-                    "lab_room_ids": set(),
-                }
-
-            day_info[day_id]["room_types"].add(tipo_sala_id)
-            day_info[day_id]["room_ids"].add(sala_id)
-
-            # Track non-classroom rooms as "lab" rooms
-            if tipo_sala_id != regular_classroom_type_id:
-                day_info[day_id]["lab_room_ids"].add(sala_id)
-
-        # Convert sets to lists and add is_lab_day flag
-        result = {}
-        for day_id, info in day_info.items():
-            result[day_id] = {
-                "room_types": list(info["room_types"]),
-                "room_ids": list(info["room_ids"]),
-                "lab_room_ids": list(info["lab_room_ids"]),
-                "is_lab_day": len(info["lab_room_ids"]) > 0,
-            }
+    def save_hybrid_detection(
+        self,
+        semester_id: int,
+        versao: Tuple[int, int],
+        rows: List[Tuple[str, int, Optional[int], int]],
+    ) -> None:
+        """
+        Replace the materialized hybrid detection of a semester.
 
-        return result
+        The rows are written inside a savepoint and only flushed: committing
+        is left to the caller, and a failure rolls back the savepoint alone.
+
+        Args:
+            semester_id: Detection semester
+            versao: (semester version, inventory version) the rows were read at
+            rows: Usage rows of the hybrid disciplines
+        """
+        with self.session.begin_nested():
+            self.session.execute(
+                delete(deteccoes_hibridas_salas).where(
+                    deteccoes_hibridas_salas.c.semestre_id == semester_id
+                )
+            )
+            self.session.execute(
+                delete(deteccoes_hibridas).where(
+                    deteccoes_hibridas.c.semestre_id == semester_id
+                )
+            )
+            self.session.execute(
+                insert(deteccoes_hibridas).values(
+                    semestre_id=semester_id,
+                    versao=versao[0],
+                    versao_inventario=versao[1],
+                )
+            )
+            if rows:
+                self.session.execute(
+                    insert(deteccoes_hibridas_salas),
+                    [
+                        {
+                            "semestre_id": semester_id,
+                            "codigo_disciplina": codigo,
+                            "dia_semana_id": dia_semana_id,
+                            "tipo_sala_id": tipo_sala_id,
+                            "sala_id": sala_id,
+                        }
+                        for codigo, dia_semana_id, tipo_sala_id, sala_id in rows
+                    ],
+                )
 
     def get_most_recent_semester_id(self) -> Optional[int]:
         """
@@ -12,6 +12,9 @@ from sqlalchemy.orm import Session
 T = TypeVar("T")  # ORM Model type
 D = TypeVar("D")  # DTO type
 
+# Maximum number of values bound in a single IN (...) clause by bulk methods
+IN_CLAUSE_CHUNK_SIZE = 500
+
 
 class BaseRepository(Generic[T, D]):
     """
@@ -5,14 +5,19 @@ Provides data access methods for course demand queries with filters,
 search capabilities, and enrollment information.
 """
 
-from typing import List, Optional
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
 
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import case, delete, exists, func, insert, or_, update
 
 from src.models.academic import Demanda
 from src.schemas.academic import DemandaRead, DemandaCreate
-from src.repositories.base import BaseRepository
+from src.repositories.base import IN_CLAUSE_CHUNK_SIZE, BaseRepository
+
+
+# Course-name terms that give unallocated demands laboratory priority in the
+# demand queue ("lab" also covers "laboratório")
+QUEUE_LAB_TERMS = ("lab", "prático")
 
 
 class DisciplinaRepository(BaseRepository[Demanda, DemandaRead]):
@@ -139,16 +144,120 @@ class DisciplinaRepository(BaseRepository[Demanda, DemandaRead]):
             semestre_id: Semester ID
 
         Returns:
-            List of DemandaRead DTOs sorted by course code
+            List of DemandaRead DTOs sorted by course code (then ID)
         """
         orm_objs = (
             self.session.query(Demanda)
             .filter(Demanda.semestre_id == semestre_id)
-            .order_by(Demanda.codigo_disciplina)
+            .order_by(Demanda.codigo_disciplina, Demanda.id)
             .all()
         )
         return [self.orm_to_dto(obj) for obj in orm_objs]
 
+    def count_by_semestre(self, semestre_id: int) -> int:
+        """Count the course demands of a semester.
+
+        Args:
+            semestre_id: Semester ID
+
+        Returns:
+            Number of demands
+        """
+        return (
+            self.session.query(func.count(Demanda.id))
+            .filter(Demanda.semestre_id == semestre_id)
+            .scalar()
+        )
+
+    def get_queue_page(
+        self,
+        semestre_id: int,
+        allocation_status: str = "all",
+        search_text: str = "",
+        professor: str = "",
+        codigo_curso: str = "",
+        codigos_disciplina: Optional[Collection[str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Tuple[List[Tuple[DemandaRead, bool]], int]:
+        """Get one page of the demand queue, filtered and ordered in SQL.
+
+        Queue priority: unallocated demands first, laboratory/practical
+        courses before the others, then by enrollment (one step per 10
+        seats, capped at 20); ties keep course code then ID order.
+
+        Args:
+            semestre_id: Semester ID
+            allocation_status: "allocated", "unallocated" or "all"
+            search_text: Partial match on course code or name (case-insensitive)
+            professor: Partial match on the professors text (case-sensitive)
+            codigo_curso: Exact course (program) code
+            codigos_disciplina: Only these discipline codes (None: no filter)
+            limit: Page size
+            offset: Number of rows to skip
+
+        Returns:
+            ([(DemandaRead, is_allocated), ...], total matching demands)
+        """
+        from src.models.allocation import AlocacaoSemestral
+
+        alocada = (
+            exists()
+            .where(AlocacaoSemestral.demanda_id == Demanda.id)
+            .label("alocada")
+        )
+
+        filters = [Demanda.semestre_id == semestre_id]
+        if allocation_status == "allocated":
+            filters.append(alocada)
+        elif allocation_status == "unallocated":
+            filters.append(~alocada)
+        if search_text:
+            filters.append(
+                or_(
+                    Demanda.codigo_disciplina.icontains(search_text, autoescape=True),
+                    Demanda.nome_disciplina.icontains(search_text, autoescape=True),
+                )
+            )
+        if professor:
+            filters.append(func.instr(Demanda.professores_disciplina, professor) > 0)
+        if codigo_curso:
+            filters.append(Demanda.codigo_curso == codigo_curso)
+        if codigos_disciplina is not None:
+            filters.append(Demanda.codigo_disciplina.in_(list(codigos_disciplina)))
+
+        total = self.session.query(func.count(Demanda.id)).filter(*filters).scalar()
+
+        # SQLite LIKE only folds ASCII case: match accented terms in both cases
+        lab_patterns = {
+            f"%{variant}%"
+            for term in QUEUE_LAB_TERMS
+            for variant in (term, term.upper())
+        }
+        lab_priority = case(
+            (or_(*[Demanda.nome_disciplina.like(p) for p in lab_patterns]), 1),
+            else_=0,
+        )
+        enrollment_priority = func.min(
+            func.coalesce(Demanda.vagas_disciplina, 0) // 10, 20
+        )
+
+        rows = (
+            self.session.query(Demanda, alocada)
+            .filter(*filters)
+            .order_by(
+                alocada,
+                case((alocada, 0), else_=lab_priority).desc(),
+                case((alocada, 0), else_=enrollment_priority).desc(),
+                Demanda.codigo_disciplina,
+                Demanda.id,
+            )
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+        return [(self.orm_to_dto(row[0]), bool(row[1])) for row in rows], total
+
     def get_by_professor_name(self, professor_name: str) -> List[DemandaRead]:
         """Get all course demands for a specific professor.
 
@@ -254,7 +363,7 @@ class DisciplinaRepository(BaseRepository[Demanda, DemandaRead]):
             .filter(
                 (Demanda.semestre_id == semestre_id) & (Demanda.nao_alocar == False)
             )
-            .order_by(Demanda.codigo_disciplina)
+            .order_by(Demanda.codigo_disciplina, Demanda.id)
             .all()
         )
         return [self.orm_to_dto(obj) for obj in orm_objs]
@@ -275,6 +384,86 @@ class DisciplinaRepository(BaseRepository[Demanda, DemandaRead]):
             return self.orm_to_dto(orm_obj)
         return None
 
+    def get_external_ids_by_semestre(self, semestre_id: int) -> Set[str]:
+        """Get all external oferta ids (id_oferta_externo) of a semester."""
+        rows = (
+            self.session.query(Demanda.id_oferta_externo)
+            .filter(
+                (Demanda.semestre_id == semestre_id)
+                & (Demanda.id_oferta_externo.isnot(None))
+            )
+            .all()
+        )
+        return {row[0] for row in rows}
+
+    def bulk_insert(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert many demandas with a single executemany statement.
+
+        Does not commit and does not load the rows back (no IDs are returned),
+        so callers can insert several batches in one transaction.
+
+        Args:
+            rows: Column dicts as produced by DemandaCreate.model_dump()
+
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        self.session.execute(insert(Demanda), rows)
+        return len(rows)
+
+    def get_by_semestre_keyed_by_external_id(
+        self, semestre_id: int
+    ) -> Dict[str, DemandaRead]:
+        """Get the demandas of a semester that came from the API, by external id."""
+        orm_objs = (
+            self.session.query(Demanda)
+            .filter(
+                (Demanda.semestre_id == semestre_id)
+                & (Demanda.id_oferta_externo.isnot(None))
+            )
+            .all()
+        )
+        return {obj.id_oferta_externo: self.orm_to_dto(obj) for obj in orm_objs}
+
+    def bulk_update(self, rows: List[Dict[str, Any]]) -> int:
+        """Update many demandas by primary key with one executemany (no commit).
+
+        Args:
+            rows: Column dicts, each with the "id" of the demanda to update
+
+        Returns:
+            Number of rows updated
+        """
+        if not rows:
+            return 0
+        self.session.execute(update(Demanda), rows)
+        return len(rows)
+
+    def delete_by_ids(self, demanda_ids: List[int]) -> int:
+        """Delete demandas by ID with bulk DELETE statements (no commit).
+
+        Allocations are not cascaded: delete them first
+        (AlocacaoRepository.delete_by_demandas).
+
+        Args:
+            demanda_ids: Demanda IDs
+
+        Returns:
+            Number of rows deleted
+        """
+        ids = list(demanda_ids)
+        deleted = 0
+        for start in range(0, len(ids), IN_CLAUSE_CHUNK_SIZE):
+            result = self.session.execute(
+                delete(Demanda).where(
+                    Demanda.id.in_(ids[start : start + IN_CLAUSE_CHUNK_SIZE])
+                )
+            )
+            deleted += result.rowcount
+        return deleted
+
     def get_skip_allocation(self, semestre_id: int) -> List[DemandaRead]:
         """Get courses marked to skip allocation.
 
@@ -287,7 +476,7 @@ class DisciplinaRepository(BaseRepository[Demanda, DemandaRead]):
         orm_objs = (
             self.session.query(Demanda)
             .filter((Demanda.semestre_id == semestre_id) & (Demanda.nao_alocar == True))
-            .order_by(Demanda.codigo_disciplina)
+            .order_by(Demanda.codigo_disciplina, Demanda.id)
             .all()
         )
         return [self.orm_to_dto(obj) for obj in orm_objs]
@@ -357,11 +546,9 @@ class DisciplinaRepository(BaseRepository[Demanda, DemandaRead]):
         Returns:
             List of unique course codes (codigo_curso)
         """
-        from sqlalchemy import distinct
-        from src.models.academic import Demanda
-
         result = (
-            self.session.query(distinct(Demanda.codigo_curso))
+            self.session.query(Demanda.codigo_curso)
+            .distinct()
             .filter(Demanda.codigo_curso != "")  # Exclude empty codes
             .filter(Demanda.codigo_curso.isnot(None))  # Exclude null codes
             .order_by(Demanda.codigo_curso)
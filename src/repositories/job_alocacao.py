@@ -0,0 +1,362 @@
+"""
+Repository for JobAlocacao (background allocation job) operations.
+
+Every method commits immediately: job rows are polled by other processes
+(the Streamlit pages and the worker), so no change may sit in an open
+transaction.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.models.allocation import (
+    JOB_ACTIVE_STATUSES,
+    JOB_STATUS_CANCELLED,
+    JOB_STATUS_FAILED,
+    JOB_STATUS_QUEUED,
+    JOB_STATUS_RUNNING,
+    JobAlocacao,
+)
+from src.repositories.base import BaseRepository
+from src.schemas.allocation import JobAlocacaoRead
+
+
+class JobAlocacaoRepository(BaseRepository[JobAlocacao, JobAlocacaoRead]):
+    """
+    Repository for JobAlocacao operations.
+    """
+
+    def __init__(self, session: Session):
+        super().__init__(session, JobAlocacao)
+
+    def orm_to_dto(self, orm_obj: JobAlocacao) -> JobAlocacaoRead:
+        """Convert JobAlocacao ORM to DTO."""
+        return JobAlocacaoRead(
+            id=orm_obj.id,
+            semestre_id=orm_obj.semestre_id,
+            status=orm_obj.status,
+            dry_run=bool(orm_obj.dry_run),
+            solicitado_por=orm_obj.solicitado_por,
+            fase_atual=orm_obj.fase_atual,
+            progresso=orm_obj.get_progresso(),
+            cancelamento_solicitado=bool(orm_obj.cancelamento_solicitado),
+            resultado=orm_obj.get_resultado(),
+            erro=orm_obj.erro,
+            pdf_path=orm_obj.pdf_path,
+            worker_pid=orm_obj.worker_pid,
+            iniciado_em=orm_obj.iniciado_em,
+            finalizado_em=orm_obj.finalizado_em,
+            heartbeat_em=orm_obj.heartbeat_em,
+            created_at=orm_obj.created_at,
+            updated_at=orm_obj.updated_at,
+        )
+
+    def create_queued(
+        self,
+        semestre_id: int,
+        dry_run: bool = False,
+        solicitado_por: Optional[str] = None,
+    ) -> Optional[JobAlocacaoRead]:
+        """
+        Insert a queued job, taking the semester's job lock.
+
+        Args:
+            semestre_id: Semester to allocate
+            dry_run: Whether the run only simulates allocations
+            solicitado_por: Username of the requester
+
+        Returns:
+            The new job, or None if the semester already has an active job
+        """
+        job = JobAlocacao(
+            semestre_id=semestre_id,
+            status=JOB_STATUS_QUEUED,
+            dry_run=dry_run,
+            solicitado_por=solicitado_por,
+            progresso_json="{}",
+        )
+        self.session.add(job)
+        try:
+            self.session.commit()
+        except IntegrityError:
+            # ux_jobs_alocacao_semestre_ativo: another job holds the lock
+            self.session.rollback()
+            return None
+        return self.orm_to_dto(job)
+
+    def get_active_by_semestre(self, semestre_id: int) -> Optional[JobAlocacaoRead]:
+        """Get the queued or running job of a semester, if any."""
+        orm_obj = (
+            self.session.query(JobAlocacao)
+            .filter(
+                JobAlocacao.semestre_id == semestre_id,
+                JobAlocacao.status.in_(JOB_ACTIVE_STATUSES),
+            )
+            .first()
+        )
+        return self.orm_to_dto(orm_obj) if orm_obj else None
+
+    def get_latest_by_semestre(self, semestre_id: int) -> Optional[JobAlocacaoRead]:
+        """Get the most recently created job of a semester, if any."""
+        orm_obj = (
+            self.session.query(JobAlocacao)
+            .filter(JobAlocacao.semestre_id == semestre_id)
+            .order_by(JobAlocacao.id.desc())
+            .first()
+        )
+        return self.orm_to_dto(orm_obj) if orm_obj else None
+
+    def mark_running(self, job_id: int, worker_pid: int) -> bool:
+        """
+        Move a queued job to running.
+
+        Returns:
+            False if the job is no longer queued (e.g. cancelled while waiting)
+        """
+        now = datetime.utcnow()
+        updated = (
+            self.session.query(JobAlocacao)
+            .filter(JobAlocacao.id == job_id, JobAlocacao.status == JOB_STATUS_QUEUED)
+            .update(
+                {
+                    "status": JOB_STATUS_RUNNING,
+                    "worker_pid": worker_pid,
+                    "iniciado_em": now,
+                    "heartbeat_em": now,
+                    "updated_at": now,
+                },
+                synchronize_session=False,
+            )
+        )
+        self.session.commit()
+        return updated > 0
+
+    def claim_next_queued(self, worker_pid: int) -> Optional[JobAlocacaoRead]:
+        """
+        Claim the oldest queued job for a worker, moving it to running.
+
+        Safe with several workers: a job claimed concurrently by another
+        worker is skipped.
+
+        Args:
+            worker_pid: PID of the claiming worker process
+
+        Returns:
+            The claimed job, or None if no job is queued
+        """
+        while True:
+            row = (
+                self.session.query(JobAlocacao.id)
+                .filter(JobAlocacao.status == JOB_STATUS_QUEUED)
+                .order_by(JobAlocacao.id)
+                .first()
+            )
+            if row is None:
+                return None
+            if self.mark_running(row[0], worker_pid):
+                return self.get_by_id(row[0])
+
+    def count_running(self) -> int:
+        """Count jobs currently held by a worker."""
+        return (
+            self.session.query(JobAlocacao)
+            .filter(JobAlocacao.status == JOB_STATUS_RUNNING)
+            .count()
+        )
+
+    def update_progress(
+        self, job_id: int, fase_atual: str, progresso: Dict[str, Any]
+    ) -> bool:
+        """
+        Store progress counters and refresh the heartbeat.
+
+        Returns:
+            Whether cancellation has been requested for the job
+        """
+        now = datetime.utcnow()
+        self.session.query(JobAlocacao).filter(JobAlocacao.id == job_id).update(
+            {
+                "fase_atual": fase_atual,
+                "progresso_json": json.dumps(progresso),
+                "heartbeat_em": now,
+                "updated_at": now,
+            },
+            synchronize_session=False,
+        )
+        self.session.commit()
+        return self.is_cancel_requested(job_id)
+
+    def is_cancel_requested(self, job_id: int) -> bool:
+        """Check the job's cancellation flag."""
+        row = (
+            self.session.query(JobAlocacao.cancelamento_solicitado)
+            .filter(JobAlocacao.id == job_id)
+            .first()
+        )
+        return bool(row and row[0])
+
+    def cancel_queued(self, job_id: int) -> bool:
+        """
+        Cancel a job that no worker has started yet.
+
+        Returns:
+            False if the job is not queued (a worker may already run it)
+        """
+        now = datetime.utcnow()
+        updated = (
+            self.session.query(JobAlocacao)
+            .filter(JobAlocacao.id == job_id, JobAlocacao.status == JOB_STATUS_QUEUED)
+            .update(
+                {
+                    "status": JOB_STATUS_CANCELLED,
+                    "cancelamento_solicitado": True,
+                    "finalizado_em": now,
+                    "updated_at": now,
+                },
+                synchronize_session=False,
+            )
+        )
+        self.session.commit()
+        return updated > 0
+
+    def request_cancel(self, job_id: int) -> bool:
+        """
+        Flag an active job for cancellation.
+
+        Returns:
+            False if the job is not queued or running
+        """
+        updated = (
+            self.session.query(JobAlocacao)
+            .filter(
+                JobAlocacao.id == job_id,
+                JobAlocacao.status.in_(JOB_ACTIVE_STATUSES),
+            )
+            .update(
+                {"cancelamento_solicitado": True, "updated_at": datetime.utcnow()},
+                synchronize_session=False,
+            )
+        )
+        self.session.commit()
+        return updated > 0
+
+    def finish(
+        self,
+        job_id: int,
+        status: str,
+        resultado: Optional[Dict[str, Any]] = None,
+        erro: Optional[str] = None,
+        pdf_path: Optional[str] = None,
+    ) -> bool:
+        """
+        Record a job's final state, releasing the semester's job lock.
+
+        A job that already reached a final state (e.g. failed as stale while
+        its worker was still running) is left unchanged.
+
+        Args:
+            job_id: Job ID
+            status: done, failed or cancelled
+            resultado: JSON-serializable result summary
+            erro: Error message, if any
+            pdf_path: Path of the generated report, if any
+
+        Returns:
+            True if the job was still active and is now finished
+        """
+        now = datetime.utcnow()
+        updated = (
+            self.session.query(JobAlocacao)
+            .filter(
+                JobAlocacao.id == job_id,
+                JobAlocacao.status.in_(JOB_ACTIVE_STATUSES),
+            )
+            .update(
+                {
+                    "status": status,
+                    "resultado_json": (
+                        json.dumps(resultado, default=str)
+                        if resultado is not None
+                        else None
+                    ),
+                    "erro": erro,
+                    "pdf_path": pdf_path,
+                    "finalizado_em": now,
+                    "updated_at": now,
+                },
+                synchronize_session=False,
+            )
+        )
+        self.session.commit()
+        return updated > 0
+
+    def fail_if_active(self, job_id: int, erro: str) -> bool:
+        """
+        Mark a job failed unless it already reached a final state.
+
+        Returns:
+            True if the job was still active and is now failed
+        """
+        now = datetime.utcnow()
+        updated = (
+            self.session.query(JobAlocacao)
+            .filter(
+                JobAlocacao.id == job_id,
+                JobAlocacao.status.in_(JOB_ACTIVE_STATUSES),
+            )
+            .update(
+                {
+                    "status": JOB_STATUS_FAILED,
+                    "erro": erro,
+                    "finalizado_em": now,
+                    "updated_at": now,
+                },
+                synchronize_session=False,
+            )
+        )
+        self.session.commit()
+        return updated > 0
+
+    def fail_stale(self, cutoff: datetime, erro: str) -> List[int]:
+        """
+        Fail running jobs whose worker stopped reporting before the cutoff.
+
+        Only running jobs are judged, by their heartbeat: a queued job may be
+        waiting for a busy worker (see has_queued_before).
+
+        Args:
+            cutoff: Oldest acceptable heartbeat
+            erro: Error message stored on the failed jobs
+
+        Returns:
+            IDs of the jobs marked failed
+        """
+        running = (
+            self.session.query(JobAlocacao)
+            .filter(JobAlocacao.status == JOB_STATUS_RUNNING)
+            .all()
+        )
+        stale_ids = [
+            job.id
+            for job in running
+            if (job.heartbeat_em or job.iniciado_em or job.created_at) < cutoff
+        ]
+        for job_id in stale_ids:
+            self.fail_if_active(job_id, erro)
+        return stale_ids
+
+    def has_queued_before(self, cutoff: datetime) -> bool:
+        """Check whether a job has been queued since before the cutoff."""
+        return (
+            self.session.query(JobAlocacao.id)
+            .filter(
+                JobAlocacao.status == JOB_STATUS_QUEUED,
+                JobAlocacao.created_at < cutoff,
+            )
+            .first()
+            is not None
+        )
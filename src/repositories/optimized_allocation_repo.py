@@ -2,9 +2,9 @@
 Optimized Allocation Repository - Batch operations for reduced I/O
 """
 
-from typing import List, Dict, Set, Tuple, Optional
+from typing import Any, List, Dict, Set, Tuple, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, text
+from sqlalchemy import and_, func, insert, or_, text
 from src.repositories.base import BaseRepository
 from src.models.allocation import AlocacaoSemestral
 from src.schemas.allocation import AlocacaoSemestralCreate, AlocacaoSemestralRead
@@ -20,7 +20,19 @@ class OptimizedAllocationRepository(BaseRepository[AlocacaoSemestralCreate, Aloc
     
     def __init__(self, session: Session):
         super().__init__(session, AlocacaoSemestral)
-    
+        # Optional in-memory occupancy index (SemesterOccupancyIndex) kept in sync
+        # with batch writes and used to answer conflict checks without SQL
+        self.occupancy_index = None
+
+    def attach_occupancy_index(self, occupancy_index) -> None:
+        """
+        Attach an in-memory occupancy index for conflict checks and updates.
+
+        Args:
+            occupancy_index: SemesterOccupancyIndex instance (or None to detach)
+        """
+        self.occupancy_index = occupancy_index
+
     def dto_to_orm_create(self, dto: AlocacaoSemestralCreate) -> AlocacaoSemestral:
         """Convert DTO to ORM object for creation."""
         return AlocacaoSemestral(
@@ -61,7 +73,16 @@ class OptimizedAllocationRepository(BaseRepository[AlocacaoSemestralCreate, Aloc
         """
         if not room_time_slots:
             return {}
-        
+
+        # Answer from the in-memory index when it covers this semester
+        if self.occupancy_index is not None and self.occupancy_index.covers(semester_id):
+            return {
+                slot: bool(
+                    self.occupancy_index.conflicting_slots(slot[0], [(slot[2], slot[1])])
+                )
+                for slot in room_time_slots
+            }
+
         # Build OR conditions for all slots
         or_conditions = []
         for sala_id, dia_semana_id, codigo_bloco in room_time_slots:
@@ -119,7 +140,15 @@ class OptimizedAllocationRepository(BaseRepository[AlocacaoSemestralCreate, Aloc
             # Refresh all objects to get their IDs
             for orm_obj in orm_objects:
                 self.session.refresh(orm_obj)
-            
+
+            # Keep the in-memory occupancy index in sync with committed rows
+            if self.occupancy_index is not None:
+                for dto in allocation_dtos:
+                    if self.occupancy_index.covers(dto.semestre_id):
+                        self.occupancy_index.mark_allocated(
+                            dto.sala_id, [(dto.codigo_bloco, dto.dia_semana_id)]
+                        )
+
             # Convert back to DTOs
             return [self.orm_to_dto(obj) for obj in orm_objects]
             
@@ -128,6 +157,34 @@ class OptimizedAllocationRepository(BaseRepository[AlocacaoSemestralCreate, Aloc
             logger.error(f"Batch allocation failed: {e}")
             raise
 
+    def bulk_insert(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert many allocation rows with one executemany in a single transaction.
+
+        Unlike create_batch_atomic, rows are not loaded back into ORM objects
+        (no per-row refresh) and the occupancy index is not touched: callers
+        staging rows (see AllocationWriteBuffer) have already recorded them.
+
+        Args:
+            rows: Column dicts (semestre_id, demanda_id, sala_id, dia_semana_id,
+                codigo_bloco)
+
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+
+        try:
+            self.session.execute(insert(AlocacaoSemestral), rows)
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Bulk allocation insert failed: {e}")
+            raise
+
+        return len(rows)
+
     def get_room_occupancy_batch(
         self, 
         room_ids: List[int], 
@@ -166,6 +223,62 @@ class OptimizedAllocationRepository(BaseRepository[AlocacaoSemestralCreate, Aloc
             
         return occupancy
 
+    def get_previous_room_occupancy_batch(
+        self,
+        room_ids: List[int],
+        semester_id: int
+    ) -> Dict[int, int]:
+        """
+        Get each room's allocation count in its latest earlier semester.
+
+        Single-query equivalent of the fallback in utils.room_utils.get_room_occupancy,
+        which walks back one semester at a time until the room has allocations.
+
+        Args:
+            room_ids: List of room IDs to check
+            semester_id: Semester whose predecessors are searched
+
+        Returns:
+            Dict mapping room_id to allocation count (0 if never allocated before)
+        """
+        if not room_ids:
+            return {}
+
+        latest = (
+            self.session.query(
+                AlocacaoSemestral.sala_id.label("sala_id"),
+                func.max(AlocacaoSemestral.semestre_id).label("semestre_id"),
+            )
+            .filter(
+                and_(
+                    AlocacaoSemestral.sala_id.in_(room_ids),
+                    AlocacaoSemestral.semestre_id < semester_id,
+                    AlocacaoSemestral.semestre_id > 0,
+                )
+            )
+            .group_by(AlocacaoSemestral.sala_id)
+            .subquery()
+        )
+
+        occupancy_data = (
+            self.session.query(AlocacaoSemestral.sala_id, func.count(AlocacaoSemestral.id))
+            .join(
+                latest,
+                and_(
+                    AlocacaoSemestral.sala_id == latest.c.sala_id,
+                    AlocacaoSemestral.semestre_id == latest.c.semestre_id,
+                ),
+            )
+            .group_by(AlocacaoSemestral.sala_id)
+            .all()
+        )
+
+        occupancy = {room_id: 0 for room_id in room_ids}
+        for room_id, count in occupancy_data:
+            occupancy[room_id] = count
+
+        return occupancy
+
     def get_existing_allocations_for_demands(
         self, 
         demanda_ids: List[int], 
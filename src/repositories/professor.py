@@ -5,10 +5,10 @@ Provides data access methods for professor queries with filters
 and search capabilities.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import insert, or_
 
 from src.models.academic import Professor
 from src.schemas.academic import ProfessorRead, ProfessorCreate
@@ -99,6 +99,22 @@ class ProfessorRepository(BaseRepository[Professor, ProfessorRead]):
             return self.orm_to_dto(orm_obj)
         return None
 
+    def bulk_insert(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert many professors with a single executemany statement.
+
+        Does not commit and does not load the rows back.
+
+        Args:
+            rows: Column dicts as produced by ProfessorCreate.model_dump()
+
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        self.session.execute(insert(Professor), rows)
+        return len(rows)
+
     def search(self, query: str) -> List[ProfessorRead]:
         """Search professors by name or username (case-insensitive).
 
@@ -4,6 +4,7 @@ Repository for Regra operations.
 Provides data access methods for allocation rules (hard and soft constraints for disciplines).
 """
 
+import json
 from typing import List, Optional
 
 from sqlalchemy.orm import Session
@@ -112,23 +113,70 @@ class RegraRepository(BaseRepository[Regra, RegraRead]):
     def find_rules_by_disciplina(self, codigo_disciplina: str) -> List[RegraRead]:
         """Find all rules that apply to a specific discipline.
 
+        Allocation code should prefer the compiled index in
+        src.services.rule_index, which avoids this table scan.
+
         Args:
             codigo_disciplina: Discipline code to search for
 
         Returns:
-            List of RegraRead DTOs that reference this discipline
+            List of RegraRead DTOs whose config_json has this exact codigo_disciplina
         """
-        # Search in config_json for disciplina references
-        # This is a bit hacky since we're searching JSON as text
+        # LIKE narrows the scan; the exact match on the parsed config drops
+        # codes that merely contain the requested one (FUP001 vs FUP0012)
         pattern = f"%{codigo_disciplina}%"
 
         orm_objs = (
             self.session.query(Regra)
             .filter(Regra.config_json.like(pattern))
-            .order_by(Regra.prioridade, Regra.tipo_regra)
+            .order_by(Regra.prioridade, Regra.tipo_regra, Regra.id)
             .all()
         )
-        return [self.orm_to_dto(obj) for obj in orm_objs]
+        return [
+            self.orm_to_dto(obj)
+            for obj in orm_objs
+            if self._config_disciplina(obj) == codigo_disciplina
+        ]
+
+    @staticmethod
+    def _config_disciplina(orm_obj: Regra) -> Optional[str]:
+        """Get codigo_disciplina from a rule's config_json (None if invalid)."""
+        try:
+            config = json.loads(orm_obj.config_json)
+        except (json.JSONDecodeError, TypeError):
+            return None
+        return config.get("codigo_disciplina") if isinstance(config, dict) else None
+
+    # ========================================================================
+    # WRITES (invalidate the compiled rule index)
+    # ========================================================================
+
+    def create(self, dto: RegraCreate) -> RegraRead:
+        result = super().create(dto)
+        self._invalidate_compiled_rules()
+        return result
+
+    def update(self, id: int, dto) -> Optional[RegraRead]:
+        result = super().update(id, dto)
+        self._invalidate_compiled_rules()
+        return result
+
+    def delete(self, id: int) -> bool:
+        result = super().delete(id)
+        self._invalidate_compiled_rules()
+        return result
+
+    def delete_all(self) -> int:
+        result = super().delete_all()
+        self._invalidate_compiled_rules()
+        return result
+
+    @staticmethod
+    def _invalidate_compiled_rules() -> None:
+        # Local import: the rule index itself loads rules through this repository
+        from src.services.rule_index import invalidate_compiled_rules
+
+        invalidate_compiled_rules()
 
     def search_by_descricao(self, search_term: str) -> List[RegraRead]:
         """Search rules by description (case-insensitive).
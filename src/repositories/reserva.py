@@ -3,7 +3,7 @@ Repository for ReservaEsporadica operations.
 """
 
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Set, Tuple
 
 from src.repositories.base import BaseRepository
 from src.models.allocation import ReservaEsporadica
@@ -101,3 +101,28 @@ class ReservaRepository(BaseRepository[ReservaEsporadica, ReservaEsporadicaRead]
             .first()
         )
         return existing is not None
+
+    def get_booked_slots_in_range(
+        self, sala_id: int, start_date: str, end_date: str
+    ) -> Set[Tuple[str, str]]:
+        """
+        Get the booked (date, block) slots of a room within a date range.
+
+        Set-based counterpart of check_conflict for checking many dates at once.
+
+        Args:
+            sala_id: Room ID
+            start_date: Start date (YYYY-MM-DD, inclusive)
+            end_date: End date (YYYY-MM-DD, inclusive)
+
+        Returns:
+            Set of (data_reserva, codigo_bloco) tuples
+        """
+        rows = self.session.query(
+            self.model_class.data_reserva, self.model_class.codigo_bloco
+        ).filter(
+            self.model_class.sala_id == sala_id,
+            self.model_class.data_reserva >= start_date,
+            self.model_class.data_reserva <= end_date,
+        )
+        return {(row.data_reserva, row.codigo_bloco) for row in rows}
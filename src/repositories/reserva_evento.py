@@ -3,11 +3,17 @@ Repository for ReservaEvento operations.
 """
 
 from sqlalchemy.orm import Session
-from typing import Optional, List
-from sqlalchemy import and_, or_
+from typing import Optional, List, Tuple
+from sqlalchemy import and_, or_, select
 
 from src.repositories.base import BaseRepository
-from src.models.allocation import ReservaEvento
+from src.models.allocation import (
+    INVENTORY_VERSION_KEY,
+    RESERVAS_VERSION_KEY,
+    ReservaEvento,
+    versoes_dados,
+)
+from src.models.inventory import Predio, Sala
 from src.schemas.allocation import (
     ReservaEventoCreate,
     ReservaEventoRead,
@@ -33,6 +39,10 @@ class ReservaEventoRepository(BaseRepository[ReservaEvento, ReservaEventoRead]):
             nome_solicitante=orm_obj.nome_solicitante,
             nome_responsavel=orm_obj.nome_responsavel,
             regra_recorrencia_json=orm_obj.regra_recorrencia_json,
+            ocorrencias_virtuais=bool(orm_obj.ocorrencias_virtuais),
+            data_inicio=orm_obj.data_inicio,
+            data_fim=orm_obj.data_fim,
+            blocos_json=orm_obj.blocos_json,
             created_at=orm_obj.created_at,
             updated_at=orm_obj.updated_at,
         )
@@ -46,6 +56,10 @@ class ReservaEventoRepository(BaseRepository[ReservaEvento, ReservaEventoRead]):
             nome_solicitante=dto.nome_solicitante,
             nome_responsavel=dto.nome_responsavel,
             regra_recorrencia_json=dto.regra_recorrencia_json,
+            ocorrencias_virtuais=dto.ocorrencias_virtuais,
+            data_inicio=dto.data_inicio,
+            data_fim=dto.data_fim,
+            blocos_json=dto.blocos_json,
         )
 
     def get_by_creator(self, username: str) -> List[ReservaEventoRead]:
@@ -224,3 +238,53 @@ class ReservaEventoRepository(BaseRepository[ReservaEvento, ReservaEventoRead]):
 
         orm_objs = self.session.query(self.model_class).filter(and_(*filters)).all()
         return [self.orm_to_dto(obj) for obj in orm_objs]
+
+    def get_data_version(self) -> Tuple[int, int]:
+        """Get the data versions that key caches of the reservation events.
+
+        The versoes_dados rows are bumped by database triggers on every write
+        to reservas_eventos and to rooms/buildings.
+
+        Returns:
+            (reservations version, inventory version); 0 when never written
+        """
+        rows = self.session.execute(
+            select(versoes_dados.c.chave, versoes_dados.c.versao).where(
+                versoes_dados.c.chave.in_(
+                    [RESERVAS_VERSION_KEY, INVENTORY_VERSION_KEY]
+                )
+            )
+        ).all()
+        versions = {row.chave: row.versao for row in rows}
+        return (
+            versions.get(RESERVAS_VERSION_KEY, 0),
+            versions.get(INVENTORY_VERSION_KEY, 0),
+        )
+
+    def get_filter_facet_rows(
+        self,
+    ) -> List[Tuple[int, str, Optional[str], Optional[int], Optional[str], str]]:
+        """
+        Get the distinct (room, building, title) combinations of all events.
+
+        One aggregate query feeding the Reservas page filter options.
+
+        Returns:
+            List of (sala_id, sala_nome, sala_descricao, predio_id,
+            predio_nome, titulo_evento) tuples
+        """
+        rows = (
+            self.session.query(
+                Sala.id,
+                Sala.nome,
+                Sala.descricao,
+                Predio.id,
+                Predio.nome,
+                self.model_class.titulo_evento,
+            )
+            .join(Sala, self.model_class.sala_id == Sala.id)
+            .outerjoin(Predio, Sala.predio_id == Predio.id)
+            .distinct()
+            .all()
+        )
+        return [tuple(row) for row in rows]
@@ -1,19 +1,39 @@
 """
 Repository for ReservaOcorrencia operations.
+
+Occurrences of virtual series (ReservaEvento.ocorrencias_virtuais) have no
+rows: the readers below expand them from the rule for the requested window
+only, apply the series' exceptions (reservas_excecoes) and merge them with
+the materialized rows of legacy series.
 """
 
 from datetime import date
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Optional, List, Set, Tuple
 from sqlalchemy import and_, or_
 
 from src.repositories.base import BaseRepository
-from src.models.allocation import ReservaOcorrencia
+from src.models.allocation import (
+    OCORRENCIA_CANCELADA,
+    OCORRENCIA_MOVIDA,
+    ReservaEvento,
+    ReservaExcecao,
+    ReservaOcorrencia,
+)
+from src.models.inventory import Sala
 from src.schemas.allocation import (
     ReservaOcorrenciaCreate,
     ReservaOcorrenciaRead,
     ReservaOcorrenciaReadWithEvent,
 )
+from src.utils.recurrence_calculator import RecurrenceCalculator
+
+# Window covering every date of a series
+_ALL_DATES = ("0000-00-00", "9999-12-31")
+
+# (event, data_reserva, codigo_bloco, status_excecao) of an expanded occurrence
+VirtualSlot = Tuple[ReservaEvento, str, str, Optional[str]]
 
 
 class ReservaOcorrenciaRepository(
@@ -47,6 +67,170 @@ class ReservaOcorrenciaRepository(
             status_excecao=dto.status_excecao,
         )
 
+    def expand_virtual_slots(
+        self,
+        start_date: str,
+        end_date: str,
+        room_ids: Optional[List[int]] = None,
+        evento_ids: Optional[List[int]] = None,
+        include_cancelled: bool = False,
+        load_sala: bool = False,
+    ) -> List[VirtualSlot]:
+        """
+        Expand the occurrences of virtual series that fall inside a date window.
+
+        At most four queries regardless of the window length: the series
+        overlapping the window, the series with an occurrence moved into the
+        window from outside their dates (and those series, if any), and their
+        exceptions. Dates come from the cached series expansion
+        (RecurrenceCalculator.expand_window).
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            room_ids: Optional list of room IDs to filter by
+            evento_ids: Optional list of event IDs to filter by
+            include_cancelled: Also return cancelled occurrences
+            load_sala: Eager load each event's room and building
+
+        Returns:
+            Unordered list of (event, data_reserva, codigo_bloco, status_excecao)
+        """
+        query = self.session.query(ReservaEvento).filter(
+            ReservaEvento.ocorrencias_virtuais.is_(True)
+        )
+        if load_sala:
+            query = query.options(
+                joinedload(ReservaEvento.sala).joinedload(Sala.predio)
+            )
+        if room_ids is not None:
+            query = query.filter(ReservaEvento.sala_id.in_(room_ids))
+        if evento_ids is not None:
+            query = query.filter(ReservaEvento.id.in_(evento_ids))
+        eventos = query.filter(
+            ReservaEvento.data_fim >= start_date,
+            ReservaEvento.data_inicio <= end_date,
+        ).all()
+
+        # Occurrences can be moved outside their series' dates, which stay
+        # those of the rule (data_inicio anchors the expansion)
+        moved_query = self.session.query(ReservaExcecao.evento_id).filter(
+            ReservaExcecao.nova_data >= start_date,
+            ReservaExcecao.nova_data <= end_date,
+            ReservaExcecao.status_excecao == OCORRENCIA_MOVIDA,
+        )
+        if evento_ids is not None:
+            moved_query = moved_query.filter(ReservaExcecao.evento_id.in_(evento_ids))
+        moved_ids = {row[0] for row in moved_query.distinct()} - {
+            evento.id for evento in eventos
+        }
+        if moved_ids:
+            eventos += query.filter(ReservaEvento.id.in_(moved_ids)).all()
+        if not eventos:
+            return []
+
+        excecoes_by_evento = {}
+        for excecao in (
+            self.session.query(ReservaExcecao)
+            .filter(ReservaExcecao.evento_id.in_([e.id for e in eventos]))
+            .all()
+        ):
+            excecoes_by_evento.setdefault(excecao.evento_id, {})[
+                (excecao.data_reserva, excecao.codigo_bloco)
+            ] = excecao
+
+        slots = []
+        for evento in eventos:
+            excecoes = excecoes_by_evento.get(evento.id, {})
+            blocos = evento.get_blocos()
+
+            for data_reserva in RecurrenceCalculator.expand_window(
+                evento.regra_recorrencia_json, evento.data_inicio, start_date, end_date
+            ):
+                for codigo_bloco in blocos:
+                    excecao = excecoes.get((data_reserva, codigo_bloco))
+                    if excecao is None:
+                        slots.append((evento, data_reserva, codigo_bloco, None))
+                    elif (
+                        include_cancelled
+                        and excecao.status_excecao == OCORRENCIA_CANCELADA
+                    ):
+                        slots.append(
+                            (evento, data_reserva, codigo_bloco, OCORRENCIA_CANCELADA)
+                        )
+                    # Moved occurrences are added at their new date below
+
+            for excecao in excecoes.values():
+                if (
+                    excecao.status_excecao == OCORRENCIA_MOVIDA
+                    and start_date <= excecao.nova_data <= end_date
+                ):
+                    slots.append(
+                        (
+                            evento,
+                            excecao.nova_data,
+                            excecao.novo_bloco or excecao.codigo_bloco,
+                            OCORRENCIA_MOVIDA,
+                        )
+                    )
+
+        return slots
+
+    def expand_virtual_occurrences(
+        self,
+        start_date: str,
+        end_date: str,
+        room_ids: Optional[List[int]] = None,
+        evento_ids: Optional[List[int]] = None,
+        include_cancelled: bool = False,
+        load_sala: bool = False,
+    ) -> List[ReservaOcorrencia]:
+        """
+        Expand virtual occurrences in a date window as transient ORM objects.
+
+        The objects are never added to the session (id is None); their evento
+        relationship is set without the backref, so they do not join
+        evento.ocorrencias and are never flushed.
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            room_ids: Optional list of room IDs to filter by
+            evento_ids: Optional list of event IDs to filter by
+            include_cancelled: Also return cancelled occurrences
+            load_sala: Eager load each event's room and building
+
+        Returns:
+            Unordered list of transient occurrences
+        """
+        occurrences = []
+        for evento, data_reserva, codigo_bloco, status_excecao in (
+            self.expand_virtual_slots(
+                start_date,
+                end_date,
+                room_ids,
+                evento_ids,
+                include_cancelled,
+                load_sala,
+            )
+        ):
+            ocorrencia = ReservaOcorrencia(
+                evento_id=evento.id,
+                data_reserva=data_reserva,
+                codigo_bloco=codigo_bloco,
+                status_excecao=status_excecao,
+                created_at=evento.created_at,
+                updated_at=evento.updated_at,
+            )
+            set_committed_value(ocorrencia, "evento", evento)
+            occurrences.append(ocorrencia)
+        return occurrences
+
+    @staticmethod
+    def _sorted_by_date_and_block(occurrences: List) -> List:
+        """Sort occurrences as the materialized queries do (date, block)."""
+        return sorted(occurrences, key=lambda o: (o.data_reserva, o.codigo_bloco))
+
     def get_by_evento(self, evento_id: int) -> List[ReservaOcorrenciaRead]:
         """
         Get all occurrences for a specific event.
@@ -63,6 +247,11 @@ class ReservaOcorrenciaRepository(
             .order_by(self.model_class.data_reserva, self.model_class.codigo_bloco)
             .all()
         )
+        orm_objs += self._sorted_by_date_and_block(
+            self.expand_virtual_occurrences(
+                *_ALL_DATES, evento_ids=[evento_id], include_cancelled=True
+            )
+        )
         return [self.orm_to_dto(obj) for obj in orm_objs]
 
     def get_by_room_and_date(
@@ -90,6 +279,12 @@ class ReservaOcorrenciaRepository(
             .order_by(self.model_class.codigo_bloco)
             .all()
         )
+        orm_objs = self._sorted_by_date_and_block(
+            orm_objs
+            + self.expand_virtual_occurrences(
+                data_reserva, data_reserva, room_ids=[room_id], include_cancelled=True
+            )
+        )
         return [self.orm_to_dto(obj) for obj in orm_objs]
 
     def get_active_occurrences(
@@ -121,6 +316,12 @@ class ReservaOcorrenciaRepository(
             .order_by(self.model_class.codigo_bloco)
             .all()
         )
+        orm_objs = self._sorted_by_date_and_block(
+            orm_objs
+            + self.expand_virtual_occurrences(
+                data_reserva, data_reserva, room_ids=[room_id]
+            )
+        )
         return [self.orm_to_dto(obj) for obj in orm_objs]
 
     def get_conflicting_occurrences(
@@ -153,6 +354,13 @@ class ReservaOcorrenciaRepository(
             )
             .all()
         )
+        orm_objs += [
+            obj
+            for obj in self.expand_virtual_occurrences(
+                data_reserva, data_reserva, room_ids=[room_id]
+            )
+            if obj.codigo_bloco == codigo_bloco
+        ]
         return [self.orm_to_dto(obj) for obj in orm_objs]
 
     def create_bulk(
@@ -196,6 +404,9 @@ class ReservaOcorrenciaRepository(
             .filter(self.model_class.evento_id == evento_id)
             .delete()
         )
+        self.session.query(ReservaExcecao).filter(
+            ReservaExcecao.evento_id == evento_id
+        ).delete()
         self.session.commit()
         return count
 
@@ -221,6 +432,92 @@ class ReservaOcorrenciaRepository(
         self.session.commit()
         return True
 
+    def set_occurrence_exception(
+        self,
+        evento_id: int,
+        data_reserva: str,
+        codigo_bloco: str,
+        status_excecao: str,
+        nova_data: Optional[str] = None,
+        novo_bloco: Optional[str] = None,
+    ) -> bool:
+        """
+        Cancel or move one occurrence of a series, in either storage mode.
+
+        Materialized occurrences are updated in place. For virtual series the
+        exception is recorded in reservas_excecoes (an occurrence that was
+        already moved is identified by its current date and block). The
+        series' dates are left alone: data_inicio anchors the recurrence, and
+        moved occurrences are found by their new date.
+
+        Args:
+            evento_id: Event ID
+            data_reserva: Current date of the occurrence (YYYY-MM-DD)
+            codigo_bloco: Current time block of the occurrence
+            status_excecao: OCORRENCIA_CANCELADA or OCORRENCIA_MOVIDA
+            nova_data: New date of a moved occurrence
+            novo_bloco: New time block of a moved occurrence (default: same)
+
+        Returns:
+            True if updated, False if the occurrence does not exist
+        """
+        moved = status_excecao == OCORRENCIA_MOVIDA
+        novo_bloco = novo_bloco or codigo_bloco
+
+        orm_obj = (
+            self.session.query(self.model_class)
+            .filter(
+                self.model_class.evento_id == evento_id,
+                self.model_class.data_reserva == data_reserva,
+                self.model_class.codigo_bloco == codigo_bloco,
+            )
+            .first()
+        )
+        if orm_obj is not None:
+            orm_obj.status_excecao = status_excecao
+            if moved:
+                orm_obj.data_reserva = nova_data
+                orm_obj.codigo_bloco = novo_bloco
+            self.session.commit()
+            return True
+
+        current = [
+            slot
+            for slot in self.expand_virtual_slots(
+                data_reserva, data_reserva, evento_ids=[evento_id]
+            )
+            if slot[2] == codigo_bloco
+        ]
+        if not current:
+            return False
+
+        excecao = None
+        if current[0][3] == OCORRENCIA_MOVIDA:
+            excecao = (
+                self.session.query(ReservaExcecao)
+                .filter(
+                    ReservaExcecao.evento_id == evento_id,
+                    ReservaExcecao.status_excecao == OCORRENCIA_MOVIDA,
+                    ReservaExcecao.nova_data == data_reserva,
+                    ReservaExcecao.novo_bloco == codigo_bloco,
+                )
+                .first()
+            )
+        if excecao is None:
+            excecao = ReservaExcecao(
+                evento_id=evento_id,
+                data_reserva=data_reserva,
+                codigo_bloco=codigo_bloco,
+            )
+            self.session.add(excecao)
+
+        excecao.status_excecao = status_excecao
+        excecao.nova_data = nova_data if moved else None
+        excecao.novo_bloco = novo_bloco if moved else None
+
+        self.session.commit()
+        return True
+
     def get_with_event(
         self, occurrence_id: int
     ) -> Optional[ReservaOcorrenciaReadWithEvent]:
@@ -287,8 +584,57 @@ class ReservaOcorrenciaRepository(
             .order_by(self.model_class.data_reserva, self.model_class.codigo_bloco)
             .all()
         )
+        orm_objs = self._sorted_by_date_and_block(
+            orm_objs
+            + self.expand_virtual_occurrences(start_date, end_date, room_ids=[room_id])
+        )
         return [self.orm_to_dto(obj) for obj in orm_objs]
 
+    def get_active_slots_in_date_range(
+        self, room_id: int, start_date: str, end_date: str
+    ) -> Set[Tuple[str, str]]:
+        """
+        Get the (date, block) slots of a room's active occurrences in a date range.
+
+        Column-only, set-based counterpart of get_conflicting_occurrences for
+        checking many dates at once (e.g. a new recurring reservation).
+        Virtual series are expanded for the window only.
+
+        Args:
+            room_id: Room ID
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+
+        Returns:
+            Set of (data_reserva, codigo_bloco) tuples
+        """
+        rows = (
+            self.session.query(
+                self.model_class.data_reserva, self.model_class.codigo_bloco
+            )
+            .join(ReservaEvento, self.model_class.evento_id == ReservaEvento.id)
+            .filter(
+                and_(
+                    self.model_class.data_reserva >= start_date,
+                    self.model_class.data_reserva <= end_date,
+                    ReservaEvento.sala_id == room_id,
+                    or_(
+                        self.model_class.status_excecao.is_(None),
+                        self.model_class.status_excecao != "Cancelada",
+                    ),
+                )
+            )
+            .all()
+        )
+        slots = {(row.data_reserva, row.codigo_bloco) for row in rows}
+        slots.update(
+            (data_reserva, codigo_bloco)
+            for _, data_reserva, codigo_bloco, _ in self.expand_virtual_slots(
+                start_date, end_date, room_ids=[room_id]
+            )
+        )
+        return slots
+
     def check_duplicate_occurrence(
         self, evento_id: int, data_reserva: str, codigo_bloco: str
     ) -> bool:
@@ -314,7 +660,18 @@ class ReservaOcorrenciaRepository(
             )
             .first()
         )
-        return existing is not None
+        if existing is not None:
+            return True
+
+        return any(
+            slot[2] == codigo_bloco
+            for slot in self.expand_virtual_slots(
+                data_reserva,
+                data_reserva,
+                evento_ids=[evento_id],
+                include_cancelled=True,
+            )
+        )
 
     def get_ocorrencias_by_date_range(
         self, start_date: date, end_date: date, room_ids: Optional[List[int]] = None
@@ -322,36 +679,53 @@ class ReservaOcorrenciaRepository(
         """
         Get occurrences within a date range, optionally filtered by rooms.
 
+        Each occurrence comes with its event, the event's room and the room's
+        building already loaded (one joined query for the materialized rows,
+        one for the virtual series), so callers can walk
+        ocorrencia.evento.sala.predio without extra queries.
+
         Args:
             start_date: Start date
             end_date: End date
             room_ids: Optional list of room IDs to filter by
 
         Returns:
-            List of occurrence ORM objects (with eager loaded relationships)
+            List of occurrence ORM objects (with eager loaded relationships);
+            occurrences of virtual series are transient objects (id None)
         """
-        from src.models.allocation import ReservaEvento
-
-        # Start with base query
-        query = self.session.query(self.model_class)
-
-        # Apply date range filter
-        query = query.filter(
-            and_(
-                self.model_class.data_reserva >= start_date.strftime("%Y-%m-%d"),
-                self.model_class.data_reserva <= end_date.strftime("%Y-%m-%d"),
+        # Occurrences of the window with their event, room and building
+        query = (
+            self.session.query(self.model_class)
+            .join(ReservaEvento, self.model_class.evento_id == ReservaEvento.id)
+            .options(
+                contains_eager(self.model_class.evento)
+                .joinedload(ReservaEvento.sala)
+                .joinedload(Sala.predio)
+            )
+            .filter(
+                and_(
+                    self.model_class.data_reserva >= start_date.strftime("%Y-%m-%d"),
+                    self.model_class.data_reserva <= end_date.strftime("%Y-%m-%d"),
+                )
             )
         )
 
-        # Apply room filter if provided by joining with evento
+        # Apply room filter if provided
         if room_ids:
-            query = query.join(
-                ReservaEvento, self.model_class.evento_id == ReservaEvento.id
-            ).filter(ReservaEvento.sala_id.in_(room_ids))
+            query = query.filter(ReservaEvento.sala_id.in_(room_ids))
 
         # Order by date and time
         query = query.order_by(
             self.model_class.data_reserva, self.model_class.codigo_bloco
         )
 
-        return query.all()
+        return self._sorted_by_date_and_block(
+            query.all()
+            + self.expand_virtual_occurrences(
+                start_date.strftime("%Y-%m-%d"),
+                end_date.strftime("%Y-%m-%d"),
+                room_ids=room_ids or None,
+                include_cancelled=True,
+                load_sala=True,
+            )
+        )
@@ -5,7 +5,7 @@ Provides data access methods for room queries with domain-specific filters
 and availability checks.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 from datetime import date
 
 from sqlalchemy.orm import Session
@@ -349,6 +349,24 @@ class SalaRepository(BaseRepository[Sala, SalaRead]):
             "caracteristicas": caracteristicas_dto,
         }
 
+    def get_caracteristica_ids_by_sala(self) -> Dict[int, Set[int]]:
+        """Get characteristic IDs of every room in a single query.
+
+        Returns:
+            Dictionary mapping sala_id to its set of caracteristica_id values
+            (rooms without characteristics are absent)
+        """
+        from src.models.inventory import sala_caracteristicas
+
+        rows = self.session.query(
+            sala_caracteristicas.c.sala_id, sala_caracteristicas.c.caracteristica_id
+        ).all()
+
+        result: Dict[int, Set[int]] = {}
+        for sala_id, caracteristica_id in rows:
+            result.setdefault(sala_id, set()).add(caracteristica_id)
+        return result
+
     def add_caracteristica_to_sala(
         self, sala_id: int, caracteristica_ids: List[int]
     ) -> bool:
@@ -271,6 +271,11 @@ class ReservaEventoBase(BaseModel):
     regra_recorrencia_json: str = Field(
         ..., min_length=1, description="JSON recurrence rule"
     )
+    # Virtual series: occurrences expanded from the rule (see ReservaEvento)
+    ocorrencias_virtuais: bool = False
+    data_inicio: Optional[str] = Field(None, min_length=10, max_length=10)
+    data_fim: Optional[str] = Field(None, min_length=10, max_length=10)
+    blocos_json: Optional[str] = None
 
     @field_validator("nome_solicitante")
     @classmethod
@@ -413,9 +418,13 @@ class ReservaOcorrenciaUpdate(BaseModel):
 
 
 class ReservaOcorrenciaRead(ReservaOcorrenciaBase):
-    """Schema for reading ReservaOcorrencia (includes timestamps)."""
+    """Schema for reading ReservaOcorrencia (includes timestamps).
 
-    id: int
+    Occurrences expanded from a virtual series have no id and carry the
+    timestamps of their event.
+    """
+
+    id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -560,3 +569,38 @@ class PartialAllocationResult(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# ============================================================================
+# JOB_ALOCACAO Schemas
+# ============================================================================
+
+
+class JobAlocacaoRead(BaseModel):
+    """Schema for reading a background allocation job (JobAlocacao)."""
+
+    id: int
+    semestre_id: int
+    status: str
+    dry_run: bool = False
+    solicitado_por: Optional[str] = None
+    fase_atual: Optional[str] = None
+    progresso: dict = Field(default_factory=dict)
+    cancelamento_solicitado: bool = False
+    resultado: dict = Field(default_factory=dict)
+    erro: Optional[str] = None
+    pdf_path: Optional[str] = None
+    worker_pid: Optional[int] = None
+    iniciado_em: Optional[datetime] = None
+    finalizado_em: Optional[datetime] = None
+    heartbeat_em: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the job is still queued or running."""
+        return self.status in ("queued", "running")
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,356 @@
+"""
+Allocation Job Service - Autonomous allocation runs in background processes.
+
+The Ensalamento page used to run execute_autonomous_allocation_partial (and
+build its PDF) inside the Streamlit script, blocking the user's session for
+the whole run. Runs are now jobs:
+
+- submit_allocation_job inserts a queued row in jobs_alocacao. The partial
+  unique index on (semestre_id) for queued/running rows is the per-semester
+  lock, so two coordinators cannot start concurrent runs on the same semester.
+- Worker processes (at most settings.ALLOCATION_JOB_WORKERS) claim queued
+  jobs and run them with their own DB sessions. Each job stores per-phase
+  progress counters (and a heartbeat) at most every PROGRESS_FLUSH_INTERVAL
+  seconds, polls its cancellation flag between demands and writes the PDF
+  report to settings.REPORTS_DIR. A worker keeps claiming jobs until the
+  queue is empty, then exits.
+- Pages poll get_job/get_active_job/get_latest_job, so a browser refresh no
+  longer loses the result.
+
+Workers are started as "python -m src.services.allocation_job_service"
+rather than through multiprocessing: Streamlit installs the page script as
+__main__, which spawned multiprocessing children would execute again.
+
+Running jobs whose worker stopped reporting for ALLOCATION_JOB_STALE_SECONDS
+(e.g. the machine restarted mid-run) are marked failed, releasing the lock; a
+worker finishing such a job later leaves it failed. Long steps without
+progress callbacks (the CP-SAT solve, the PDF report) are preceded and
+followed by a heartbeat. Queued jobs are never failed: one still queued after
+that long gets a new worker once a worker slot is free.
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from src.config.database import get_db_session
+from src.config.settings import settings
+from src.models.allocation import (
+    JOB_STATUS_CANCELLED,
+    JOB_STATUS_DONE,
+    JOB_STATUS_FAILED,
+)
+from src.repositories.job_alocacao import JobAlocacaoRepository
+from src.schemas.allocation import JobAlocacaoRead
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between two progress writes of a running job
+PROGRESS_FLUSH_INTERVAL = 0.5
+
+STALE_JOB_ERROR = "Processo de alocação interrompido (sem sinal do worker)"
+
+
+class AllocationJobConflictError(Exception):
+    """Raised when the semester already has a queued or running job."""
+
+
+def _start_worker() -> None:
+    """Start a detached worker process that drains the job queue."""
+    subprocess.Popen(
+        [sys.executable, "-m", "src.services.allocation_job_service"],
+        cwd=str(settings.PROJECT_ROOT),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def _recover_stale_jobs(repository: JobAlocacaoRepository) -> None:
+    """
+    Fail running jobs whose worker stopped sending heartbeats, and start a
+    worker for jobs queued longer than the stale timeout while a worker slot
+    is free (the worker meant to claim them is gone).
+    """
+    cutoff = datetime.utcnow() - timedelta(
+        seconds=settings.ALLOCATION_JOB_STALE_SECONDS
+    )
+    stale_ids = repository.fail_stale(cutoff, STALE_JOB_ERROR)
+    if stale_ids:
+        logger.warning(f"Marked stale allocation jobs as failed: {stale_ids}")
+
+    if (
+        repository.has_queued_before(cutoff)
+        and repository.count_running() < settings.ALLOCATION_JOB_WORKERS
+    ):
+        logger.warning("Starting a worker for long-queued allocation jobs")
+        _start_worker()
+
+
+def submit_allocation_job(
+    semester_id: int,
+    dry_run: bool = False,
+    solicitado_por: Optional[str] = None,
+) -> JobAlocacaoRead:
+    """
+    Queue an autonomous allocation run for a semester.
+
+    Args:
+        semester_id: Semester to allocate
+        dry_run: Simulate without writing allocations
+        solicitado_por: Username of the requester
+
+    Returns:
+        The queued job
+
+    Raises:
+        AllocationJobConflictError: If the semester already has an active job
+    """
+    with get_db_session() as session:
+        repository = JobAlocacaoRepository(session)
+        _recover_stale_jobs(repository)
+        job = repository.create_queued(semester_id, dry_run, solicitado_por)
+        if job is None:
+            raise AllocationJobConflictError(
+                f"Já existe uma alocação em andamento para o semestre {semester_id}"
+            )
+        busy_workers = repository.count_running()
+
+    # Otherwise a busy worker claims the job once it finishes its current one
+    if busy_workers < settings.ALLOCATION_JOB_WORKERS:
+        _start_worker()
+
+    logger.info(f"Queued allocation job {job.id} for semester {semester_id}")
+    return job
+
+
+def get_job(job_id: int) -> Optional[JobAlocacaoRead]:
+    """Get a job by ID."""
+    with get_db_session() as session:
+        return JobAlocacaoRepository(session).get_by_id(job_id)
+
+
+def get_active_job(semester_id: int) -> Optional[JobAlocacaoRead]:
+    """Get the queued or running job of a semester (after recovering stale jobs)."""
+    with get_db_session() as session:
+        repository = JobAlocacaoRepository(session)
+        _recover_stale_jobs(repository)
+        return repository.get_active_by_semestre(semester_id)
+
+
+def get_latest_job(semester_id: int) -> Optional[JobAlocacaoRead]:
+    """Get the most recent job of a semester, whatever its status."""
+    with get_db_session() as session:
+        return JobAlocacaoRepository(session).get_latest_by_semestre(semester_id)
+
+
+def cancel_job(job_id: int) -> bool:
+    """
+    Cancel a job.
+
+    A queued job is cancelled at once; a running job stops at the next demand
+    boundary (allocations of phases that already finished are kept).
+
+    Returns:
+        False if the job already finished
+    """
+    with get_db_session() as session:
+        repository = JobAlocacaoRepository(session)
+        return repository.cancel_queued(job_id) or repository.request_cancel(job_id)
+
+
+class _JobProgressReporter:
+    """Throttled progress writer and cancellation flag cache for one job."""
+
+    def __init__(self, repository: JobAlocacaoRepository, job_id: int):
+        self.repository = repository
+        self.job_id = job_id
+        self.phase: Optional[str] = None
+        self.progress: Dict[str, Dict[str, int]] = {}
+        self._cancel_requested = False
+        self._last_flush = 0.0
+
+    def report(self, phase: str, done: int, total: int) -> None:
+        """Progress callback for OptimizedAutonomousAllocationService."""
+        self.phase = phase
+        self.progress[phase] = {"done": done, "total": total}
+        if (
+            done == 0
+            or done >= total
+            or time.monotonic() - self._last_flush >= PROGRESS_FLUSH_INTERVAL
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write progress and refresh the cancellation flag."""
+        self._cancel_requested = self.repository.update_progress(
+            self.job_id, self.phase, self.progress
+        )
+        self._last_flush = time.monotonic()
+
+    def cancel_requested(self) -> bool:
+        """Cancel check for OptimizedAutonomousAllocationService."""
+        return self._cancel_requested
+
+
+def _job_result_summary(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the PDF bytes from an allocation result before persisting it."""
+    return {key: value for key, value in result.items() if key != "pdf_report"}
+
+
+def _write_pdf_report(
+    service, job_id: int, semester_id: int, result: Dict[str, Any]
+) -> Optional[str]:
+    """
+    Write the run's PDF report to settings.REPORTS_DIR.
+
+    Args:
+        service: The OptimizedAutonomousAllocationService that ran the job
+        job_id: Job ID (part of the file name)
+        semester_id: Allocated semester
+        result: Allocation result
+
+    Returns:
+        Path of the written file, or None if there was nothing to report
+    """
+    if "message" in result:
+        # Nothing was processed (no unallocated demands)
+        return None
+
+    semester = service.semestre_repo.get_by_id(semester_id)
+    semester_name = semester.nome if semester else f"Semestre {semester_id}"
+
+    decisions = service.decision_logger.get_all_decisions()
+    pdf_content = result.get("pdf_report")
+    if pdf_content is None:
+        pdf_content = service.report_service.generate_autonomous_allocation_report(
+            allocation_results=result,
+            allocation_decisions=decisions,
+            semester_name=semester_name,
+            execution_time=result.get("execution_time", 0),
+            include_detailed_decisions=settings.REPORT_INCLUDE_DETAILED_DECISIONS,
+        )
+
+    os.makedirs(settings.REPORTS_DIR, exist_ok=True)
+    pdf_path = os.path.join(
+        settings.REPORTS_DIR,
+        f"relatorio_alocacao_autonoma_{semester_name.replace('-', '_')}"
+        f"_job{job_id}.pdf",
+    )
+    with open(pdf_path, "wb") as f:
+        f.write(pdf_content)
+
+    if not settings.REPORT_INCLUDE_DETAILED_DECISIONS:
+        from src.services.autonomous_allocation_report_service import (
+            decisions_payload_path,
+            encode_report_payload,
+        )
+
+        # Kept for the detailed decisions appendix, rendered on download
+        with open(decisions_payload_path(pdf_path), "wb") as f:
+            f.write(
+                encode_report_payload(
+                    result, decisions, semester_name, result.get("execution_time", 0)
+                )
+            )
+
+    logger.info(f"PDF report saved to: {pdf_path}")
+    return pdf_path
+
+
+def _finish_job(
+    jobs: JobAlocacaoRepository, job_id: int, status: str, **fields: Any
+) -> str:
+    """
+    Record a job's final status unless it already has one.
+
+    Returns:
+        The status the job ended with
+    """
+    if jobs.finish(job_id, status, **fields):
+        return status
+    # E.g. failed as stale while this worker was still running it
+    final_status = jobs.get_by_id(job_id).status
+    logger.warning(
+        f"Allocation job {job_id} was already {final_status}; not marking it {status}"
+    )
+    return final_status
+
+
+def run_allocation_job(job: JobAlocacaoRead) -> str:
+    """
+    Execute a job already claimed (status running) by this worker.
+
+    Args:
+        job: The claimed job
+
+    Returns:
+        Final job status
+    """
+    # Imported here so the Streamlit process does not load the allocation
+    # engine just to submit or poll jobs
+    from src.services.optimized_autonomous_allocation_service import (
+        AllocationCancelledError,
+        OptimizedAutonomousAllocationService,
+    )
+
+    with get_db_session() as job_session, get_db_session() as session:
+        jobs = JobAlocacaoRepository(job_session)
+        reporter = _JobProgressReporter(jobs, job.id)
+        service = OptimizedAutonomousAllocationService(session)
+        service.set_progress_callback(reporter.report)
+        service.set_cancel_check(reporter.cancel_requested)
+
+        try:
+            result = service.execute_autonomous_allocation_partial(
+                job.semestre_id, dry_run=job.dry_run
+            )
+            # Heartbeats around the report, which sends no progress callbacks
+            reporter.flush()
+            pdf_path = _write_pdf_report(service, job.id, job.semestre_id, result)
+            reporter.flush()
+            status = _finish_job(
+                jobs,
+                job.id,
+                JOB_STATUS_DONE,
+                resultado=_job_result_summary(result),
+                pdf_path=pdf_path,
+            )
+            logger.info(f"Allocation job {job.id} finished")
+            return status
+
+        except AllocationCancelledError as e:
+            logger.info(f"Allocation job {job.id} cancelled: {e}")
+            return _finish_job(jobs, job.id, JOB_STATUS_CANCELLED, erro=str(e))
+
+        except Exception as e:
+            logger.exception(f"Allocation job {job.id} failed")
+            job_session.rollback()
+            return _finish_job(jobs, job.id, JOB_STATUS_FAILED, erro=str(e))
+
+
+def run_worker() -> int:
+    """
+    Claim and run queued jobs until the queue is empty (worker entry point).
+
+    Returns:
+        Number of jobs run
+    """
+    jobs_run = 0
+    while True:
+        with get_db_session() as session:
+            job = JobAlocacaoRepository(session).claim_next_queued(os.getpid())
+        if job is None:
+            return jobs_run
+        logger.info(f"Worker {os.getpid()} running allocation job {job.id}")
+        run_allocation_job(job)
+        jobs_run += 1
+
+
+if __name__ == "__main__":
+    run_worker()
@@ -0,0 +1,250 @@
+"""
+Allocation Solver - Global assignment for the atomic allocation phase.
+
+The greedy atomic phase walks the demands by their best candidate score and
+takes each demand's first conflict-free room. The order among ties is
+arbitrary, and an early demand can take the only room that a later demand
+fits in while another room would have served it just as well, stranding the
+later demand.
+
+AllocationSolver models the phase as an assignment problem and solves it
+with OR-Tools CP-SAT (optional dependency, runs locally):
+
+- one boolean per (demand, candidate room), at most one room per demand;
+- at most one demand per (room, day, block) slot, so nothing is double
+  booked;
+- maximize the number of allocated demands first, then the total score.
+
+The greedy assignment is computed in memory first and passed as the search
+hint, so the solver starts from the greedy result and keeps it when the
+time limit expires before it finds anything better. Whenever the solver is
+unavailable or returns no solution, the caller falls back to greedy.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set, Tuple
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # pragma: no cover - optional dependency
+    cp_model = None
+
+logger = logging.getLogger(__name__)
+
+# Atomic phase strategies (settings.ALLOCATION_SOLVER)
+SOLVER_GREEDY = "greedy"
+SOLVER_CPSAT = "cpsat"
+
+# Scores are fractional; CP-SAT needs integer coefficients
+SCORE_SCALE = 100
+
+Slot = Tuple[int, int, str]  # (sala_id, dia_sigaa, codigo_bloco)
+
+
+def is_cpsat_available() -> bool:
+    """Check whether OR-Tools (CP-SAT) is installed."""
+    return cp_model is not None
+
+
+def candidate_slots(candidate: Any) -> List[Slot]:
+    """Get the (room, day, block) slots an AllocationCandidate would occupy."""
+    return [
+        (candidate.sala.id, dia_sigaa, bloco_codigo)
+        for bloco_codigo, dia_sigaa in candidate.atomic_blocks
+    ]
+
+
+@dataclass
+class SolverResult:
+    """Outcome of one solve."""
+
+    status: str  # CP-SAT status name, "GREEDY" or "UNAVAILABLE"
+    choices: Dict[int, Any] = field(default_factory=dict)  # demanda_id -> candidate
+    allocated: int = 0
+    total_score: float = 0.0
+    greedy_allocated: int = 0
+    greedy_total_score: float = 0.0
+    wall_time: float = 0.0
+
+    @property
+    def used_solver(self) -> bool:
+        """True if the solver's assignment is used (not the greedy one)."""
+        return bool(self.choices) and self.status in ("OPTIMAL", "FEASIBLE")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary for the allocation results and the benchmark."""
+        return {
+            "status": self.status,
+            "allocated": self.allocated,
+            "total_score": round(self.total_score, 2),
+            "greedy_allocated": self.greedy_allocated,
+            "greedy_total_score": round(self.greedy_total_score, 2),
+            "wall_time": round(self.wall_time, 3),
+        }
+
+
+class AllocationSolver:
+    """CP-SAT assignment of demands to candidate rooms without double booking."""
+
+    def __init__(
+        self,
+        time_limit_seconds: float = 20.0,
+        max_candidates_per_demand: int = 30,
+        num_workers: int = 8,
+    ):
+        """
+        Initialize solver.
+
+        Args:
+            time_limit_seconds: Wall-clock limit of one solve
+            max_candidates_per_demand: Best-scored rooms modelled per demand
+                (the greedy fallback still tries every candidate)
+            num_workers: CP-SAT search workers
+        """
+        self.time_limit_seconds = time_limit_seconds
+        self.max_candidates_per_demand = max_candidates_per_demand
+        self.num_workers = num_workers
+
+    def greedy_assignment(
+        self,
+        candidates_by_demand: Dict[int, List[Any]],
+        demand_order: List[int],
+    ) -> Dict[int, Any]:
+        """
+        Assign demands in order to their first free candidate (in memory).
+
+        Same policy as the greedy atomic phase, used as the solver's hint and
+        as the baseline it has to beat.
+
+        Args:
+            candidates_by_demand: demanda_id -> candidates sorted by score
+            demand_order: Demand IDs in allocation order
+
+        Returns:
+            demanda_id -> chosen candidate
+        """
+        taken: Set[Slot] = set()
+        choices = {}
+        for demanda_id in demand_order:
+            for candidate in candidates_by_demand[demanda_id]:
+                slots = candidate_slots(candidate)
+                if not any(slot in taken for slot in slots):
+                    taken.update(slots)
+                    choices[demanda_id] = candidate
+                    break
+        return choices
+
+    def solve(
+        self,
+        candidates_by_demand: Dict[int, List[Any]],
+        demand_order: List[int],
+    ) -> SolverResult:
+        """
+        Find the assignment with the most allocated demands, then the best score.
+
+        Args:
+            candidates_by_demand: demanda_id -> conflict-free candidates sorted
+                by score (highest first)
+            demand_order: Demand IDs in greedy allocation order
+
+        Returns:
+            SolverResult; its choices are the greedy ones unless the solver
+            found a better assignment
+        """
+        start = time.perf_counter()
+        greedy = self.greedy_assignment(candidates_by_demand, demand_order)
+        result = SolverResult(
+            status="GREEDY",
+            choices=greedy,
+            allocated=len(greedy),
+            total_score=sum(c.score for c in greedy.values()),
+            greedy_allocated=len(greedy),
+            greedy_total_score=sum(c.score for c in greedy.values()),
+        )
+
+        if not is_cpsat_available():
+            logger.warning(
+                "ALLOCATION_SOLVER=cpsat but OR-Tools is not installed; "
+                "using the greedy atomic allocation"
+            )
+            result.status = "UNAVAILABLE"
+            result.wall_time = time.perf_counter() - start
+            return result
+
+        model = cp_model.CpModel()
+        variables: List[Tuple[int, Any, Any]] = []  # (demanda_id, candidate, var)
+        by_slot: Dict[Slot, List[Any]] = {}
+        per_demand: Dict[int, List[Any]] = {}
+
+        for demanda_id in demand_order:
+            modelled = candidates_by_demand[demanda_id][
+                : self.max_candidates_per_demand
+            ]
+            chosen = greedy.get(demanda_id)
+            if chosen is not None and not any(c is chosen for c in modelled):
+                # Keep the hint feasible for the model
+                modelled = modelled + [chosen]
+
+            for index, candidate in enumerate(modelled):
+                var = model.NewBoolVar(f"x_{demanda_id}_{index}")
+                variables.append((demanda_id, candidate, var))
+                per_demand.setdefault(demanda_id, []).append(var)
+                for slot in candidate_slots(candidate):
+                    by_slot.setdefault(slot, []).append(var)
+                model.AddHint(var, candidate is chosen)
+
+        if not variables:
+            result.wall_time = time.perf_counter() - start
+            return result
+
+        for demand_vars in per_demand.values():
+            model.AddAtMostOne(demand_vars)
+        for slot_vars in by_slot.values():
+            if len(slot_vars) > 1:
+                model.AddAtMostOne(slot_vars)
+
+        # Lexicographic objective: one more allocation outweighs any score
+        # gain (no assignment scores more than every demand's best room)
+        scaled = []
+        best_by_demand: Dict[int, int] = {}
+        for demanda_id, candidate, var in variables:
+            score = int(round(candidate.score * SCORE_SCALE))
+            scaled.append((var, score))
+            best_by_demand[demanda_id] = max(
+                best_by_demand.get(demanda_id, 0), abs(score)
+            )
+        allocation_weight = sum(best_by_demand.values()) + 1
+        model.Maximize(
+            sum(var * (allocation_weight + score) for var, score in scaled)
+        )
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = self.time_limit_seconds
+        solver.parameters.num_workers = self.num_workers
+        status = solver.Solve(model)
+        result.status = solver.StatusName(status)
+
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            choices = {
+                demanda_id: candidate
+                for demanda_id, candidate, var in variables
+                if solver.BooleanValue(var)
+            }
+            allocated = len(choices)
+            total_score = sum(c.score for c in choices.values())
+            if (allocated, total_score) >= (result.allocated, result.total_score):
+                result.choices = choices
+                result.allocated = allocated
+                result.total_score = total_score
+            else:
+                result.status = "GREEDY"
+
+        result.wall_time = time.perf_counter() - start
+        logger.info(
+            f"Allocation solver {result.status}: {result.allocated} demands, "
+            f"score {result.total_score:.1f} (greedy {result.greedy_allocated}, "
+            f"{result.greedy_total_score:.1f}) in {result.wall_time:.2f}s"
+        )
+        return result
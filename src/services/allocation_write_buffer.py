@@ -0,0 +1,92 @@
+"""
+Allocation Write Buffer - Write-behind staging of autonomous allocation rows.
+
+Allocating each demand through create_batch_atomic costs one commit (an fsync
+on SQLite) plus one refresh per row. During an autonomous run the chosen rows
+are instead staged here; conflict checks keep working because staging records
+the slots in the run's SemesterOccupancyIndex immediately.
+
+The service flushes the buffer at the end of each phase with a single bulk
+INSERT in one transaction. Dry runs never flush, so nothing reaches the
+database while later demands still see the simulated allocations.
+"""
+
+import logging
+from typing import Any, Dict, List, Set, Tuple
+
+from src.repositories.optimized_allocation_repo import OptimizedAllocationRepository
+from src.schemas.allocation import AlocacaoSemestralCreate
+
+logger = logging.getLogger(__name__)
+
+
+class AllocationWriteBuffer:
+    """Allocation rows chosen during a run, pending a bulk insert."""
+
+    def __init__(
+        self,
+        repository: OptimizedAllocationRepository,
+        occupancy_index=None,
+    ):
+        """
+        Initialize buffer.
+
+        Args:
+            repository: Repository used for the bulk insert
+            occupancy_index: SemesterOccupancyIndex updated as rows are staged
+        """
+        self.repository = repository
+        self.occupancy_index = occupancy_index
+        self._rows: List[Dict[str, Any]] = []
+        self._slots: Set[Tuple[int, int, int, str]] = set()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def stage(self, allocation_dtos: List[AlocacaoSemestralCreate]) -> bool:
+        """
+        Stage the rows of one allocation (all or nothing).
+
+        Rows taking a (semester, room, day, block) slot that is already staged
+        are rejected, as the unique constraint would reject them on insert.
+
+        Args:
+            allocation_dtos: Rows to stage
+
+        Returns:
+            True if staged, False if a slot was already taken
+        """
+        slots = [
+            (dto.semestre_id, dto.sala_id, dto.dia_semana_id, dto.codigo_bloco)
+            for dto in allocation_dtos
+        ]
+        if len(set(slots)) != len(slots) or not self._slots.isdisjoint(slots):
+            return False
+
+        self._slots.update(slots)
+        self._rows.extend(dto.model_dump() for dto in allocation_dtos)
+
+        if self.occupancy_index is not None:
+            for dto in allocation_dtos:
+                if self.occupancy_index.covers(dto.semestre_id):
+                    self.occupancy_index.mark_allocated(
+                        dto.sala_id, [(dto.codigo_bloco, dto.dia_semana_id)]
+                    )
+        return True
+
+    def flush(self) -> int:
+        """
+        Write all staged rows with one bulk INSERT and commit.
+
+        Returns:
+            Number of rows written
+        """
+        written = self.repository.bulk_insert(self._rows)
+        self.clear()
+        logger.debug(f"Flushed {written} staged allocation rows")
+        return written
+
+    def clear(self) -> None:
+        """Drop staged rows without writing them."""
+        self._rows = []
+        self._slots = set()
@@ -1,13 +1,29 @@
 """
 Autonomous Allocation PDF Report Generator - Human-readable allocation decision reports
+
+The report is split into REPORT_SECTIONS, each rendered as a standalone PDF
+document and merged with pypdf (optional dependency; without it the sections
+are laid out as one story, as before). Outside a Streamlit server the
+sections are rendered concurrently in a spawned process pool; the results
+and decisions are sent to each worker once, as a compressed JSON payload.
+
+The detailed decisions appendix (one scoring table per allocation) is the
+largest section and can be left out of the report and rendered on its own
+with generate_detailed_decisions_report.
 """
 
+import gzip
 import io
+import json
+import multiprocessing
 import os
 import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -24,6 +40,11 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 
+try:
+    from pypdf import PdfWriter
+except ImportError:  # pragma: no cover - optional dependency
+    PdfWriter = None
+
 # Suppress ReportLab logging completely
 logging.getLogger("reportlab").setLevel(logging.ERROR)
 logging.getLogger("reportlab.lib").setLevel(logging.ERROR)
@@ -34,6 +55,7 @@ logging.getLogger("reportlab.pdfbase.pdfmetrics").setLevel(logging.ERROR)
 logging.getLogger("reportlab.pdfbase.ttfonts").setLevel(logging.ERROR)
 
 # Import existing styles from statistics service
+from src.config.settings import settings
 from src.services.statistics_report_service import StatisticsReportService
 from src.utils.pdf_fonts import (
     register_pdf_fonts,
@@ -57,6 +79,80 @@ def _register_unicode_fonts():
 # Register fonts on module import
 _register_unicode_fonts()
 
+logger = logging.getLogger(__name__)
+
+REPORT_AUTHOR = "Sistema de Ensalamento FUP/UnB"
+
+# Report sections in document order; each one starts on a new page
+DETAILED_DECISIONS_SECTION = "decisoes_detalhadas"
+REPORT_SECTIONS = [
+    "capa",
+    "resumo",
+    DETAILED_DECISIONS_SECTION,
+    "analise_alocacao",
+    "analise_ocupacao",
+    "recomendacoes",
+]
+
+
+def encode_report_payload(
+    results: Dict[str, Any],
+    decisions: List[Dict[str, Any]],
+    semester_name: str,
+    execution_time: float = 0.0,
+) -> bytes:
+    """Serialize the report inputs as gzip-compressed JSON."""
+    data = {
+        "results": {k: v for k, v in results.items() if k != "pdf_report"},
+        "decisions": decisions,
+        "semester_name": semester_name,
+        "execution_time": execution_time,
+    }
+    return gzip.compress(
+        json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    )
+
+
+def decode_report_payload(payload: bytes) -> Dict[str, Any]:
+    """Inverse of encode_report_payload."""
+    return json.loads(gzip.decompress(payload))
+
+
+def decisions_payload_path(pdf_path: str) -> str:
+    """Path of the report payload saved next to a report PDF."""
+    return f"{os.path.splitext(pdf_path)[0]}.json.gz"
+
+
+def _can_use_process_pool(workers: int, sections: int) -> bool:
+    """Spawned workers re-run __main__, which is the page script under Streamlit."""
+    workers = min(workers, os.cpu_count() or 1)
+    if workers <= 1 or sections <= 1 or PdfWriter is None:
+        return False
+    if "streamlit" in sys.modules:
+        from streamlit import runtime
+
+        return not runtime.exists()
+    return True
+
+
+# Per-process state of the section render pool
+_worker_service: Optional["AutonomousAllocationReportService"] = None
+_worker_payload: Optional[bytes] = None
+
+
+def _init_section_worker(payload: bytes) -> None:
+    """Pool initializer: receive the payload once per worker process."""
+    global _worker_service, _worker_payload
+    _worker_service = AutonomousAllocationReportService()
+    _worker_payload = payload
+
+
+def _render_worker_section(section: str) -> Tuple[str, bytes, float]:
+    """Pool task: render one section, returning its PDF and render time."""
+    start = time.perf_counter()
+    pdf = _worker_service.render_section(section, _worker_payload)
+    return section, pdf, time.perf_counter() - start
+
 
 class AutonomousAllocationReportService:
     """Service for generating human-readable PDF reports of autonomous allocation decisions."""
@@ -65,6 +161,8 @@ class AutonomousAllocationReportService:
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
         self.stats_service = StatisticsReportService()
+        # Seconds spent on each section by the last generate_* call
+        self.last_section_timings: Dict[str, float] = {}
 
     def _setup_custom_styles(self):
         """Setup custom styles for the allocation report with Unicode font support."""
@@ -186,87 +284,234 @@ class AutonomousAllocationReportService:
         allocation_decisions: List[Dict[str, Any]],
         semester_name: str,
         execution_time: float = 0.0,
+        include_detailed_decisions: bool = True,
+        workers: Optional[int] = None,
     ) -> bytes:
         """
         Generate comprehensive human-readable PDF report of autonomous allocation.
 
+        Each entry of REPORT_SECTIONS is rendered as its own PDF document
+        (in a process pool when workers > 1) and the documents are merged in
+        order. Per-section render times are logged and kept in
+        self.last_section_timings.
+
         Args:
             allocation_results: Results from autonomous allocation execution
             allocation_decisions: Detailed decision data from allocation logger
             semester_name: Name of the semester (e.g., "2025-1")
             execution_time: Total execution time in seconds
+            include_detailed_decisions: Include the per-decision scoring
+                appendix (generate_detailed_decisions_report renders it alone)
+            workers: Section render processes (default
+                settings.REPORT_SECTION_WORKERS; 1 renders in this process)
 
         Returns:
             bytes: PDF file content
         """
-        buffer = io.BytesIO()
-
-        # Create PDF document with reduced margins for better table rendering
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=12 * mm,
-            leftMargin=12 * mm,
-            topMargin=15 * mm,
-            bottomMargin=15 * mm,
-            title=f"Relatório de Alocação Autônoma - {semester_name}",
-            author="Sistema de Ensalamento FUP/UnB",
+        sections = [
+            section
+            for section in REPORT_SECTIONS
+            if include_detailed_decisions or section != DETAILED_DECISIONS_SECTION
+        ]
+        payload = encode_report_payload(
+            allocation_results, allocation_decisions, semester_name, execution_time
         )
+        if workers is None:
+            workers = settings.REPORT_SECTION_WORKERS
 
-        # Build document content
-        story = []
+        start = time.perf_counter()
+        if PdfWriter is None:
+            logger.warning(
+                "pypdf is not installed; rendering the report as one document"
+            )
+            pdf_content = self._render_single_document(sections, payload)
+        else:
+            rendered = self._render_sections(sections, payload, workers)
+            pdf_content = self._merge_sections(
+                [rendered[section] for section in sections], semester_name
+            )
 
-        # Title page with key metrics
-        story.extend(
-            self._build_title_page(semester_name, allocation_results, execution_time)
+        self.last_section_timings["total"] = round(time.perf_counter() - start, 3)
+        logger.info(
+            f"Allocation report for {semester_name} rendered: "
+            + ", ".join(f"{k}={v}s" for k, v in self.last_section_timings.items())
         )
+        return pdf_content
 
-        # Executive summary with visual performance indicators
-        story.extend(self._build_executive_summary(allocation_results))
-
-        # Critical insights - What went right/wrong
-        story.extend(
-            self._build_critical_insights(allocation_results, allocation_decisions)
-        )
+    def generate_detailed_decisions_report(
+        self,
+        allocation_decisions: List[Dict[str, Any]],
+        semester_name: str,
+    ) -> bytes:
+        """
+        Generate the detailed decisions appendix as a standalone PDF.
 
-        # Hybrid disciplines summary (Phase 0 detection results)
-        story.extend(self._build_hybrid_discipline_summary(allocation_results))
+        Used to render the appendix on download when the main report was
+        generated without it.
 
-        # Phase-by-phase analysis with success metrics
-        story.extend(self._build_phase_analysis(allocation_results))
+        Args:
+            allocation_decisions: Detailed decision data from allocation logger
+            semester_name: Name of the semester (e.g., "2025-1")
 
-        # Detailed allocation decisions with scoring breakdowns
+        Returns:
+            bytes: PDF file content
+        """
+        start = time.perf_counter()
+        story = [
+            Paragraph(
+                f"RELATÓRIO DE ALOCAÇÃO AUTÔNOMA - {semester_name}",
+                self.styles["ReportTitle"],
+            )
+        ]
         story.extend(self._build_detailed_allocation_decisions(allocation_decisions))
+        pdf_content = self._render_story(
+            story, f"Decisões de Alocação Detalhadas - {semester_name}"
+        )
+        self.last_section_timings = {
+            DETAILED_DECISIONS_SECTION: round(time.perf_counter() - start, 3)
+        }
+        return pdf_content
 
-        # Candidate fallback analysis - How many tries per demand
-        story.extend(self._build_candidate_fallback_analysis(allocation_decisions))
-
-        # Conflict analysis - Where and why conflicts occurred
-        story.extend(
-            self._build_conflict_analysis(allocation_decisions, allocation_results)
+    def build_section(
+        self,
+        section: str,
+        results: Dict[str, Any],
+        decisions: List[Dict[str, Any]],
+        semester_name: str,
+        execution_time: float,
+    ) -> List[Any]:
+        """Build the flowables of one REPORT_SECTIONS entry."""
+        builders = {
+            "capa": lambda: self._build_title_page(
+                semester_name, results, execution_time
+            ),
+            "resumo": lambda: (
+                # Executive summary, critical insights (what went right/wrong),
+                # Phase 0 hybrid detection and phase-by-phase analysis
+                self._build_executive_summary(results)
+                + self._build_critical_insights(results, decisions)
+                + self._build_hybrid_discipline_summary(results)
+                + self._build_phase_analysis(results)
+            ),
+            # Detailed allocation decisions with scoring breakdowns
+            DETAILED_DECISIONS_SECTION: lambda: (
+                self._build_detailed_allocation_decisions(decisions)
+            ),
+            "analise_alocacao": lambda: (
+                # Candidate fallback (tries per demand), conflicts and rooms
+                self._build_candidate_fallback_analysis(decisions)
+                + self._build_conflict_analysis(decisions, results)
+                + self._build_room_utilization_analysis(decisions)
+            ),
+            "analise_ocupacao": lambda: (
+                # Busiest times, scoring factors and demands needing manual work
+                self._build_time_slot_analysis(decisions)
+                + self._build_scoring_effectiveness(decisions)
+                + self._build_unallocated_demands_analysis(decisions)
+            ),
+            # Actionable recommendations with priorities
+            "recomendacoes": lambda: self._build_recommendations(results, decisions),
+        }
+        return builders[section]()
+
+    def render_section(self, section: str, payload: bytes) -> bytes:
+        """Render one REPORT_SECTIONS entry as a standalone PDF."""
+        data = decode_report_payload(payload)
+        story = self.build_section(section, **data)
+        # Each section starts on a new page of the merged report anyway
+        while story and isinstance(story[-1], PageBreak):
+            story.pop()
+        return self._render_story(story)
+
+    def _render_sections(
+        self, sections: List[str], payload: bytes, workers: int
+    ) -> Dict[str, bytes]:
+        """Render sections, in a process pool when possible."""
+        self.last_section_timings = {}
+        rendered = {}
+
+        if _can_use_process_pool(workers, len(sections)):
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=min(workers, len(sections), os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_section_worker,
+                    initargs=(payload,),
+                ) as pool:
+                    for section, pdf, seconds in pool.map(
+                        _render_worker_section, sections
+                    ):
+                        rendered[section] = pdf
+                        self.last_section_timings[section] = round(seconds, 3)
+                return rendered
+            except Exception as e:
+                logger.warning(
+                    f"Parallel report rendering failed ({e}); rendering in process"
+                )
+                rendered.clear()
+                self.last_section_timings = {}
+
+        for section in sections:
+            start = time.perf_counter()
+            rendered[section] = self.render_section(section, payload)
+            self.last_section_timings[section] = round(time.perf_counter() - start, 3)
+        return rendered
+
+    def _render_single_document(self, sections: List[str], payload: bytes) -> bytes:
+        """Render all sections as one story (without pypdf to merge them)."""
+        self.last_section_timings = {}
+        data = decode_report_payload(payload)
+        story = []
+        for section in sections:
+            start = time.perf_counter()
+            story.extend(self.build_section(section, **data))
+            self.last_section_timings[section] = round(time.perf_counter() - start, 3)
+
+        start = time.perf_counter()
+        pdf_content = self._render_story(
+            story, f"Relatório de Alocação Autônoma - {data['semester_name']}"
         )
+        self.last_section_timings["layout"] = round(time.perf_counter() - start, 3)
+        return pdf_content
 
-        # Room utilization with capacity analysis
-        story.extend(self._build_room_utilization_analysis(allocation_decisions))
+    def _render_story(self, story: List[Any], title: str = "") -> bytes:
+        """Lay out a story on A4 pages and return the PDF bytes."""
+        buffer = io.BytesIO()
 
-        # Time slot utilization - Busiest times
-        story.extend(self._build_time_slot_analysis(allocation_decisions))
+        # Create PDF document with reduced margins for better table rendering
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            rightMargin=12 * mm,
+            leftMargin=12 * mm,
+            topMargin=15 * mm,
+            bottomMargin=15 * mm,
+            title=title,
+            author=REPORT_AUTHOR,
+        )
+        doc.build(story)
 
-        # Scoring effectiveness - Which factors mattered most
-        story.extend(self._build_scoring_effectiveness(allocation_decisions))
+        # Get PDF content
+        pdf_content = buffer.getvalue()
+        buffer.close()
 
-        # Top unallocated demands - Manual intervention needed
-        story.extend(self._build_unallocated_demands_analysis(allocation_decisions))
+        return pdf_content
 
-        # Actionable recommendations with priorities
-        story.extend(
-            self._build_recommendations(allocation_results, allocation_decisions)
+    def _merge_sections(self, section_pdfs: List[bytes], semester_name: str) -> bytes:
+        """Concatenate section PDFs into the final report."""
+        writer = PdfWriter()
+        for pdf in section_pdfs:
+            writer.append(io.BytesIO(pdf))
+        writer.add_metadata(
+            {
+                "/Title": f"Relatório de Alocação Autônoma - {semester_name}",
+                "/Author": REPORT_AUTHOR,
+            }
         )
 
-        # Build PDF
-        doc.build(story)
-
-        # Get PDF content
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        writer.close()
         pdf_content = buffer.getvalue()
         buffer.close()
 
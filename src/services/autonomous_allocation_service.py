@@ -18,7 +18,6 @@ Implements RF-006 requirements:
 from typing import List, Dict, Tuple, Optional, Set, NamedTuple, Any
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 import logging
 from datetime import datetime
 
@@ -30,9 +29,9 @@ from src.repositories.sala import SalaRepository
 from src.repositories.semestre import SemestreRepository
 from src.config.scoring_config import SCORING_WEIGHTS
 from src.utils.sigaa_parser import SigaaScheduleParser
-from src.utils.room_utils import get_room_occupancy
 from src.services.manual_allocation_service import ManualAllocationService
 from src.services.room_scoring_service import RoomScoringService
+from src.services.semester_grid_service import split_professors
 from src.schemas.allocation import AlocacaoSemestralCreate
 from src.models.inventory import Sala
 from src.models.academic import Professor
@@ -111,6 +110,19 @@ class AutonomousAllocationService:
         self.sala_repo = SalaRepository(session)
         self.semestre_repo = SemestreRepository(session)
 
+        # Room reference data for the current run (InventorySnapshot, optional)
+        self.inventory_snapshot = None
+
+    def _get_all_rooms(self) -> List:
+        """Get all rooms, from the run's inventory snapshot when available."""
+        if self.inventory_snapshot is not None:
+            return self.inventory_snapshot.get_rooms()
+        return self.sala_repo.get_all()
+
+    def _find_rules_by_disciplina(self, codigo_disciplina: str) -> List:
+        """Get the rules of a discipline from the compiled rule index."""
+        return self.scoring_service._find_rules_by_disciplina(codigo_disciplina)
+
     def execute_autonomous_allocation(self, semester_id: int) -> Dict:
         """
         Execute the complete autonomous allocation algorithm for a semester.
@@ -305,7 +317,7 @@ class AutonomousAllocationService:
                 continue
 
             # Find hard rules for this demand
-            hard_rules = self.regra_repo.find_rules_by_disciplina(
+            hard_rules = self._find_rules_by_disciplina(
                 demanda.codigo_disciplina
             )
             hard_rules = [
@@ -491,11 +503,11 @@ class AutonomousAllocationService:
             if phase2_candidates and demanda_id in phase2_candidates:
                 valid_candidates = phase2_candidates[demanda_id]
                 # Sort by score descending, then by room occupancy (highest first for optimization)
+                occupancy = self.scoring_service._get_room_occupancy_vector(
+                    [c.sala.id for c in valid_candidates], semester_id
+                )
                 valid_candidates.sort(
-                    key=lambda c: (
-                        c.score,
-                        get_room_occupancy(self.alocacao_repo, c.sala.id, semester_id),
-                    ),
+                    key=lambda c: (c.score, occupancy[c.sala.id], -c.sala.id),
                     reverse=True,
                 )
 
@@ -547,13 +559,11 @@ class AutonomousAllocationService:
 
                     if valid_candidates:
                         # Sort by score and try top candidates (with room occupancy optimization)
+                        occupancy = self.scoring_service._get_room_occupancy_vector(
+                            [c.sala.id for c in valid_candidates], semester_id
+                        )
                         valid_candidates.sort(
-                            key=lambda c: (
-                                c.score,
-                                get_room_occupancy(
-                                    self.alocacao_repo, c.sala.id, semester_id
-                                ),
-                            ),
+                            key=lambda c: (c.score, occupancy[c.sala.id], -c.sala.id),
                             reverse=True,
                         )
 
@@ -599,10 +609,11 @@ class AutonomousAllocationService:
         Higher priority = more restrictive constraints = allocate first.
         """
         priorities = []
+        professor_index = self.scoring_service._get_professor_index()
 
         for demanda in demands:
             demanda_id = demanda.id
-            hard_rules = self.regra_repo.find_rules_by_disciplina(
+            hard_rules = self._find_rules_by_disciplina(
                 demanda.codigo_disciplina
             )
             hard_rules = [r for r in hard_rules if r.prioridade == 0]
@@ -620,8 +631,9 @@ class AutonomousAllocationService:
                 priority_score += SCORING_WEIGHTS.PRIORITY_SPECIFIC_ROOM_REQUIRED
             if has_professor:
                 # Check if professor has mobility constraints
-                prof_name = demanda.professores_disciplina.strip()
-                professor = self.prof_repo.get_by_nome_completo(prof_name)
+                professor = professor_index.resolve_text(
+                    demanda.professores_disciplina
+                )
                 if professor and not professor.tem_baixa_mobilidade:
                     priority_score += SCORING_WEIGHTS.PRIORITY_MOBILITY_CONSTRAINTS
 
@@ -662,7 +674,7 @@ class AutonomousAllocationService:
         """
         Find rooms that satisfy ALL hard rules for a demand.
         """
-        all_rooms = self.sala_repo.get_all()
+        all_rooms = self._get_all_rooms()
         compatible_rooms = []
 
         for room in all_rooms:
@@ -686,23 +698,14 @@ class AutonomousAllocationService:
 
         Returns Dict[demanda_id, Professor] for successful lookups.
         """
+        professor_index = self.scoring_service._get_professor_index()
         professor_map = {}
 
         for demanda in demands:
-            demanda_id = demanda["id"]
             prof_text = demanda.get("professores_disciplina", "").strip()
-
             if prof_text:
                 # Support multiple professors (take first match)
-                prof_names = [name.strip() for name in prof_text.split(",")]
-                professor = None
-
-                for prof_name in prof_names:
-                    professor = self.prof_repo.get_by_nome_completo(prof_name)
-                    if professor:
-                        break
-
-                professor_map[demanda_id] = professor
+                professor_map[demanda["id"]] = professor_index.resolve_text(prof_text)
 
         return professor_map
 
@@ -718,25 +721,7 @@ class AutonomousAllocationService:
         Returns:
             Dict[demanda_id, Professor] for successful lookups.
         """
-        professor_map = {}
-
-        for demanda in demands:
-            demanda_id = demanda.id
-            prof_text = demanda.professores_disciplina.strip()
-
-            if prof_text:
-                # Support multiple professors (take first match)
-                prof_names = [name.strip() for name in prof_text.split(",")]
-                professor = None
-
-                for prof_name in prof_names:
-                    professor = self.prof_repo.get_by_nome_completo(prof_name)
-                    if professor:
-                        break
-
-                professor_map[demanda_id] = professor
-
-        return professor_map
+        return self.scoring_service._get_professor_index().resolve_demands(demands)
 
     def _score_room_candidates_for_demand(
         self, demanda: Any, professor: Optional[Professor], semester_id: int
@@ -756,7 +741,7 @@ class AutonomousAllocationService:
         professor_prefs = self._get_professor_preferences_for_professor(professor)
 
         # Get all rooms
-        all_rooms = self.sala_repo.get_all()
+        all_rooms = self._get_all_rooms()
 
         for room in all_rooms:
             candidate = AllocationCandidate(
@@ -794,32 +779,8 @@ class AutonomousAllocationService:
         self, professor: Optional[Professor]
     ) -> Dict:
         """Get professor preferences dict from Professor object (different from string version)."""
-        prefs = {"preferred_rooms": [], "preferred_characteristics": []}
-
-        if not professor:
-            return prefs
-
-        # Get room preferences
-        stmt = self.session.execute(
-            text(
-                "SELECT sala_id FROM professor_prefere_sala WHERE professor_id = :prof_id"
-            ),
-            {"prof_id": professor.id},
-        )
-        room_prefs = [row[0] for row in stmt.fetchall()]
-        prefs["preferred_rooms"].extend(room_prefs)
-
-        # Get characteristic preferences
-        stmt = self.session.execute(
-            text(
-                "SELECT caracteristica_id FROM professor_prefere_caracteristica WHERE professor_id = :prof_id"
-            ),
-            {"prof_id": professor.id},
-        )
-        char_prefs = [row[0] for row in stmt.fetchall()]
-        prefs["preferred_characteristics"].extend(char_prefs)
-
-        return prefs
+        # Same source as scoring (the run's preference index, when attached)
+        return self.scoring_service._get_professor_preferences_for_professor(professor)
 
     def _check_allocation_conflicts(
         self, candidate: AllocationCandidate, semester_id: int
@@ -1039,7 +1000,7 @@ END OF AUTONOMOUS ALLOCATION LOG
         all_discipline_codes = [d.codigo_disciplina for d in unallocated_demands]
         all_rules = []
         for code in set(all_discipline_codes):
-            all_rules.extend(self.regra_repo.find_rules_by_disciplina(code))
+            all_rules.extend(self._find_rules_by_disciplina(code))
 
         stats["total_hard_rules"] = sum(1 for r in all_rules if r.prioridade == 0)
         stats["discipline_specific_rules"] = sum(
@@ -1056,15 +1017,13 @@ END OF AUTONOMOUS ALLOCATION LOG
         )
 
         # Analyze professors
+        professor_index = self.scoring_service._get_professor_index()
         professor_ids = set()
         for demanda in unallocated_demands:
-            prof_text = demanda.professores_disciplina.strip()
-            if prof_text:
-                prof_names = [name.strip() for name in prof_text.split(",")]
-                for prof_name in prof_names:
-                    prof = self.prof_repo.get_by_nome_completo(prof_name)
-                    if prof:
-                        professor_ids.add(prof.id)
+            for prof_name in split_professors(demanda.professores_disciplina):
+                prof = professor_index.resolve(prof_name)
+                if prof:
+                    professor_ids.add(prof.id)
 
         stats["total_professors_in_demands"] = len(professor_ids)
 
@@ -1095,7 +1054,7 @@ END OF AUTONOMOUS ALLOCATION LOG
         stats["total_db_allocations"] = len(all_allocs)
 
         # Get all rooms to calculate average allocations per room
-        all_rooms = self.sala_repo.get_all()
+        all_rooms = self._get_all_rooms()
         if all_rooms:
             # Calculate average based on semester-allocated rooms
             allocated_rooms = set(a.sala_id for a in all_allocs)
@@ -0,0 +1,192 @@
+"""
+Demand Queue Service - Paged read model for the manual allocation queue.
+
+The Ensalamento page's demand queue used to load every demand of the
+semester, filter and sort them in Python and draw one card per demand, with
+allocation lookups and rule warnings computed card by card. Most cards were
+off-screen, yet every rerun paid for all of them.
+
+DemandQueueService pushes the filters (allocation status, search text,
+professor, course, hybrid flag) and the queue priority ordering into SQL
+(DisciplinaRepository.get_queue_page, LIMIT/OFFSET) and precomputes the
+allocation summary, hybrid flag and rule warnings for the requested page
+only, so the cost of a rerun depends on the page size, not on the semester.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.repositories.disciplina import DisciplinaRepository
+from src.schemas.academic import DemandaRead
+from src.services.manual_allocation_service import ManualAllocationService
+
+DEFAULT_PAGE_SIZE = 20
+
+# Terms that flag rule warnings on a queue card
+MOBILITY_TERMS = ("baixa mobilidade", "cadeira de rodas")
+LAB_NAME_TERMS = ("laboratório", "prático", "prática")
+HIGH_ENROLLMENT_VAGAS = 60
+
+
+@dataclass(frozen=True)
+class DemandQueueFilters:
+    """Filters of the demand queue (empty values mean no filter)."""
+
+    allocation_status: str = "unallocated"  # "allocated", "unallocated", "all"
+    search_text: str = ""
+    professor: str = ""
+    codigo_curso: str = ""
+    hybrid_only: bool = False
+
+
+@dataclass
+class DemandQueueItem:
+    """One card of the demand queue with everything it displays."""
+
+    demanda: DemandaRead
+    is_allocated: bool
+    is_hybrid: bool
+    warnings: List[str]
+    allocation_info: Optional[Dict] = None
+
+
+@dataclass
+class DemandQueuePage:
+    """One page of the demand queue."""
+
+    items: List[DemandQueueItem]
+    total: int
+    page: int
+    page_size: int
+    progress: Dict = field(default_factory=dict)
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages (at least 1)."""
+        return max(1, -(-self.total // self.page_size))
+
+
+def get_rule_warnings(demanda: DemandaRead, is_hybrid: bool) -> List[str]:
+    """
+    Get the rule-related warnings shown on a demand card.
+
+    Checks for:
+    - Professor accessibility requirements
+    - Disciplines requiring laboratories (hybrid detection, else course name)
+    - High enrollment requirements
+
+    Args:
+        demanda: Demand DTO
+        is_hybrid: Discipline detected as hybrid from historical allocations
+
+    Returns:
+        List of warning messages
+    """
+    warnings = []
+
+    professors = str(demanda.professores_disciplina or "").lower()
+    discipline_name = str(demanda.nome_disciplina or "").lower()
+
+    if any(term in professors for term in MOBILITY_TERMS):
+        warnings.append("Professor com restrição de mobilidade")
+
+    if is_hybrid:
+        # Strong indication - detected from historical allocation data
+        warnings.append("🧪 Disciplina HÍBRIDA - requer laboratório em alguns dias")
+    elif any(term in discipline_name for term in LAB_NAME_TERMS):
+        # Soft check for laboratory requirements (less certain)
+        warnings.append("Disciplina pode necessitar de laboratório")
+
+    if demanda.vagas_disciplina and demanda.vagas_disciplina > HIGH_ENROLLMENT_VAGAS:
+        warnings.append("Alta demanda - verificar capacidade da sala")
+
+    return warnings
+
+
+class DemandQueueService:
+    """Read model for the paged demand queue."""
+
+    def __init__(self, session: Session):
+        """Initialize service with repositories."""
+        self.session = session
+        self.demanda_repo = DisciplinaRepository(session)
+        self.manual_service = ManualAllocationService(session)
+
+    def get_page(
+        self,
+        semester_id: int,
+        filters: DemandQueueFilters,
+        page: int = 1,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        hybrid_codes: FrozenSet[str] = frozenset(),
+        room_names: Optional[Dict[int, str]] = None,
+    ) -> DemandQueuePage:
+        """
+        Get one page of the demand queue, in priority order.
+
+        Args:
+            semester_id: Semester ID
+            filters: Queue filters
+            page: 1-based page number (clamped to the last page)
+            page_size: Cards per page
+            hybrid_codes: Discipline codes detected as hybrid
+            room_names: sala_id -> room name for the allocation summaries
+
+        Returns:
+            DemandQueuePage with the page items, total and allocation progress
+        """
+        query_args = dict(
+            allocation_status=filters.allocation_status,
+            search_text=filters.search_text,
+            professor=filters.professor,
+            codigo_curso=filters.codigo_curso,
+            codigos_disciplina=hybrid_codes if filters.hybrid_only else None,
+        )
+
+        page = max(1, page)
+        rows, total = self.demanda_repo.get_queue_page(
+            semester_id,
+            limit=page_size,
+            offset=(page - 1) * page_size,
+            **query_args,
+        )
+
+        # Filters changed under a later page: show the last one instead
+        last_page = max(1, -(-total // page_size))
+        if not rows and page > last_page:
+            page = last_page
+            rows, total = self.demanda_repo.get_queue_page(
+                semester_id,
+                limit=page_size,
+                offset=(page - 1) * page_size,
+                **query_args,
+            )
+
+        allocation_infos = self.manual_service.get_allocation_summaries(
+            semester_id,
+            [demanda for demanda, is_allocated in rows if is_allocated],
+            room_names=room_names,
+        )
+
+        items = []
+        for demanda, is_allocated in rows:
+            is_hybrid = demanda.codigo_disciplina in hybrid_codes
+            items.append(
+                DemandQueueItem(
+                    demanda=demanda,
+                    is_allocated=is_allocated,
+                    is_hybrid=is_hybrid,
+                    warnings=get_rule_warnings(demanda, is_hybrid),
+                    allocation_info=allocation_infos.get(demanda.id),
+                )
+            )
+
+        return DemandQueuePage(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            progress=self.manual_service.get_allocation_progress(semester_id),
+        )
@@ -0,0 +1,100 @@
+"""
+Historical Frequency Index - Precomputed discipline/room/day allocation counts.
+
+Historical frequency scoring (RF-006.6) asks, for every candidate room of every
+demand, how many times the discipline was allocated to that room (optionally on
+a specific day) in previous semesters. Instead of one JOIN + COUNT query per
+question, this index loads all counts with a single GROUP BY over
+alocacoes_semestrais ⋈ demandas and answers lookups from memory.
+
+Storage is sparse: codigo_disciplina -> {(sala_id, dia_semana_id): count},
+plus per-room totals for the day-independent (legacy) bonus.
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.repositories.alocacao import AlocacaoRepository
+
+logger = logging.getLogger(__name__)
+
+
+class HistoricalFrequencyIndex:
+    """
+    Historical allocation counts keyed by (codigo_disciplina, sala_id, dia_semana_id).
+
+    Built for one "current" semester, whose allocations are excluded, so counts
+    stay stable while the current semester is being allocated.
+    """
+
+    def __init__(
+        self,
+        exclude_semester_id: Optional[int],
+        day_counts: Optional[Dict[str, Dict[Tuple[int, int], int]]] = None,
+    ):
+        """
+        Initialize index.
+
+        Args:
+            exclude_semester_id: Semester excluded from the counts (current semester)
+            day_counts: Optional mapping of codigo_disciplina to
+                {(sala_id, dia_semana_id): count}
+        """
+        self.exclude_semester_id = exclude_semester_id
+        self._day_counts: Dict[str, Dict[Tuple[int, int], int]] = day_counts or {}
+
+        # Per-room totals (all days) for the legacy frequency bonus
+        self._room_counts: Dict[str, Dict[int, int]] = {}
+        for codigo, counts in self._day_counts.items():
+            room_totals = self._room_counts.setdefault(codigo, {})
+            for (sala_id, _dia_semana_id), count in counts.items():
+                room_totals[sala_id] = room_totals.get(sala_id, 0) + count
+
+    @classmethod
+    def load(
+        cls, session: Session, exclude_semester_id: Optional[int]
+    ) -> "HistoricalFrequencyIndex":
+        """
+        Build the index with a single grouped query.
+
+        Args:
+            session: SQLAlchemy session
+            exclude_semester_id: Semester to exclude (current semester)
+
+        Returns:
+            HistoricalFrequencyIndex populated with historical counts
+        """
+        rows = AlocacaoRepository(session).get_discipline_room_day_frequency_matrix(
+            exclude_semester_id
+        )
+
+        day_counts: Dict[str, Dict[Tuple[int, int], int]] = {}
+        for codigo_disciplina, sala_id, dia_semana_id, count in rows:
+            day_counts.setdefault(codigo_disciplina, {})[
+                (sala_id, dia_semana_id)
+            ] = count
+
+        logger.debug(
+            f"Loaded historical frequency index (excluding semester "
+            f"{exclude_semester_id}): {len(rows)} entries for "
+            f"{len(day_counts)} disciplines"
+        )
+        return cls(exclude_semester_id, day_counts)
+
+    def covers(self, exclude_semester_id: Optional[int]) -> bool:
+        """Check whether this index was built excluding the given semester."""
+        return exclude_semester_id == self.exclude_semester_id
+
+    def room_frequency(self, disciplina_codigo: str, sala_id: int) -> int:
+        """Get how many times a discipline was allocated to a room (any day)."""
+        return self._room_counts.get(disciplina_codigo, {}).get(sala_id, 0)
+
+    def room_day_frequency(
+        self, disciplina_codigo: str, sala_id: int, dia_semana_id: int
+    ) -> int:
+        """Get how many times a discipline was allocated to a room on a given day."""
+        return self._day_counts.get(disciplina_codigo, {}).get(
+            (sala_id, dia_semana_id), 0
+        )
@@ -6,12 +6,19 @@ both classroom and lab/specialized room allocations) based on historical data.
 
 This enables proper per-day scoring so that lab time slots are allocated
 to labs and classroom time slots to regular classrooms.
+
+Detection reads the semester's distinct (discipline, day, room type, room)
+allocations with one grouped query and stores the rows of the hybrid
+disciplines in deteccoes_hibridas_salas. Later detections of the same
+semester (other runs, other Streamlit sessions) reuse them until the
+semester's data version or the inventory version changes.
 """
 
 import logging
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from src.repositories.alocacao import AlocacaoRepository
@@ -22,6 +29,26 @@ logger = logging.getLogger(__name__)
 # Regular classroom type ID (Sala de Aula)
 REGULAR_CLASSROOM_TYPE_ID = 2
 
+# (codigo_disciplina, dia_semana_id, tipo_sala_id, sala_id)
+UsageRow = Tuple[str, int, Optional[int], int]
+
+
+def _group_by_code(rows: List[UsageRow]) -> Dict[str, List[UsageRow]]:
+    """Group usage rows by discipline code, keeping their order."""
+    grouped: Dict[str, List[UsageRow]] = {}
+    for row in rows:
+        grouped.setdefault(row[0], []).append(row)
+    return grouped
+
+
+def _is_hybrid_usage(rows: List[UsageRow]) -> bool:
+    """2+ distinct rooms, at least one of a known non-classroom type."""
+    rooms = {sala_id for _, _, _, sala_id in rows}
+    return len(rooms) >= 2 and any(
+        tipo_sala_id is not None and tipo_sala_id != REGULAR_CLASSROOM_TYPE_ID
+        for _, _, tipo_sala_id, _ in rows
+    )
+
 
 @dataclass
 class HybridDisciplineInfo:
@@ -104,16 +131,16 @@ class HybridDisciplineDetectionService:
         # Clear previous cache
         self._cache.clear()
 
-        # Detect hybrid discipline codes
-        hybrid_codes = self.alocacao_repo.detect_hybrid_disciplines(
-            detection_semester_id, REGULAR_CLASSROOM_TYPE_ID
-        )
+        usage_by_code = self._load_hybrid_usage(detection_semester_id)
+        hybrid_codes = sorted(usage_by_code)
 
         logger.info(f"Found {len(hybrid_codes)} hybrid disciplines")
 
         # Build detailed info for each hybrid discipline
         for codigo in hybrid_codes:
-            info = self._build_hybrid_info(codigo, detection_semester_id)
+            info = self._build_hybrid_info(
+                codigo, usage_by_code[codigo], detection_semester_id
+            )
             self._cache[codigo] = info
 
         self._is_initialized = True
@@ -125,47 +152,90 @@ class HybridDisciplineDetectionService:
             details=self._cache.copy(),
         )
 
+    def _load_hybrid_usage(self, semester_id: int) -> Dict[str, List[UsageRow]]:
+        """
+        Get the room usage of the semester's hybrid disciplines.
+
+        The detection is materialized per semester (deteccoes_hibridas) and
+        reused while the semester's data version and the inventory version
+        are unchanged; otherwise it is recomputed from one grouped query and
+        stored again in the caller's session (committed with the caller's
+        next commit).
+
+        Args:
+            semester_id: Semester used for detection
+
+        Returns:
+            Dict codigo_disciplina -> (codigo, day, room type, room) rows
+        """
+        # Read the version before the data (see get_semester_grid)
+        versao = self.alocacao_repo.get_data_version(semester_id)
+
+        rows = self.alocacao_repo.get_hybrid_detection(semester_id, versao)
+        if rows is not None:
+            logger.debug(
+                f"Reusing hybrid detection of semester {semester_id} "
+                f"(version {versao})"
+            )
+            return _group_by_code(rows)
+
+        usage_by_code = {
+            codigo: code_rows
+            for codigo, code_rows in _group_by_code(
+                self.alocacao_repo.get_discipline_day_room_usage(semester_id)
+            ).items()
+            if _is_hybrid_usage(code_rows)
+        }
+
+        try:
+            self.alocacao_repo.save_hybrid_detection(
+                semester_id,
+                versao,
+                [row for code_rows in usage_by_code.values() for row in code_rows],
+            )
+        except SQLAlchemyError as e:
+            # Only the savepoint was rolled back: detection still works, uncached
+            logger.warning(
+                f"Could not store hybrid detection of semester {semester_id}: {e}"
+            )
+
+        return usage_by_code
+
     def _build_hybrid_info(
-        self, codigo_disciplina: str, semester_id: int
+        self, codigo_disciplina: str, rows: List[UsageRow], semester_id: int
     ) -> HybridDisciplineInfo:
         """
         Build detailed hybrid discipline info with per-day room type analysis.
 
         Args:
             codigo_disciplina: Discipline code
+            rows: The discipline's (codigo, day, room type, room) rows
             semester_id: Semester used for detection
 
         Returns:
             HybridDisciplineInfo with detailed day-by-day analysis
         """
-        # Get per-day room type info
-        day_room_types = self.alocacao_repo.get_hybrid_discipline_day_room_types(
-            codigo_disciplina, semester_id, REGULAR_CLASSROOM_TYPE_ID
-        )
-
-        lab_days = []
-        classroom_days = []
+        # Non-classroom rooms used per day ("lab" rooms); empty for classroom days
+        day_lab_rooms: Dict[int, List[int]] = {}
         lab_room_types = set()
-        historical_lab_rooms = {}
 
-        for day_id, day_info in day_room_types.items():
-            if day_info["is_lab_day"]:
-                lab_days.append(day_id)
-                historical_lab_rooms[day_id] = day_info["lab_room_ids"]
+        for _, day_id, tipo_sala_id, sala_id in rows:
+            lab_rooms = day_lab_rooms.setdefault(day_id, [])
+            if tipo_sala_id != REGULAR_CLASSROOM_TYPE_ID:
+                lab_rooms.append(sala_id)
+                lab_room_types.add(tipo_sala_id)
 
-                # Track all non-classroom room types used
-                for tipo_id in day_info["room_types"]:
-                    if tipo_id != REGULAR_CLASSROOM_TYPE_ID:
-                        lab_room_types.add(tipo_id)
-            else:
-                classroom_days.append(day_id)
+        lab_days = [day_id for day_id, rooms in day_lab_rooms.items() if rooms]
+        classroom_days = [
+            day_id for day_id, rooms in day_lab_rooms.items() if not rooms
+        ]
 
         info = HybridDisciplineInfo(
             codigo_disciplina=codigo_disciplina,
             lab_days=sorted(lab_days),
             classroom_days=sorted(classroom_days),
             lab_room_types=lab_room_types,
-            historical_lab_rooms=historical_lab_rooms,
+            historical_lab_rooms={day_id: day_lab_rooms[day_id] for day_id in lab_days},
             detection_semester_id=semester_id,
         )
 
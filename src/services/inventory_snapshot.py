@@ -0,0 +1,109 @@
+"""
+Inventory Snapshot - Immutable room reference data for allocation runs.
+
+Scoring, rule compliance and suggestion building repeatedly need the same
+reference data: the room list, each room's characteristics and the names of
+buildings, room types, rooms and characteristics. Looking them up with one
+SELECT per room per call makes a semester run do O(demands × rooms) inventory
+queries.
+
+InventorySnapshot loads everything in a fixed number of queries at the start
+of an allocation run (or a suggestions request) and is then passed to every
+consumer. It is read-only: take a new snapshot to see inventory changes.
+"""
+
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import FrozenSet, List, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.repositories.caracteristica import CaracteristicaRepository
+from src.repositories.predio import PredioRepository
+from src.repositories.sala import SalaRepository
+from src.repositories.tipo_sala import TipoSalaRepository
+from src.schemas.inventory import SalaRead
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class InventorySnapshot:
+    """Rooms with their characteristic sets and id → name maps."""
+
+    rooms: Tuple[SalaRead, ...]
+    room_characteristics: Mapping[int, FrozenSet[int]]
+    room_names: Mapping[int, str]
+    room_type_names: Mapping[int, str]
+    building_names: Mapping[int, str]
+    characteristic_names: Mapping[int, str]
+
+    @classmethod
+    def load(cls, session: Session) -> "InventorySnapshot":
+        """
+        Load the room inventory and its reference tables.
+
+        Args:
+            session: SQLAlchemy session
+
+        Returns:
+            InventorySnapshot (rooms in SalaRepository.get_all() order)
+        """
+        sala_repo = SalaRepository(session)
+        rooms = tuple(sala_repo.get_all())
+        room_characteristics = {
+            sala_id: frozenset(char_ids)
+            for sala_id, char_ids in sala_repo.get_caracteristica_ids_by_sala().items()
+        }
+
+        snapshot = cls(
+            rooms=rooms,
+            room_characteristics=MappingProxyType(room_characteristics),
+            room_names=MappingProxyType({room.id: room.nome for room in rooms}),
+            room_type_names=MappingProxyType(
+                {t.id: t.nome for t in TipoSalaRepository(session).get_all()}
+            ),
+            building_names=MappingProxyType(
+                {p.id: p.nome for p in PredioRepository(session).get_all()}
+            ),
+            characteristic_names=MappingProxyType(
+                {c.id: c.nome for c in CaracteristicaRepository(session).get_all()}
+            ),
+        )
+
+        logger.debug(
+            f"Loaded inventory snapshot: {len(rooms)} rooms, "
+            f"{len(snapshot.characteristic_names)} characteristics"
+        )
+        return snapshot
+
+    def get_rooms(self) -> List[SalaRead]:
+        """Get a list copy of all rooms."""
+        return list(self.rooms)
+
+    def get_room_characteristics(self, sala_id: int) -> FrozenSet[int]:
+        """Get characteristic IDs of a room (empty if none)."""
+        return self.room_characteristics.get(sala_id, frozenset())
+
+    def get_room_name(self, sala_id: Optional[int]) -> str:
+        """Get room name by ID ("N/A" if unknown)."""
+        if not sala_id:
+            return "N/A"
+        return self.room_names.get(sala_id, "N/A")
+
+    def get_room_type_name(self, tipo_sala_id: Optional[int]) -> str:
+        """Get room type name by ID ("N/A" if unknown)."""
+        if not tipo_sala_id:
+            return "N/A"
+        return self.room_type_names.get(tipo_sala_id, "N/A")
+
+    def get_building_name(self, predio_id: Optional[int]) -> str:
+        """Get building name by ID ("N/A" if unknown)."""
+        if not predio_id:
+            return "N/A"
+        return self.building_names.get(predio_id, "N/A")
+
+    def get_characteristic_name(self, caracteristica_id: int) -> str:
+        """Get characteristic name by ID (empty string if unknown)."""
+        return self.characteristic_names.get(caracteristica_id, "")
@@ -1,6 +1,7 @@
 """Service for executing manual allocation operations."""
 
-from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
@@ -22,6 +23,8 @@ from src.schemas.manual_allocation import (
     ConflictDetail,
     RoomSuggestion,
 )
+from src.services.inventory_snapshot import InventorySnapshot
+from src.services.rule_index import get_compiled_rule_set
 from src.services.room_scoring_service import BlockGroup, RoomScoringService
 from src.utils.sigaa_parser import SigaaScheduleParser
 
@@ -41,6 +44,57 @@ class ManualAllocationService:
         self.parser = SigaaScheduleParser()
         self.scoring_service = RoomScoringService(session)
 
+        # Optional in-memory occupancy index (injected via set_occupancy_index)
+        self.occupancy_index = None
+
+        # Optional room reference data (injected via set_inventory_snapshot)
+        self.inventory_snapshot: Optional[InventorySnapshot] = None
+
+    def set_occupancy_index(self, occupancy_index) -> None:
+        """
+        Set the in-memory occupancy index kept in sync with allocation writes.
+
+        The index is also shared with the scoring service so suggestions and
+        conflict checks for its semester never hit the database.
+
+        Args:
+            occupancy_index: SemesterOccupancyIndex instance (or None to disable)
+        """
+        self.occupancy_index = occupancy_index
+        self.scoring_service.set_occupancy_index(occupancy_index)
+
+    def set_inventory_snapshot(self, snapshot: Optional[InventorySnapshot]) -> None:
+        """
+        Set the inventory snapshot used for rooms and names, shared with scoring.
+
+        Args:
+            snapshot: InventorySnapshot instance (or None to query the database)
+        """
+        self.inventory_snapshot = snapshot
+        self.scoring_service.set_inventory_snapshot(snapshot)
+
+    @contextmanager
+    def _inventory_scope(self) -> Iterator[InventorySnapshot]:
+        """
+        Provide an inventory snapshot for the duration of one request.
+
+        Reuses the attached snapshot (e.g. during an allocation run); otherwise
+        loads one, together with the compiled rule set, and detaches both
+        afterwards so later requests see fresh data.
+        """
+        if self.inventory_snapshot is not None:
+            yield self.inventory_snapshot
+            return
+
+        snapshot = InventorySnapshot.load(self.session)
+        self.set_inventory_snapshot(snapshot)
+        self.scoring_service.set_rule_set(get_compiled_rule_set(self.session))
+        try:
+            yield snapshot
+        finally:
+            self.set_inventory_snapshot(None)
+            self.scoring_service.set_rule_set(None)
+
     def allocate_demand(self, demanda_id: int, sala_id: int) -> AllocationResult:
         """
         Allocate a demand to a room.
@@ -112,6 +166,11 @@ class ManualAllocationService:
                 new_allocation = self.alocacao_repo.create(allocation_dto)
                 created_allocation_ids.append(new_allocation.id)
 
+            if self.occupancy_index is not None and self.occupancy_index.covers(
+                semester.id
+            ):
+                self.occupancy_index.mark_allocated(sala_id, atomic_blocks)
+
             return AllocationResult(
                 success=True,
                 demanda_id=demanda_id,
@@ -264,6 +323,11 @@ class ManualAllocationService:
                 created_allocation_ids.append(new_allocation.id)
                 allocated_blocks.append(f"{day_id}{block_code}")
 
+            if self.occupancy_index is not None and self.occupancy_index.covers(
+                semester.id
+            ):
+                self.occupancy_index.mark_allocated(sala_id, blocks_to_allocate)
+
             # Calculate remaining unallocated blocks
             now_allocated = already_allocated.union(set(blocks_to_allocate))
             remaining_blocks = [
@@ -407,6 +471,18 @@ class ManualAllocationService:
         Returns:
             List of room suggestions with per-day scoring, sorted by score descending.
         """
+        with self._inventory_scope():
+            return self._get_suggestions_for_block_group(
+                demanda_id, day_id, semester_id
+            )
+
+    def _get_suggestions_for_block_group(
+        self,
+        demanda_id: int,
+        day_id: int,
+        semester_id: int,
+    ) -> List[Dict]:
+        """Build block group suggestions (see get_suggestions_for_block_group)."""
         demanda = self.demanda_repo.get_by_id(demanda_id)
         if not demanda:
             return []
@@ -530,6 +606,68 @@ class ManualAllocationService:
             'allocated_rooms': allocated_rooms,
         }
 
+    def get_allocation_summaries(
+        self,
+        semester_id: int,
+        demandas: Optional[List] = None,
+        room_names: Optional[Dict[int, str]] = None,
+    ) -> Dict[int, Dict]:
+        """
+        Get the allocation summary of every demand of a semester at once.
+
+        Uses one grouped allocation query for the whole semester instead of
+        get_allocation_status_for_demand's per-demand lookups.
+
+        Args:
+            semester_id: Semester ID
+            demandas: Demands to summarize (default: all demands of the semester)
+            room_names: sala_id -> room name (default: loaded from the rooms table)
+
+        Returns:
+            Dict mapping demanda_id to:
+            {
+                'is_allocated': True,
+                'room_name': 'AT-01, AT-02',  # Comma-separated if multiple rooms
+                'room_names': ['AT-01', 'AT-02'],
+                'room_ids': [5, 7],
+                'is_split': True,  # Allocated to multiple rooms
+                'total_blocks': 4,
+                'allocated_blocks': 4,
+                'is_fully_allocated': True,
+            }
+        """
+        if demandas is None:
+            demandas = self.demanda_repo.get_by_semestre(semester_id)
+        if room_names is None:
+            room_names = {sala.id: sala.nome for sala in self.sala_repo.get_all()}
+
+        room_block_counts = self.alocacao_repo.get_room_block_counts_by_semestre(
+            semester_id, [demanda.id for demanda in demandas]
+        )
+
+        summaries = {}
+        for demanda in demandas:
+            rooms = room_block_counts.get(demanda.id, [])
+            room_ids = [sala_id for sala_id, _ in rooms]
+            names = [room_names.get(sala_id, f"Sala {sala_id}") for sala_id in room_ids]
+            total_blocks = len(
+                self.parser.split_to_atomic_tuples(demanda.horario_sigaa_bruto)
+            )
+            allocated_blocks = sum(count for _, count in rooms)
+
+            summaries[demanda.id] = {
+                "is_allocated": bool(rooms),
+                "room_name": ", ".join(names) if names else None,
+                "room_names": names,
+                "room_ids": room_ids,
+                "is_split": len(room_ids) > 1,
+                "total_blocks": total_blocks,
+                "allocated_blocks": allocated_blocks,
+                "is_fully_allocated": bool(rooms) and allocated_blocks >= total_blocks,
+            }
+
+        return summaries
+
     def _check_allocation_conflicts(
         self, sala_id: int, atomic_blocks: List[tuple], semester_id: int
     ) -> List[ConflictDetail]:
@@ -542,11 +680,24 @@ class ManualAllocationService:
         """
         conflicts = []
 
+        # Fast path: only slots flagged by the occupancy index need a detail lookup
+        use_index = self.occupancy_index is not None and self.occupancy_index.covers(
+            semester_id
+        )
+        occupied_slots = (
+            set(self.occupancy_index.conflicting_slots(sala_id, atomic_blocks))
+            if use_index
+            else None
+        )
+
         for bloco_codigo, dia_sigaa in atomic_blocks:
             # Check if there's already an allocation for this time slot in CURRENT semester
-            has_conflict = self.alocacao_repo.check_conflict(
-                sala_id, dia_sigaa, bloco_codigo, semestre_id=semester_id
-            )
+            if use_index:
+                has_conflict = (bloco_codigo, dia_sigaa) in occupied_slots
+            else:
+                has_conflict = self.alocacao_repo.check_conflict(
+                    sala_id, dia_sigaa, bloco_codigo, semestre_id=semester_id
+                )
 
             if has_conflict:
                 # Find the conflicting allocation for detailed error message
@@ -568,14 +719,9 @@ class ManualAllocationService:
 
     def get_allocation_progress(self, semester_id: int) -> dict:
         """Get allocation progress summary for a semester."""
-        # Get total demands for semester
-        demandas = self.demanda_repo.get_by_semestre(semester_id)
-        total_demands = len(demandas)
-
-        # Get allocated demands (demands that have at least one allocation)
-        allocations = self.alocacao_repo.get_by_semestre(semester_id)
-        allocated_demand_ids = set(alloc.demanda_id for alloc in allocations)
-        allocated_demands = len(allocated_demand_ids)
+        # Count total demands and demands with at least one allocation
+        total_demands = self.demanda_repo.count_by_semestre(semester_id)
+        allocated_demands = self.alocacao_repo.count_allocated_demandas(semester_id)
 
         # Calculate percentage
         allocation_percent = (
@@ -666,6 +812,13 @@ class ManualAllocationService:
                 deleted_allocation_ids.append(alloc.id)
                 deleted_count += 1
 
+                if self.occupancy_index is not None and self.occupancy_index.covers(
+                    alloc.semestre_id
+                ):
+                    self.occupancy_index.release(
+                        alloc.sala_id, [(alloc.codigo_bloco, alloc.dia_semana_id)]
+                    )
+
             return AllocationResult(
                 success=True,
                 demanda_id=demanda_id,
@@ -692,6 +845,13 @@ class ManualAllocationService:
         - Historical frequency bonus (RF-006.6)
         - Semester-isolated conflict detection
         """
+        with self._inventory_scope():
+            return self._get_suggestions_for_demand(demanda_id, semester_id)
+
+    def _get_suggestions_for_demand(
+        self, demanda_id: int, semester_id: int
+    ) -> AllocationSuggestions:
+        """Build demand suggestions (see get_suggestions_for_demand)."""
         # Use the shared advanced scoring service with professor override for consistency
         # Lookup professor information first to match autonomous allocation behavior
         professor_map = (
@@ -731,7 +891,7 @@ class ManualAllocationService:
                 and not candidate.scoring_breakdown.hard_rules_satisfied
             ):
                 # Get rules that were NOT satisfied
-                hard_rules = self.regra_repo.find_rules_by_disciplina(
+                hard_rules = self.scoring_service._find_rules_by_disciplina(
                     demanda.codigo_disciplina
                 )
                 hard_rules = [r for r in hard_rules if r.prioridade == 0]
@@ -878,6 +1038,8 @@ class ManualAllocationService:
         """Get building name by ID."""
         if not predio_id:
             return "N/A"
+        if self.inventory_snapshot is not None:
+            return self.inventory_snapshot.get_building_name(predio_id)
         # Use direct query since we need to access predios table
         stmt = text("SELECT nome FROM predios WHERE id = :pid")
         row = self.session.execute(stmt, {"pid": predio_id}).fetchone()
@@ -887,18 +1049,24 @@ class ManualAllocationService:
         """Get room type name by ID."""
         if not tipo_sala_id:
             return "N/A"
+        if self.inventory_snapshot is not None:
+            return self.inventory_snapshot.get_room_type_name(tipo_sala_id)
         stmt = text("SELECT nome FROM tipos_sala WHERE id = :tid")
         row = self.session.execute(stmt, {"tid": tipo_sala_id}).fetchone()
         return row[0] if row else "N/A"
 
     def _get_characteristic_name(self, caracteristica_id: int) -> str:
         """Get characteristic name by ID."""
+        if self.inventory_snapshot is not None:
+            return self.inventory_snapshot.get_characteristic_name(caracteristica_id)
         stmt = text("SELECT nome FROM caracteristicas WHERE id = :cid")
         row = self.session.execute(stmt, {"cid": caracteristica_id}).fetchone()
         return row[0] if row else ""
 
     def _get_room_characteristics(self, sala_id: int):
         """Get characteristic IDs for a room."""
+        if self.inventory_snapshot is not None:
+            return self.inventory_snapshot.get_room_characteristics(sala_id)
         stmt = text(
             "SELECT caracteristica_id FROM sala_caracteristicas WHERE sala_id = :sala_id"
         )
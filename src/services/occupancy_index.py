@@ -0,0 +1,261 @@
+"""
+Semester Occupancy Index - In-memory conflict detection for allocation runs.
+
+Loads every alocacoes_semestrais row of a semester once and keeps, for each
+room, a compact day×block bitmask. Conflict checks become bitwise ANDs on
+Python integers instead of one SQL round-trip per (room, day, block).
+
+Bit layout (one bit per atomic SIGAA slot, defined in utils.sigaa_parser so
+that ParsedSchedule.slot_mask can be used here directly):
+- 6 days (SIGAA 2=SEG ... 7=SAB)
+- 3 shifts (M, T, N) × 7 slots each = 21 slots per day
+- 6 × 21 = 126 bits, which fits in a 128-bit integer
+
+The index also keeps the per-room allocation counts used to break score
+ties in favour of busier rooms (the occupancy vector). They are loaded with
+two grouped queries, including the fallback to a room's latest earlier
+semester, instead of get_room_occupancy's query per room and semester.
+
+The index must be kept current by the code paths that write allocations
+(OptimizedAllocationRepository.create_batch_atomic and
+ManualAllocationService.allocate_demand call mark_allocated/release).
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.models.inventory import Sala
+from src.repositories.alocacao import AlocacaoRepository
+from src.repositories.optimized_allocation_repo import OptimizedAllocationRepository
+from src.utils.sigaa_parser import (
+    FIRST_DAY_ID,
+    SHIFT_ORDER,
+    SLOTS_PER_DAY,
+    SLOTS_PER_SHIFT,
+    slot_bit,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def slot_mask(atomic_tuples: Iterable[Tuple[str, int]]) -> int:
+    """
+    Build a slot bitmask from (block_code, day_id) tuples.
+
+    Args:
+        atomic_tuples: Iterable of (block_code, day_id) tuples
+
+    Returns:
+        Integer bitmask with one bit set per valid slot
+    """
+    mask = 0
+    for block_code, day_id in atomic_tuples:
+        bit = slot_bit(block_code, day_id)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def mask_to_tuples(mask: int) -> List[Tuple[str, int]]:
+    """
+    Expand a slot bitmask back into (block_code, day_id) tuples.
+
+    Args:
+        mask: Integer slot bitmask
+
+    Returns:
+        List of (block_code, day_id) tuples ordered by day, shift and slot
+    """
+    tuples = []
+    while mask:
+        low_bit = mask & -mask
+        bit = low_bit.bit_length() - 1
+        day_offset, in_day = divmod(bit, SLOTS_PER_DAY)
+        shift_idx, slot_idx = divmod(in_day, SLOTS_PER_SHIFT)
+        tuples.append(
+            (f"{SHIFT_ORDER[shift_idx]}{slot_idx + 1}", FIRST_DAY_ID + day_offset)
+        )
+        mask ^= low_bit
+    return tuples
+
+
+class SemesterOccupancyIndex:
+    """
+    Per-room slot bitmasks for a single semester.
+
+    Answers "is this room free for these slots?" for one room or for every
+    room at once, and is updated incrementally as allocations are written.
+    """
+
+    def __init__(
+        self,
+        semester_id: int,
+        room_masks: Optional[Dict[int, int]] = None,
+        room_counts: Optional[Dict[int, int]] = None,
+        previous_counts: Optional[Dict[int, int]] = None,
+    ):
+        """
+        Initialize index.
+
+        Args:
+            semester_id: Semester the bitmasks belong to
+            room_masks: Optional initial mapping of sala_id to slot bitmask
+            room_counts: Optional mapping of sala_id to allocation count
+            previous_counts: Optional mapping of sala_id to its allocation count
+                in the latest earlier semester where it had any
+        """
+        self.semester_id = semester_id
+        self._room_masks: Dict[int, int] = dict(room_masks or {})
+        self._room_counts: Dict[int, int] = dict(room_counts or {})
+        self._previous_counts: Dict[int, int] = dict(previous_counts or {})
+
+    @classmethod
+    def load(
+        cls,
+        session: Session,
+        semester_id: int,
+        room_ids: Optional[Iterable[int]] = None,
+    ) -> "SemesterOccupancyIndex":
+        """
+        Build the index for a semester.
+
+        Args:
+            session: SQLAlchemy session
+            semester_id: Semester to load
+            room_ids: Rooms to load occupancy counts for (default: all rooms)
+
+        Returns:
+            SemesterOccupancyIndex populated with current allocations
+        """
+        rows = AlocacaoRepository(session).get_occupied_slots_by_semestre(semester_id)
+
+        if room_ids is None:
+            room_ids = [sala_id for (sala_id,) in session.query(Sala.id)]
+        room_ids = list(room_ids)
+        batch_repo = OptimizedAllocationRepository(session)
+        room_counts = batch_repo.get_room_occupancy_batch(room_ids, semester_id)
+        previous_counts = batch_repo.get_previous_room_occupancy_batch(
+            room_ids, semester_id
+        )
+
+        room_masks: Dict[int, int] = {}
+        for sala_id, dia_semana_id, codigo_bloco in rows:
+            bit = slot_bit(codigo_bloco, dia_semana_id)
+            if bit is None:
+                continue
+            room_masks[sala_id] = room_masks.get(sala_id, 0) | (1 << bit)
+
+        logger.debug(
+            f"Loaded occupancy index for semester {semester_id}: "
+            f"{len(rows)} slots in {len(room_masks)} rooms"
+        )
+        return cls(semester_id, room_masks, room_counts, previous_counts)
+
+    def covers(self, semester_id: Optional[int]) -> bool:
+        """Check whether this index answers queries for the given semester."""
+        return semester_id is not None and semester_id == self.semester_id
+
+    def room_mask(self, sala_id: int) -> int:
+        """Get the occupied-slot bitmask of a room (0 if empty)."""
+        return self._room_masks.get(sala_id, 0)
+
+    def occupancy(self, sala_id: int) -> int:
+        """
+        Get a room's allocation count, as utils.room_utils.get_room_occupancy.
+
+        Falls back to the count of the latest earlier semester in which the
+        room had allocations when it is still empty in this semester.
+        """
+        count = self._room_counts.get(sala_id, 0)
+        if count > 0:
+            return count
+        return self._previous_counts.get(sala_id, 0)
+
+    def occupancy_vector(self, room_ids: Iterable[int]) -> Dict[int, int]:
+        """Get occupancy (see occupancy) for several rooms."""
+        return {sala_id: self.occupancy(sala_id) for sala_id in room_ids}
+
+    def has_conflict(self, sala_id: int, mask: int) -> bool:
+        """
+        Check whether any slot of the mask is already taken in the room.
+
+        Args:
+            sala_id: Room ID
+            mask: Slot bitmask to test
+
+        Returns:
+            True if at least one slot is occupied
+        """
+        return bool(self._room_masks.get(sala_id, 0) & mask)
+
+    def conflicting_slots(
+        self, sala_id: int, atomic_tuples: Iterable[Tuple[str, int]]
+    ) -> List[Tuple[str, int]]:
+        """
+        Get which (block_code, day_id) slots are already taken in a room.
+
+        Args:
+            sala_id: Room ID
+            atomic_tuples: Slots to test
+
+        Returns:
+            List of occupied (block_code, day_id) tuples, in input order
+        """
+        occupied = self._room_masks.get(sala_id, 0)
+        if not occupied:
+            return []
+
+        conflicts = []
+        for block_code, day_id in atomic_tuples:
+            bit = slot_bit(block_code, day_id)
+            if bit is not None and occupied & (1 << bit):
+                conflicts.append((block_code, day_id))
+        return conflicts
+
+    def conflicting_rooms(self, mask: int) -> Set[int]:
+        """
+        Get every room where at least one slot of the mask is taken.
+
+        Args:
+            mask: Slot bitmask to test
+
+        Returns:
+            Set of conflicting room IDs (rooms absent from the set are free)
+        """
+        if not mask:
+            return set()
+        return {
+            sala_id
+            for sala_id, occupied in self._room_masks.items()
+            if occupied & mask
+        }
+
+    def mark_allocated(
+        self, sala_id: int, atomic_tuples: Iterable[Tuple[str, int]]
+    ) -> None:
+        """Record newly written allocation slots for a room."""
+        atomic_tuples = list(atomic_tuples)
+        self._room_counts[sala_id] = self._room_counts.get(sala_id, 0) + len(
+            atomic_tuples
+        )
+        mask = slot_mask(atomic_tuples)
+        if mask:
+            self._room_masks[sala_id] = self._room_masks.get(sala_id, 0) | mask
+
+    def release(self, sala_id: int, atomic_tuples: Iterable[Tuple[str, int]]) -> None:
+        """Clear slots of a room after its allocations were deleted."""
+        atomic_tuples = list(atomic_tuples)
+        self._room_counts[sala_id] = max(
+            0, self._room_counts.get(sala_id, 0) - len(atomic_tuples)
+        )
+        mask = slot_mask(atomic_tuples)
+        if not mask or sala_id not in self._room_masks:
+            return
+
+        remaining = self._room_masks[sala_id] & ~mask
+        if remaining:
+            self._room_masks[sala_id] = remaining
+        else:
+            del self._room_masks[sala_id]
@@ -7,13 +7,19 @@ Supports both full allocation (all blocks to one room) and partial allocation
 
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from src.config.settings import Settings
 from src.repositories.optimized_allocation_repo import OptimizedAllocationRepository
 from src.schemas.allocation import AlocacaoSemestralCreate
+from src.services.allocation_solver import (
+    SOLVER_CPSAT,
+    AllocationSolver,
+    SolverResult,
+)
+from src.services.allocation_write_buffer import AllocationWriteBuffer
 from src.services.autonomous_allocation_report_service import (
     AutonomousAllocationReportService,
 )
@@ -26,11 +32,35 @@ from src.services.hybrid_discipline_service import (
     HybridDisciplineDetectionService,
     HybridDetectionResult,
 )
+from src.services.historical_frequency_index import HistoricalFrequencyIndex
+from src.services.inventory_snapshot import InventorySnapshot
+from src.services.professor_name_index import (
+    ProfessorNameIndex,
+    get_professor_name_index,
+)
+from src.services.professor_preference_index import ProfessorPreferenceIndex
+from src.services.rule_index import CompiledRuleSet
+from src.services.occupancy_index import SemesterOccupancyIndex
+from src.services.vectorized_scoring_engine import (
+    RoomColumns,
+    VectorizedScoringEngine,
+)
 from src.utils.allocation_debug_report import AllocationDebugReport
 from src.utils.allocation_logger import AllocationDecisionLogger
 
 logger = logging.getLogger(__name__)
 
+# Phase names passed to the progress callback
+PHASE_HYBRID_DETECTION = "hybrid_detection"
+PHASE_HARD_RULES = "hard_rules"
+PHASE_SOFT_SCORING = "soft_scoring"
+PHASE_ATOMIC_ALLOCATION = "atomic_allocation"
+PHASE_PARTIAL_ALLOCATION = "partial_allocation"
+
+
+class AllocationCancelledError(Exception):
+    """Raised between demands when the cancel check asks the run to stop."""
+
 
 @dataclass
 class BlockGroupCandidate:
@@ -85,6 +115,258 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
         # Hybrid discipline detection service (Phase 0)
         self.hybrid_detection_service = HybridDisciplineDetectionService(session)
 
+        # In-memory occupancy index for the semester being allocated
+        self.occupancy_index: Optional[SemesterOccupancyIndex] = None
+
+        # Precomputed historical frequency counts (current semester excluded)
+        self.historical_frequency_index: Optional[HistoricalFrequencyIndex] = None
+
+        # Rules compiled once per run
+        self.rule_set: Optional[CompiledRuleSet] = None
+
+        # Professor room/characteristic preferences loaded once per run
+        self.preference_index: Optional[ProfessorPreferenceIndex] = None
+
+        # Allocation rows staged during a run, flushed at the end of each phase
+        self.write_buffer: Optional[AllocationWriteBuffer] = None
+
+        # Optional hooks used by background jobs (see allocation_job_service)
+        self.progress_callback: Optional[Callable[[str, int, int], None]] = None
+        self.cancel_check: Optional[Callable[[], bool]] = None
+
+        # Global assignment for the atomic phase (None keeps the greedy order)
+        settings = Settings()
+        self.allocation_solver: Optional[AllocationSolver] = None
+        if settings.ALLOCATION_SOLVER == SOLVER_CPSAT:
+            self.allocation_solver = AllocationSolver(
+                time_limit_seconds=settings.ALLOCATION_SOLVER_TIME_LIMIT,
+                max_candidates_per_demand=settings.ALLOCATION_SOLVER_MAX_CANDIDATES,
+            )
+        self.last_solver_result: Optional[SolverResult] = None
+
+    def set_progress_callback(
+        self, callback: Optional[Callable[[str, int, int], None]]
+    ) -> None:
+        """
+        Set a callback receiving (phase, done, total) as demands are processed.
+
+        Args:
+            callback: Progress callback, or None to disable
+        """
+        self.progress_callback = callback
+
+    def set_cancel_check(self, check: Optional[Callable[[], bool]]) -> None:
+        """
+        Set a predicate polled between demands; returning True cancels the run.
+
+        Allocations of phases that already finished stay committed; rows staged
+        by the interrupted phase are discarded.
+
+        Args:
+            check: Cancellation predicate, or None to disable
+        """
+        self.cancel_check = check
+
+    def set_allocation_solver(self, solver: Optional[AllocationSolver]) -> None:
+        """
+        Set the solver planning the atomic phase (overrides ALLOCATION_SOLVER).
+
+        Args:
+            solver: AllocationSolver, or None for the greedy order
+        """
+        self.allocation_solver = solver
+
+    def _report_progress(self, phase: str, done: int, total: int) -> None:
+        """
+        Report progress and honour cancellation requests.
+
+        Raises:
+            AllocationCancelledError: If the cancel check returns True
+        """
+        if self.progress_callback is not None:
+            self.progress_callback(phase, done, total)
+        if self.cancel_check is not None and self.cancel_check():
+            if self.write_buffer is not None:
+                self.write_buffer.clear()
+            raise AllocationCancelledError(
+                f"Allocation cancelled during {phase} ({done}/{total})"
+            )
+
+    def _load_run_indexes(self, semester_id: int) -> None:
+        """
+        Load the in-memory indexes used throughout an allocation run.
+
+        Args:
+            semester_id: Semester being allocated
+        """
+        self._attach_inventory_snapshot()
+        self._attach_rule_set()
+        self._attach_professor_index()
+        self._attach_preference_index()
+        self._attach_occupancy_index(semester_id)
+        self._attach_write_buffer()
+        self._attach_historical_frequency_index(semester_id)
+        self._attach_vectorized_scoring()
+
+    def _attach_inventory_snapshot(self) -> InventorySnapshot:
+        """
+        Load room reference data once and share it with every scorer.
+
+        Returns:
+            The loaded InventorySnapshot
+        """
+        self.inventory_snapshot = InventorySnapshot.load(self.session)
+        self.scoring_service.set_inventory_snapshot(self.inventory_snapshot)
+        self.manual_service.set_inventory_snapshot(self.inventory_snapshot)
+        return self.inventory_snapshot
+
+    def _attach_rule_set(self) -> CompiledRuleSet:
+        """
+        Compile all rules once and share them with both scoring services.
+
+        Returns:
+            The loaded CompiledRuleSet
+        """
+        self.rule_set = CompiledRuleSet.load(self.session)
+        self.scoring_service.set_rule_set(self.rule_set)
+        self.manual_service.scoring_service.set_rule_set(self.rule_set)
+        return self.rule_set
+
+    def _attach_professor_index(self) -> ProfessorNameIndex:
+        """
+        Resolve demand professors from one name index for the whole run.
+
+        Returns:
+            The shared ProfessorNameIndex
+        """
+        professor_index = get_professor_name_index(self.session)
+        self.scoring_service.set_professor_index(professor_index)
+        self.manual_service.scoring_service.set_professor_index(professor_index)
+        return professor_index
+
+    def _attach_preference_index(self) -> ProfessorPreferenceIndex:
+        """
+        Load every professor's preferences once and share them with both scorers.
+
+        Returns:
+            The loaded ProfessorPreferenceIndex
+        """
+        self.preference_index = ProfessorPreferenceIndex.load(self.session)
+        self.scoring_service.set_preference_index(self.preference_index)
+        self.manual_service.scoring_service.set_preference_index(self.preference_index)
+        return self.preference_index
+
+    def _attach_occupancy_index(self, semester_id: int) -> SemesterOccupancyIndex:
+        """
+        Load the semester occupancy index and share it with all conflict checkers.
+
+        The same index instance is used by the scoring service, the manual
+        allocation service and the batch repository, which updates it on every
+        write, so the run never queries the database for conflict detection.
+
+        Args:
+            semester_id: Semester being allocated
+
+        Returns:
+            The loaded SemesterOccupancyIndex
+        """
+        self.occupancy_index = SemesterOccupancyIndex.load(
+            self.session,
+            semester_id,
+            room_ids=[room.id for room in self.inventory_snapshot.rooms],
+        )
+        self.optimized_alocacao_repo.attach_occupancy_index(self.occupancy_index)
+        self.manual_service.set_occupancy_index(self.occupancy_index)
+        self.scoring_service.set_occupancy_index(self.occupancy_index)
+        return self.occupancy_index
+
+    def _attach_write_buffer(self) -> AllocationWriteBuffer:
+        """
+        Start an empty allocation write buffer backed by the occupancy index.
+
+        Returns:
+            The new AllocationWriteBuffer
+        """
+        self.write_buffer = AllocationWriteBuffer(
+            self.optimized_alocacao_repo, self.occupancy_index
+        )
+        return self.write_buffer
+
+    def _flush_allocations(self) -> int:
+        """
+        Write the allocations staged by a phase in one transaction.
+
+        Dry runs skip the flush: staged rows stay in memory only, so later
+        phases still see them as occupied.
+
+        Returns:
+            Number of rows written
+        """
+        if self.write_buffer is None:
+            return 0
+        return self.write_buffer.flush()
+
+    def _write_allocations(self, allocation_dtos: List[AlocacaoSemestralCreate]) -> bool:
+        """
+        Stage allocation rows in the run's write buffer.
+
+        Outside a run (no buffer) the rows are written immediately.
+
+        Returns:
+            True if the rows were staged or written
+        """
+        if self.write_buffer is not None:
+            return self.write_buffer.stage(allocation_dtos)
+        self.optimized_alocacao_repo.create_batch_atomic(allocation_dtos)
+        return True
+
+    def _attach_historical_frequency_index(
+        self, semester_id: int
+    ) -> HistoricalFrequencyIndex:
+        """
+        Load historical frequency counts once and share them with the scorers.
+
+        Allocations of the semester being allocated are excluded, so the counts
+        do not change while the run writes new allocations.
+
+        Args:
+            semester_id: Semester being allocated
+
+        Returns:
+            The loaded HistoricalFrequencyIndex
+        """
+        self.historical_frequency_index = HistoricalFrequencyIndex.load(
+            self.session, semester_id
+        )
+        self.scoring_service.set_historical_frequency_index(
+            self.historical_frequency_index
+        )
+        self.manual_service.scoring_service.set_historical_frequency_index(
+            self.historical_frequency_index
+        )
+        return self.historical_frequency_index
+
+    def _attach_vectorized_scoring(self) -> RoomColumns:
+        """
+        Switch both scoring services to the vectorized engine.
+
+        Room columns are built once from the run's inventory snapshot and
+        shared; each scoring service gets its own engine so it keeps using its
+        own hybrid and frequency sources.
+
+        Returns:
+            The shared RoomColumns
+        """
+        columns = RoomColumns.from_snapshot(self.inventory_snapshot)
+        for scoring_service in (
+            self.scoring_service,
+            self.manual_service.scoring_service,
+        ):
+            scoring_service.set_vectorized_engine(
+                VectorizedScoringEngine(scoring_service, columns)
+            )
+        return columns
+
     # =========================================================================
     # PARTIAL ALLOCATION METHODS (Block-Group Level Scoring & Allocation)
     # =========================================================================
@@ -156,7 +438,7 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
         )
 
         # Get all rooms to map room_id to room objects
-        all_rooms = self.sala_repo.get_all()
+        all_rooms = self._get_all_rooms()
         room_dict = {room.id: room for room in all_rooms}
 
         candidates = []
@@ -213,9 +495,8 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                 )
                 allocation_dtos.append(allocation_dto)
 
-            created_allocations = self.optimized_alocacao_repo.create_batch_atomic(
-                allocation_dtos
-            )
+            if not self._write_allocations(allocation_dtos):
+                return False
 
             logger.debug(
                 f"Allocated block group {candidate.day_name} ({len(candidate.blocks)} blocks) "
@@ -259,7 +540,8 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
 
         logger.info(f"Executing partial allocation phase for {len(demands)} demands")
 
-        for demanda in demands:
+        for position, demanda in enumerate(demands):
+            self._report_progress(PHASE_PARTIAL_ALLOCATION, position, len(demands))
             demanda_id = demanda.id
             professor = professor_map.get(demanda_id)
 
@@ -328,27 +610,9 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                     if has_conflicts:
                         continue
 
-                    # Allocate this block group
-                    if not dry_run:
-                        success = self._allocate_block_group(candidate, semester_id)
-                        if success:
-                            result.allocations_completed += 1
-                            allocated = True
-                            block_group_results.append(
-                                BlockGroupAllocationResult(
-                                    demanda_id=demanda_id,
-                                    day_id=candidate.day_id,
-                                    day_name=candidate.day_name,
-                                    blocks=[b[0] for b in candidate.blocks],
-                                    allocated=True,
-                                    sala_id=candidate.sala.id,
-                                    sala_nome=candidate.sala.nome,
-                                    score=candidate.score,
-                                )
-                            )
-                            break
-                    else:
-                        # Dry run - count as successful
+                    # Allocate this block group (staged; dry runs never flush)
+                    success = self._allocate_block_group(candidate, semester_id)
+                    if success:
                         result.allocations_completed += 1
                         allocated = True
                         block_group_results.append(
@@ -388,6 +652,7 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                         )
                     )
 
+        self._report_progress(PHASE_PARTIAL_ALLOCATION, len(demands), len(demands))
         result.total_demands_processed = len(demands)
         return result, block_group_results
 
@@ -420,6 +685,9 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
         self.decision_logger = AllocationDecisionLogger()
 
         try:
+            # Load occupancy bitmaps and historical counts once per run
+            self._load_run_indexes(semester_id)
+
             # Get unallocated demands
             unallocated_demands = self.manual_service.get_unallocated_demands(
                 semester_id
@@ -428,7 +696,9 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
 
             # Phase 0: Hybrid Discipline Detection (NEW!)
             logger.info("=== PHASE 0: Hybrid Discipline Detection ===")
+            self._report_progress(PHASE_HYBRID_DETECTION, 0, 1)
             phase0_result = self._execute_hybrid_detection_phase(semester_id)
+            self._report_progress(PHASE_HYBRID_DETECTION, 1, 1)
             logger.info(f"Detected {phase0_result.detected_count} hybrid disciplines")
 
             # Phase 1: Hard Rules (unchanged - allocates all blocks to one room)
@@ -439,7 +709,7 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
             self.decision_logger.log_phase_summary("hard_rules", phase1_result.__dict__)
 
             if not dry_run:
-                self.session.commit()
+                self._flush_allocations()
                 logger.info("Phase 1 allocations committed")
 
             # Get remaining demands after Phase 1
@@ -456,7 +726,7 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
             )
 
             if not dry_run:
-                self.session.commit()
+                self._flush_allocations()
                 logger.info("Partial allocation phase committed")
 
             # Compile results
@@ -536,6 +806,11 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
 
             return final_result
 
+        except AllocationCancelledError as e:
+            logger.info(str(e))
+            self.session.rollback()
+            raise
+
         except Exception as e:
             logger.error(f"Partial autonomous allocation failed: {e}")
             self.session.rollback()
@@ -701,6 +976,9 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
             )
 
         try:
+            # Load occupancy bitmaps and historical counts once per run
+            self._load_run_indexes(semester_id)
+
             # Get unallocated demands
             unallocated_demands = self.manual_service.get_unallocated_demands(
                 semester_id
@@ -715,9 +993,11 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                     "Detect hybrid disciplines from historical allocations",
                 )
 
+            self._report_progress(PHASE_HYBRID_DETECTION, 0, 1)
             phase0_result = self._execute_hybrid_detection_phase(
                 semester_id, debug_report
             )
+            self._report_progress(PHASE_HYBRID_DETECTION, 1, 1)
 
             if debug_report:
                 debug_report.log_phase_end(
@@ -761,7 +1041,7 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
 
             # ✅ Commit Phase 1 allocations to ensure fresh conflict checks in Phase 3
             if not dry_run:
-                self.session.commit()
+                self._flush_allocations()
                 logger.info("Phase 1 allocations committed to database")
 
             # Get remaining demands - REFRESH after phase 1 allocations
@@ -828,7 +1108,7 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
 
             # ✅ Commit Phase 3 allocations
             if not dry_run:
-                self.session.commit()
+                self._flush_allocations()
                 logger.info("Phase 3 allocations committed to database")
 
             # Compile final results - count only new allocations made in this session
@@ -860,6 +1140,9 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                 phase1_result, phase2_result, phase3_result, semester_id
             )
 
+            if self.last_solver_result is not None:
+                final_result["solver"] = self.last_solver_result.to_dict()
+
             # Override with CORRECT new allocation count (not total semester allocations)
             final_result["allocations_completed"] = total_newly_allocated
             final_result["total_demands_processed"] = len(unallocated_demands)
@@ -882,6 +1165,10 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                 allocation_decisions=allocation_decisions,
                 semester_name=semester_name,
                 execution_time=execution_time,
+                include_detailed_decisions=settings.REPORT_INCLUDE_DETAILED_DECISIONS,
+            )
+            final_result["report_timings"] = dict(
+                self.report_service.last_section_timings
             )
 
             # Add PDF to results
@@ -896,6 +1183,11 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
 
             return final_result
 
+        except AllocationCancelledError as e:
+            logger.info(str(e))
+            self.session.rollback()
+            raise
+
         except Exception as e:
             logger.error(f"Optimized autonomous allocation failed: {e}")
             self.session.rollback()
@@ -911,14 +1203,14 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
         discipline_codes = [d.codigo_disciplina for d in demands]
         all_hard_rules = {}
         for code in discipline_codes:
-            rules = self.regra_repo.find_rules_by_disciplina(code)
+            rules = self._find_rules_by_disciplina(code)
             all_hard_rules[code] = [r for r in rules if r.prioridade == 0]
 
         # Batch: Get professor information for all demands
         professor_map = self._lookup_professors_for_demands_from_objects(demands)
 
         # Batch: Get all rooms
-        all_rooms = self.sala_repo.get_all()
+        all_rooms = self._get_all_rooms()
 
         # Process demands with hard rules
         demands_with_hard_rules = [
@@ -929,17 +1221,21 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
             f"Processing {len(demands_with_hard_rules)} demands with hard rules"
         )
 
-        for demanda in demands_with_hard_rules:
+        for position, demanda in enumerate(demands_with_hard_rules):
+            self._report_progress(
+                PHASE_HARD_RULES, position, len(demands_with_hard_rules)
+            )
             demanda_id = demanda.id
             hard_rules = all_hard_rules[demanda.codigo_disciplina]
             professor = professor_map.get(demanda_id)
+            # Parsed once per demand (results are cached by the parser)
+            atomic_blocks = self.parser.split_to_atomic_tuples(
+                demanda.horario_sigaa_bruto
+            )
 
             # Debug report: Log demand start
             if debug_report:
                 block_groups = []
-                atomic_blocks = self.parser.split_to_atomic_tuples(
-                    demanda.horario_sigaa_bruto
-                )
                 day_blocks = {}
                 day_names = {2: "SEG", 3: "TER", 4: "QUA", 5: "QUI", 6: "SEX", 7: "SAB"}
                 for bloco, dia in atomic_blocks:
@@ -985,11 +1281,6 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                     suitable_rooms.append(room)
 
             if suitable_rooms:
-                # Get the demand's actual time blocks (not all possible slots)
-                atomic_blocks = self.parser.split_to_atomic_tuples(
-                    demanda.horario_sigaa_bruto
-                )
-
                 # Build room-time slots ONLY for this demand's actual blocks
                 room_time_slots = []
                 for room in suitable_rooms:
@@ -1024,9 +1315,6 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                         6: "SEX",
                         7: "SAB",
                     }
-                    atomic_blocks = self.parser.split_to_atomic_tuples(
-                        demanda.horario_sigaa_bruto
-                    )
                     all_blocks = [b[0] for b in atomic_blocks]
                     debug_report.log_allocation_decision(
                         day_name="ALL DAYS",
@@ -1044,24 +1332,22 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                         is_split=False,
                     )
 
-                # Perform allocation
-                if not dry_run:
-                    success = self._allocate_atomic_blocks_optimized(
-                        AllocationCandidate(
-                            sala=allocated_room,
-                            demanda_id=demanda_id,
-                            score=100,  # Maximum priority for hard rules
-                            professor_name=demanda.professores_disciplina,
-                            professor_id=professor.id if professor else None,
-                            atomic_blocks=self.parser.split_to_atomic_tuples(
-                                demanda.horario_sigaa_bruto
-                            ),
-                        ),
-                        semester_id,
-                    )
-                    if success:
-                        result.allocations_completed += 1
+                # Perform allocation (staged; dry runs never flush)
+                success = self._allocate_atomic_blocks_optimized(
+                    AllocationCandidate(
+                        sala=allocated_room,
+                        demanda_id=demanda_id,
+                        score=100,  # Maximum priority for hard rules
+                        professor_name=demanda.professores_disciplina,
+                        professor_id=professor.id if professor else None,
+                        atomic_blocks=list(atomic_blocks),
+                    ),
+                    semester_id,
+                )
+                if success:
+                    result.allocations_completed += 1
 
+                if not dry_run:
                     # Log decision
                     self.decision_logger.log_allocation_attempt(
                         semester_id=semester_id,
@@ -1087,9 +1373,6 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                         f"Allocated {demanda.codigo_disciplina} to {allocated_room.nome} via hard rules"
                     )
                 else:
-                    # Dry run - just count as successful
-                    result.allocations_completed += 1
-
                     # Log decision
                     self.decision_logger.log_allocation_attempt(
                         semester_id=semester_id,
@@ -1125,6 +1408,11 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                     skipped_reason="No rooms satisfy hard rules",
                 )
 
+        self._report_progress(
+            PHASE_HARD_RULES,
+            len(demands_with_hard_rules),
+            len(demands_with_hard_rules),
+        )
         result.total_demands_processed = len(demands_with_hard_rules)
         result.success_rate = (
             result.allocations_completed / len(demands_with_hard_rules)
@@ -1146,7 +1434,8 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
 
         logger.info(f"Scoring {len(demands)} demands with advanced algorithm")
 
-        for demanda in demands:
+        for position, demanda in enumerate(demands):
+            self._report_progress(PHASE_SOFT_SCORING, position, len(demands))
             demanda_id = demanda.id
 
             # Debug report: Log demand start
@@ -1182,7 +1471,7 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                 )
 
                 # Log soft rules if any
-                soft_rules = self.regra_repo.find_rules_by_disciplina(
+                soft_rules = self._find_rules_by_disciplina(
                     demanda.codigo_disciplina
                 )
                 soft_rules = [r for r in soft_rules if r.prioridade > 0]
@@ -1320,6 +1609,7 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                     decision_reason=f"Scored {len(valid_candidates)} valid candidates, top score: {valid_candidates[0].score if valid_candidates else 0}",
                 )
 
+        self._report_progress(PHASE_SOFT_SCORING, len(demands), len(demands))
         result.candidates = phase2_candidates
         result.total_demands_processed = len(demands)
         result.success_rate = len(phase2_candidates) / len(demands) if demands else 0
@@ -1361,9 +1651,26 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
             f"Attempting atomic allocation for {len(sorted_demand_ids)} scored demands"
         )
 
+        # Optional global assignment: its rooms are tried first, the greedy
+        # loop below then places them and retries everything it left out
+        solver_choices: Dict[int, AllocationCandidate] = {}
+        self.last_solver_result = None
+        if self.allocation_solver is not None and sorted_demand_ids:
+            # Report (heartbeat) before the time-limited solve; the loop
+            # below reports again as soon as it returns
+            self._report_progress(
+                PHASE_ATOMIC_ALLOCATION, 0, len(sorted_demand_ids)
+            )
+            solver_choices, sorted_demand_ids = self._plan_with_solver(
+                demands_with_candidates, sorted_demand_ids
+            )
+
         allocation_attempts = []
 
-        for demanda_id in sorted_demand_ids:
+        for position, demanda_id in enumerate(sorted_demand_ids):
+            self._report_progress(
+                PHASE_ATOMIC_ALLOCATION, position, len(sorted_demand_ids)
+            )
             # Get demand details for logging
             demanda = self.demanda_repo.get_by_id(demanda_id)
             if not demanda:
@@ -1388,7 +1695,11 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
             # ✅ CRITICAL FIX: Try ALL candidates for this demand until one succeeds
             # Original version tries multiple candidates; optimized was only trying 1
             candidates_tried = []
-            for candidate_idx, candidate in enumerate(candidates):
+            ranked_candidates = list(enumerate(candidates))
+            chosen = solver_choices.get(demanda_id)
+            if chosen is not None:
+                ranked_candidates.sort(key=lambda ranked: ranked[1] is not chosen)
+            for candidate_idx, candidate in ranked_candidates:
                 # Build slots for this specific candidate
                 slots = [
                     (candidate.sala.id, dia_sigaa, bloco_codigo)
@@ -1421,50 +1732,40 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                     )
                     continue
 
-                # No conflicts - try to allocate
-                if not dry_run:
-                    success = self._allocate_atomic_blocks_optimized(
-                        candidate, semester_id
-                    )
-                    if success:
-                        result.allocations_completed += 1
-                        allocation_attempts.append((demanda, candidate, True, None))
-                        allocation_success = True
-                        candidates_tried.append(
-                            {
-                                "room": candidate.sala.nome,
-                                "score": candidate.score,
-                                "result": "ALLOCATED",
-                                "reason": f"Successfully allocated (rank #{candidate_idx + 1})",
-                            }
-                        )
-                        logger.debug(
-                            f"Successfully allocated {demanda.codigo_disciplina} to room {candidate.sala.nome} (score: {candidate.score})"
-                        )
-                        break  # Success - move to next demand
-                    else:
-                        # Allocation failed - try next candidate
-                        candidates_tried.append(
-                            {
-                                "room": candidate.sala.nome,
-                                "score": candidate.score,
-                                "result": "DB_ERROR",
-                                "reason": "Database allocation failed",
-                            }
-                        )
-                        logger.debug(
-                            f"Allocation failed for {candidate.sala.nome}, trying next candidate..."
-                        )
-                        continue
-                else:
-                    # Dry run - just count as successful (no DB operations)
+                # No conflicts - try to allocate (staged; dry runs never flush)
+                success = self._allocate_atomic_blocks_optimized(
+                    candidate, semester_id
+                )
+                if success:
                     result.allocations_completed += 1
                     allocation_attempts.append((demanda, candidate, True, None))
                     allocation_success = True
+                    candidates_tried.append(
+                        {
+                            "room": candidate.sala.nome,
+                            "score": candidate.score,
+                            "result": "ALLOCATED",
+                            "reason": f"Successfully allocated (rank #{candidate_idx + 1})",
+                        }
+                    )
+                    logger.debug(
+                        f"Successfully allocated {demanda.codigo_disciplina} to room {candidate.sala.nome} (score: {candidate.score})"
+                    )
+                    break  # Success - move to next demand
+                else:
+                    # Allocation failed - try next candidate
+                    candidates_tried.append(
+                        {
+                            "room": candidate.sala.nome,
+                            "score": candidate.score,
+                            "result": "DB_ERROR",
+                            "reason": "Database allocation failed",
+                        }
+                    )
                     logger.debug(
-                        f"[DRY RUN] Would allocate {demanda.codigo_disciplina} to room {candidate.sala.nome}"
+                        f"Allocation failed for {candidate.sala.nome}, trying next candidate..."
                     )
-                    break
+                    continue
 
             # If no candidates worked, record the failure
             if not allocation_success:
@@ -1507,6 +1808,9 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                     skipped_reason=failure_reason,
                 )
 
+        self._report_progress(
+            PHASE_ATOMIC_ALLOCATION, len(sorted_demand_ids), len(sorted_demand_ids)
+        )
         result.total_demands_processed = len(sorted_demand_ids)
         result.success_rate = (
             result.allocations_completed / len(sorted_demand_ids)
@@ -1516,13 +1820,44 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
 
         return result
 
+    def _plan_with_solver(
+        self,
+        demands_with_candidates: Dict[int, List[AllocationCandidate]],
+        sorted_demand_ids: List[int],
+    ) -> Tuple[Dict[int, AllocationCandidate], List[int]]:
+        """
+        Plan the atomic phase with the global assignment solver.
+
+        Args:
+            demands_with_candidates: demanda_id -> candidates sorted by score
+            sorted_demand_ids: Demand IDs in greedy order
+
+        Returns:
+            (demanda_id -> room chosen by the solver, demand order with the
+            solver-assigned demands first); no choices and the greedy order
+            when the solver is unavailable or found nothing better
+        """
+        result = self.allocation_solver.solve(
+            demands_with_candidates, sorted_demand_ids
+        )
+        self.last_solver_result = result
+        if not result.used_solver:
+            return {}, sorted_demand_ids
+
+        # The assigned demands never conflict with each other, so placing
+        # them first lets each one take its solver room
+        ordered = [d for d in sorted_demand_ids if d in result.choices] + [
+            d for d in sorted_demand_ids if d not in result.choices
+        ]
+        return result.choices, ordered
+
     def _allocate_atomic_blocks_optimized(
         self, candidate: AllocationCandidate, semester_id: int
     ) -> bool:
         """
         Optimized atomic block allocation using batch operations.
 
-        Creates all allocation records in a single transaction.
+        Stages all allocation records of the demand in the run's write buffer.
         """
         try:
             # Prepare all allocation DTOs
@@ -1537,13 +1872,12 @@ class OptimizedAutonomousAllocationService(AutonomousAllocationService):
                 )
                 allocation_dtos.append(allocation_dto)
 
-            # Batch create all allocations in a single transaction
-            created_allocations = self.optimized_alocacao_repo.create_batch_atomic(
-                allocation_dtos
-            )
+            # Stage all allocations (written in one bulk insert per phase)
+            if not self._write_allocations(allocation_dtos):
+                return False
 
             logger.debug(
-                f"Batch allocated {len(created_allocations)} blocks for demand {candidate.demanda_id} to room {candidate.sala.id}"
+                f"Batch allocated {len(allocation_dtos)} blocks for demand {candidate.demanda_id} to room {candidate.sala.id}"
             )
             return True
 
@@ -4,9 +4,11 @@ PDF Report Generation Service
 Creates formatted PDF reports for room allocation schedules.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, BinaryIO, Iterable, Iterator, Optional, Union
 from datetime import datetime
 import io
+import os
+import tempfile
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -26,6 +28,27 @@ from reportlab.pdfbase.ttfonts import TTFont
 from src.utils.cache_helpers import get_sigaa_parser
 
 
+class _StreamingStory(list):
+    """
+    Story that pulls the next chunk of flowables when it runs empty.
+
+    SimpleDocTemplate.build consumes the story from the front and checks
+    len() before each flowable, so only the chunk being laid out is alive.
+    """
+
+    def __init__(self, chunks: Iterator[List[Any]]):
+        super().__init__()
+        self._chunks = chunks
+
+    def __len__(self) -> int:
+        while not super().__len__():
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self.extend(chunk)
+        return super().__len__()
+
+
 class PDFReportService:
     """Service for generating PDF reports of room allocations."""
 
@@ -132,6 +155,9 @@ class PDFReportService:
         """
         Generate PDF report for room allocations.
 
+        Holds the whole PDF in memory; large exports should use
+        export_allocation_report, which writes to a temporary file.
+
         Args:
             room_allocations: Dictionary mapping room_id to allocation data
             semester_name: Name of the semester (e.g., "2025-1")
@@ -141,7 +167,73 @@ class PDFReportService:
             bytes: PDF file content
         """
         buffer = io.BytesIO()
+        self.write_allocation_report(
+            buffer, room_allocations, semester_name, selected_room_id, portrait_mode
+        )
+
+        # Get PDF content
+        pdf_content = buffer.getvalue()
+        buffer.close()
+
+        return pdf_content
 
+    def export_allocation_report(
+        self,
+        room_allocations: Dict[int, Dict[str, Any]],
+        semester_name: str,
+        selected_room_id: Optional[int] = None,
+        portrait_mode: bool = False,
+        directory: Optional[str] = None,
+    ) -> str:
+        """
+        Write the PDF report to a temporary file.
+
+        The caller owns the file: serve it (e.g. open(path, "rb")) and
+        remove it afterwards.
+
+        Args:
+            room_allocations: Dictionary mapping room_id to allocation data
+            semester_name: Name of the semester (e.g., "2025-1")
+            selected_room_id: If provided, generate report only for this room
+            portrait_mode: Portrait A4 instead of landscape
+            directory: Directory of the temporary file (default: system temp)
+
+        Returns:
+            str: Path of the PDF file
+        """
+        fd, path = tempfile.mkstemp(prefix="ensalamento_", suffix=".pdf", dir=directory)
+        os.close(fd)
+        try:
+            self.write_allocation_report(
+                path, room_allocations, semester_name, selected_room_id, portrait_mode
+            )
+        except Exception:
+            os.remove(path)
+            raise
+        return path
+
+    def write_allocation_report(
+        self,
+        output: Union[str, BinaryIO],
+        room_allocations: Dict[int, Dict[str, Any]],
+        semester_name: str,
+        selected_room_id: Optional[int] = None,
+        portrait_mode: bool = False,
+    ) -> None:
+        """
+        Write the PDF report (one page per room) to a path or binary file.
+
+        Rooms are laid out one at a time: each room's title and table are
+        built only when the previous room has been drawn, so the flowables
+        held in memory do not grow with the number of rooms.
+
+        Args:
+            output: File path or writable binary file
+            room_allocations: Dictionary mapping room_id to allocation data
+            semester_name: Name of the semester (e.g., "2025-1")
+            selected_room_id: If provided, generate report only for this room
+            portrait_mode: Portrait A4 instead of landscape
+        """
         # Set page size and margins based on orientation
         if portrait_mode:
             page_size = A4  # Portrait A4
@@ -162,7 +254,7 @@ class PDFReportService:
 
         # Create PDF document
         doc = SimpleDocTemplate(
-            buffer,
+            output,
             pagesize=page_size,
             rightMargin=right_margin,
             leftMargin=left_margin,
@@ -172,19 +264,36 @@ class PDFReportService:
             author="Sistema de Ensalamento FUP/UnB",
         )
 
-        # Build document content
-        story = []
-
         # Filter rooms if specific room selected
         rooms_to_process = room_allocations
         if selected_room_id and selected_room_id in room_allocations:
             rooms_to_process = {selected_room_id: room_allocations[selected_room_id]}
 
-        # Generate one page per room
-        for room_id, room_data in rooms_to_process.items():
+        pages = self._iter_room_pages(
+            rooms_to_process.values(), [time_col_width] + [day_col_width] * 6
+        )
+        doc.build(_StreamingStory(pages))
+
+    def _iter_room_pages(
+        self, rooms: Iterable[Dict[str, Any]], col_widths: List[float]
+    ) -> Iterator[List[Any]]:
+        """
+        Yield the flowables of one room page at a time.
+
+        Args:
+            rooms: Room data dicts ({"room_name": str, "allocations": [...]})
+            col_widths: Width of the time column and of each day column
+
+        Yields:
+            Flowables of a room (a page break before every room but the first)
+        """
+        for index, room_data in enumerate(rooms):
             room_name = room_data["room_name"]
             allocations = room_data["allocations"]
 
+            # Add page break between rooms
+            story = [PageBreak()] if index else []
+
             # Format room name: convert "UAC: AT-42/12" to "AT-42/12 (UAC)"
             if ":" in room_name:
                 parts = room_name.split(":", 1)
@@ -207,7 +316,7 @@ class PDFReportService:
                 # Create table with optimized column widths based on orientation
                 table = Table(
                     table_data,
-                    colWidths=[time_col_width] + [day_col_width] * 6,
+                    colWidths=col_widths,
                     repeatRows=1,  # Repeat header row on each page
                 )
 
@@ -261,18 +370,7 @@ class PDFReportService:
 
                 story.append(table)
 
-            # Add page break after each room (except last)
-            if room_id != list(rooms_to_process.keys())[-1]:
-                story.append(PageBreak())
-
-        # Build PDF
-        doc.build(story)
-
-        # Get PDF content
-        pdf_content = buffer.getvalue()
-        buffer.close()
-
-        return pdf_content
+            yield story
 
     def _build_schedule_table(self, allocations: List[Any]) -> List[List[Any]]:
         """
@@ -0,0 +1,252 @@
+"""
+Professor Name Index - Demand professor names resolved to professors in memory.
+
+Demands carry their professors as free text (professores_disciplina, as
+exported by SIGAA). Resolving them used to take one exact-match SELECT per
+name per demand, repeated by every phase of an allocation run, and missed
+names that differ only in accents, case or spacing ("José  da Silva" vs
+"JOSE DA SILVA").
+
+ProfessorNameIndex loads the professors table once and maps normalized names
+(accents removed, case-folded, whitespace collapsed) to professors. With
+settings.PROFESSOR_NAME_FUZZY_THRESHOLD > 0, names without a normalized match
+fall back to the most similar name by trigram similarity, if it reaches the
+threshold and is unambiguous.
+
+A process-wide index is shared via get_professor_name_index(); it is keyed by
+the professors data version (versoes_dados key 'professores', bumped by
+database triggers), so every process sees professor changes on its next
+lookup.
+"""
+
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.config.settings import settings
+from src.models.allocation import PROFESSORES_VERSION_KEY, versoes_dados
+from src.repositories.professor import ProfessorRepository
+from src.schemas.academic import ProfessorRead
+from src.services.semester_grid_service import split_professors
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_professor_name(name: Optional[str]) -> str:
+    """Fold accents and case and collapse whitespace ("" for empty names)."""
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    unaccented = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(unaccented.casefold().split())
+
+
+def name_trigrams(normalized: str) -> FrozenSet[str]:
+    """Trigrams of a normalized name, each word padded as in pg_trgm."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+@dataclass(frozen=True)
+class ProfessorNameIndex:
+    """Normalized name → professor, with an optional trigram fallback."""
+
+    versao: int
+    by_name: Mapping[str, ProfessorRead]
+    trigrams: Mapping[str, FrozenSet[str]]  # normalized name -> its trigrams
+    names_by_trigram: Mapping[str, Tuple[str, ...]]
+    fuzzy_threshold: float = 0.0
+
+    @classmethod
+    def build(
+        cls,
+        professors: Iterable[ProfessorRead],
+        versao: int = 0,
+        fuzzy_threshold: float = 0.0,
+    ) -> "ProfessorNameIndex":
+        """
+        Index professors by normalized name.
+
+        Args:
+            professors: ProfessorRead DTOs
+            versao: Professors data version they were read at
+            fuzzy_threshold: Minimum trigram similarity (0 to 1) of the fuzzy
+                fallback; 0 disables it
+
+        Returns:
+            ProfessorNameIndex (the lowest ID wins among equal normalized names)
+        """
+        by_name: Dict[str, ProfessorRead] = {}
+        for professor in sorted(professors, key=lambda p: p.id):
+            key = normalize_professor_name(professor.nome_completo)
+            if key:
+                by_name.setdefault(key, professor)
+
+        trigrams = {name: name_trigrams(name) for name in by_name}
+        names_by_trigram: Dict[str, list] = {}
+        for name, grams in trigrams.items():
+            for gram in grams:
+                names_by_trigram.setdefault(gram, []).append(name)
+
+        return cls(
+            versao=versao,
+            by_name=MappingProxyType(by_name),
+            trigrams=MappingProxyType(trigrams),
+            names_by_trigram=MappingProxyType(
+                {gram: tuple(names) for gram, names in names_by_trigram.items()}
+            ),
+            fuzzy_threshold=fuzzy_threshold,
+        )
+
+    def resolve(self, name: Optional[str]) -> Optional[ProfessorRead]:
+        """
+        Find the professor of one name.
+
+        Args:
+            name: Professor name as written in the demand
+
+        Returns:
+            ProfessorRead, or None if no (unambiguous) match
+        """
+        key = normalize_professor_name(name)
+        if not key:
+            return None
+        professor = self.by_name.get(key)
+        if professor is None and self.fuzzy_threshold > 0:
+            professor = self._resolve_fuzzy(key)
+        return professor
+
+    def resolve_text(
+        self, professores_disciplina: Optional[str]
+    ) -> Optional[ProfessorRead]:
+        """
+        Find the professor of a demand (first matching name of the field).
+
+        Args:
+            professores_disciplina: Demand professor field (names separated
+                by ",", ";" or "/")
+
+        Returns:
+            ProfessorRead, or None if no name matches
+        """
+        for name in split_professors(professores_disciplina):
+            professor = self.resolve(name)
+            if professor is not None:
+                return professor
+        return None
+
+    def resolve_demands(
+        self, demands: Iterable[Any]
+    ) -> Dict[int, Optional[ProfessorRead]]:
+        """
+        Resolve the professor of every demand in one pass (RF-006.3).
+
+        Args:
+            demands: Demand objects with id and professores_disciplina
+
+        Returns:
+            Dict demanda_id -> ProfessorRead (None when no name matches) for
+            demands that list at least one professor
+        """
+        professor_map = {}
+        for demanda in demands:
+            prof_text = (demanda.professores_disciplina or "").strip()
+            if prof_text:
+                professor_map[demanda.id] = self.resolve_text(prof_text)
+        return professor_map
+
+    def _resolve_fuzzy(self, key: str) -> Optional[ProfessorRead]:
+        """Best trigram match at or above the threshold (None on ties)."""
+        grams = name_trigrams(key)
+        shared = Counter(
+            name for gram in grams for name in self.names_by_trigram.get(gram, ())
+        )
+
+        best_score = 0.0
+        best_names = []
+        for name, common in shared.items():
+            score = common / (len(grams) + len(self.trigrams[name]) - common)
+            if score > best_score:
+                best_score, best_names = score, [name]
+            elif score == best_score:
+                best_names.append(name)
+
+        if best_score < self.fuzzy_threshold or len(best_names) != 1:
+            return None
+        logger.debug(f"Fuzzy professor match: {key!r} -> {best_names[0]!r}")
+        return self.by_name[best_names[0]]
+
+
+def get_professors_version(session: Session) -> int:
+    """Current professors data version (0 when never written)."""
+    versao = session.execute(
+        select(versoes_dados.c.versao).where(
+            versoes_dados.c.chave == PROFESSORES_VERSION_KEY
+        )
+    ).scalar()
+    return versao or 0
+
+
+# Process-wide professor name index (see get_professor_name_index)
+_index_cache: Optional[ProfessorNameIndex] = None
+_index_cache_lock = threading.Lock()
+
+
+def get_professor_name_index(session: Session) -> ProfessorNameIndex:
+    """
+    Get the shared professor name index, rebuilding it if professors changed.
+
+    A cache hit costs one indexed query on versoes_dados.
+
+    Args:
+        session: SQLAlchemy session
+
+    Returns:
+        Up-to-date ProfessorNameIndex (shared, read-only)
+    """
+    global _index_cache
+
+    # Read the version before the data (see get_semester_grid)
+    versao = get_professors_version(session)
+    threshold = settings.PROFESSOR_NAME_FUZZY_THRESHOLD
+
+    cached = _index_cache
+    if cached is not None and (cached.versao, cached.fuzzy_threshold) == (
+        versao,
+        threshold,
+    ):
+        return cached
+
+    with _index_cache_lock:
+        cached = _index_cache
+        if cached is None or (cached.versao, cached.fuzzy_threshold) != (
+            versao,
+            threshold,
+        ):
+            cached = ProfessorNameIndex.build(
+                ProfessorRepository(session).get_all(), versao, threshold
+            )
+            _index_cache = cached
+            logger.debug(
+                f"Professor name index rebuilt at version {versao}: "
+                f"{len(cached.by_name)} names"
+            )
+        return cached
+
+
+def clear_professor_name_index() -> None:
+    """Drop the shared index (e.g. after restoring a backup)."""
+    global _index_cache
+
+    with _index_cache_lock:
+        _index_cache = None
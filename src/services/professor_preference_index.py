@@ -0,0 +1,124 @@
+"""
+Professor Preference Index - Professor room/characteristic preferences in memory.
+
+Scoring a demand needs its professor's preferred rooms and characteristics.
+They used to be read with two SELECTs per demand (professor_prefere_sala and
+professor_prefere_caracteristica), repeated by the Phase 1 logs, the Phase 2
+scorer and the manual allocation assistant, mostly for the same professors.
+
+ProfessorPreferenceIndex reads both tables with one query each and keeps
+them as a sparse professor × room matrix and a professor × characteristic
+matrix (one sorted ID tuple per professor, in the order the per-professor
+queries returned them). It is loaded once per allocation run and shared
+with both scoring services, like InventorySnapshot.
+"""
+
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models.academic import (
+    professor_prefere_caracteristica,
+    professor_prefere_sala,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _group_by_professor(
+    rows: Iterable[Tuple[int, int]],
+) -> Mapping[int, Tuple[int, ...]]:
+    """Group (professor_id, other_id) rows into professor_id -> ID tuple."""
+    grouped: Dict[int, List[int]] = {}
+    for professor_id, other_id in rows:
+        grouped.setdefault(professor_id, []).append(other_id)
+    return MappingProxyType(
+        {professor_id: tuple(ids) for professor_id, ids in grouped.items()}
+    )
+
+
+@dataclass(frozen=True)
+class ProfessorPreferenceIndex:
+    """Preferred rooms and characteristics of every professor."""
+
+    rooms_by_professor: Mapping[int, Tuple[int, ...]]
+    characteristics_by_professor: Mapping[int, Tuple[int, ...]]
+
+    @classmethod
+    def build(
+        cls,
+        room_rows: Iterable[Tuple[int, int]],
+        characteristic_rows: Iterable[Tuple[int, int]],
+    ) -> "ProfessorPreferenceIndex":
+        """
+        Build the index from association table rows.
+
+        Args:
+            room_rows: (professor_id, sala_id) pairs
+            characteristic_rows: (professor_id, caracteristica_id) pairs
+
+        Returns:
+            ProfessorPreferenceIndex (IDs kept in row order)
+        """
+        return cls(
+            rooms_by_professor=_group_by_professor(room_rows),
+            characteristics_by_professor=_group_by_professor(characteristic_rows),
+        )
+
+    @classmethod
+    def load(cls, session: Session) -> "ProfessorPreferenceIndex":
+        """
+        Load every professor's preferences with two queries.
+
+        Args:
+            session: SQLAlchemy session
+
+        Returns:
+            ProfessorPreferenceIndex
+        """
+        room_rows = session.execute(
+            select(
+                professor_prefere_sala.c.professor_id,
+                professor_prefere_sala.c.sala_id,
+            ).order_by(
+                professor_prefere_sala.c.professor_id,
+                professor_prefere_sala.c.sala_id,
+            )
+        ).all()
+        characteristic_rows = session.execute(
+            select(
+                professor_prefere_caracteristica.c.professor_id,
+                professor_prefere_caracteristica.c.caracteristica_id,
+            ).order_by(
+                professor_prefere_caracteristica.c.professor_id,
+                professor_prefere_caracteristica.c.caracteristica_id,
+            )
+        ).all()
+
+        index = cls.build(room_rows, characteristic_rows)
+        logger.debug(
+            f"Professor preference index loaded: {len(room_rows)} room and "
+            f"{len(characteristic_rows)} characteristic preferences"
+        )
+        return index
+
+    def preferences_for(self, professor_id: Optional[int]) -> Dict:
+        """
+        Get one professor's preferences in the scoring services' format.
+
+        Args:
+            professor_id: Professor ID (None for demands without a professor)
+
+        Returns:
+            Dict with preferred_rooms and preferred_characteristics lists
+        """
+        return {
+            "preferred_rooms": list(self.rooms_by_professor.get(professor_id, ())),
+            "preferred_characteristics": list(
+                self.characteristics_by_professor.get(professor_id, ())
+            ),
+        }
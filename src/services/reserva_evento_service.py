@@ -5,11 +5,14 @@ Handles the creation, management, and conflict detection for recurring
 room reservations using the Parent/Instance design pattern.
 """
 
+import json
 import logging
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
 
+from src.config.settings import settings
+from src.models.allocation import OCORRENCIA_CANCELADA, OCORRENCIA_MOVIDA
 from src.repositories.reserva_evento import ReservaEventoRepository
 from src.repositories.reserva_ocorrencia import ReservaOcorrenciaRepository
 from src.repositories.alocacao import AlocacaoRepository
@@ -27,6 +30,9 @@ from src.utils.ui_feedback import set_session_feedback
 
 logger = logging.getLogger(__name__)
 
+# Conflicting dates listed in the error message of a recurring reservation
+MAX_CONFLICT_DATES_SHOWN = 10
+
 
 class ReservaEventoService:
     """
@@ -71,8 +77,6 @@ class ReservaEventoService:
 
         try:
             # Parse and validate recurrence rule
-            import json
-
             rule_dict = json.loads(evento_dto.regra_recorrencia_json)
 
             if not RecurrenceCalculator.validate_recurrence_rule(rule_dict):
@@ -112,11 +116,16 @@ class ReservaEventoService:
                 errors.extend(conflict_errors)
                 return None, errors
 
-            # Create the event and all occurrences in a transaction
+            # Create the event (and, in legacy storage, all its occurrences)
             logger.info(f"Starting event creation for: {evento_dto.titulo_evento}")
-            created_event = self._create_event_with_occurrences(
-                evento_dto, occurrences_with_blocks
-            )
+            if settings.RESERVAS_OCORRENCIAS_VIRTUAIS:
+                created_event = self._create_virtual_event(
+                    evento_dto, occurrences_with_blocks, blocos_selecionados
+                )
+            else:
+                created_event = self._create_event_with_occurrences(
+                    evento_dto, occurrences_with_blocks
+                )
 
             if created_event:
                 logger.info(f"Event creation successful: {created_event.id}")
@@ -153,37 +162,9 @@ class ReservaEventoService:
         Returns:
             List of occurrence dictionaries with data_reserva and codigo_bloco
         """
-        # Import here to avoid circular imports
-        from src.schemas.allocation import (
-            RegraUnica,
-            RegraDiaria,
-            RegraSemanal,
-            RegraMensalDia,
-            RegraMensalPosicao,
-        )
-        import json
-
-        # Create appropriate rule object based on type
-        tipo = rule_dict.get("tipo")
-
-        if tipo == "unica":
-            rule = RegraUnica()
-        elif tipo == "diaria":
-            rule = RegraDiaria(
-                intervalo=rule_dict.get("intervalo", 1), fim=rule_dict["fim"]
-            )
-        elif tipo == "semanal":
-            rule = RegraSemanal(dias=rule_dict["dias"], fim=rule_dict["fim"])
-        elif tipo == "mensal" and "dia_mes" in rule_dict:
-            rule = RegraMensalDia(dia_mes=rule_dict["dia_mes"], fim=rule_dict["fim"])
-        elif tipo == "mensal" and "posicao" in rule_dict:
-            rule = RegraMensalPosicao(
-                posicao=rule_dict["posicao"],
-                dia_semana=rule_dict["dia_semana"],
-                fim=rule_dict["fim"],
-            )
-        else:
-            logger.error(f"Unknown recurrence type: {tipo}")
+        rule = RecurrenceCalculator.parse_rule(rule_dict)
+        if rule is None:
+            logger.error(f"Unknown recurrence type: {rule_dict.get('tipo')}")
             return []
 
         occurrences = RecurrenceCalculator.expand_dates_with_blocks(
@@ -195,6 +176,67 @@ class ReservaEventoService:
             logger.debug(f"Last occurrence: {occurrences[-1]}")
         return occurrences
 
+    def find_conflicting_occurrences(
+        self, room_id: int, occurrences_with_blocks: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the occurrences that clash with semester allocations or reservations.
+
+        Set-based: loads the room's allocated (weekday, block) slots and the
+        legacy and recurring reservations in the occurrences' date range (one
+        query each) and intersects them in memory, so the query count does
+        not depend on the number of occurrences.
+
+        Args:
+            room_id: Room ID
+            occurrences_with_blocks: List of occurrence dictionaries
+
+        Returns:
+            List of {"data_reserva", "codigo_bloco", "motivo"} dictionaries
+            ("alocacao" or "reserva"), in occurrence order
+        """
+        if not occurrences_with_blocks:
+            return []
+
+        dates = [occurrence["data_reserva"] for occurrence in occurrences_with_blocks]
+        start_date, end_date = min(dates), max(dates)
+
+        allocated_slots = self.alocacao_repo.get_room_weekday_slots(room_id)
+        reserved_slots = self.reserva_repo.get_booked_slots_in_range(
+            room_id, start_date, end_date
+        ) | self.ocorrencia_repo.get_active_slots_in_date_range(
+            room_id, start_date, end_date
+        )
+
+        weekdays: Dict[str, int] = {}
+        conflicts = []
+        for occurrence in occurrences_with_blocks:
+            data_reserva = occurrence["data_reserva"]
+            codigo_bloco = occurrence["codigo_bloco"]
+
+            weekday = weekdays.get(data_reserva)
+            if weekday is None:
+                weekday = weekdays[data_reserva] = (
+                    datetime.strptime(data_reserva, "%Y-%m-%d").weekday() + 2
+                )  # SIGAA format
+
+            if (weekday, codigo_bloco) in allocated_slots:
+                motivo = "alocacao"
+            elif (data_reserva, codigo_bloco) in reserved_slots:
+                motivo = "reserva"
+            else:
+                continue
+
+            conflicts.append(
+                {
+                    "data_reserva": data_reserva,
+                    "codigo_bloco": codigo_bloco,
+                    "motivo": motivo,
+                }
+            )
+
+        return conflicts
+
     def _check_conflicts_for_occurrences(
         self, room_id: int, occurrences_with_blocks: List[Dict[str, Any]]
     ) -> List[str]:
@@ -209,48 +251,85 @@ class ReservaEventoService:
             List of conflict error messages
         """
         errors = []
-        conflict_count = 0
         logger.info(
             f"Checking conflicts for room {room_id} with {len(occurrences_with_blocks)} occurrences"
         )
 
-        for occurrence in occurrences_with_blocks:
-            data_reserva = occurrence["data_reserva"]
-            codigo_bloco = occurrence["codigo_bloco"]
+        conflicts = self.find_conflicting_occurrences(room_id, occurrences_with_blocks)
 
-            # Check conflicts with semester allocations
-            weekday = (
-                datetime.strptime(data_reserva, "%Y-%m-%d").weekday() + 2
-            )  # SIGAA format
-            semester_conflict = self.alocacao_repo.check_conflict(
-                room_id, weekday, codigo_bloco
-            )
-
-            if semester_conflict:
-                conflict_count += 1
-                logger.warning(
-                    f"Conflict found: semester allocation on {data_reserva} {codigo_bloco}"
+        if conflicts:
+            # Conflicting dates (with their blocks), in occurrence order
+            blocks_by_date: Dict[str, List[str]] = {}
+            for conflict in conflicts:
+                blocks_by_date.setdefault(conflict["data_reserva"], []).append(
+                    conflict["codigo_bloco"]
                 )
-                continue  # Don't add individual error messages, just count
-
-            # Check conflicts with existing reservations (both legacy and recurring)
-            reserva_conflict = self.reserva_repo.check_conflict(
-                room_id, codigo_bloco, data_reserva
+            logger.warning(
+                f"Found {len(conflicts)} conflict(s) in room {room_id} on "
+                f"{len(blocks_by_date)} date(s): {list(blocks_by_date)[:10]}"
             )
 
-            if reserva_conflict:
-                conflict_count += 1
-                logger.warning(
-                    f"Conflict found: existing reservation on {data_reserva} {codigo_bloco}"
-                )
+            shown = [
+                f"{datetime.strptime(data, '%Y-%m-%d').strftime('%d/%m/%Y')} "
+                f"({', '.join(blocos)})"
+                for data, blocos in list(blocks_by_date.items())[
+                    :MAX_CONFLICT_DATES_SHOWN
+                ]
+            ]
+            remaining = len(blocks_by_date) - len(shown)
+            if remaining > 0:
+                shown.append(f"e mais {remaining} data(s)")
 
-        if conflict_count > 0:
             errors.append(
-                f"Encontrados {conflict_count} conflito(s) com alocações existentes. Por favor, verifique os horários e datas selecionadas."
+                f"Encontrados {len(conflicts)} conflito(s) com alocações existentes. Por favor, verifique os horários e datas selecionadas."
             )
+            errors.append("Datas em conflito: " + "; ".join(shown))
 
         return errors
 
+    def _create_virtual_event(
+        self,
+        evento_dto: ReservaEventoCreate,
+        occurrences_with_blocks: List[Dict[str, Any]],
+        blocos_selecionados: List[str],
+    ) -> Optional[ReservaEventoRead]:
+        """
+        Create a virtual series: one event row holding the rule, its date
+        bounds and blocks; occurrences are expanded on demand.
+
+        Args:
+            evento_dto: Event data
+            occurrences_with_blocks: Expanded occurrences (for the date bounds)
+            blocos_selecionados: Time block codes of every occurrence
+
+        Returns:
+            Created event or None if failed
+        """
+        try:
+            dates = [o["data_reserva"] for o in occurrences_with_blocks]
+            created_event = self.evento_repo.create(
+                evento_dto.model_copy(
+                    update={
+                        "ocorrencias_virtuais": True,
+                        "data_inicio": min(dates),
+                        "data_fim": max(dates),
+                        "blocos_json": json.dumps(list(blocos_selecionados)),
+                    }
+                )
+            )
+            logger.info(
+                f"Virtual event created with ID: {created_event.id} "
+                f"({len(occurrences_with_blocks)} occurrences)"
+            )
+            return created_event
+
+        except Exception as e:
+            import traceback
+
+            logger.error(f"Error creating virtual event: {str(e)}")
+            logger.error(traceback.format_exc())
+            return None
+
     def _create_event_with_occurrences(
         self,
         evento_dto: ReservaEventoCreate,
@@ -316,6 +395,80 @@ class ReservaEventoService:
             logger.error(traceback.format_exc())
             return None
 
+    def cancelar_ocorrencia(
+        self, evento_id: int, data_reserva: str, codigo_bloco: str
+    ) -> Tuple[bool, str]:
+        """
+        Cancel one occurrence of a recurring reservation.
+
+        Args:
+            evento_id: Event ID
+            data_reserva: Date of the occurrence (YYYY-MM-DD)
+            codigo_bloco: Time block of the occurrence
+
+        Returns:
+            Tuple of (success, message)
+        """
+        try:
+            if self.ocorrencia_repo.set_occurrence_exception(
+                evento_id, data_reserva, codigo_bloco, OCORRENCIA_CANCELADA
+            ):
+                return True, "Ocorrência cancelada com sucesso"
+            return False, "Ocorrência não encontrada"
+
+        except Exception as e:
+            self.session.rollback()
+            return False, f"Erro ao cancelar ocorrência: {str(e)}"
+
+    def mover_ocorrencia(
+        self,
+        evento_id: int,
+        data_reserva: str,
+        codigo_bloco: str,
+        nova_data: str,
+        novo_bloco: Optional[str] = None,
+    ) -> Tuple[bool, str]:
+        """
+        Move one occurrence of a recurring reservation to another date/block.
+
+        Args:
+            evento_id: Event ID
+            data_reserva: Current date of the occurrence (YYYY-MM-DD)
+            codigo_bloco: Current time block of the occurrence
+            nova_data: New date (YYYY-MM-DD)
+            novo_bloco: New time block (default: same block)
+
+        Returns:
+            Tuple of (success, message)
+        """
+        try:
+            evento = self.evento_repo.get_by_id(evento_id)
+            if not evento:
+                return False, "Reserva não encontrada"
+
+            novo_bloco = novo_bloco or codigo_bloco
+            conflicts = self.find_conflicting_occurrences(
+                evento.sala_id,
+                [{"data_reserva": nova_data, "codigo_bloco": novo_bloco}],
+            )
+            if conflicts:
+                return False, "O novo horário conflita com uma alocação ou reserva"
+
+            if self.ocorrencia_repo.set_occurrence_exception(
+                evento_id,
+                data_reserva,
+                codigo_bloco,
+                OCORRENCIA_MOVIDA,
+                nova_data=nova_data,
+                novo_bloco=novo_bloco,
+            ):
+                return True, "Ocorrência remarcada com sucesso"
+            return False, "Ocorrência não encontrada"
+
+        except Exception as e:
+            self.session.rollback()
+            return False, f"Erro ao remarcar ocorrência: {str(e)}"
+
     def excluir_serie_recorrente(
         self, evento_id: int, username: str
     ) -> Tuple[bool, str]:
@@ -489,8 +642,6 @@ class ReservaEventoService:
             Tuple of (is_valid, error_message)
         """
         try:
-            import json
-
             rule_dict = json.loads(rule_json)
 
             if RecurrenceCalculator.validate_recurrence_rule(rule_dict):
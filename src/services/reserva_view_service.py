@@ -0,0 +1,202 @@
+"""
+Reserva View Service - Read model of the Reservas page.
+
+The Reservas page used to load every occurrence of the two years around
+today on each Streamlit rerun just to build the room and building filter
+options, and then loaded each occurrence's event, room and building lazily,
+row by row, both for the options and for the table.
+
+This module splits that into three parts:
+
+- ReservaFacets: the room, building and event title filter options, built
+  from one aggregate query over the reservation events and shared by every
+  session of the process until the next reservation or inventory write
+  (versoes_dados keys 'reservas' and 'inventario', bumped by database
+  triggers, see src/models/allocation.py).
+- The occurrences of the visible date window only, loaded with their event,
+  room and building (ReservaOcorrenciaRepository.get_ocorrencias_by_date_range).
+- ReservaTablePage: one page of the editor table.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.config.database import get_db_session
+from src.repositories.reserva_evento import ReservaEventoRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def format_sala_label(nome: str, descricao: Optional[str]) -> str:
+    """Format a room as the Reservas page shows it ("nome: descrição")."""
+    return f"{nome}: {descricao}" if descricao else nome
+
+
+@dataclass
+class ReservaFacets:
+    """Filter options of the Reservas page."""
+
+    versao: Tuple[int, int]
+    sala_options: Dict[int, str]  # sala_id -> label, sorted by label
+    predio_options: Dict[int, str]  # predio_id -> name, sorted by name
+    titulos: List[str]
+    rooms_by_predio: Dict[int, List[int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        versao: Tuple[int, int],
+        rows: Sequence[
+            Tuple[int, str, Optional[str], Optional[int], Optional[str], str]
+        ],
+    ) -> "ReservaFacets":
+        """
+        Build the options from the distinct (room, building, title) rows.
+
+        Args:
+            versao: (reservations version, inventory version) the rows were read at
+            rows: ReservaEventoRepository.get_filter_facet_rows() rows
+
+        Returns:
+            ReservaFacets
+        """
+        salas: Dict[int, str] = {}
+        predios: Dict[int, str] = {}
+        rooms_by_predio: Dict[int, List[int]] = {}
+        titulos = set()
+        for sala_id, sala_nome, sala_descricao, predio_id, predio_nome, titulo in rows:
+            if sala_id not in salas:
+                salas[sala_id] = format_sala_label(sala_nome, sala_descricao)
+                if predio_id is not None:
+                    predios[predio_id] = predio_nome
+                    rooms_by_predio.setdefault(predio_id, []).append(sala_id)
+            titulos.add(titulo)
+
+        return cls(
+            versao=versao,
+            sala_options=dict(sorted(salas.items(), key=lambda item: item[1])),
+            predio_options=dict(sorted(predios.items(), key=lambda item: item[1])),
+            titulos=sorted(titulos),
+            rooms_by_predio=rooms_by_predio,
+        )
+
+    def room_ids(
+        self, sala_ids: Sequence[int], predio_ids: Sequence[int]
+    ) -> Optional[List[int]]:
+        """
+        Resolve the room and building filters to the rooms to load.
+
+        Both filters must match, as the page always did.
+
+        Args:
+            sala_ids: Selected rooms (empty means no filter)
+            predio_ids: Selected buildings (empty means no filter)
+
+        Returns:
+            Room IDs to load (possibly empty), or None when not filtered
+        """
+        if not sala_ids and not predio_ids:
+            return None
+        if not predio_ids:
+            return list(sala_ids)
+
+        in_predios = [
+            sala_id
+            for predio_id in predio_ids
+            for sala_id in self.rooms_by_predio.get(predio_id, [])
+        ]
+        if not sala_ids:
+            return in_predios
+        selected = set(sala_ids)
+        return [sala_id for sala_id in in_predios if sala_id in selected]
+
+
+# Process-wide cache of the filter options
+_facets_cache: Optional[ReservaFacets] = None
+_facets_cache_lock = threading.Lock()
+
+
+def get_reserva_facets() -> ReservaFacets:
+    """
+    Get the Reservas page filter options, rebuilding them if the data changed.
+
+    A cache hit costs one indexed query on versoes_dados.
+
+    Returns:
+        ReservaFacets (shared, treat as read-only)
+    """
+    global _facets_cache
+
+    with get_db_session(read_only=True) as session:
+        evento_repo = ReservaEventoRepository(session)
+        # Read the version before the data (see get_semester_grid)
+        versao = evento_repo.get_data_version()
+
+        cached = _facets_cache
+        if cached is not None and cached.versao == versao:
+            return cached
+
+        with _facets_cache_lock:
+            cached = _facets_cache
+            if cached is not None and cached.versao == versao:
+                return cached
+
+            facets = ReservaFacets.build(versao, evento_repo.get_filter_facet_rows())
+            _facets_cache = facets
+            logger.debug(
+                f"Reservation facets rebuilt at version {versao}: "
+                f"{len(facets.sala_options)} rooms, {len(facets.titulos)} titles"
+            )
+            return facets
+
+
+def clear_reserva_facets_cache() -> None:
+    """Drop the cached filter options (e.g. after restoring a backup)."""
+    global _facets_cache
+
+    with _facets_cache_lock:
+        _facets_cache = None
+
+
+@dataclass
+class ReservaTablePage:
+    """One page of the Reservas editor table."""
+
+    rows: List[Dict]
+    total: int
+    page: int
+    page_size: int
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages (at least 1)."""
+        return max(1, -(-self.total // self.page_size))
+
+
+def paginate_reserva_rows(
+    rows: List[Dict], page: int, page_size: int = DEFAULT_PAGE_SIZE
+) -> ReservaTablePage:
+    """
+    Slice the (merged) table rows to one page.
+
+    Args:
+        rows: All rows of the filtered window
+        page: 1-based page number (clamped to the available pages)
+        page_size: Rows per page
+
+    Returns:
+        ReservaTablePage
+    """
+    page_count = max(1, -(-len(rows) // page_size))
+    page = min(max(1, page), page_count)
+    start = (page - 1) * page_size
+    return ReservaTablePage(
+        rows=rows[start : start + page_size],
+        total=len(rows),
+        page=page,
+        page_size=page_size,
+    )
@@ -26,11 +26,30 @@ from src.repositories.disciplina import DisciplinaRepository
 logger = logging.getLogger(__name__)
 from src.models.academic import Professor
 from src.models.inventory import Sala
+from src.repositories.optimized_allocation_repo import OptimizedAllocationRepository
 from src.repositories.professor import ProfessorRepository
 from src.repositories.regra import RegraRepository
 from src.repositories.sala import SalaRepository
 from src.schemas.manual_allocation import CompatibilityScore
-from src.utils.room_utils import get_room_occupancy
+from src.services.inventory_snapshot import InventorySnapshot
+from src.services.professor_name_index import (
+    ProfessorNameIndex,
+    get_professor_name_index,
+)
+from src.services.professor_preference_index import ProfessorPreferenceIndex
+from src.services.occupancy_index import slot_mask
+from src.services.rule_index import (
+    RULE_TYPE_CHARACTERISTIC,
+    CompiledRule,
+    CompiledRuleSet,
+    compile_rule,
+    get_compiled_rule_set,
+)
+from src.services.vectorized_scoring_engine import (
+    MISSING_ID,
+    VectorizedScores,
+    VectorizedScoringEngine,
+)
 from src.utils.sigaa_parser import SigaaScheduleParser
 
 
@@ -168,6 +187,27 @@ class RoomScoringService:
         # Hybrid discipline detection service (injected via set_hybrid_detection_service)
         self._hybrid_detection_service = None
 
+        # In-memory semester occupancy index (injected via set_occupancy_index)
+        self._occupancy_index = None
+
+        # Precomputed historical frequency counts (injected via set_historical_frequency_index)
+        self._historical_frequency_index = None
+
+        # Optional NumPy scoring engine (injected via set_vectorized_engine)
+        self._vectorized_engine = None
+
+        # Immutable room reference data (injected via set_inventory_snapshot)
+        self._inventory_snapshot: Optional[InventorySnapshot] = None
+
+        # Rules compiled once per run (injected via set_rule_set)
+        self._rule_set: Optional[CompiledRuleSet] = None
+
+        # Professor name index of the run (injected via set_professor_index)
+        self._professor_index: Optional[ProfessorNameIndex] = None
+
+        # Professor preferences of the run (injected via set_preference_index)
+        self._preference_index: Optional[ProfessorPreferenceIndex] = None
+
     def set_hybrid_detection_service(self, hybrid_service) -> None:
         """
         Set the hybrid discipline detection service for hybrid-aware scoring.
@@ -177,11 +217,109 @@ class RoomScoringService:
         """
         self._hybrid_detection_service = hybrid_service
 
+    def set_occupancy_index(self, occupancy_index) -> None:
+        """
+        Set the in-memory occupancy index used for conflict detection.
+
+        When the index covers the semester being scored, conflict checks are
+        answered with bitmask operations instead of per-slot SQL queries.
+
+        Args:
+            occupancy_index: SemesterOccupancyIndex instance (or None to disable)
+        """
+        self._occupancy_index = occupancy_index
+
+    def set_historical_frequency_index(self, frequency_index) -> None:
+        """
+        Set the precomputed historical frequency index used for RF-006.6 bonuses.
+
+        When the index was built excluding the semester being scored, frequency
+        lookups are answered from memory instead of one COUNT query per room.
+
+        Args:
+            frequency_index: HistoricalFrequencyIndex instance (or None to disable)
+        """
+        self._historical_frequency_index = frequency_index
+
+    def set_inventory_snapshot(self, snapshot: Optional[InventorySnapshot]) -> None:
+        """
+        Set the inventory snapshot used for rooms, characteristics and names.
+
+        With a snapshot, scoring and rule checks do not query inventory tables.
+
+        Args:
+            snapshot: InventorySnapshot instance (or None to query the database)
+        """
+        self._inventory_snapshot = snapshot
+
+    def set_rule_set(self, rule_set: Optional[CompiledRuleSet]) -> None:
+        """
+        Set the compiled rule set used for rule lookups and compliance checks.
+
+        Without one, lookups use the shared compiled set (revalidated on each
+        call) and compliance checks parse the rule configuration per room.
+
+        Args:
+            rule_set: CompiledRuleSet instance (or None)
+        """
+        self._rule_set = rule_set
+
+    def set_professor_index(self, index: Optional[ProfessorNameIndex]) -> None:
+        """
+        Set the professor name index used to resolve demand professors.
+
+        Without one, lookups use the shared index (revalidated on each call).
+
+        Args:
+            index: ProfessorNameIndex instance (or None)
+        """
+        self._professor_index = index
+
+    def _get_professor_index(self) -> ProfessorNameIndex:
+        """Get the run's professor name index, or the shared one."""
+        return self._professor_index or get_professor_name_index(self.session)
+
+    def set_preference_index(self, index: Optional[ProfessorPreferenceIndex]) -> None:
+        """
+        Set the professor preference index used for soft preference points.
+
+        With an index, professor preferences are read from memory instead of
+        two queries per scored demand.
+
+        Args:
+            index: ProfessorPreferenceIndex instance (or None to query the database)
+        """
+        self._preference_index = index
+
+    def set_vectorized_engine(self, engine: Optional[VectorizedScoringEngine]) -> None:
+        """
+        Set the vectorized engine used to score all rooms at once.
+
+        Scores are identical to the per-room engine; detailed breakdowns are
+        only built for the candidates that are returned (see top_k).
+
+        Args:
+            engine: VectorizedScoringEngine instance (or None for per-room scoring)
+        """
+        self._vectorized_engine = engine
+
+    def enable_vectorized_scoring(self) -> VectorizedScoringEngine:
+        """
+        Load room columns and switch to the vectorized engine.
+
+        Returns:
+            The loaded VectorizedScoringEngine
+        """
+        engine = VectorizedScoringEngine.load(self)
+        self.set_vectorized_engine(engine)
+        return engine
+
     def score_room_candidates_for_demand(
         self,
         demanda_id: int,
         semester_id: int,
         professor_override: Optional[Professor] = None,
+        top_k: Optional[int] = None,
     ) -> List[RoomCandidate]:
         """
         Score all room candidates for a demand using advanced algorithm.
@@ -196,6 +334,7 @@ class RoomScoringService:
             demanda_id: Demand to score rooms for
             semester_id: Semester to check conflicts within
             professor_override: Optional professor object (if known)
+            top_k: Optional limit on the number of candidates returned
 
         Returns:
             List of RoomCandidate objects, sorted by score descending
@@ -215,19 +354,27 @@ class RoomScoringService:
         professor_prefs = self._get_professor_preferences_for_professor(professor)
 
         # Get hard rules for this demand
-        hard_rules = self.regra_repo.find_rules_by_disciplina(demanda.codigo_disciplina)
+        hard_rules = self._find_rules_by_disciplina(demanda.codigo_disciplina)
+
+        if self._vectorized_engine is not None:
+            return self._score_room_candidates_vectorized(
+                demanda, hard_rules, professor_prefs, semester_id, top_k
+            )
 
         # Get all rooms
-        all_rooms = self.sala_repo.get_all()
+        all_rooms = self._get_all_rooms()
+
+        # Parse once (cached) and resolve conflicts for every room at once
+        # when an occupancy index is set
+        schedule = self.parser.parse(demanda.horario_sigaa_bruto)
+        conflicting_room_ids = self._get_conflicting_room_ids(
+            schedule.slot_mask, semester_id
+        )
 
         candidates = []
         for room in all_rooms:
             candidate = RoomCandidate(sala=room)
-
-            # Parse atomic blocks for this demand
-            candidate.atomic_blocks = self.parser.split_to_atomic_tuples(
-                demanda.horario_sigaa_bruto
-            )
+            candidate.atomic_blocks = list(schedule.atomic_tuples)
 
             # Calculate detailed scoring breakdown
             scoring_breakdown = self._calculate_detailed_scoring_breakdown(
@@ -250,19 +397,36 @@ class RoomScoringService:
                     candidate.rule_violations.append("Regras rígidas não atendidas")
 
             # Check for conflicts within the specified semester
-            conflicts = self._check_allocation_conflicts_semester_isolated(
-                candidate, semester_id
-            )
-            candidate.has_conflicts = len(conflicts) > 0
+            if conflicting_room_ids is not None:
+                candidate.has_conflicts = room.id in conflicting_room_ids
+            else:
+                conflicts = self._check_allocation_conflicts_semester_isolated(
+                    candidate, semester_id
+                )
+                candidate.has_conflicts = len(conflicts) > 0
 
             candidates.append(candidate)
 
-        # Sort by score (highest first), then by conflict status, then by room occupancy (highest first for optimization)
+        self._sort_room_candidates(candidates, semester_id)
+
+        return candidates[:top_k] if top_k is not None else candidates
+
+    def _sort_room_candidates(
+        self, candidates: List[RoomCandidate], semester_id: int
+    ) -> None:
+        """Sort candidates in place by score, conflict status and room occupancy."""
+        occupancy = self._get_room_occupancy_vector(
+            [c.sala.id for c in candidates], semester_id
+        )
+
+        # Sort by score (highest first), then by conflict status, then by room
+        # occupancy (highest first for optimization), then by room ID (lowest first)
         candidates.sort(
             key=lambda c: (
                 c.score,
                 not c.has_conflicts,
-                get_room_occupancy(self.alocacao_repo, c.sala.id, semester_id),
+                occupancy[c.sala.id],
+                -c.sala.id,
             ),
             reverse=True,
         )
@@ -272,17 +436,137 @@ class RoomScoringService:
             top_score = candidates[0].score
             second_score = candidates[1].score
             if top_score == second_score:
-                import logging
-
-                logger = logging.getLogger(__name__)
                 logger.debug(
                     f"Room occupancy optimization applied for demand {candidates[0].sala.id}: "
-                    f"Room {candidates[0].sala.nome} (occupancy: {get_room_occupancy(self.alocacao_repo, candidates[0].sala.id, semester_id)}) "
-                    f"vs Room {candidates[1].sala.nome} (occupancy: {get_room_occupancy(self.alocacao_repo, candidates[1].sala.id, semester_id)})"
+                    f"Room {candidates[0].sala.nome} (occupancy: {occupancy[candidates[0].sala.id]}) "
+                    f"vs Room {candidates[1].sala.nome} (occupancy: {occupancy[candidates[1].sala.id]})"
+                )
+
+    def _get_room_occupancy_vector(
+        self, room_ids: List[int], semester_id: int
+    ) -> Dict[int, int]:
+        """
+        Get allocation counts used to break score ties, for several rooms.
+
+        Served from the occupancy index (kept current as allocations are
+        written) when it covers the semester; otherwise loaded with two
+        grouped queries.
+
+        Args:
+            room_ids: Room IDs
+            semester_id: Semester to count within
+
+        Returns:
+            Dict mapping room_id to occupancy (see SemesterOccupancyIndex.occupancy)
+        """
+        if self._occupancy_index is not None and self._occupancy_index.covers(
+            semester_id
+        ):
+            return self._occupancy_index.occupancy_vector(room_ids)
+
+        batch_repo = OptimizedAllocationRepository(self.session)
+        current = batch_repo.get_room_occupancy_batch(room_ids, semester_id)
+        previous = batch_repo.get_previous_room_occupancy_batch(room_ids, semester_id)
+        return {
+            sala_id: current.get(sala_id) or previous.get(sala_id, 0)
+            for sala_id in room_ids
+        }
+
+    def _score_room_candidates_vectorized(
+        self,
+        demanda,
+        hard_rules: List,
+        professor_prefs: Dict,
+        semester_id: int,
+        top_k: Optional[int],
+    ) -> List[RoomCandidate]:
+        """
+        Vectorized counterpart of score_room_candidates_for_demand.
+
+        Scores every room with the NumPy engine, sorts with the same keys as the
+        per-room path and builds full breakdowns only for returned candidates.
+        """
+        engine = self._vectorized_engine
+        scores = engine.score_demand(demanda, hard_rules, professor_prefs, semester_id)
+
+        schedule = self.parser.parse(demanda.horario_sigaa_bruto)
+        atomic_blocks = schedule.atomic_tuples
+        conflicting_room_ids = self._get_conflicting_room_ids(
+            schedule.slot_mask, semester_id
+        )
+
+        candidates = []
+        rows_by_room_id = {}
+        for row, room in enumerate(engine.columns.rooms):
+            candidate = RoomCandidate(sala=room, score=int(scores.total[row]))
+            candidate.atomic_blocks = list(atomic_blocks)
+
+            if conflicting_room_ids is not None:
+                candidate.has_conflicts = room.id in conflicting_room_ids
+            else:
+                candidate.has_conflicts = (
+                    len(
+                        self._check_allocation_conflicts_semester_isolated(
+                            candidate, semester_id
+                        )
+                    )
+                    > 0
                 )
 
+            rows_by_room_id[room.id] = row
+            candidates.append(candidate)
+
+        self._sort_room_candidates(candidates, semester_id)
+        if top_k is not None:
+            candidates = candidates[:top_k]
+
+        # Materialize full breakdowns only for the candidates being returned
+        for candidate in candidates:
+            breakdown = self._scoring_breakdown_from_vectorized(
+                scores, rows_by_room_id[candidate.sala.id]
+            )
+            candidate.scoring_breakdown = breakdown
+            if not breakdown.capacity_satisfied:
+                candidate.rule_violations.append("Capacidade insuficiente")
+            if not breakdown.hard_rules_satisfied:
+                candidate.rule_violations.append("Regras rígidas não atendidas")
+
         return candidates
 
+    def _scoring_breakdown_from_vectorized(
+        self, scores: VectorizedScores, row: int
+    ) -> ScoringBreakdown:
+        """Build the ScoringBreakdown of one room from vectorized scores."""
+        breakdown = ScoringBreakdown(
+            total_score=int(scores.total[row]),
+            capacity_points=int(scores.capacity_points[row]),
+            hard_rules_points=int(scores.hard_rules_points[row]),
+            soft_preference_points=int(scores.soft_preference_points[row]),
+            historical_frequency_points=int(scores.historical_frequency_points[row]),
+            capacity_satisfied=bool(scores.capacity_satisfied[row]),
+            historical_allocations=int(scores.historical_allocations[row]),
+        )
+        self._fill_rule_details_from_vectorized(breakdown, scores, row)
+        return breakdown
+
+    def _fill_rule_details_from_vectorized(
+        self, breakdown, scores: VectorizedScores, row: int
+    ) -> None:
+        """Fill satisfied hard-rule and preference descriptions for one room."""
+        if scores.hard_rules_satisfied[row]:
+            breakdown.hard_rules_satisfied = list(scores.hard_rule_descriptions)
+
+        if scores.preferred_room[row]:
+            breakdown.soft_preferences_satisfied.append("Sala preferida pelo professor")
+        char_id = int(scores.preferred_characteristic[row])
+        if char_id != MISSING_ID:
+            char_name = self._vectorized_engine.columns.characteristic_names.get(
+                char_id, ""
+            )
+            breakdown.soft_preferences_satisfied.append(
+                f"Característica preferida: {char_name}"
+            )
+
     # ========================================================================
     # BLOCK-GROUP LEVEL SCORING (For Partial/Split Allocation)
     # ========================================================================
@@ -309,24 +593,14 @@ class RoomScoringService:
             7: "SAB",
         }
 
-        # Parse to atomic tuples: [(block_code, day_id), ...]
-        atomic_tuples = self.parser.split_to_atomic_tuples(horario_sigaa)
-
-        # Group by day
-        day_blocks: Dict[int, List[str]] = {}
-        for block_code, day_id in atomic_tuples:
-            if day_id not in day_blocks:
-                day_blocks[day_id] = []
-            day_blocks[day_id].append(block_code)
-
-        # Create BlockGroup objects
+        # Day groups come pre-sorted from the parse cache
         block_groups = []
-        for day_id in sorted(day_blocks.keys()):
+        for day_id, blocks in self.parser.parse(horario_sigaa).day_groups:
             block_groups.append(
                 BlockGroup(
                     day_id=day_id,
                     day_name=day_names.get(day_id, f"DIA{day_id}"),
-                    blocks=sorted(day_blocks[day_id]),
+                    blocks=list(blocks),
                 )
             )
 
@@ -338,6 +612,7 @@ class RoomScoringService:
         block_group: BlockGroup,
         semester_id: int,
         professor_override: Optional[Professor] = None,
+        top_k: Optional[int] = None,
     ) -> List[BlockGroupRoomScore]:
         """
         Score all rooms for a specific block group.
@@ -350,6 +625,7 @@ class RoomScoringService:
             block_group: The block group to score rooms for
             semester_id: Semester to check conflicts within
             professor_override: Optional professor object
+            top_k: Optional limit on the number of scores returned
 
         Returns:
             List of BlockGroupRoomScore objects, sorted by score descending
@@ -369,10 +645,20 @@ class RoomScoringService:
         professor_prefs = self._get_professor_preferences_for_professor(professor)
 
         # Get hard rules for this demand
-        hard_rules = self.regra_repo.find_rules_by_disciplina(demanda.codigo_disciplina)
+        hard_rules = self._find_rules_by_disciplina(demanda.codigo_disciplina)
+
+        if self._vectorized_engine is not None:
+            return self._score_rooms_for_block_group_vectorized(
+                demanda, block_group, hard_rules, professor_prefs, semester_id, top_k
+            )
 
         # Get all rooms
-        all_rooms = self.sala_repo.get_all()
+        all_rooms = self._get_all_rooms()
+
+        # Resolve conflicts for every room at once when an occupancy index is set
+        conflicting_room_ids = self._get_conflicting_room_ids(
+            slot_mask(block_group.get_atomic_tuples()), semester_id
+        )
 
         scores = []
         for room in all_rooms:
@@ -387,9 +673,12 @@ class RoomScoringService:
             )
 
             # Check for conflicts for this block group specifically
-            conflicts = self._check_block_group_conflicts(
-                room.id, block_group, semester_id
-            )
+            if conflicting_room_ids is not None and room.id not in conflicting_room_ids:
+                conflicts = []
+            else:
+                conflicts = self._check_block_group_conflicts(
+                    room.id, block_group, semester_id
+                )
 
             # Get room metadata
             predio_name = self._get_building_name(room.predio_id) if room.predio_id else "N/A"
@@ -412,7 +701,98 @@ class RoomScoringService:
         # Sort by score descending, then by conflict status
         scores.sort(key=lambda s: (s.score, not s.has_conflict), reverse=True)
 
-        return scores
+        return scores[:top_k] if top_k is not None else scores
+
+    def _score_rooms_for_block_group_vectorized(
+        self,
+        demanda,
+        block_group: BlockGroup,
+        hard_rules: List,
+        professor_prefs: Dict,
+        semester_id: int,
+        top_k: Optional[int],
+    ) -> List[BlockGroupRoomScore]:
+        """
+        Vectorized counterpart of score_rooms_for_block_group.
+
+        Ranks every room from the score arrays and builds BlockGroupRoomScore
+        objects (with names and breakdowns) only for the returned rooms.
+        """
+        engine = self._vectorized_engine
+        scores = engine.score_block_group(
+            demanda, block_group.day_id, hard_rules, professor_prefs, semester_id
+        )
+        rooms = engine.columns.rooms
+
+        conflicting_room_ids = self._get_conflicting_room_ids(
+            slot_mask(block_group.get_atomic_tuples()), semester_id
+        )
+        conflicts_by_row = []
+        for room in rooms:
+            if conflicting_room_ids is not None and room.id not in conflicting_room_ids:
+                conflicts_by_row.append([])
+            else:
+                conflicts_by_row.append(
+                    self._check_block_group_conflicts(room.id, block_group, semester_id)
+                )
+
+        # Same ordering as the per-room path: stable sort on (score, no conflict)
+        order = sorted(
+            range(len(rooms)),
+            key=lambda row: (int(scores.total[row]), not conflicts_by_row[row]),
+            reverse=True,
+        )
+        if top_k is not None:
+            order = order[:top_k]
+
+        building_names: Dict[int, str] = {}
+        room_type_names: Dict[int, str] = {}
+        results = []
+        for row in order:
+            room = rooms[row]
+
+            breakdown = BlockGroupScoringBreakdown(
+                total_score=int(scores.total[row]),
+                capacity_points=int(scores.capacity_points[row]),
+                hard_rules_points=int(scores.hard_rules_points[row]),
+                soft_preference_points=int(scores.soft_preference_points[row]),
+                historical_frequency_points=int(
+                    scores.historical_frequency_points[row]
+                ),
+                hybrid_bonus_points=int(scores.hybrid_bonus_points[row]),
+                capacity_satisfied=bool(scores.capacity_satisfied[row]),
+                historical_allocations=int(scores.historical_allocations[row]),
+                hybrid_room_type_match=bool(scores.hybrid_bonus_points[row] > 0),
+            )
+            self._fill_rule_details_from_vectorized(breakdown, scores, row)
+
+            if room.predio_id not in building_names:
+                building_names[room.predio_id] = (
+                    self._get_building_name(room.predio_id) if room.predio_id else "N/A"
+                )
+            if room.tipo_sala_id not in room_type_names:
+                room_type_names[room.tipo_sala_id] = (
+                    self._get_room_type_name_by_id(room.tipo_sala_id)
+                    if room.tipo_sala_id
+                    else "N/A"
+                )
+
+            results.append(
+                BlockGroupRoomScore(
+                    block_group=block_group,
+                    room_id=room.id,
+                    room_name=room.nome,
+                    room_capacity=room.capacidade or 0,
+                    room_type=room_type_names[room.tipo_sala_id],
+                    building_name=building_names[room.predio_id],
+                    score=breakdown.total_score,
+                    breakdown=breakdown,
+                    has_conflict=len(conflicts_by_row[row]) > 0,
+                    conflict_details=conflicts_by_row[row],
+                )
+            )
+
+        return results
 
     def score_rooms_for_all_block_groups(
         self,
@@ -633,6 +1013,15 @@ class RoomScoringService:
         """
         conflicts = []
 
+        if self._occupancy_index is not None and self._occupancy_index.covers(
+            semester_id
+        ):
+            for block_code, _ in self._occupancy_index.conflicting_slots(
+                sala_id, block_group.get_atomic_tuples()
+            ):
+                conflicts.append(f"{block_group.day_name} {block_code} já alocado")
+            return conflicts
+
         for block_code in block_group.blocks:
             has_conflict = self.alocacao_repo.check_conflict(
                 sala_id, block_group.day_id, block_code, semestre_id=semester_id
@@ -645,10 +1034,39 @@ class RoomScoringService:
 
         return conflicts
 
+    def _get_conflicting_room_ids(
+        self, schedule_mask: int, semester_id: int
+    ) -> Optional[set]:
+        """
+        Get IDs of all rooms with conflicts for the given slots in one pass.
+
+        Args:
+            schedule_mask: Slot bitmask of the demand (ParsedSchedule.slot_mask)
+            semester_id: Semester to check conflicts within
+
+        Returns:
+            Set of conflicting room IDs, or None if no occupancy index covers
+            the semester (callers must then fall back to per-room checks)
+        """
+        if self._occupancy_index is None or not self._occupancy_index.covers(
+            semester_id
+        ):
+            return None
+
+        return self._occupancy_index.conflicting_rooms(schedule_mask)
+
+    def _get_all_rooms(self) -> List:
+        """Get all rooms, from the inventory snapshot when available."""
+        if self._inventory_snapshot is not None:
+            return self._inventory_snapshot.get_rooms()
+        return self.sala_repo.get_all()
+
     def _get_building_name(self, predio_id: int) -> str:
         """Get building name by ID."""
         if not predio_id:
             return "N/A"
+        if self._inventory_snapshot is not None:
+            return self._inventory_snapshot.get_building_name(predio_id)
         stmt = text("SELECT nome FROM predios WHERE id = :pid")
         row = self.session.execute(stmt, {"pid": predio_id}).fetchone()
         return row[0] if row else "N/A"
@@ -816,58 +1234,34 @@ class RoomScoringService:
 
         return breakdown
 
-    def _check_rule_compliance(self, room, demanda, rule) -> bool:
-        """Check if room complies with a specific rule."""
-        import json
-
-        try:
-            config = json.loads(rule.config_json)
-
-            if rule.tipo_regra == "DISCIPLINA_TIPO_SALA":
-                required_type_id = config.get("tipo_sala_id")
-                result = room.tipo_sala_id == required_type_id
-                logger.debug(
-                    f"Rule check DISCIPLINA_TIPO_SALA: {rule.descricao} | "
-                    f"Room {room.nome} tipo_sala_id={room.tipo_sala_id} | "
-                    f"Required tipo_sala_id={required_type_id} | "
-                    f"Match: {result}"
-                )
-                return result
+    def _find_rules_by_disciplina(self, codigo_disciplina: str) -> List:
+        """Get the rules of a discipline from the compiled rule index."""
+        rule_set = self._rule_set or get_compiled_rule_set(self.session)
+        return rule_set.rules_for(codigo_disciplina)
 
-            elif rule.tipo_regra == "DISCIPLINA_SALA":
-                required_room_id = config.get("sala_id")
-                result = room.id == required_room_id
-                logger.debug(
-                    f"Rule check DISCIPLINA_SALA: {rule.descricao} | "
-                    f"Room id={room.id} | Required room_id={required_room_id} | "
-                    f"Match: {result}"
-                )
-                return result
+    def _compile_rule(self, rule) -> CompiledRule:
+        """Get the compiled form of a rule (parsed once per run with a rule set)."""
+        if self._rule_set is not None:
+            return self._rule_set.compiled(rule)
+        return compile_rule(rule)
 
-            elif rule.tipo_regra == "DISCIPLINA_CARACTERISTICA":
-                required_char = config.get("caracteristica_nome")
-                room_chars = self._get_room_characteristics(room.id)
-                char_names = [self._get_characteristic_name(cid) for cid in room_chars]
-                result = required_char in char_names
-                logger.debug(
-                    f"Rule check DISCIPLINA_CARACTERISTICA: {rule.descricao} | "
-                    f"Room {room.nome} chars={char_names} | "
-                    f"Required char={required_char} | "
-                    f"Match: {result}"
-                )
-                return result
-
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(
-                f"Rule compliance check failed for {rule.descricao}: {e} | "
-                f"config_json={rule.config_json}"
-            )
-            return False
-
-        logger.warning(
-            f"Unknown rule type: {rule.tipo_regra} for rule {rule.descricao}"
+    def _check_rule_compliance(self, room, demanda, rule) -> bool:
+        """Check if room complies with a specific rule."""
+        compiled = self._compile_rule(rule)
+
+        char_names = ()
+        if compiled.valid and compiled.tipo_regra == RULE_TYPE_CHARACTERISTIC:
+            char_names = [
+                self._get_characteristic_name(cid)
+                for cid in self._get_room_characteristics(room.id)
+            ]
+
+        result = compiled.matches(room, char_names)
+        logger.debug(
+            f"Rule check {rule.tipo_regra}: {rule.descricao} | "
+            f"Room {room.nome} | Match: {result}"
         )
-        return False
+        return result
 
     def _check_allocation_conflicts_semester_isolated(
         self, candidate: RoomCandidate, semester_id: int
@@ -877,6 +1271,21 @@ class RoomScoringService:
         """
         conflicts = []
 
+        if self._occupancy_index is not None and self._occupancy_index.covers(
+            semester_id
+        ):
+            for bloco_codigo, dia_sigaa in self._occupancy_index.conflicting_slots(
+                candidate.sala.id, candidate.atomic_blocks
+            ):
+                conflicts.append(
+                    {
+                        "dia_sigaa": dia_sigaa,
+                        "codigo_bloco": bloco_codigo,
+                        "sala_id": candidate.sala.id,
+                    }
+                )
+            return conflicts
+
         for bloco_codigo, dia_sigaa in candidate.atomic_blocks:
             # Check for conflicts IN THE SPECIFIED SEMESTER only
             has_conflict = self.alocacao_repo.check_conflict(
@@ -903,6 +1312,9 @@ class RoomScoringService:
         if not professor:
             return prefs
 
+        if self._preference_index is not None:
+            return self._preference_index.preferences_for(professor.id)
+
         # Get room preferences
         stmt = text(
             "SELECT sala_id FROM professor_prefere_sala WHERE professor_id = :prof_id"
@@ -942,10 +1354,14 @@ class RoomScoringService:
         Returns:
             Historical frequency points (already capped at MAX_CAP value)
         """
-        # Use existing repository method to get frequency count
-        frequency = self.alocacao_repo.get_discipline_room_frequency(
-            disciplina_codigo, sala_id, exclude_semester_id
-        )
+        # Use the precomputed index when available, else the repository count
+        frequency_index = self._historical_frequency_index
+        if frequency_index is not None and frequency_index.covers(exclude_semester_id):
+            frequency = frequency_index.room_frequency(disciplina_codigo, sala_id)
+        else:
+            frequency = self.alocacao_repo.get_discipline_room_frequency(
+                disciplina_codigo, sala_id, exclude_semester_id
+            )
 
         # Calculate points: frequency (count) × weight (points per allocation)
         historical_points = (
@@ -981,10 +1397,16 @@ class RoomScoringService:
         Returns:
             Historical frequency points for this day (capped at MAX_CAP value)
         """
-        # Use new repository method to get day-specific frequency count
-        frequency = self.alocacao_repo.get_discipline_room_day_frequency(
-            disciplina_codigo, sala_id, dia_semana_id, exclude_semester_id
-        )
+        # Use the precomputed index when available, else the repository count
+        frequency_index = self._historical_frequency_index
+        if frequency_index is not None and frequency_index.covers(exclude_semester_id):
+            frequency = frequency_index.room_day_frequency(
+                disciplina_codigo, sala_id, dia_semana_id
+            )
+        else:
+            frequency = self.alocacao_repo.get_discipline_room_day_frequency(
+                disciplina_codigo, sala_id, dia_semana_id, exclude_semester_id
+            )
 
         # Calculate points: frequency (count) × weight (points per allocation)
         historical_points = (
@@ -994,32 +1416,59 @@ class RoomScoringService:
         # Cap at maximum POINTS (not maximum allocations)
         return min(historical_points, SCORING_WEIGHTS.HISTORICAL_FREQUENCY_MAX_CAP)
 
-    def _lookup_professors_for_demands_from_objects(
-        self, demands
-    ) -> Dict[int, Optional[Professor]]:
-        """Lookup professors for demand objects."""
-        professor_map = {}
+    def _get_historical_frequency_counts(
+        self,
+        disciplina_codigo: str,
+        sala_ids: List[int],
+        exclude_semester_id: int,
+        dia_semana_id: Optional[int] = None,
+    ) -> Dict[int, int]:
+        """
+        Get historical allocation counts of a discipline for many rooms at once.
 
-        for demanda in demands:
-            demanda_id = demanda.id
-            prof_text = demanda.professores_disciplina.strip()
+        Args:
+            disciplina_codigo: Discipline code
+            sala_ids: Room IDs to count for
+            exclude_semester_id: Semester ID to exclude (current semester)
+            dia_semana_id: Optional day to restrict the count to
 
-            if prof_text:
-                # Support multiple professors (take first match)
-                prof_names = [name.strip() for name in prof_text.split(",")]
-                professor = None
+        Returns:
+            Dict mapping sala_id to allocation count (rooms without history may be absent)
+        """
+        frequency_index = self._historical_frequency_index
+        if frequency_index is not None and frequency_index.covers(exclude_semester_id):
+            if dia_semana_id is None:
+                return {
+                    sala_id: frequency_index.room_frequency(disciplina_codigo, sala_id)
+                    for sala_id in sala_ids
+                }
+            return {
+                sala_id: frequency_index.room_day_frequency(
+                    disciplina_codigo, sala_id, dia_semana_id
+                )
+                for sala_id in sala_ids
+            }
 
-                for prof_name in prof_names:
-                    professor = self.prof_repo.get_by_nome_completo(prof_name)
-                    if professor:
-                        break
+        if dia_semana_id is None:
+            return self.alocacao_repo.get_discipline_room_frequencies_bulk(
+                disciplina_codigo, sala_ids, exclude_semester_id
+            )
 
-                professor_map[demanda_id] = professor
+        day_counts = self.alocacao_repo.get_discipline_room_day_frequencies_bulk(
+            disciplina_codigo, sala_ids, [dia_semana_id], exclude_semester_id
+        )
+        return {sala_id: count for (sala_id, _), count in day_counts.items()}
 
-        return professor_map
+    def _lookup_professors_for_demands_from_objects(
+        self, demands
+    ) -> Dict[int, Optional[Professor]]:
+        """Lookup professors for demand objects (first matching name)."""
+        return self._get_professor_index().resolve_demands(demands)
 
     def _get_room_characteristics(self, sala_id: int):
         """Get characteristic IDs for a room."""
+        if self._inventory_snapshot is not None:
+            return self._inventory_snapshot.get_room_characteristics(sala_id)
         stmt = text(
             "SELECT caracteristica_id FROM sala_caracteristicas WHERE sala_id = :sala_id"
         )
@@ -1028,6 +1477,8 @@ class RoomScoringService:
 
     def _get_characteristic_name(self, caracteristica_id: int) -> str:
         """Get characteristic name by ID."""
+        if self._inventory_snapshot is not None:
+            return self._inventory_snapshot.get_characteristic_name(caracteristica_id)
         stmt = text("SELECT nome FROM caracteristicas WHERE id = :cid")
         row = self.session.execute(stmt, {"cid": caracteristica_id}).fetchone()
         return row[0] if row else ""
@@ -1064,6 +1515,8 @@ class RoomScoringService:
         """Get room type name by ID."""
         if not tipo_sala_id:
             return "N/A"
+        if self._inventory_snapshot is not None:
+            return self._inventory_snapshot.get_room_type_name(tipo_sala_id)
         stmt = text("SELECT nome FROM tipos_sala WHERE id = :tid")
         row = self.session.execute(stmt, {"tid": tipo_sala_id}).fetchone()
         return row[0] if row else "N/A"
@@ -1072,6 +1525,8 @@ class RoomScoringService:
         """Get room name by ID."""
         if not sala_id:
             return "N/A"
+        if self._inventory_snapshot is not None:
+            return self._inventory_snapshot.get_room_name(sala_id)
         stmt = text("SELECT nome FROM salas WHERE id = :sid")
         row = self.session.execute(stmt, {"sid": sala_id}).fetchone()
         return row[0] if row else "N/A"
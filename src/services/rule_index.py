@@ -0,0 +1,256 @@
+"""
+Compiled Rule Index - Allocation rules parsed once and keyed by discipline code.
+
+Rules (regras) store their parameters as JSON text. Looking them up with
+LIKE '%CODE%' cannot use an index and matches codes that merely contain the
+requested one (FUP001 also matches FUP0012), and rule checks used to re-parse
+the JSON for every room.
+
+CompiledRuleSet parses every Regra once into a CompiledRule (typed predicate)
+and indexes them by codigo_disciplina. A process-wide instance is shared via
+get_compiled_rule_set() and dropped by invalidate_compiled_rules(), which
+RegraRepository calls whenever a rule is created, updated or deleted. A cheap
+fingerprint query also detects changes made outside the application.
+"""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.models.allocation import Regra
+from src.repositories.regra import RegraRepository
+from src.schemas.allocation import RegraRead
+
+logger = logging.getLogger(__name__)
+
+RULE_TYPE_ROOM_TYPE = "DISCIPLINA_TIPO_SALA"
+RULE_TYPE_ROOM = "DISCIPLINA_SALA"
+RULE_TYPE_CHARACTERISTIC = "DISCIPLINA_CARACTERISTICA"
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A rule with its JSON configuration parsed into typed fields."""
+
+    regra: RegraRead
+    codigo_disciplina: Optional[str] = None
+    tipo_sala_id: Any = None
+    sala_id: Any = None
+    caracteristica_nome: Optional[str] = None
+    valid: bool = True  # False when config_json could not be parsed
+
+    @property
+    def tipo_regra(self) -> str:
+        return self.regra.tipo_regra
+
+    @property
+    def is_hard(self) -> bool:
+        return self.regra.prioridade == 0
+
+    def matches(self, room, characteristic_names: Iterable[str]) -> bool:
+        """
+        Check whether a single room complies with the rule.
+
+        Args:
+            room: Room DTO or ORM object
+            characteristic_names: Names of the room's characteristics
+
+        Returns:
+            True if the room satisfies the rule
+        """
+        if not self.valid:
+            return False
+        if self.tipo_regra == RULE_TYPE_ROOM_TYPE:
+            return room.tipo_sala_id == self.tipo_sala_id
+        if self.tipo_regra == RULE_TYPE_ROOM:
+            return room.id == self.sala_id
+        if self.tipo_regra == RULE_TYPE_CHARACTERISTIC:
+            return self.caracteristica_nome in characteristic_names
+        return False
+
+    def mask(self, columns) -> np.ndarray:
+        """
+        Evaluate the rule for every room at once.
+
+        Args:
+            columns: RoomColumns of the room inventory
+
+        Returns:
+            Boolean array, True where the room satisfies the rule
+        """
+        n_rooms = len(columns)
+        if not self.valid:
+            return np.zeros(n_rooms, dtype=bool)
+
+        if self.tipo_regra == RULE_TYPE_ROOM_TYPE:
+            if isinstance(self.tipo_sala_id, (int, float)):
+                return columns.tipo_sala_ids == self.tipo_sala_id
+            return np.zeros(n_rooms, dtype=bool)
+
+        if self.tipo_regra == RULE_TYPE_ROOM:
+            if isinstance(self.sala_id, (int, float)):
+                return columns.ids == self.sala_id
+            return np.zeros(n_rooms, dtype=bool)
+
+        if self.tipo_regra == RULE_TYPE_CHARACTERISTIC:
+            return columns.has_any_characteristic(
+                columns.ids_with_characteristic_name(self.caracteristica_nome)
+            )
+
+        return np.zeros(n_rooms, dtype=bool)
+
+
+def compile_rule(regra) -> CompiledRule:
+    """
+    Parse a rule's JSON configuration once.
+
+    Args:
+        regra: RegraRead DTO (or any object with the same attributes)
+
+    Returns:
+        CompiledRule (marked invalid if the configuration cannot be used)
+    """
+    try:
+        config = json.loads(regra.config_json)
+        if not isinstance(config, dict):
+            raise ValueError("config_json is not an object")
+    except (json.JSONDecodeError, TypeError, ValueError) as e:
+        logger.error(
+            f"Rule compliance check failed for {regra.descricao}: {e} | "
+            f"config_json={regra.config_json}"
+        )
+        return CompiledRule(regra=regra, valid=False)
+
+    if regra.tipo_regra not in (
+        RULE_TYPE_ROOM_TYPE,
+        RULE_TYPE_ROOM,
+        RULE_TYPE_CHARACTERISTIC,
+    ):
+        logger.warning(f"Unknown rule type: {regra.tipo_regra} for rule {regra.descricao}")
+
+    return CompiledRule(
+        regra=regra,
+        codigo_disciplina=config.get("codigo_disciplina"),
+        tipo_sala_id=config.get("tipo_sala_id"),
+        sala_id=config.get("sala_id"),
+        caracteristica_nome=config.get("caracteristica_nome"),
+    )
+
+
+def _rule_order_key(regra) -> Tuple:
+    """Same order as RegraRepository.find_rules_by_disciplina (NULL priority first)."""
+    return (
+        regra.prioridade is not None,
+        regra.prioridade or 0,
+        regra.tipo_regra,
+        regra.id,
+    )
+
+
+class CompiledRuleSet:
+    """All rules compiled once, with a dict lookup by discipline code."""
+
+    def __init__(self, regras: Iterable, fingerprint: Optional[Tuple] = None):
+        """
+        Initialize rule set.
+
+        Args:
+            regras: RegraRead DTOs to compile
+            fingerprint: Database state the rules were loaded from (see load)
+        """
+        self.fingerprint = fingerprint
+        self._by_id: Dict[int, CompiledRule] = {}
+        self._by_code: Dict[str, List[CompiledRule]] = {}
+
+        for regra in sorted(regras, key=_rule_order_key):
+            compiled = compile_rule(regra)
+            self._by_id[regra.id] = compiled
+            if compiled.codigo_disciplina:
+                self._by_code.setdefault(compiled.codigo_disciplina, []).append(
+                    compiled
+                )
+
+    @classmethod
+    def load(cls, session: Session) -> "CompiledRuleSet":
+        """
+        Load and compile every rule.
+
+        Args:
+            session: SQLAlchemy session
+
+        Returns:
+            CompiledRuleSet for the current database state
+        """
+        fingerprint = _rules_fingerprint(session)
+        rule_set = cls(RegraRepository(session).get_all(), fingerprint)
+        logger.debug(
+            f"Compiled {len(rule_set._by_id)} rules for "
+            f"{len(rule_set._by_code)} disciplines"
+        )
+        return rule_set
+
+    def rules_for(self, codigo_disciplina: str) -> List[RegraRead]:
+        """Get the rules of a discipline, ordered by priority and type."""
+        return [c.regra for c in self._by_code.get(codigo_disciplina, [])]
+
+    def compiled_rules_for(self, codigo_disciplina: str) -> List[CompiledRule]:
+        """Get the compiled rules of a discipline, ordered by priority and type."""
+        return list(self._by_code.get(codigo_disciplina, []))
+
+    def compiled(self, regra) -> CompiledRule:
+        """
+        Get the compiled form of a rule.
+
+        Rules that are not part of the set (or changed since it was built) are
+        compiled on the fly.
+        """
+        compiled = self._by_id.get(regra.id)
+        if compiled is not None and compiled.regra.config_json == regra.config_json:
+            return compiled
+        return compile_rule(regra)
+
+
+def _rules_fingerprint(session: Session) -> Tuple:
+    """Cheap summary of the regras table used to detect outside changes."""
+    row = session.query(
+        func.count(Regra.id), func.max(Regra.id), func.max(Regra.updated_at)
+    ).one()
+    return tuple(row)
+
+
+# Process-wide compiled rule set (see get_compiled_rule_set)
+_rule_set: Optional[CompiledRuleSet] = None
+_rule_set_lock = threading.Lock()
+
+
+def get_compiled_rule_set(session: Session) -> CompiledRuleSet:
+    """
+    Get the shared compiled rule set, rebuilding it if rules changed.
+
+    Args:
+        session: SQLAlchemy session
+
+    Returns:
+        Up-to-date CompiledRuleSet
+    """
+    global _rule_set
+
+    fingerprint = _rules_fingerprint(session)
+    with _rule_set_lock:
+        if _rule_set is None or _rule_set.fingerprint != fingerprint:
+            _rule_set = CompiledRuleSet(RegraRepository(session).get_all(), fingerprint)
+        return _rule_set
+
+
+def invalidate_compiled_rules() -> None:
+    """Drop the shared compiled rule set (called after rule writes)."""
+    global _rule_set
+
+    with _rule_set_lock:
+        _rule_set = None
@@ -0,0 +1,266 @@
+"""
+Semester Grid Service - Process-wide cache of a semester's allocation grid.
+
+The Home and Visualização pages used to reload every allocation of the
+semester (with its demand), the room list and the demand list on each
+Streamlit rerun, i.e. on every filter change, and then find each
+allocation's building with a linear scan over the rooms.
+
+SemesterGrid is built once per semester and data version and shared by every
+session of the process. It holds room → day → block → slot (each slot points
+to the shared DemandaRead of its demand), the rooms of each building and the
+discipline/professor filter options, so the page filters are in-memory
+slices.
+
+Invalidation is exact, not TTL based: database triggers bump the
+versoes_dados rows on every write to the semester's allocations or demands
+and to rooms/buildings (see src/models/allocation.py), and get_semester_grid
+compares the cached version with one indexed lookup. Because the version
+lives in the database, writes made by other processes (e.g. the allocation
+job workers) invalidate the cache too.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.database import get_db_session
+from src.repositories.alocacao import AlocacaoRepository
+from src.repositories.disciplina import DisciplinaRepository
+from src.repositories.predio import PredioRepository
+from src.repositories.sala import SalaRepository
+from src.schemas.academic import DemandaRead
+from src.schemas.inventory import SalaRead
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GridSlot:
+    """One allocated (room, day, block) slot of the semester grid.
+
+    Exposes the same attributes as AlocacaoSemestralRead that the schedule
+    grids, the PDF report and the statistics report read.
+    """
+
+    sala_id: int
+    dia_semana_id: int
+    codigo_bloco: str
+    demanda_id: int
+    demanda: Optional[DemandaRead]
+
+
+def split_professors(professores_disciplina: Optional[str]) -> List[str]:
+    """Split a demand's professor field on the common separators (; / ,)."""
+    if not professores_disciplina or not professores_disciplina.strip():
+        return []
+    return [
+        p.strip()
+        for p in professores_disciplina.replace(";", ",").replace("/", ",").split(",")
+        if p.strip()
+    ]
+
+
+@dataclass
+class SemesterGrid:
+    """Allocation grid of one semester, indexed for the page filters."""
+
+    semestre_id: int
+    versao: Tuple[int, int]
+    rooms: List[SalaRead]
+    room_labels: Dict[int, str]  # sala_id -> "Prédio: Sala"
+    predio_options: Dict[int, str]
+    disciplina_options: Dict[str, str]  # codigo -> "codigo - nome"
+    professor_options: Dict[str, str]
+    # sala_id -> dia_semana_id -> codigo_bloco -> slot (rooms in the order of
+    # their first allocation, as the pages used to group them)
+    cells: Dict[int, Dict[int, Dict[str, GridSlot]]]
+    rooms_by_predio: Dict[int, List[int]] = field(default_factory=dict)
+    slots: List[GridSlot] = field(default_factory=list)
+
+    @classmethod
+    def build(
+        cls,
+        semestre_id: int,
+        versao: Tuple[int, int],
+        slot_rows: List[Tuple[int, int, int, str]],
+        demandas: List[DemandaRead],
+        rooms: List[SalaRead],
+        predio_options: Dict[int, str],
+    ) -> "SemesterGrid":
+        """
+        Build the grid from already loaded rows.
+
+        Args:
+            semestre_id: Semester ID
+            versao: (semester version, inventory version) the rows were read at
+            slot_rows: (demanda_id, sala_id, dia_semana_id, codigo_bloco) rows
+            demandas: Demands of the semester
+            rooms: All rooms
+            predio_options: predio_id -> building name
+
+        Returns:
+            SemesterGrid
+        """
+        room_labels = {
+            sala.id: f"{predio_options.get(sala.predio_id, '')}: {sala.nome}"
+            for sala in rooms
+        }
+        rooms_by_predio: Dict[int, List[int]] = {}
+        for sala in rooms:
+            rooms_by_predio.setdefault(sala.predio_id, []).append(sala.id)
+
+        demandas_by_id = {d.id: d for d in demandas}
+        disciplina_options: Dict[str, str] = {}
+        professor_options: Dict[str, str] = {}
+        for demanda in demandas:
+            disciplina_options.setdefault(
+                demanda.codigo_disciplina,
+                f"{demanda.codigo_disciplina} - {demanda.nome_disciplina}",
+            )
+            for professor in split_professors(demanda.professores_disciplina):
+                professor_options.setdefault(professor, professor)
+
+        cells: Dict[int, Dict[int, Dict[str, GridSlot]]] = {}
+        slots: List[GridSlot] = []
+        for demanda_id, sala_id, dia_semana_id, codigo_bloco in slot_rows:
+            slot = GridSlot(
+                sala_id=sala_id,
+                dia_semana_id=dia_semana_id,
+                codigo_bloco=codigo_bloco,
+                demanda_id=demanda_id,
+                demanda=demandas_by_id.get(demanda_id),
+            )
+            slots.append(slot)
+            cells.setdefault(sala_id, {}).setdefault(dia_semana_id, {})[
+                codigo_bloco
+            ] = slot
+
+        return cls(
+            semestre_id=semestre_id,
+            versao=versao,
+            rooms=rooms,
+            room_labels=room_labels,
+            predio_options=predio_options,
+            disciplina_options=disciplina_options,
+            professor_options=professor_options,
+            cells=cells,
+            rooms_by_predio=rooms_by_predio,
+            slots=slots,
+        )
+
+    def room_slots(self, sala_id: int) -> List[GridSlot]:
+        """Get every slot of a room (ordered by day, then block insertion)."""
+        return [
+            slot
+            for day in self.cells.get(sala_id, {}).values()
+            for slot in day.values()
+        ]
+
+    def room_allocations(
+        self,
+        predio_id: Optional[int] = None,
+        sala_id: Optional[int] = None,
+        codigo_disciplina: Optional[str] = None,
+        professor: Optional[str] = None,
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Slice the grid by the page filters (None means no filter).
+
+        The professor filter matches slots whose professores_disciplina
+        contains the given name, as the pages always did.
+
+        Returns:
+            Dict room_id -> {"room_name": str, "allocations": [GridSlot]} with
+            the rooms that have at least one matching slot
+        """
+        room_ids = list(self.cells.keys())
+        if sala_id is not None:
+            room_ids = [r for r in room_ids if r == sala_id]
+        if predio_id is not None:
+            in_predio = set(self.rooms_by_predio.get(predio_id, []))
+            # Rooms missing from the inventory are kept, as before
+            room_ids = [
+                r for r in room_ids if r in in_predio or r not in self.room_labels
+            ]
+
+        result: Dict[int, Dict[str, Any]] = {}
+        for room_id in room_ids:
+            allocations = self.room_slots(room_id)
+            if codigo_disciplina is not None:
+                allocations = [
+                    s
+                    for s in allocations
+                    if s.demanda and s.demanda.codigo_disciplina == codigo_disciplina
+                ]
+            if professor is not None:
+                allocations = [
+                    s
+                    for s in allocations
+                    if s.demanda
+                    and s.demanda.professores_disciplina
+                    and professor in s.demanda.professores_disciplina
+                ]
+            if allocations:
+                result[room_id] = {
+                    "room_name": self.room_labels.get(room_id, f"Sala {room_id}"),
+                    "allocations": allocations,
+                }
+        return result
+
+
+# Process-wide cache: semestre_id -> SemesterGrid
+_grid_cache: Dict[int, SemesterGrid] = {}
+_grid_cache_lock = threading.Lock()
+
+
+def get_semester_grid(semestre_id: int) -> SemesterGrid:
+    """
+    Get the allocation grid of a semester, rebuilding it if the data changed.
+
+    A cache hit costs one indexed query on versoes_dados.
+
+    Args:
+        semestre_id: Semester ID
+
+    Returns:
+        SemesterGrid (shared, treat as read-only)
+    """
+    with get_db_session(read_only=True) as session:
+        aloc_repo = AlocacaoRepository(session)
+        # Read the version before the data: a write landing in between makes
+        # the next call rebuild again instead of caching stale rows
+        versao = aloc_repo.get_data_version(semestre_id)
+
+        cached = _grid_cache.get(semestre_id)
+        if cached is not None and cached.versao == versao:
+            return cached
+
+        with _grid_cache_lock:
+            cached = _grid_cache.get(semestre_id)
+            if cached is not None and cached.versao == versao:
+                return cached
+
+            grid = SemesterGrid.build(
+                semestre_id=semestre_id,
+                versao=versao,
+                slot_rows=aloc_repo.get_grid_slots_by_semestre(semestre_id),
+                demandas=DisciplinaRepository(session).get_by_semestre(semestre_id),
+                rooms=SalaRepository(session).get_all(),
+                predio_options={
+                    p.id: p.nome for p in PredioRepository(session).get_all()
+                },
+            )
+            _grid_cache[semestre_id] = grid
+            logger.debug(
+                f"Semester grid {semestre_id} rebuilt at version {versao}: "
+                f"{len(grid.slots)} slots"
+            )
+            return grid
+
+
+def clear_semester_grid_cache() -> None:
+    """Drop every cached semester grid (e.g. after restoring a backup)."""
+    with _grid_cache_lock:
+        _grid_cache.clear()
@@ -1,16 +1,23 @@
-from typing import Dict, Set, Any, List
+from datetime import datetime
+from typing import Dict, Set, Any, List, Tuple
 import logging
 import re
 from sqlalchemy.exc import IntegrityError
 
 from src.config.database import get_db_session
 from src.services.oferta_api import fetch_ofertas, OfertaAPIError
+from src.services.professor_name_index import (
+    get_professor_name_index,
+    normalize_professor_name,
+)
 from src.repositories.semestre import SemestreRepository
+from src.repositories.alocacao import AlocacaoRepository
 from src.repositories.disciplina import DisciplinaRepository
 from src.repositories.professor import ProfessorRepository
 from src.models.academic import Semestre
 from src.schemas.academic import (
     DemandaCreate,
+    DemandaRead,
     ProfessorCreate,
     SemestreCreate,
     SemestreUpdate,
@@ -68,12 +75,214 @@ def _extract_professores_string(prof_list: Any) -> str:
     return ", ".join(names)
 
 
+# Rows per bulk INSERT; an IntegrityError skips only the batch it occurred in
+BULK_INSERT_BATCH_SIZE = 500
+
+
+def _insert_demandas_in_batches(
+    session, dem_repo: DisciplinaRepository, rows: List[Dict[str, Any]], summary, logger
+) -> None:
+    """Bulk insert new demandas, one savepoint per batch."""
+    for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+        batch = rows[start : start + BULK_INSERT_BATCH_SIZE]
+        try:
+            with session.begin_nested():
+                dem_repo.bulk_insert(batch)
+            summary["demandas"] += len(batch)
+            summary["diff"]["created"].extend(row["id_oferta_externo"] for row in batch)
+        except Exception as e:
+            is_integrity_error = isinstance(e, IntegrityError)
+            message = str(e.orig) if is_integrity_error else str(e)
+            for row in batch:
+                summary["skipped"] += 1
+                summary["skipped_details"].append(
+                    {
+                        "oferta_key": row["id_oferta_externo"],
+                        "codigo": row["codigo_disciplina"],
+                        "turma": row["turma_disciplina"],
+                        "reason": "integrity_error" if is_integrity_error else "exception",
+                        "message": message,
+                    }
+                )
+            if is_integrity_error:
+                logger.warning(
+                    "IntegrityError inserting %d demandas, batch skipped: %s",
+                    len(batch),
+                    message,
+                )
+            else:
+                logger.exception(
+                    "Exception while inserting %d demandas, batch skipped", len(batch)
+                )
+
+
+# Demanda columns filled from an oferta; compared to detect changed offers
+SYNC_FIELDS = (
+    "codigo_disciplina",
+    "nome_disciplina",
+    "turma_disciplina",
+    "vagas_disciplina",
+    "horario_sigaa_bruto",
+    "professores_disciplina",
+    "codigo_curso",
+)
+
+# Share of the semester's API-synced demandas an incremental sync may delete
+# without confirmation (a truncated payload must not wipe the semester)
+MAX_UNCONFIRMED_REMOVAL_SHARE = 0.2
+
+
+def _changed_fields(existing: DemandaRead, row: Dict[str, Any]) -> List[str]:
+    """List the synced fields that differ between a demanda and its offer."""
+    current = existing.model_dump()
+    return [field for field in SYNC_FIELDS if current.get(field) != row.get(field)]
+
+
+def _apply_incremental_changes(
+    session,
+    dem_repo: DisciplinaRepository,
+    existing_by_external_id: Dict[str, DemandaRead],
+    changed: List[Tuple[DemandaRead, Dict[str, Any], List[str]]],
+    payload_keys: Set[str],
+    summary,
+    logger,
+    confirm_removals: bool = False,
+) -> None:
+    """
+    Update changed demandas, delete removed offers and invalidate stale allocations.
+
+    Only allocation rows whose (day, block) is no longer part of the new
+    schedule are deleted; the rest of the demand's allocation is kept.
+
+    Removed offers are not deleted when the payload is empty, nor when they
+    exceed MAX_UNCONFIRMED_REMOVAL_SHARE of the existing offers without
+    confirm_removals; they are then listed in diff['pending_removals'] and
+    summary['removal_blocked'] tells why.
+    """
+    aloc_repo = AlocacaoRepository(session)
+    diff = summary["diff"]
+    now = datetime.utcnow()
+
+    # 1. Changed offers: one executemany UPDATE
+    update_rows = []
+    new_blocks: Dict[int, Set[Tuple[str, int]]] = {}
+    external_id_by_demanda: Dict[int, str] = {}
+    for existing, row, fields in changed:
+        update_rows.append(
+            {"id": existing.id, **{f: row[f] for f in SYNC_FIELDS}, "updated_at": now}
+        )
+        diff["updated"].append(
+            {
+                "oferta_key": existing.id_oferta_externo,
+                "demanda_id": existing.id,
+                "fields": fields,
+            }
+        )
+        if "horario_sigaa_bruto" in fields:
+            new_blocks[existing.id] = set(
+                parser.split_to_atomic_tuples(row["horario_sigaa_bruto"])
+            )
+            external_id_by_demanda[existing.id] = existing.id_oferta_externo
+    summary["updated"] += dem_repo.bulk_update(update_rows)
+
+    # 2. Removed offers (API-synced demandas absent from the payload)
+    removed = [
+        demanda
+        for external_id, demanda in existing_by_external_id.items()
+        if external_id not in payload_keys
+    ]
+    if removed and not payload_keys:
+        summary["removal_blocked"] = "empty_payload"
+    elif (
+        removed
+        and not confirm_removals
+        and len(removed) > MAX_UNCONFIRMED_REMOVAL_SHARE * len(existing_by_external_id)
+    ):
+        summary["removal_blocked"] = "needs_confirmation"
+
+    removal_list = (
+        diff["pending_removals"] if summary["removal_blocked"] else diff["removed"]
+    )
+    for demanda in removed:
+        removal_list.append(
+            {
+                "oferta_key": demanda.id_oferta_externo,
+                "demanda_id": demanda.id,
+                "codigo": demanda.codigo_disciplina,
+                "turma": demanda.turma_disciplina,
+            }
+        )
+    if summary["removal_blocked"]:
+        logger.warning(
+            "Incremental sync: %d of %d offers missing from the payload, "
+            "not removed (%s)",
+            len(removed),
+            len(existing_by_external_id),
+            summary["removal_blocked"],
+        )
+        removed = []
+
+    removed_ids = {demanda.id for demanda in removed}
+    for demanda in removed:
+        external_id_by_demanda[demanda.id] = demanda.id_oferta_externo
+
+    # 3. Allocations to invalidate, in a single pass over both sets of demands
+    stale_ids: List[int] = []
+    stale_blocks: Dict[int, List[str]] = {}
+    for aloc_id, demanda_id, dia, bloco in aloc_repo.get_slots_by_demandas(
+        list(new_blocks) + list(removed_ids)
+    ):
+        if demanda_id in removed_ids or (bloco, dia) not in new_blocks[demanda_id]:
+            stale_ids.append(aloc_id)
+            stale_blocks.setdefault(demanda_id, []).append(f"{dia}{bloco}")
+
+    for demanda_id, blocks in stale_blocks.items():
+        diff["invalidated_allocations"].append(
+            {
+                "oferta_key": external_id_by_demanda[demanda_id],
+                "demanda_id": demanda_id,
+                "blocks": sorted(blocks),
+                "reason": (
+                    "offer_removed" if demanda_id in removed_ids else "schedule_changed"
+                ),
+            }
+        )
+
+    summary["invalidated_allocations"] += aloc_repo.delete_by_ids(stale_ids)
+    summary["removed"] += dem_repo.delete_by_ids(sorted(removed_ids))
+
+    logger.info(
+        "Incremental sync: %d updated, %d removed, %d allocations invalidated",
+        summary["updated"],
+        summary["removed"],
+        summary["invalidated_allocations"],
+    )
+
+
 def sync_semester_from_api(
-    cod_semestre: str, cursos_ignorados: List[str] = None
-) -> Dict[str, int]:
+    cod_semestre: str,
+    cursos_ignorados: List[str] = None,
+    incremental: bool = False,
+    confirm_removals: bool = False,
+) -> Dict[str, Any]:
     """
     Sync ofertas for cod_semestre.
     Returns summary: {'created_semestre':0/1,'demandas':N,'professores':M,'skipped':K}
+
+    Existing external ids and professor names are prefetched once; new
+    demandas and professors are written with bulk INSERTs in one transaction.
+
+    With incremental=True, offers that already exist are compared field by
+    field instead of being skipped: changed demandas are updated in bulk,
+    demandas whose offer disappeared are deleted, and only the allocations
+    of blocks that no longer exist are removed. The summary then also
+    reports 'updated', 'removed', 'unchanged', 'invalidated_allocations' and
+    a per-offer 'diff'.
+
+    Removals are skipped for an empty payload, and need confirm_removals
+    when they exceed MAX_UNCONFIRMED_REMOVAL_SHARE of the existing offers;
+    skipped removals are listed in diff['pending_removals'] and
+    'removal_blocked' is set to "empty_payload" or "needs_confirmation".
     """
     try:
         payload = fetch_ofertas(cod_semestre)
@@ -91,6 +300,18 @@ def sync_semester_from_api(
         "professores": 0,
         "skipped": 0,
         "skipped_details": [],
+        "updated": 0,
+        "removed": 0,
+        "unchanged": 0,
+        "invalidated_allocations": 0,
+        "removal_blocked": None,
+        "diff": {
+            "created": [],
+            "updated": [],
+            "removed": [],
+            "pending_removals": [],
+            "invalidated_allocations": [],
+        },
     }
 
     with get_db_session() as session:
@@ -108,6 +329,20 @@ def sync_semester_from_api(
         # collect all professor names to provision later
         prof_names_to_provision: Set[str] = set()
 
+        # prefetch for idempotency checks; new rows are inserted after the loop
+        existing_by_external_id: Dict[str, DemandaRead] = (
+            dem_repo.get_by_semestre_keyed_by_external_id(semestre.id)
+            if incremental
+            else {}
+        )
+        existing_external_ids = (
+            set(existing_by_external_id)
+            if incremental
+            else dem_repo.get_external_ids_by_semestre(semestre.id)
+        )
+        new_demanda_rows: List[Dict[str, Any]] = []
+        changed_demandas: List[Tuple[DemandaRead, Dict[str, Any], List[str]]] = []
+
         for oferta_key, oferta in ofertas.items():
             # Check if course should be ignored (filtering at sync time)
             codigo_curso = oferta.get("cod_curso", "")
@@ -196,7 +431,9 @@ def sync_semester_from_api(
                     prof_names_to_provision.add(nomep)
 
             # if demanda with same semestre_id + external id exists -> skip
-            if dem_repo.get_by_semestre_and_external_id(semestre.id, id_oferta_externo):
+            # (incremental: compare it with the offer and update it if changed)
+            existing = existing_by_external_id.get(id_oferta_externo)
+            if id_oferta_externo in existing_external_ids and existing is None:
                 summary["skipped"] += 1
                 detail = {
                     "oferta_key": id_oferta_externo,
@@ -225,26 +462,10 @@ def sync_semester_from_api(
             }
 
             try:
-                # Convert dict to DemandaCreate schema so repository dto_to_orm_create
-                # can access attributes (expects a DTO-like object)
-                demanda_dto = DemandaCreate(**dto)
-                dem_repo.create(demanda_dto)
-                summary["demandas"] += 1
-            except IntegrityError as ie:
-                session.rollback()
-                summary["skipped"] += 1
-                detail = {
-                    "oferta_key": id_oferta_externo,
-                    "codigo": codigo,
-                    "turma": turma,
-                    "reason": "integrity_error",
-                    "message": str(ie),
-                }
-                summary["skipped_details"].append(detail)
-                logger.warning("IntegrityError creating demanda, skipping: %s", detail)
+                # Validate through DemandaCreate; the row is written in bulk later
+                demanda_row = DemandaCreate(**dto).model_dump()
             except Exception as e:
-                # unexpected errors — record and re-raise after collecting
-                session.rollback()
+                # invalid offer — record and continue
                 summary["skipped"] += 1
                 detail = {
                     "oferta_key": id_oferta_externo,
@@ -255,15 +476,50 @@ def sync_semester_from_api(
                 }
                 summary["skipped_details"].append(detail)
                 logger.exception("Exception while creating demanda: %s", detail)
+                continue
+
+            if existing is not None:
+                fields = _changed_fields(existing, demanda_row)
+                if fields:
+                    changed_demandas.append((existing, demanda_row, fields))
+                else:
+                    summary["unchanged"] += 1
+                continue
+
+            new_demanda_rows.append(demanda_row)
+            existing_external_ids.add(id_oferta_externo)
+
+        _insert_demandas_in_batches(
+            session, dem_repo, new_demanda_rows, summary, logger
+        )
 
-        # Provision professors (idempotent)
+        if incremental:
+            _apply_incremental_changes(
+                session,
+                dem_repo,
+                existing_by_external_id,
+                changed_demandas,
+                {str(key) for key in ofertas},
+                summary,
+                logger,
+                confirm_removals=confirm_removals,
+            )
+
+        # Provision professors (idempotent; accent, case or spacing variants
+        # of a registered name are not provisioned again)
+        professor_index = get_professor_name_index(session)
+        new_prof_names: Dict[str, str] = {}
         for nome in sorted(prof_names_to_provision):
-            if not prof_repo.get_by_nome_completo(nome):
-                prof_dto = ProfessorCreate(
-                    nome_completo=nome, tem_baixa_mobilidade=False
-                )
-                prof_repo.create(prof_dto)
-                summary["professores"] += 1
+            key = normalize_professor_name(nome)
+            if key and key not in professor_index.by_name:
+                new_prof_names.setdefault(key, nome)
+        prof_rows = [
+            ProfessorCreate(nome_completo=nome, tem_baixa_mobilidade=False).model_dump()
+            for nome in new_prof_names.values()
+        ]
+        summary["professores"] += prof_repo.bulk_insert(prof_rows)
+
+        session.commit()
 
     return summary
 
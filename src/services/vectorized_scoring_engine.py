@@ -0,0 +1,432 @@
+"""
+Vectorized Scoring Engine - Whole-campus room scoring with NumPy.
+
+Alternate engine for RoomScoringService. Rooms are represented as column arrays
+(id, capacity, tipo_sala_id, predio_id and a room × characteristic boolean
+matrix) and every scoring criterion is computed for all rooms at once:
+
+- Capacity points
+- Hard-rule compliance masks
+- Professor preference points (only when all hard rules pass)
+- Historical frequency bonus (overall or per day)
+- Hybrid discipline bonus (per day)
+
+The engine only produces numeric arrays. RoomScoringService turns the rows it
+actually returns into ScoringBreakdown / BlockGroupScoringBreakdown objects, so
+full breakdowns are built only for the top-K rooms when a limit is requested.
+
+Scores are identical to the per-room engine; see
+tests/test_vectorized_scoring_parity.py.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from src.config.scoring_config import SCORING_WEIGHTS
+from src.services.inventory_snapshot import InventorySnapshot
+
+logger = logging.getLogger(__name__)
+
+# Regular classroom type ID (Sala de Aula = 2), same as the per-room hybrid bonus
+REGULAR_CLASSROOM_TYPE_ID = 2
+
+# Sentinel stored in integer columns for NULL values
+MISSING_ID = -1
+
+
+class RoomColumns:
+    """
+    Column-oriented view of the room inventory.
+
+    Row i of every array describes rooms[i]; row order follows the input list
+    so results can be mapped back to room DTOs without lookups.
+    """
+
+    def __init__(
+        self,
+        rooms: Iterable,
+        room_characteristics: Mapping[int, Set[int]],
+        characteristic_names: Mapping[int, str],
+    ):
+        """
+        Initialize columns.
+
+        Args:
+            rooms: Room DTOs (SalaRead), in the order results should follow
+            room_characteristics: Mapping of sala_id to caracteristica_id set
+            characteristic_names: Mapping of caracteristica_id to name
+        """
+        self.rooms = list(rooms)
+        self.characteristic_names = dict(characteristic_names)
+
+        self.ids = np.array([room.id for room in self.rooms], dtype=np.int64)
+        self.capacities = np.array(
+            [room.capacidade or 0 for room in self.rooms], dtype=np.int64
+        )
+        self.tipo_sala_ids = np.array(
+            [
+                room.tipo_sala_id if room.tipo_sala_id is not None else MISSING_ID
+                for room in self.rooms
+            ],
+            dtype=np.int64,
+        )
+        self.predio_ids = np.array(
+            [
+                room.predio_id if room.predio_id is not None else MISSING_ID
+                for room in self.rooms
+            ],
+            dtype=np.int64,
+        )
+
+        # Room × characteristic membership matrix
+        char_ids = sorted(
+            {cid for chars in room_characteristics.values() for cid in chars}
+        )
+        self._char_columns = {cid: col for col, cid in enumerate(char_ids)}
+        self.char_matrix = np.zeros((len(self.rooms), len(char_ids)), dtype=bool)
+        for row, room in enumerate(self.rooms):
+            for cid in room_characteristics.get(room.id, ()):
+                self.char_matrix[row, self._char_columns[cid]] = True
+
+    @classmethod
+    def from_snapshot(cls, snapshot: InventorySnapshot) -> "RoomColumns":
+        """
+        Build columns from an inventory snapshot (no queries).
+
+        Args:
+            snapshot: InventorySnapshot of the room inventory
+
+        Returns:
+            RoomColumns for every room, in snapshot order
+        """
+        return cls(
+            snapshot.rooms,
+            snapshot.room_characteristics,
+            snapshot.characteristic_names,
+        )
+
+    @classmethod
+    def load(cls, session: Session) -> "RoomColumns":
+        """
+        Load the room inventory with a fixed number of queries.
+
+        Args:
+            session: SQLAlchemy session
+
+        Returns:
+            RoomColumns for every room, in SalaRepository.get_all() order
+        """
+        return cls.from_snapshot(InventorySnapshot.load(session))
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def has_any_characteristic(self, caracteristica_ids: Iterable[int]) -> np.ndarray:
+        """Boolean mask of rooms having at least one of the characteristics."""
+        cols = [
+            self._char_columns[cid]
+            for cid in caracteristica_ids
+            if cid in self._char_columns
+        ]
+        if not cols:
+            return np.zeros(len(self.rooms), dtype=bool)
+        return self.char_matrix[:, cols].any(axis=1)
+
+    def first_matching_characteristic(
+        self, caracteristica_ids: List[int]
+    ) -> np.ndarray:
+        """
+        For each room, the first characteristic of the list it has.
+
+        Args:
+            caracteristica_ids: Characteristic IDs in preference order
+
+        Returns:
+            Integer array with the matching caracteristica_id, or MISSING_ID
+        """
+        result = np.full(len(self.rooms), MISSING_ID, dtype=np.int64)
+        # Walk backwards so earlier entries overwrite later ones
+        for cid in reversed(caracteristica_ids):
+            col = self._char_columns.get(cid)
+            if col is not None:
+                result = np.where(self.char_matrix[:, col], cid, result)
+        return result
+
+    def ids_with_characteristic_name(self, nome: Optional[str]) -> List[int]:
+        """Get IDs of characteristics whose name matches exactly."""
+        return [cid for cid, name in self.characteristic_names.items() if name == nome]
+
+
+@dataclass
+class VectorizedScores:
+    """Per-room score components, one array element per RoomColumns row."""
+
+    total: np.ndarray
+    capacity_points: np.ndarray
+    capacity_satisfied: np.ndarray
+    hard_rules_points: np.ndarray
+    hard_rules_satisfied: np.ndarray
+    soft_preference_points: np.ndarray
+    preferred_room: np.ndarray
+    preferred_characteristic: np.ndarray  # caracteristica_id or MISSING_ID
+    historical_frequency_points: np.ndarray
+    historical_allocations: np.ndarray
+    hybrid_bonus_points: np.ndarray
+
+    # Descriptions of hard rules (shared by every room that satisfies them)
+    hard_rule_descriptions: List[str] = field(default_factory=list)
+
+
+class VectorizedScoringEngine:
+    """
+    Computes RoomScoringService scores for every room in a few array operations.
+
+    The engine delegates inputs that are not room-dependent (rule descriptions,
+    historical counts, hybrid discipline info) to the owning RoomScoringService
+    so both engines read the same data sources.
+    """
+
+    def __init__(self, scoring_service, columns: RoomColumns):
+        """
+        Initialize engine.
+
+        Args:
+            scoring_service: Owning RoomScoringService
+            columns: Room inventory columns
+        """
+        self.scoring_service = scoring_service
+        self.columns = columns
+
+        # Precomputed boolean mask per rule, valid for these columns
+        self._rule_masks: Dict[tuple, np.ndarray] = {}
+
+        # Preference arrays per (preferred rooms, preferred characteristics)
+        self._preference_cache: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def load(cls, scoring_service) -> "VectorizedScoringEngine":
+        """Build an engine from the service's inventory snapshot (or a fresh load)."""
+        snapshot = scoring_service._inventory_snapshot
+        if snapshot is None:
+            snapshot = InventorySnapshot.load(scoring_service.session)
+        return cls(scoring_service, RoomColumns.from_snapshot(snapshot))
+
+    # ------------------------------------------------------------------
+    # Public scoring entry points
+    # ------------------------------------------------------------------
+
+    def score_demand(
+        self, demanda, hard_rules: List, professor_prefs: Dict, semester_id: int
+    ) -> VectorizedScores:
+        """
+        Score every room for a whole demand (all blocks, overall history).
+
+        Mirrors RoomScoringService._calculate_detailed_scoring_breakdown.
+        """
+        scores = self._score_common(demanda, hard_rules, professor_prefs)
+
+        counts = self._frequency_array(
+            self.scoring_service._get_historical_frequency_counts(
+                demanda.codigo_disciplina, self.columns.ids.tolist(), semester_id
+            )
+        )
+        points = self._capped_frequency_points(counts)
+        self._set_historical(scores, points)
+
+        scores.total = (
+            scores.capacity_points
+            + scores.hard_rules_points
+            + scores.soft_preference_points
+            + scores.historical_frequency_points
+        )
+        return scores
+
+    def score_block_group(
+        self,
+        demanda,
+        day_id: int,
+        hard_rules: List,
+        professor_prefs: Dict,
+        semester_id: int,
+    ) -> VectorizedScores:
+        """
+        Score every room for one block group (single day).
+
+        Mirrors RoomScoringService._calculate_block_group_scoring_breakdown.
+        """
+        scores = self._score_common(demanda, hard_rules, professor_prefs)
+
+        counts = self._frequency_array(
+            self.scoring_service._get_historical_frequency_counts(
+                demanda.codigo_disciplina,
+                self.columns.ids.tolist(),
+                semester_id,
+                dia_semana_id=day_id,
+            )
+        )
+        self._set_historical(scores, self._capped_frequency_points(counts))
+        scores.hybrid_bonus_points = self._hybrid_bonus(
+            demanda.codigo_disciplina, day_id
+        )
+
+        scores.total = (
+            scores.capacity_points
+            + scores.hard_rules_points
+            + scores.soft_preference_points
+            + scores.historical_frequency_points
+            + scores.hybrid_bonus_points
+        )
+        return scores
+
+    # ------------------------------------------------------------------
+    # Score components
+    # ------------------------------------------------------------------
+
+    def _score_common(
+        self, demanda, hard_rules: List, professor_prefs: Dict
+    ) -> VectorizedScores:
+        """Compute capacity, hard-rule and preference components."""
+        n_rooms = len(self.columns)
+        zeros = np.zeros(n_rooms, dtype=np.int64)
+
+        # 1. Capacity
+        capacities = self.columns.capacities
+        capacity_satisfied = (capacities != 0) & (
+            capacities >= demanda.vagas_disciplina
+        )
+        capacity_points = np.where(
+            capacity_satisfied, SCORING_WEIGHTS.CAPACITY_ADEQUATE, 0
+        ).astype(np.int64)
+
+        # 2. Hard rules: all must pass, otherwise no points at all
+        rules = [rule for rule in hard_rules if rule.prioridade == 0]
+        all_pass = np.ones(n_rooms, dtype=bool)
+        for rule in rules:
+            all_pass &= self._rule_mask(rule)
+        hard_rules_satisfied = all_pass if rules else np.zeros(n_rooms, dtype=bool)
+        hard_rules_points = np.where(
+            hard_rules_satisfied, SCORING_WEIGHTS.HARD_RULE_COMPLIANCE * len(rules), 0
+        ).astype(np.int64)
+
+        # 3. Professor preferences, only for rooms satisfying the hard rules
+        room_matches, characteristic_matches = self._preference_arrays(professor_prefs)
+        preferred_room = hard_rules_satisfied & room_matches
+        preferred_characteristic = np.where(
+            hard_rules_satisfied, characteristic_matches, MISSING_ID
+        )
+        soft_preference_points = (
+            np.where(preferred_room, SCORING_WEIGHTS.PREFERRED_ROOM, 0)
+            + np.where(
+                preferred_characteristic != MISSING_ID,
+                SCORING_WEIGHTS.PREFERRED_CHARACTERISTIC,
+                0,
+            )
+        ).astype(np.int64)
+
+        return VectorizedScores(
+            total=zeros,
+            capacity_points=capacity_points,
+            capacity_satisfied=capacity_satisfied,
+            hard_rules_points=hard_rules_points,
+            hard_rules_satisfied=hard_rules_satisfied,
+            soft_preference_points=soft_preference_points,
+            preferred_room=preferred_room,
+            preferred_characteristic=preferred_characteristic,
+            historical_frequency_points=zeros,
+            historical_allocations=zeros,
+            hybrid_bonus_points=zeros,
+            hard_rule_descriptions=[
+                self.scoring_service._get_rule_description(rule) for rule in rules
+            ],
+        )
+
+    def _rule_mask(self, rule) -> np.ndarray:
+        """Boolean mask of rooms complying with a rule (see _check_rule_compliance)."""
+        key = (rule.id, rule.config_json)
+        mask = self._rule_masks.get(key)
+        if mask is None:
+            mask = self.scoring_service._compile_rule(rule).mask(self.columns)
+            mask.setflags(write=False)
+            self._rule_masks[key] = mask
+        return mask
+
+    def _preference_arrays(
+        self, professor_prefs: Dict
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Preferred-room mask and first preferred characteristic of every room.
+
+        Computed once per distinct preference set (in practice, once per
+        professor) and reused for all of that professor's demands.
+        """
+        key = (
+            tuple(professor_prefs.get("preferred_rooms", ())),
+            tuple(professor_prefs.get("preferred_characteristics", ())),
+        )
+        arrays = self._preference_cache.get(key)
+        if arrays is None:
+            room_matches = np.isin(self.columns.ids, key[0])
+            characteristic_matches = self.columns.first_matching_characteristic(
+                list(key[1])
+            )
+            room_matches.setflags(write=False)
+            characteristic_matches.setflags(write=False)
+            arrays = (room_matches, characteristic_matches)
+            self._preference_cache[key] = arrays
+        return arrays
+
+    def _frequency_array(self, counts_by_room: Dict[int, int]) -> np.ndarray:
+        """Align a sala_id → count mapping with the room rows."""
+        if not counts_by_room:
+            return np.zeros(len(self.columns), dtype=np.int64)
+        return np.array(
+            [counts_by_room.get(room_id, 0) for room_id in self.columns.ids.tolist()],
+            dtype=np.int64,
+        )
+
+    @staticmethod
+    def _capped_frequency_points(counts: np.ndarray) -> np.ndarray:
+        """Convert allocation counts into capped historical points."""
+        return np.minimum(
+            counts * SCORING_WEIGHTS.HISTORICAL_FREQUENCY_PER_ALLOCATION,
+            SCORING_WEIGHTS.HISTORICAL_FREQUENCY_MAX_CAP,
+        )
+
+    @staticmethod
+    def _set_historical(scores: VectorizedScores, points: np.ndarray) -> None:
+        """Store historical points and the displayed allocation count."""
+        scores.historical_frequency_points = points
+        if SCORING_WEIGHTS.HISTORICAL_FREQUENCY_PER_ALLOCATION > 0:
+            scores.historical_allocations = (
+                points // SCORING_WEIGHTS.HISTORICAL_FREQUENCY_PER_ALLOCATION
+            )
+        else:
+            scores.historical_allocations = np.zeros_like(points)
+
+    def _hybrid_bonus(self, codigo_disciplina: str, day_id: int) -> np.ndarray:
+        """Hybrid bonus per room (see RoomScoringService._calculate_hybrid_bonus)."""
+        n_rooms = len(self.columns)
+        no_bonus = np.zeros(n_rooms, dtype=np.int64)
+
+        hybrid_service = self.scoring_service._hybrid_detection_service
+        if hybrid_service is None or not hybrid_service.is_hybrid(codigo_disciplina):
+            return no_bonus
+
+        hybrid_info = hybrid_service.get_hybrid_info(codigo_disciplina)
+        if not hybrid_info:
+            return no_bonus
+
+        is_lab_room = self.columns.tipo_sala_ids != REGULAR_CLASSROOM_TYPE_ID
+        match = np.zeros(n_rooms, dtype=bool)
+        if day_id in hybrid_info.lab_days:
+            match |= is_lab_room
+        if day_id in hybrid_info.classroom_days:
+            match |= ~is_lab_room
+
+        return np.where(match, SCORING_WEIGHTS.HYBRID_ROOM_TYPE_MATCH, 0).astype(
+            np.int64
+        )
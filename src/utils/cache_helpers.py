@@ -5,7 +5,7 @@ This module provides cached lookup functions to reduce database queries
 for relatively static data like buildings, room types, characteristics, etc.
 
 Cache Strategy:
-- Reference data (buildings, types): 5-minute TTL
+- Reference data (buildings, rooms, types): 5-minute TTL
 - Semester data: 10-minute TTL
 - Singleton utility objects: @st.cache_resource (no TTL)
 
@@ -17,8 +17,10 @@ from typing import Dict, List, Tuple
 
 from src.config.database import get_db_session
 from src.repositories.predio import PredioRepository
+from src.repositories.sala import SalaRepository
 from src.repositories.tipo_sala import TipoSalaRepository
 from src.repositories.caracteristica import CaracteristicaRepository
+from src.repositories.disciplina import DisciplinaRepository
 from src.repositories.semestre import SemestreRepository
 from src.utils.sigaa_parser import SigaaScheduleParser
 
@@ -34,7 +36,8 @@ def get_sigaa_parser() -> SigaaScheduleParser:
     Get singleton SigaaScheduleParser instance (cached).
 
     This parser contains static lookup dictionaries and is safe to reuse
-    across all pages and sessions.
+    across all pages and sessions. Parsed schedules (parser.parse) live in a
+    process-wide LRU cache, so every session shares them.
 
     Returns:
         SigaaScheduleParser: Singleton parser instance
@@ -68,6 +71,23 @@ def get_predio_options() -> Dict[int, str]:
         return {p.id: p.nome for p in predios}
 
 
+@st.cache_data(ttl=300)
+def get_sala_options() -> Dict[int, str]:
+    """
+    Get room ID->name mapping (cached for 5 minutes).
+
+    Returns:
+        Dict mapping sala_id to room name
+
+    Example:
+        options = get_sala_options()
+        room_name = options.get(sala_id, "Unknown")
+    """
+    with get_db_session() as session:
+        salas = SalaRepository(session).get_all()
+        return {s.id: s.nome for s in salas}
+
+
 @st.cache_data(ttl=300)
 def get_tipo_sala_options() -> Dict[int, str]:
     """
@@ -102,6 +122,21 @@ def get_caracteristica_options() -> Dict[int, str]:
         return {c.id: c.nome for c in caracteristicas}
 
 
+@st.cache_data(ttl=300)
+def get_course_code_options() -> List[str]:
+    """
+    Get the course (program) codes found in the demands (cached for 5 minutes).
+
+    Returns:
+        Sorted list of codigo_curso values
+
+    Example:
+        cursos = get_course_code_options()
+    """
+    with get_db_session() as session:
+        return DisciplinaRepository(session).get_unique_course_codes()
+
+
 @st.cache_data(ttl=600)
 def get_semester_options() -> List[Tuple[int, str]]:
     """
@@ -156,6 +191,7 @@ def clear_reference_data_cache():
     """
     # Clear specific cached functions
     get_predio_options.clear()
+    get_sala_options.clear()
     get_tipo_sala_options.clear()
     get_caracteristica_options.clear()
     get_semester_options.clear()
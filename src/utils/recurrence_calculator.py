@@ -5,8 +5,12 @@ Supports daily, weekly, and monthly recurrence patterns with
 one-year maximum limit enforcement.
 """
 
+import json
+import logging
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from dateutil.relativedelta import relativedelta, MO, TU, WE, TH, FR, SA
 
 from src.schemas.allocation import (
@@ -19,6 +23,11 @@ from src.schemas.allocation import (
     RegraMensalPosicao,
 )
 
+logger = logging.getLogger(__name__)
+
+# Maximum number of (rule, start date) series kept expanded in memory
+EXPANSION_CACHE_SIZE = 512
+
 
 class RecurrenceCalculator:
     """
@@ -38,6 +47,64 @@ class RecurrenceCalculator:
         7: SA,  # Saturday
     }
 
+    @staticmethod
+    def parse_rule(rule_dict: Dict[str, Any]) -> Optional[RegraRecorrencia]:
+        """
+        Build the rule object of a recurrence rule dictionary.
+
+        Args:
+            rule_dict: Recurrence rule dictionary (see ReservaEvento)
+
+        Returns:
+            Rule object, or None for an unknown recurrence type
+        """
+        tipo = rule_dict.get("tipo")
+
+        if tipo == "unica":
+            return RegraUnica()
+        elif tipo == "diaria":
+            return RegraDiaria(
+                intervalo=rule_dict.get("intervalo", 1), fim=rule_dict["fim"]
+            )
+        elif tipo == "semanal":
+            return RegraSemanal(dias=rule_dict["dias"], fim=rule_dict["fim"])
+        elif tipo == "mensal" and "dia_mes" in rule_dict:
+            return RegraMensalDia(dia_mes=rule_dict["dia_mes"], fim=rule_dict["fim"])
+        elif tipo == "mensal" and "posicao" in rule_dict:
+            return RegraMensalPosicao(
+                posicao=rule_dict["posicao"],
+                dia_semana=rule_dict["dia_semana"],
+                fim=rule_dict["fim"],
+            )
+        return None
+
+    @staticmethod
+    def expand_window(
+        regra_recorrencia_json: str,
+        data_inicio: str,
+        window_start: str,
+        window_end: str,
+    ) -> List[str]:
+        """
+        Get the dates of a series that fall inside a date window.
+
+        The whole series is expanded once per (rule, start date) and kept in
+        a bounded LRU cache, so each window is a binary-search slice.
+
+        Args:
+            regra_recorrencia_json: Recurrence rule JSON of the event
+            data_inicio: First date of the series (YYYY-MM-DD)
+            window_start: First date of the window (YYYY-MM-DD)
+            window_end: Last date of the window (YYYY-MM-DD)
+
+        Returns:
+            Sorted list of dates (YYYY-MM-DD) in the window
+        """
+        dates = _expand_series_cached(regra_recorrencia_json, data_inicio)
+        return list(
+            dates[bisect_left(dates, window_start) : bisect_right(dates, window_end)]
+        )
+
     @staticmethod
     def expand_recurrence(rule: RegraRecorrencia, start_date: date) -> List[date]:
         """
@@ -342,3 +409,27 @@ class RecurrenceCalculator:
                 )
 
         return result
+
+
+@lru_cache(maxsize=EXPANSION_CACHE_SIZE)
+def _expand_series_cached(
+    regra_recorrencia_json: str, data_inicio: str
+) -> Tuple[str, ...]:
+    """Expand a whole series into its sorted dates (YYYY-MM-DD)."""
+    try:
+        rule = RecurrenceCalculator.parse_rule(json.loads(regra_recorrencia_json))
+        if rule is None:
+            return ()
+        if isinstance(rule, RegraUnica):
+            return (data_inicio,)
+        start_date = RecurrenceCalculator._parse_date(data_inicio)
+        dates = RecurrenceCalculator.expand_recurrence(rule, start_date)
+    except (ValueError, KeyError, TypeError) as e:
+        logger.error(f"Cannot expand recurrence {regra_recorrencia_json!r}: {e}")
+        return ()
+    return tuple(sorted({d.strftime("%Y-%m-%d") for d in dates}))
+
+
+def clear_expansion_cache() -> None:
+    """Drop every expanded series kept in the cache."""
+    _expand_series_cached.cache_clear()
@@ -12,10 +12,91 @@ Funções principais:
 - parse_to_human_readable: Pega um código Sigaa (ex: "24M12") e o formata
   para exibição humana (ex: "SEG 08:00-09:50, QUA 08:00-09:50").
   Útil para a UI.
+
+- parse: Devolve um ParsedSchedule imutável (tuplas atômicas, blocos por dia e
+  máscara de slots). O resultado fica num cache LRU compartilhado por todas as
+  instâncias, pois os serviços de alocação parseiam a mesma string várias vezes.
 """
 
+import logging
 import re
-from typing import Any, Dict, List, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Layout da máscara de slots (um bit por slot atômico aceito pelo parser):
+# 6 dias (2=SEG ... 7=SAB) × 3 turnos (M, T, N) × 7 slots = 126 bits
+FIRST_DAY_ID = 2
+LAST_DAY_ID = 7
+SHIFT_ORDER = ("M", "T", "N")
+SLOTS_PER_SHIFT = 7
+SLOTS_PER_DAY = len(SHIFT_ORDER) * SLOTS_PER_SHIFT
+
+# Número máximo de strings de horário distintas mantidas no cache de parse
+PARSE_CACHE_SIZE = 4096
+
+
+def slot_bit(block_code: str, day_id: int) -> Optional[int]:
+    """
+    Get the bit position of an atomic (block, day) slot.
+
+    Args:
+        block_code: Block code (M1, T3, N2, etc.)
+        day_id: SIGAA day code (2=SEG ... 7=SAB)
+
+    Returns:
+        Bit position (0-125), or None if the slot is outside the grid
+    """
+    if not block_code or len(block_code) < 2:
+        return None
+    if day_id < FIRST_DAY_ID or day_id > LAST_DAY_ID:
+        return None
+
+    try:
+        shift_idx = SHIFT_ORDER.index(block_code[0])
+        slot_num = int(block_code[1:])
+    except (ValueError, IndexError):
+        return None
+
+    if slot_num < 1 or slot_num > SLOTS_PER_SHIFT:
+        return None
+
+    return (
+        (day_id - FIRST_DAY_ID) * SLOTS_PER_DAY
+        + shift_idx * SLOTS_PER_SHIFT
+        + (slot_num - 1)
+    )
+
+
+# Uma única instância de cada tupla (bloco, dia) válida, compartilhada por
+# todos os resultados do cache
+_INTERNED_SLOTS: Dict[Tuple[str, int], Tuple[str, int]] = {
+    (f"{shift}{slot}", day): (f"{shift}{slot}", day)
+    for day in range(FIRST_DAY_ID, LAST_DAY_ID + 1)
+    for shift in SHIFT_ORDER
+    for slot in range(1, SLOTS_PER_SHIFT + 1)
+}
+
+
+@dataclass(frozen=True)
+class ParsedSchedule:
+    """
+    Resultado imutável do parse de uma string de horário Sigaa.
+
+    Attributes:
+        atomic_tuples: Tuplas (bloco, dia) na ordem da string
+        day_groups: Pares (dia, blocos) ordenados por dia, blocos sem repetição
+        slot_mask: Máscara de bits com um bit por slot (ver slot_bit)
+    """
+
+    atomic_tuples: Tuple[Tuple[str, int], ...] = ()
+    day_groups: Tuple[Tuple[int, Tuple[str, ...]], ...] = ()
+    slot_mask: int = 0
+
+
+EMPTY_SCHEDULE = ParsedSchedule()
 
 
 class SigaaScheduleParser:
@@ -203,25 +284,10 @@ class SigaaScheduleParser:
             Dict mapping day_id to list of block codes.
             Example: {2: ['M1', 'M2'], 4: ['M1', 'M2'], 6: ['T3', 'T4']}
         """
-        if not text or not isinstance(text, str):
-            return {}
-
-        # Parse to atomic tuples: [(block_code, day_id), ...]
-        atomic_tuples = self.split_to_atomic_tuples(text)
-
-        # Group by day
-        day_blocks: Dict[int, List[str]] = {}
-        for block_code, day_id in atomic_tuples:
-            if day_id not in day_blocks:
-                day_blocks[day_id] = []
-            if block_code not in day_blocks[day_id]:  # Avoid duplicates
-                day_blocks[day_id].append(block_code)
-
-        # Sort blocks within each day for consistent ordering
-        for day_id in day_blocks:
-            day_blocks[day_id] = sorted(day_blocks[day_id])
-
-        return day_blocks
+        # Grouped (deduplicated, sorted) once per string by the parse cache
+        return {
+            day_id: list(blocks) for day_id, blocks in self.parse(text).day_groups
+        }
 
     def get_block_groups_with_names(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -275,17 +341,43 @@ class SigaaScheduleParser:
 
         return f"{start_time}-{end_time}"
 
-    def split_to_atomic_tuples(self, text: str) -> List[Tuple[str, int]]:
+    def parse(self, text: str) -> ParsedSchedule:
         """
-        Converte uma string Sigaa bruta em uma lista de tuplas atômicas (bloco, dia).
+        Parseia uma string Sigaa bruta usando o cache LRU compartilhado.
 
-        Ex: "24M12" vira [('M1', 2), ('M2', 2), ('M1', 4), ('M2', 4)]
+        Ex: "24M12" vira ParsedSchedule(
+            atomic_tuples=(('M1', 2), ('M2', 2), ('M1', 4), ('M2', 4)),
+            day_groups=((2, ('M1', 'M2')), (4, ('M1', 'M2'))),
+            slot_mask=...,
+        )
 
-        Returns empty list for invalid input to handle errors gracefully.
+        Returns EMPTY_SCHEDULE for invalid input.
         """
         if not text or not isinstance(text, str):
-            return []
+            return EMPTY_SCHEDULE
+        return _parse_cached(text)
+
+    def split_to_atomic_tuples(self, text: str) -> Tuple[Tuple[str, int], ...]:
+        """
+        Converte uma string Sigaa bruta em tuplas atômicas (bloco, dia).
+
+        Ex: "24M12" vira (('M1', 2), ('M2', 2), ('M1', 4), ('M2', 4))
 
+        O resultado vem do cache de parse e é imutável; use list() para obter
+        uma cópia editável. Returns an empty tuple for invalid input.
+        """
+        return self.parse(text).atomic_tuples
+
+    def slot_mask(self, text: str) -> int:
+        """
+        Get the slot bitmask of a SIGAA schedule string (see slot_bit).
+        """
+        return self.parse(text).slot_mask
+
+    def _parse_uncached(self, text: str) -> ParsedSchedule:
+        """
+        Parseia a string sem consultar o cache (usado por _parse_cached).
+        """
         atomic_array = self.split_to_atomic_array(text)
         results = []
         invalid_blocks = []
@@ -312,7 +404,7 @@ class SigaaScheduleParser:
                         invalid_blocks.append(block)
                         continue
 
-                    results.append((code, day))
+                    results.append(_INTERNED_SLOTS.get((code, day), (code, day)))
                 except (ValueError, IndexError):
                     invalid_blocks.append(block)
                     continue
@@ -321,11 +413,39 @@ class SigaaScheduleParser:
 
         # Log warnings for invalid blocks (if any)
         if invalid_blocks:
-            import logging
-            logger = logging.getLogger(__name__)
             logger.warning(f"Invalid SIGAA blocks detected and skipped: {invalid_blocks}")
 
-        return results
+        day_blocks: Dict[int, List[str]] = {}
+        mask = 0
+        for code, day in results:
+            blocks = day_blocks.setdefault(day, [])
+            if code not in blocks:
+                blocks.append(code)
+            bit = slot_bit(code, day)
+            if bit is not None:
+                mask |= 1 << bit
+
+        return ParsedSchedule(
+            atomic_tuples=tuple(results),
+            day_groups=tuple(
+                (day, tuple(sorted(day_blocks[day]))) for day in sorted(day_blocks)
+            ),
+            slot_mask=mask,
+        )
+
+
+# Instância usada apenas para preencher o cache (o parse não depende de estado)
+_CACHE_PARSER = SigaaScheduleParser()
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(text: str) -> ParsedSchedule:
+    return _CACHE_PARSER._parse_uncached(text)
+
+
+def clear_parse_cache() -> None:
+    """Descarta todos os horários parseados mantidos no cache."""
+    _parse_cached.cache_clear()
 
 
 # --- Exemplo de Uso ---
@@ -236,3 +236,181 @@ def sample_horario_bloco(db_session):
     db_session.refresh(horario)
 
     return horario
+
+
+@pytest.fixture(scope="module")
+def seeded_session():
+    """
+    Create a session on a seeded in-memory database with rooms, rules,
+    professor preferences and several semesters of allocations.
+
+    Data is generated from a fixed random seed, so every run sees the same
+    inventory and history. The last semester has demands but no allocations.
+    """
+    import json
+    import random
+
+    from sqlalchemy import insert
+
+    from src.models.academic import (
+        Demanda,
+        Professor,
+        Semestre,
+        professor_prefere_caracteristica,
+        professor_prefere_sala,
+    )
+    from src.models.allocation import AlocacaoSemestral, Regra
+    from src.models.base import Base
+    from src.models.horario import DiaSemana, HorarioBloco
+    from src.models.inventory import (
+        Campus,
+        Caracteristica,
+        Predio,
+        Sala,
+        TipoSala,
+        sala_caracteristicas,
+    )
+    from src.utils.sigaa_parser import SigaaScheduleParser
+
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    rnd = random.Random(20240101)
+
+    for dia_id, nome in zip(range(2, 8), ["SEG", "TER", "QUA", "QUI", "SEX", "SAB"]):
+        session.add(DiaSemana(id_sigaa=dia_id, nome=nome))
+    for codigo in ["M1", "M2", "M3", "M4", "M5", "T1", "T2", "T3", "T4", "T5"]:
+        session.add(
+            HorarioBloco(
+                codigo_bloco=codigo,
+                turno=codigo[0],
+                horario_inicio="08:00",
+                horario_fim="09:00",
+            )
+        )
+
+    campus = Campus(nome="FUP")
+    session.add(campus)
+    session.flush()
+    predios = [
+        Predio(nome=f"UAC-{i}", descricao="Bloco", campus_id=campus.id)
+        for i in range(3)
+    ]
+    tipos = [TipoSala(nome=n) for n in ["Laboratório", "Sala de Aula", "Auditório"]]
+    caracteristicas = [
+        Caracteristica(nome=n) for n in ["Projetor", "Quadro", "Acessível", "Ar"]
+    ]
+    session.add_all(predios + tipos + caracteristicas)
+    session.flush()
+
+    salas = [
+        Sala(
+            nome=f"S{i:02d}",
+            predio_id=rnd.choice(predios).id,
+            tipo_sala_id=rnd.choice([1, 2, 2, 2, 3]),
+            capacidade=rnd.choice([20, 30, 40, 60]),
+            andar=0,
+        )
+        for i in range(30)
+    ]
+    session.add_all(salas)
+    session.flush()
+    for sala in salas:
+        for caracteristica in caracteristicas:
+            if rnd.random() < 0.4:
+                session.execute(
+                    insert(sala_caracteristicas).values(
+                        sala_id=sala.id, caracteristica_id=caracteristica.id
+                    )
+                )
+
+    professores = [Professor(nome_completo=f"Professor {i}") for i in range(12)]
+    session.add_all(professores)
+    session.flush()
+    for professor in professores:
+        for sala in rnd.sample(salas, 2):
+            session.execute(
+                insert(professor_prefere_sala).values(
+                    professor_id=professor.id, sala_id=sala.id
+                )
+            )
+        for caracteristica in rnd.sample(caracteristicas, 2):
+            session.execute(
+                insert(professor_prefere_caracteristica).values(
+                    professor_id=professor.id, caracteristica_id=caracteristica.id
+                )
+            )
+
+    semestres = [Semestre(nome=f"202{i}.1") for i in range(4)]
+    session.add_all(semestres)
+    session.flush()
+
+    parser = SigaaScheduleParser()
+    codigos = [f"FUP{n:03d}" for n in range(20)]
+    for semestre in semestres:
+        for j in range(40):
+            dias = "".join(sorted(rnd.sample("234567", rnd.choice([1, 2, 3]))))
+            turno = rnd.choice("MT")
+            inicio = rnd.randint(1, 4)
+            codigo = rnd.choice(codigos)
+            session.add(
+                Demanda(
+                    semestre_id=semestre.id,
+                    codigo_disciplina=codigo,
+                    nome_disciplina=f"Disciplina {codigo}",
+                    professores_disciplina=rnd.choice(professores).nome_completo,
+                    turma_disciplina=f"{j:02d}",
+                    vagas_disciplina=rnd.choice([10, 25, 35, 50]),
+                    horario_sigaa_bruto=f"{dias}{turno}{inicio}{inicio + 1}",
+                    codigo_curso="GEAGRO",
+                )
+            )
+    session.flush()
+
+    # Historical allocations for every semester but the last one
+    for semestre in semestres[:-1]:
+        used = set()
+        demandas = session.query(Demanda).filter_by(semestre_id=semestre.id).all()
+        for demanda in demandas:
+            sala = rnd.choice(salas)
+            slots = parser.split_to_atomic_tuples(demanda.horario_sigaa_bruto)
+            if any((sala.id, dia, bloco) in used for bloco, dia in slots):
+                continue
+            for bloco, dia in slots:
+                used.add((sala.id, dia, bloco))
+                session.add(
+                    AlocacaoSemestral(
+                        semestre_id=semestre.id,
+                        demanda_id=demanda.id,
+                        sala_id=sala.id,
+                        dia_semana_id=dia,
+                        codigo_bloco=bloco,
+                    )
+                )
+
+    regras = [
+        ("DISCIPLINA_TIPO_SALA", {"codigo_disciplina": "FUP001", "tipo_sala_id": 1}, 0),
+        ("DISCIPLINA_SALA", {"codigo_disciplina": "FUP002", "sala_id": salas[3].id}, 0),
+        (
+            "DISCIPLINA_CARACTERISTICA",
+            {"codigo_disciplina": "FUP003", "caracteristica_nome": "Projetor"},
+            0,
+        ),
+        ("DISCIPLINA_TIPO_SALA", {"codigo_disciplina": "FUP003", "tipo_sala_id": 2}, 0),
+        ("DISCIPLINA_TIPO_SALA", {"codigo_disciplina": "FUP004", "tipo_sala_id": 3}, 1),
+    ]
+    for tipo_regra, config, prioridade in regras:
+        session.add(
+            Regra(
+                descricao=f"{config['codigo_disciplina']} {tipo_regra}",
+                tipo_regra=tipo_regra,
+                config_json=json.dumps(config),
+                prioridade=prioridade,
+            )
+        )
+    session.commit()
+
+    yield session
+
+    session.close()
+    Base.metadata.drop_all(bind=engine)
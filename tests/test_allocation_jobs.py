@@ -0,0 +1,171 @@
+"""
+Tests for background allocation jobs (heartbeats and final status).
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.config.settings import settings
+from src.models.academic import Semestre
+from src.models.allocation import (
+    JOB_STATUS_DONE,
+    JOB_STATUS_FAILED,
+    JOB_STATUS_QUEUED,
+    JOB_STATUS_RUNNING,
+    JobAlocacao,
+)
+from src.models.base import Base
+from src.repositories.job_alocacao import JobAlocacaoRepository
+from src.services import allocation_job_service
+from src.services import optimized_autonomous_allocation_service
+
+
+@pytest.fixture
+def job_session(monkeypatch):
+    """Session factory for a fresh database shared by the job service."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        session.add(Semestre(nome="2030-1", status=True))
+        session.commit()
+
+    @contextmanager
+    def _session():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(allocation_job_service, "get_db_session", _session)
+    yield _session
+    Base.metadata.drop_all(bind=engine)
+
+
+def _fake_service(on_run):
+    """Allocation service stand-in running on_run() and allocating nothing."""
+
+    class _Service:
+        def __init__(self, session):
+            pass
+
+        def set_progress_callback(self, callback):
+            pass
+
+        def set_cancel_check(self, check):
+            pass
+
+        def execute_autonomous_allocation_partial(self, semester_id, dry_run):
+            on_run()
+            return {"message": "Nenhuma demanda pendente"}
+
+    return _Service
+
+
+def _claimed_job(job_session):
+    with job_session() as session:
+        jobs = JobAlocacaoRepository(session)
+        semester_id = session.query(Semestre).first().id
+        jobs.create_queued(semester_id)
+        return jobs.claim_next_queued(worker_pid=1)
+
+
+def test_job_failed_as_stale_stays_failed(job_session, monkeypatch):
+    job = _claimed_job(job_session)
+
+    def _marked_stale_meanwhile():
+        with job_session() as session:
+            JobAlocacaoRepository(session).fail_stale(
+                datetime.utcnow() + timedelta(seconds=1), "stale"
+            )
+
+    monkeypatch.setattr(
+        optimized_autonomous_allocation_service,
+        "OptimizedAutonomousAllocationService",
+        _fake_service(_marked_stale_meanwhile),
+    )
+
+    assert allocation_job_service.run_allocation_job(job) == JOB_STATUS_FAILED
+    with job_session() as session:
+        stored = JobAlocacaoRepository(session).get_by_id(job.id)
+    assert stored.status == JOB_STATUS_FAILED
+    assert stored.erro == "stale"
+
+
+def test_report_step_refreshes_heartbeat(job_session, monkeypatch):
+    job = _claimed_job(job_session)
+    assert job.status == JOB_STATUS_RUNNING
+
+    heartbeats = []
+    update_progress = JobAlocacaoRepository.update_progress
+
+    def _recording_update(self, job_id, fase_atual, progresso):
+        heartbeats.append(job_id)
+        return update_progress(self, job_id, fase_atual, progresso)
+
+    monkeypatch.setattr(JobAlocacaoRepository, "update_progress", _recording_update)
+    monkeypatch.setattr(
+        optimized_autonomous_allocation_service,
+        "OptimizedAutonomousAllocationService",
+        _fake_service(lambda: None),
+    )
+
+    assert allocation_job_service.run_allocation_job(job) == JOB_STATUS_DONE
+    # No progress callbacks: only the heartbeats around the report step
+    assert heartbeats == [job.id, job.id]
+
+
+def test_queued_job_waits_for_busy_workers(job_session, monkeypatch):
+    monkeypatch.setattr(settings, "ALLOCATION_JOB_WORKERS", 2)
+    started = []
+    monkeypatch.setattr(
+        allocation_job_service, "_start_worker", lambda: started.append(True)
+    )
+    stale = datetime.utcnow() - timedelta(
+        seconds=settings.ALLOCATION_JOB_STALE_SECONDS + 60
+    )
+
+    with job_session() as session:
+        session.add_all(
+            [Semestre(nome="2030-2", status=True), Semestre(nome="2031-1", status=True)]
+        )
+        session.commit()
+        jobs = JobAlocacaoRepository(session)
+        first, second, third = (
+            jobs.create_queued(semestre.id)
+            for semestre in session.query(Semestre).order_by(Semestre.id)
+        )
+        jobs.claim_next_queued(worker_pid=1)
+        jobs.claim_next_queued(worker_pid=2)
+        # Queued for longer than the stale timeout behind two live workers
+        session.query(JobAlocacao).filter_by(id=third.id).update({"created_at": stale})
+        session.commit()
+
+    # Both workers are busy: the queued job keeps waiting
+    active = allocation_job_service.get_active_job(third.semestre_id)
+    assert active.status == JOB_STATUS_QUEUED
+    assert started == []
+
+    # A worker died: its job fails and a new worker is started for the queue
+    with job_session() as session:
+        session.query(JobAlocacao).filter_by(id=first.id).update(
+            {"heartbeat_em": stale}
+        )
+        session.commit()
+    active = allocation_job_service.get_active_job(third.semestre_id)
+    assert active.status == JOB_STATUS_QUEUED
+    assert started == [True]
+    with job_session() as session:
+        jobs = JobAlocacaoRepository(session)
+        assert jobs.get_by_id(first.id).status == JOB_STATUS_FAILED
+        assert jobs.get_by_id(second.id).status == JOB_STATUS_RUNNING
@@ -0,0 +1,93 @@
+"""
+Tests for the section-rendered autonomous allocation PDF report.
+"""
+
+import io
+
+import pytest
+
+from src.services import autonomous_allocation_report_service as report_module
+from src.services.autonomous_allocation_report_service import (
+    DETAILED_DECISIONS_SECTION,
+    REPORT_SECTIONS,
+    AutonomousAllocationReportService,
+    decode_report_payload,
+    encode_report_payload,
+)
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def _decision(index, allocated=True):
+    return {
+        "demanda_id": index,
+        "disciplina_codigo": f"FUP{index:04d}",
+        "disciplina_nome": f"Disciplina {index}",
+        "turma": "A",
+        "vagas": 40,
+        "professores": "Professor Teste",
+        "allocated": allocated,
+        "allocated_room_id": index if allocated else None,
+        "allocated_room_name": f"A1-{index:02d}" if allocated else None,
+        "allocation_phase": "atomic_allocation",
+        "final_score": 10 if allocated else None,
+        "scoring_breakdown": {"capacity_points": 4, "capacity_satisfied": True},
+        "total_candidates_evaluated": 3,
+        "conflicts_detected": 0,
+        "conflict_details": [],
+        "skipped_reason": None if allocated else "Sem sala livre",
+    }
+
+
+@pytest.fixture
+def report_input():
+    decisions = [_decision(i) for i in range(6)] + [_decision(99, allocated=False)]
+    results = {
+        "success": True,
+        "total_demands_processed": len(decisions),
+        "allocations_completed": 6,
+        "demands_skipped": 1,
+        "progress_percentage": 6 / 7 * 100,
+        "pdf_report": b"dropped from the payload",
+    }
+    return results, decisions
+
+
+def _page_count(pdf):
+    return len(pypdf.PdfReader(io.BytesIO(pdf)).pages)
+
+
+def test_payload_round_trip(report_input):
+    results, decisions = report_input
+    data = decode_report_payload(encode_report_payload(results, decisions, "2025-1"))
+
+    assert data["decisions"] == decisions
+    assert data["semester_name"] == "2025-1"
+    assert "pdf_report" not in data["results"]
+
+
+def test_merged_report_contains_every_section(report_input):
+    service = AutonomousAllocationReportService()
+    full = service.generate_autonomous_allocation_report(
+        *report_input, "2025-1", workers=1
+    )
+    assert set(REPORT_SECTIONS) <= set(service.last_section_timings)
+
+    summary = service.generate_autonomous_allocation_report(
+        *report_input, "2025-1", include_detailed_decisions=False, workers=1
+    )
+    assert DETAILED_DECISIONS_SECTION not in service.last_section_timings
+
+    appendix = service.generate_detailed_decisions_report(report_input[1], "2025-1")
+    assert _page_count(full) == _page_count(summary) + _page_count(appendix)
+
+
+def test_single_document_without_pypdf(monkeypatch, report_input):
+    monkeypatch.setattr(report_module, "PdfWriter", None)
+    service = AutonomousAllocationReportService()
+    pdf = service.generate_autonomous_allocation_report(
+        *report_input, "2025-1", workers=4
+    )
+
+    assert pdf.startswith(b"%PDF")
+    assert "layout" in service.last_section_timings
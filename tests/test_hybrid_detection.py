@@ -0,0 +1,156 @@
+"""
+Tests for the materialized hybrid discipline detection (Phase 0).
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, select
+
+from src.models.academic import Demanda, Semestre
+from src.models.allocation import AlocacaoSemestral, deteccoes_hibridas
+from src.models.inventory import Sala
+from src.services.hybrid_discipline_service import HybridDisciplineDetectionService
+
+
+@contextmanager
+def _captured_selects(session):
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+
+@pytest.fixture(scope="module")
+def detection_semester_id(seeded_session):
+    # Second to last semester: the last one has no allocations
+    return [s.id for s in seeded_session.query(Semestre).order_by(Semestre.id)][-2]
+
+
+def _expected_hybrids(session, semester_id):
+    """Hybrid codes with their lab days, straight from the allocations."""
+    rows = (
+        session.query(
+            Demanda.codigo_disciplina,
+            AlocacaoSemestral.dia_semana_id,
+            Sala.id,
+            Sala.tipo_sala_id,
+        )
+        .join(Demanda, AlocacaoSemestral.demanda_id == Demanda.id)
+        .join(Sala, AlocacaoSemestral.sala_id == Sala.id)
+        .filter(AlocacaoSemestral.semestre_id == semester_id)
+        .all()
+    )
+    rooms, lab_days = {}, {}
+    for codigo, dia, sala_id, tipo_sala_id in rows:
+        rooms.setdefault(codigo, set()).add(sala_id)
+        if tipo_sala_id != 2:
+            lab_days.setdefault(codigo, set()).add(dia)
+    return {
+        codigo: sorted(lab_days[codigo])
+        for codigo in rooms
+        if len(rooms[codigo]) >= 2 and codigo in lab_days
+    }
+
+
+def test_detection_matches_allocations(seeded_session, detection_semester_id):
+    result = HybridDisciplineDetectionService(seeded_session).detect_hybrid_disciplines(
+        detection_semester_id
+    )
+
+    expected = _expected_hybrids(seeded_session, detection_semester_id)
+    assert expected
+    assert result.hybrid_disciplines == sorted(expected)
+    assert {code: info.lab_days for code, info in result.details.items()} == expected
+
+
+def test_detection_is_reused_until_allocations_change(
+    seeded_session, detection_semester_id
+):
+    first = HybridDisciplineDetectionService(seeded_session).detect_hybrid_disciplines(
+        detection_semester_id
+    )
+
+    # Another session/run reuses the stored detection
+    with _captured_selects(seeded_session) as statements:
+        reused = HybridDisciplineDetectionService(
+            seeded_session
+        ).detect_hybrid_disciplines(detection_semester_id)
+    assert not any("alocacoes_semestrais" in sql for sql in statements)
+    assert reused.details == first.details
+
+    # Removing an allocation bumps the semester version and forces a rebuild
+    alocacao = (
+        seeded_session.query(AlocacaoSemestral)
+        .filter_by(semestre_id=detection_semester_id)
+        .first()
+    )
+    stored_version = seeded_session.execute(
+        select(deteccoes_hibridas.c.versao).where(
+            deteccoes_hibridas.c.semestre_id == detection_semester_id
+        )
+    ).scalar()
+    seeded_session.delete(alocacao)
+    seeded_session.commit()
+
+    with _captured_selects(seeded_session) as statements:
+        rebuilt = HybridDisciplineDetectionService(
+            seeded_session
+        ).detect_hybrid_disciplines(detection_semester_id)
+    assert any("alocacoes_semestrais" in sql for sql in statements)
+    assert rebuilt.hybrid_disciplines == sorted(
+        _expected_hybrids(seeded_session, detection_semester_id)
+    )
+    assert (
+        seeded_session.execute(
+            select(deteccoes_hibridas.c.versao).where(
+                deteccoes_hibridas.c.semestre_id == detection_semester_id
+            )
+        ).scalar()
+        > stored_version
+    )
+
+
+@pytest.mark.parametrize("fail_save", [False, True])
+def test_detection_leaves_caller_transaction_alone(
+    seeded_session, detection_semester_id, fail_save
+):
+    service = HybridDisciplineDetectionService(seeded_session)
+    if fail_save:
+        # Duplicated usage rows violate the primary key when stored
+        usage = service.alocacao_repo.get_discipline_day_room_usage
+        service.alocacao_repo.get_discipline_day_room_usage = lambda s: usage(s) * 2
+
+    # Pending caller work, plus a missing detection to force a rebuild
+    sala = seeded_session.query(Sala).first()
+    nome = sala.nome
+    sala.nome = f"{nome} (pendente)"
+    seeded_session.execute(
+        deteccoes_hibridas.delete().where(
+            deteccoes_hibridas.c.semestre_id == detection_semester_id
+        )
+    )
+
+    result = service.detect_hybrid_disciplines(detection_semester_id)
+    assert result.hybrid_disciplines == sorted(
+        _expected_hybrids(seeded_session, detection_semester_id)
+    )
+
+    # Neither rolled back nor committed by the detection
+    assert sala.nome == f"{nome} (pendente)"
+    stored = seeded_session.execute(
+        select(deteccoes_hibridas.c.semestre_id).where(
+            deteccoes_hibridas.c.semestre_id == detection_semester_id
+        )
+    ).scalar()
+    assert stored == (None if fail_save else detection_semester_id)
+    seeded_session.rollback()
+    assert seeded_session.get(Sala, sala.id).nome == nome
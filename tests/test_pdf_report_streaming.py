@@ -0,0 +1,64 @@
+"""
+Tests for the room-by-room PDF schedule report.
+"""
+
+import io
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.pdf_report_service import PDFReportService, _StreamingStory
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def _rooms(count):
+    demanda = SimpleNamespace(
+        codigo_disciplina="FUP0001",
+        nome_disciplina="Cálculo 1",
+        turma_disciplina="A",
+        professores_disciplina="Maria da Silva",
+    )
+    return {
+        room_id: {
+            "room_name": f"UAC: A1-{room_id:02d}",
+            "allocations": [
+                SimpleNamespace(dia_semana_id=2, codigo_bloco="M1", demanda=demanda)
+            ],
+        }
+        for room_id in range(1, count + 1)
+    }
+
+
+def _page_count(source):
+    return len(pypdf.PdfReader(source).pages)
+
+
+def test_streaming_story_pulls_chunks_lazily():
+    pulled = []
+
+    def chunks():
+        for i in range(3):
+            pulled.append(i)
+            yield [f"flowable {i}"]
+
+    story = _StreamingStory(chunks())
+    assert pulled == []
+    assert len(story) == 1 and pulled == [0]
+    del story[0]
+    assert len(story) == 1 and pulled == [0, 1]
+
+
+def test_one_page_per_room_in_memory_and_on_disk(tmp_path):
+    service = PDFReportService()
+    rooms = _rooms(4)
+
+    pdf = service.generate_allocation_report(rooms, "2025-1")
+    assert _page_count(io.BytesIO(pdf)) == 4
+
+    path = service.export_allocation_report(
+        rooms, "2025-1", selected_room_id=2, directory=str(tmp_path)
+    )
+    assert os.path.dirname(path) == str(tmp_path)
+    assert _page_count(path) == 1
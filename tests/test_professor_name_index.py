@@ -0,0 +1,80 @@
+"""
+Tests for the normalized professor name index.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.professor_name_index import (
+    ProfessorNameIndex,
+    clear_professor_name_index,
+    get_professor_name_index,
+    normalize_professor_name,
+)
+
+
+def _prof(prof_id, nome):
+    return SimpleNamespace(id=prof_id, nome_completo=nome)
+
+
+@pytest.fixture
+def index():
+    return ProfessorNameIndex.build(
+        [
+            _prof(1, "José da Silva"),
+            _prof(2, "Ana Maria Gonçalves"),
+            _prof(3, "JOSE DA SILVA"),  # duplicate after normalization
+        ]
+    )
+
+
+def test_normalization_folds_accents_case_and_spacing():
+    assert normalize_professor_name("  JOSÉ   da\tSílva ") == "jose da silva"
+    assert normalize_professor_name(None) == ""
+
+
+def test_resolves_variants_to_lowest_id(index):
+    assert index.resolve("jose  DA silva").id == 1
+    assert index.resolve("Ana Maria Goncalves").id == 2
+    assert index.resolve("Ana Gonçalves") is None
+
+
+def test_resolve_demands_takes_first_matching_name(index):
+    demands = [
+        SimpleNamespace(id=10, professores_disciplina="Fulano, ANA MARIA GONÇALVES"),
+        SimpleNamespace(id=11, professores_disciplina="Fulano"),
+        SimpleNamespace(id=12, professores_disciplina="  "),
+    ]
+    resolved = index.resolve_demands(demands)
+
+    assert resolved[10].id == 2
+    assert resolved[11] is None
+    assert 12 not in resolved
+
+
+def test_fuzzy_fallback_respects_threshold():
+    professors = [_prof(1, "Ana Maria Gonçalves"), _prof(2, "Bruno Costa")]
+    fuzzy = ProfessorNameIndex.build(professors, fuzzy_threshold=0.6)
+
+    assert fuzzy.resolve("Ana Maria Gonsalves").id == 1
+    assert fuzzy.resolve("Carla Dias") is None
+    assert ProfessorNameIndex.build(professors).resolve("Ana Maria Gonsalves") is None
+
+
+def test_shared_index_follows_professor_writes(db_session):
+    from src.models.academic import Professor
+
+    clear_professor_name_index()
+    db_session.add(Professor(nome_completo="Carla Dias"))
+    db_session.flush()
+    first = get_professor_name_index(db_session)
+    assert get_professor_name_index(db_session) is first
+
+    db_session.add(Professor(nome_completo="Bruno Costa"))
+    db_session.flush()
+    second = get_professor_name_index(db_session)
+
+    assert second is not first
+    assert second.resolve("bruno costa") is not None
+    clear_professor_name_index()
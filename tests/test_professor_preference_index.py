@@ -0,0 +1,46 @@
+"""
+Tests for the in-memory professor preference index.
+"""
+
+from src.models.academic import Demanda, Professor, Semestre
+from src.services.professor_preference_index import ProfessorPreferenceIndex
+from src.services.room_scoring_service import RoomScoringService
+
+
+def test_index_matches_per_professor_queries(seeded_session):
+    index = ProfessorPreferenceIndex.load(seeded_session)
+    queried = RoomScoringService(seeded_session)
+
+    professors = seeded_session.query(Professor).all()
+    assert professors
+    for professor in professors:
+        expected = queried._get_professor_preferences_for_professor(professor)
+        assert index.preferences_for(professor.id) == expected
+        assert expected["preferred_rooms"] and expected["preferred_characteristics"]
+
+    assert index.preferences_for(None) == {
+        "preferred_rooms": [],
+        "preferred_characteristics": [],
+    }
+
+
+def test_indexed_vectorized_scores_match_queried_per_room_scores(seeded_session):
+    semester_id = seeded_session.query(Semestre).order_by(Semestre.id.desc()).first().id
+    legacy = RoomScoringService(seeded_session)
+    indexed = RoomScoringService(seeded_session)
+    indexed.set_preference_index(ProfessorPreferenceIndex.load(seeded_session))
+    engine = indexed.enable_vectorized_scoring()
+
+    demandas = seeded_session.query(Demanda).filter_by(semestre_id=semester_id).all()
+    for demanda in demandas:
+        expected = legacy.score_room_candidates_for_demand(demanda.id, semester_id)
+        actual = indexed.score_room_candidates_for_demand(demanda.id, semester_id)
+        assert [(c.sala.id, c.score) for c in actual] == [
+            (c.sala.id, c.score) for c in expected
+        ]
+        assert [vars(c.scoring_breakdown) for c in actual] == [
+            vars(c.scoring_breakdown) for c in expected
+        ]
+
+    # Preference arrays are computed once per distinct professor
+    assert 0 < len(engine._preference_cache) < len(demandas)
@@ -0,0 +1,200 @@
+"""
+Query-plan regression tests: repository hot queries must be served by indexes.
+
+Each repository method is run against the seeded database while its SQL is
+captured; every captured statement is then passed to EXPLAIN QUERY PLAN and
+the test fails if SQLite plans a full table SCAN.
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from src.models.academic import Demanda, Semestre
+from src.repositories.alocacao import AlocacaoRepository
+from src.repositories.disciplina import DisciplinaRepository
+from src.repositories.reserva import ReservaRepository
+from src.repositories.reserva_ocorrencia import ReservaOcorrenciaRepository
+
+
+@contextmanager
+def _captured_statements(session):
+    """Collect the (statement, parameters) pairs executed on the session."""
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+
+def _full_scans(session, statement, parameters):
+    """Get the SCAN steps of a statement's query plan."""
+    rows = (
+        session.connection()
+        .exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        .fetchall()
+    )
+    return [row[3] for row in rows if row[3].startswith("SCAN ")]
+
+
+@pytest.fixture(scope="module")
+def sample_keys(seeded_session):
+    semestre_id = seeded_session.query(Semestre.id).order_by(Semestre.id).first()[0]
+    demanda = seeded_session.query(Demanda).filter_by(semestre_id=semestre_id).first()
+    return {
+        "semestre_id": semestre_id,
+        "demanda_id": demanda.id,
+        "codigo": demanda.codigo_disciplina,
+        "turma": demanda.turma_disciplina,
+    }
+
+
+HOT_QUERIES = {
+    # alocacoes_semestrais
+    "alocacao.get_by_demanda": lambda s, k: AlocacaoRepository(s).get_by_demanda(
+        k["demanda_id"]
+    ),
+    "alocacao.get_by_semestre": lambda s, k: AlocacaoRepository(s).get_by_semestre(
+        k["semestre_id"]
+    ),
+    "alocacao.get_occupied_slots_by_semestre": lambda s, k: AlocacaoRepository(
+        s
+    ).get_occupied_slots_by_semestre(k["semestre_id"]),
+    "alocacao.get_slots_by_demandas": lambda s, k: AlocacaoRepository(
+        s
+    ).get_slots_by_demandas([k["demanda_id"]]),
+    "alocacao.get_room_block_counts_by_semestre": lambda s, k: AlocacaoRepository(
+        s
+    ).get_room_block_counts_by_semestre(k["semestre_id"]),
+    "alocacao.count_allocated_demandas": lambda s, k: AlocacaoRepository(
+        s
+    ).count_allocated_demandas(k["semestre_id"]),
+    "alocacao.get_room_weekday_slots": lambda s, k: AlocacaoRepository(
+        s
+    ).get_room_weekday_slots(1),
+    "alocacao.get_by_sala_and_semestre": lambda s, k: AlocacaoRepository(
+        s
+    ).get_by_sala_and_semestre(1, k["semestre_id"]),
+    "alocacao.get_by_sala_and_dia": lambda s, k: AlocacaoRepository(
+        s
+    ).get_by_sala_and_dia(1, 2),
+    "alocacao.get_room_schedule": lambda s, k: AlocacaoRepository(s).get_room_schedule(
+        1
+    ),
+    "alocacao.check_conflict": lambda s, k: AlocacaoRepository(s).check_conflict(
+        1, 2, "M1", exclude_alocacao_id=1
+    ),
+    "alocacao.check_conflict_in_semester": lambda s, k: AlocacaoRepository(
+        s
+    ).check_conflict(1, 2, "M1", semestre_id=k["semestre_id"]),
+    "alocacao.get_discipline_room_frequency": lambda s, k: AlocacaoRepository(
+        s
+    ).get_discipline_room_frequency(k["codigo"], 1, k["semestre_id"]),
+    "alocacao.get_discipline_room_day_frequency": lambda s, k: AlocacaoRepository(
+        s
+    ).get_discipline_room_day_frequency(k["codigo"], 1, 2, k["semestre_id"]),
+    "alocacao.get_discipline_room_frequencies_bulk": lambda s, k: AlocacaoRepository(
+        s
+    ).get_discipline_room_frequencies_bulk(k["codigo"], [1, 2, 3], k["semestre_id"]),
+    "alocacao.get_discipline_room_day_frequencies_bulk": lambda s, k: (
+        AlocacaoRepository(s).get_discipline_room_day_frequencies_bulk(
+            k["codigo"], [1, 2, 3], [2, 3], k["semestre_id"]
+        )
+    ),
+    "alocacao.get_discipline_day_room_usage": lambda s, k: AlocacaoRepository(
+        s
+    ).get_discipline_day_room_usage(k["semestre_id"]),
+    "alocacao.get_hybrid_detection": lambda s, k: AlocacaoRepository(
+        s
+    ).get_hybrid_detection(k["semestre_id"], (0, 0)),
+    # demandas
+    "disciplina.get_by_codigo": lambda s, k: DisciplinaRepository(s).get_by_codigo(
+        k["codigo"]
+    ),
+    "disciplina.set_external_id_for_existing": lambda s, k: (
+        DisciplinaRepository(s).set_external_id_for_existing(
+            k["semestre_id"], "NAO-EXISTE", k["turma"], "0"
+        )
+    ),
+    "disciplina.get_by_semestre": lambda s, k: DisciplinaRepository(
+        s
+    ).get_by_semestre(k["semestre_id"]),
+    "disciplina.count_by_semestre": lambda s, k: DisciplinaRepository(
+        s
+    ).count_by_semestre(k["semestre_id"]),
+    "disciplina.get_queue_page": lambda s, k: DisciplinaRepository(s).get_queue_page(
+        k["semestre_id"], allocation_status="unallocated", search_text="a", offset=20
+    ),
+    "disciplina.get_by_semestre_and_external_id": lambda s, k: DisciplinaRepository(
+        s
+    ).get_by_semestre_and_external_id(k["semestre_id"], "123"),
+    "disciplina.get_external_ids_by_semestre": lambda s, k: DisciplinaRepository(
+        s
+    ).get_external_ids_by_semestre(k["semestre_id"]),
+    "disciplina.get_by_semestre_keyed_by_external_id": lambda s, k: (
+        DisciplinaRepository(s).get_by_semestre_keyed_by_external_id(k["semestre_id"])
+    ),
+    # reservas_ocorrencias
+    "reserva_ocorrencia.get_by_evento": lambda s, k: ReservaOcorrenciaRepository(
+        s
+    ).get_by_evento(1),
+    "reserva_ocorrencia.get_by_room_and_date": lambda s, k: (
+        ReservaOcorrenciaRepository(s).get_by_room_and_date(1, "2025-03-10")
+    ),
+    "reserva_ocorrencia.get_active_occurrences": lambda s, k: (
+        ReservaOcorrenciaRepository(s).get_active_occurrences(1, "2025-03-10")
+    ),
+    "reserva_ocorrencia.get_conflicting_occurrences": lambda s, k: (
+        ReservaOcorrenciaRepository(s).get_conflicting_occurrences(
+            1, "2025-03-10", "M1"
+        )
+    ),
+    "reserva_ocorrencia.get_occurrences_in_date_range": lambda s, k: (
+        ReservaOcorrenciaRepository(s).get_occurrences_in_date_range(
+            1, "2025-03-01", "2025-03-31"
+        )
+    ),
+    "reserva_ocorrencia.get_active_slots_in_date_range": lambda s, k: (
+        ReservaOcorrenciaRepository(s).get_active_slots_in_date_range(
+            1, "2025-03-01", "2026-02-28"
+        )
+    ),
+    "reserva_ocorrencia.expand_virtual_slots": lambda s, k: (
+        ReservaOcorrenciaRepository(s).expand_virtual_slots(
+            "2025-03-01", "2026-02-28", room_ids=[1]
+        )
+    ),
+    "reserva_ocorrencia.get_ocorrencias_by_date_range": lambda s, k: (
+        ReservaOcorrenciaRepository(s).get_ocorrencias_by_date_range(
+            date(2025, 3, 1), date(2025, 3, 31)
+        )
+    ),
+    "reserva.get_booked_slots_in_range": lambda s, k: ReservaRepository(
+        s
+    ).get_booked_slots_in_range(1, "2025-03-01", "2026-02-28"),
+    "reserva_ocorrencia.check_duplicate_occurrence": lambda s, k: (
+        ReservaOcorrenciaRepository(s).check_duplicate_occurrence(
+            1, "2025-03-10", "M1"
+        )
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(seeded_session, sample_keys, name):
+    with _captured_statements(seeded_session) as statements:
+        HOT_QUERIES[name](seeded_session, sample_keys)
+
+    assert statements, f"{name} executed no SELECT"
+    for statement, parameters in statements:
+        scans = _full_scans(seeded_session, statement, parameters)
+        assert not scans, f"{name}: {scans}\n{statement}"
@@ -0,0 +1,134 @@
+"""
+Tests for the Reservas page read model (cached facets and the window read).
+"""
+
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from src.config.settings import settings
+from src.models.academic import Usuario
+from src.models.inventory import Sala
+from src.repositories.reserva_evento import ReservaEventoRepository
+from src.repositories.reserva_ocorrencia import ReservaOcorrenciaRepository
+from src.schemas.allocation import ReservaEventoCreate
+from src.services import reserva_view_service
+from src.services.reserva_evento_service import ReservaEventoService
+from src.services.reserva_view_service import (
+    clear_reserva_facets_cache,
+    get_reserva_facets,
+)
+
+STORAGES = {"materializada": False, "virtual": True}
+
+
+def _next_sunday(start: date) -> date:
+    # Sundays have no semester allocations, so reservations never conflict
+    return start + timedelta(days=(6 - start.weekday()) % 7)
+
+
+DAY = _next_sunday(date.today() + timedelta(days=30))
+
+
+@pytest.fixture(scope="module")
+def username(seeded_session):
+    seeded_session.add(Usuario(username="facetas", nome_completo="Teste Facetas"))
+    seeded_session.commit()
+    return "facetas"
+
+
+@pytest.fixture(scope="module")
+def room_ids(seeded_session):
+    return [
+        sala.id
+        for sala in seeded_session.query(Sala)
+        .filter(Sala.predio_id.isnot(None))
+        .order_by(Sala.id)
+        .limit(2)
+    ]
+
+
+@pytest.fixture
+def view_session(seeded_session, monkeypatch):
+    """Serve the Reservas read model from the seeded session."""
+
+    @contextmanager
+    def _session(read_only=False):
+        yield seeded_session
+
+    monkeypatch.setattr(reserva_view_service, "get_db_session", _session)
+    clear_reserva_facets_cache()
+    yield seeded_session
+    clear_reserva_facets_cache()
+
+
+def _create_event(session, monkeypatch, username, storage, sala_id, titulo):
+    monkeypatch.setattr(settings, "RESERVAS_OCORRENCIAS_VIRTUAIS", STORAGES[storage])
+    evento, errors = ReservaEventoService(session).criar_reserva_recorrente(
+        ReservaEventoCreate(
+            sala_id=sala_id,
+            titulo_evento=titulo,
+            username_criador=username,
+            nome_solicitante="Ana Silva",
+            regra_recorrencia_json='{"tipo": "unica"}',
+        ),
+        ["M1", "M2"],
+        DAY,
+    )
+    assert evento is not None, errors
+    return evento
+
+
+@pytest.mark.parametrize("storage", sorted(STORAGES))
+def test_event_writes_invalidate_facets(
+    view_session, monkeypatch, username, room_ids, storage
+):
+    facets = get_reserva_facets()
+    assert get_reserva_facets() is facets
+
+    titulo = f"Facetas {storage}"
+    evento = _create_event(
+        view_session, monkeypatch, username, storage, room_ids[0], titulo
+    )
+    created = get_reserva_facets()
+    assert created.versao[0] > facets.versao[0]
+    assert titulo in created.titulos
+    assert room_ids[0] in created.sala_options
+
+    ReservaOcorrenciaRepository(view_session).delete_by_evento(evento.id)
+    assert ReservaEventoRepository(view_session).delete(evento.id)
+    deleted = get_reserva_facets()
+    assert deleted.versao[0] > created.versao[0]
+    assert titulo not in deleted.titulos
+
+
+def test_window_read_loads_room_and_building(
+    view_session, monkeypatch, username, room_ids
+):
+    eventos = {
+        _create_event(
+            view_session, monkeypatch, username, storage, sala_id, f"Janela {storage}"
+        ).id
+        for storage, sala_id in zip(sorted(STORAGES), room_ids)
+    }
+
+    ocorrencias = ReservaOcorrenciaRepository(
+        view_session
+    ).get_ocorrencias_by_date_range(DAY, DAY, room_ids=room_ids)
+    assert {o.evento_id for o in ocorrencias} >= eventos
+
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = view_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        predios = {o.evento.sala.predio.nome for o in ocorrencias}
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    assert statements == []
+    assert all(predios)
@@ -0,0 +1,107 @@
+"""
+Tests for the versoes_dados triggers and the semester grid cache.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import select
+
+from src.models.academic import Demanda, Semestre
+from src.models.allocation import (
+    INVENTORY_VERSION_KEY,
+    AlocacaoSemestral,
+    semester_version_key,
+    versoes_dados,
+)
+from src.models.inventory import Sala
+from src.repositories.alocacao import AlocacaoRepository
+from src.services import semester_grid_service
+from src.services.semester_grid_service import (
+    clear_semester_grid_cache,
+    get_semester_grid,
+)
+
+
+@pytest.fixture
+def grid_session(seeded_session, monkeypatch):
+    """Serve get_semester_grid from the seeded session."""
+
+    @contextmanager
+    def _session(read_only=False):
+        yield seeded_session
+
+    monkeypatch.setattr(semester_grid_service, "get_db_session", _session)
+    clear_semester_grid_cache()
+    yield seeded_session
+    clear_semester_grid_cache()
+
+
+def _versions(session):
+    rows = session.execute(select(versoes_dados.c.chave, versoes_dados.c.versao))
+    return {chave: versao for chave, versao in rows}
+
+
+def test_allocation_writes_bump_version_and_rebuild_grid(grid_session):
+    session = grid_session
+    # Last semester: demands but no allocations yet
+    semester_id = session.query(Semestre).order_by(Semestre.id.desc()).first().id
+    demanda = session.query(Demanda).filter_by(semestre_id=semester_id).first()
+    sala = session.query(Sala).first()
+    repo = AlocacaoRepository(session)
+
+    before = repo.get_data_version(semester_id)
+    grid = get_semester_grid(semester_id)
+    assert get_semester_grid(semester_id) is grid
+    assert not grid.slots
+
+    alocacao = AlocacaoSemestral(
+        semestre_id=semester_id,
+        demanda_id=demanda.id,
+        sala_id=sala.id,
+        dia_semana_id=2,
+        codigo_bloco="M1",
+    )
+    session.add(alocacao)
+    session.commit()
+
+    inserted = repo.get_data_version(semester_id)
+    assert inserted[0] > before[0]
+    assert inserted[1] == before[1]
+    assert _versions(session)[semester_version_key(semester_id)] == inserted[0]
+
+    grid = get_semester_grid(semester_id)
+    assert grid.versao == inserted
+    assert [(s.sala_id, s.demanda_id) for s in grid.slots] == [(sala.id, demanda.id)]
+
+    session.delete(alocacao)
+    session.commit()
+
+    deleted = repo.get_data_version(semester_id)
+    assert deleted[0] > inserted[0]
+    grid = get_semester_grid(semester_id)
+    assert grid.versao == deleted
+    assert not grid.slots
+
+
+def test_inventory_writes_bump_only_the_inventory_version(grid_session):
+    session = grid_session
+    semester_id = session.query(Semestre).order_by(Semestre.id).first().id
+    repo = AlocacaoRepository(session)
+    before = repo.get_data_version(semester_id)
+    grid = get_semester_grid(semester_id)
+
+    sala = session.query(Sala).first()
+    nome = sala.nome
+    sala.nome = f"{nome} (renomeada)"
+    session.commit()
+
+    after = repo.get_data_version(semester_id)
+    assert after == (before[0], before[1] + 1)
+    assert _versions(session)[INVENTORY_VERSION_KEY] == after[1]
+    rebuilt = get_semester_grid(semester_id)
+    assert rebuilt is not grid
+    assert rebuilt.room_labels != grid.room_labels
+
+    sala.nome = nome
+    session.commit()
@@ -0,0 +1,115 @@
+"""
+Tests for the SIGAA semester sync (skip reasons and incremental removals).
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.models.academic import Demanda, Semestre
+from src.models.base import Base
+from src.services import semester_service
+from src.services.professor_name_index import clear_professor_name_index
+
+SEMESTER = "2030-1"
+
+
+def _oferta(n, **overrides):
+    oferta = {
+        "cod_disciplina": f"FUP{n:03d}",
+        "nome_disciplina": f"Disciplina {n}",
+        "cod_turma": "01",
+        "vagas_turma": "30",
+        "horario_turma": "24M12",
+        "professores": [{"nome_perfil": f"Professor {n}"}],
+        "cod_curso": "GEAGRO",
+    }
+    oferta.update(overrides)
+    return oferta
+
+
+@pytest.fixture
+def sync(monkeypatch):
+    """Run sync_semester_from_api on a fresh database with a given payload."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        session.add(Semestre(nome=SEMESTER, status=True))
+        session.commit()
+
+    @contextmanager
+    def _session():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    payload = {}
+    monkeypatch.setattr(semester_service, "get_db_session", _session)
+    monkeypatch.setattr(semester_service, "fetch_ofertas", lambda cod: payload)
+    clear_professor_name_index()
+
+    def _run(ofertas, **kwargs):
+        payload.clear()
+        payload.update({"semestre": SEMESTER, "ofertas": ofertas})
+        return semester_service.sync_semester_from_api(SEMESTER, **kwargs)
+
+    def _count():
+        with _session() as session:
+            return session.query(Demanda).count()
+
+    _run.count = _count
+    yield _run
+
+    clear_professor_name_index()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_existing_offer_is_reported_before_validation(sync):
+    sync({"1": _oferta(1)})
+    summary = sync({"1": _oferta(1, nome_disciplina="")})
+
+    assert [d["reason"] for d in summary["skipped_details"]] == ["external_id_exists"]
+
+
+def test_empty_payload_removes_nothing(sync):
+    sync({str(n): _oferta(n) for n in range(5)})
+    summary = sync({}, incremental=True)
+
+    assert summary["removal_blocked"] == "empty_payload"
+    assert summary["removed"] == 0
+    assert len(summary["diff"]["pending_removals"]) == 5
+    assert sync.count() == 5
+
+
+def test_large_removal_needs_confirmation(sync):
+    ofertas = {str(n): _oferta(n) for n in range(10)}
+    sync(ofertas)
+
+    # One missing offer (10%) is removed right away
+    del ofertas["0"]
+    summary = sync(ofertas, incremental=True)
+    assert summary["removal_blocked"] is None
+    assert [r["oferta_key"] for r in summary["diff"]["removed"]] == ["0"]
+    assert sync.count() == 9
+
+    # Five more (over 20%) are only listed until confirmed
+    remaining = {key: ofertas[key] for key in ["5", "6", "7", "8"]}
+    summary = sync(remaining, incremental=True)
+    assert summary["removal_blocked"] == "needs_confirmation"
+    assert sorted(r["oferta_key"] for r in summary["diff"]["pending_removals"]) == [
+        "1",
+        "2",
+        "3",
+        "4",
+        "9",
+    ]
+    assert sync.count() == 9
+
+    summary = sync(remaining, incremental=True, confirm_removals=True)
+    assert summary["removed"] == 5
+    assert sync.count() == 4
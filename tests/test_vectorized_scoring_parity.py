@@ -0,0 +1,172 @@
+"""
+Parity tests: the vectorized scoring engine must reproduce the per-room engine.
+"""
+
+import pytest
+
+from src.models.academic import Demanda, Semestre
+from src.services.historical_frequency_index import HistoricalFrequencyIndex
+from src.services.hybrid_discipline_service import HybridDisciplineDetectionService
+from src.services.occupancy_index import SemesterOccupancyIndex
+from src.services.room_scoring_service import RoomScoringService
+
+
+def _demand_fingerprint(candidates):
+    return [
+        (c.sala.id, c.score, c.has_conflicts, c.rule_violations, vars(c.scoring_breakdown))
+        for c in candidates
+    ]
+
+
+def _block_group_fingerprint(scores):
+    return [
+        (
+            s.room_id,
+            s.room_name,
+            s.room_type,
+            s.building_name,
+            s.score,
+            s.has_conflict,
+            s.conflict_details,
+            vars(s.breakdown),
+        )
+        for s in scores
+    ]
+
+
+@pytest.fixture(scope="module")
+def semester_ids(seeded_session):
+    return [s.id for s in seeded_session.query(Semestre).order_by(Semestre.id)]
+
+
+@pytest.fixture(scope="module")
+def hybrid_service(seeded_session, semester_ids):
+    # Detect on the last semester that has allocations
+    service = HybridDisciplineDetectionService(seeded_session)
+    service.detect_hybrid_disciplines(semester_ids[-2])
+    return service
+
+
+def _services(session, hybrid_service, frequency_index=None):
+    legacy = RoomScoringService(session)
+    vectorized = RoomScoringService(session)
+    vectorized.enable_vectorized_scoring()
+    for service in (legacy, vectorized):
+        service.set_hybrid_detection_service(hybrid_service)
+        service.set_historical_frequency_index(frequency_index)
+    return legacy, vectorized
+
+
+@pytest.mark.parametrize("use_frequency_index", [False, True])
+@pytest.mark.parametrize("semester_position", [-2, -1])
+def test_demand_scores_match(
+    seeded_session, semester_ids, hybrid_service, semester_position, use_frequency_index
+):
+    semester_id = semester_ids[semester_position]
+    frequency_index = (
+        HistoricalFrequencyIndex.load(seeded_session, semester_id)
+        if use_frequency_index
+        else None
+    )
+    legacy, vectorized = _services(seeded_session, hybrid_service, frequency_index)
+
+    demandas = seeded_session.query(Demanda).filter_by(semestre_id=semester_id).all()
+    assert demandas
+    for demanda in demandas:
+        expected = legacy.score_room_candidates_for_demand(demanda.id, semester_id)
+        actual = vectorized.score_room_candidates_for_demand(demanda.id, semester_id)
+        assert _demand_fingerprint(actual) == _demand_fingerprint(expected), (
+            demanda.codigo_disciplina
+        )
+
+
+@pytest.mark.parametrize("semester_position", [-2, -1])
+def test_block_group_scores_match(
+    seeded_session, semester_ids, hybrid_service, semester_position
+):
+    semester_id = semester_ids[semester_position]
+    legacy, vectorized = _services(seeded_session, hybrid_service)
+
+    demandas = seeded_session.query(Demanda).filter_by(semestre_id=semester_id).all()
+    for demanda in demandas:
+        for block_group in legacy.group_blocks_by_day(demanda.horario_sigaa_bruto):
+            expected = legacy.score_rooms_for_block_group(
+                demanda.id, block_group, semester_id
+            )
+            actual = vectorized.score_rooms_for_block_group(
+                demanda.id, block_group, semester_id
+            )
+            assert _block_group_fingerprint(actual) == _block_group_fingerprint(
+                expected
+            ), (demanda.codigo_disciplina, block_group.day_id)
+
+
+def test_block_group_conflicts_match_with_occupancy_index(
+    seeded_session, semester_ids, hybrid_service
+):
+    """The per-day (partial allocation) path resolves conflicts by slot mask."""
+    semester_id = semester_ids[-2]
+    queried, _ = _services(seeded_session, hybrid_service)
+    indexed = _services(seeded_session, hybrid_service)
+    occupancy_index = SemesterOccupancyIndex.load(seeded_session, semester_id)
+    for service in indexed:
+        service.set_occupancy_index(occupancy_index)
+
+    conflicts = 0
+    demandas = seeded_session.query(Demanda).filter_by(semestre_id=semester_id).all()
+    for demanda in demandas:
+        for block_group in queried.group_blocks_by_day(demanda.horario_sigaa_bruto):
+            expected = _block_group_fingerprint(
+                queried.score_rooms_for_block_group(
+                    demanda.id, block_group, semester_id
+                )
+            )
+            for service in indexed:
+                actual = service.score_rooms_for_block_group(
+                    demanda.id, block_group, semester_id
+                )
+                assert _block_group_fingerprint(actual) == expected, (
+                    demanda.codigo_disciplina,
+                    block_group.day_id,
+                )
+            conflicts += sum(1 for score in expected if score[5])
+
+    # Allocated semester: the occupancy index must actually report conflicts
+    assert conflicts
+
+
+def test_top_k_returns_leading_candidates(seeded_session, semester_ids, hybrid_service):
+    semester_id = semester_ids[-1]
+    legacy, vectorized = _services(seeded_session, hybrid_service)
+
+    demanda = seeded_session.query(Demanda).filter_by(semestre_id=semester_id).first()
+    expected = legacy.score_room_candidates_for_demand(demanda.id, semester_id)
+    actual = vectorized.score_room_candidates_for_demand(
+        demanda.id, semester_id, top_k=5
+    )
+    assert _demand_fingerprint(actual) == _demand_fingerprint(expected[:5])
+
+
+def test_seed_exercises_every_score_component(
+    seeded_session, semester_ids, hybrid_service
+):
+    """Guard against a seed that would make the parity tests vacuous."""
+    semester_id = semester_ids[-1]
+    _, vectorized = _services(seeded_session, hybrid_service)
+
+    hits = {"hard": 0, "soft": 0, "historical": 0, "hybrid": 0}
+    for demanda in seeded_session.query(Demanda).filter_by(semestre_id=semester_id):
+        for candidate in vectorized.score_room_candidates_for_demand(
+            demanda.id, semester_id
+        ):
+            breakdown = candidate.scoring_breakdown
+            hits["hard"] += bool(breakdown.hard_rules_satisfied)
+            hits["soft"] += bool(breakdown.soft_preferences_satisfied)
+            hits["historical"] += breakdown.historical_frequency_points > 0
+        for block_group in vectorized.group_blocks_by_day(demanda.horario_sigaa_bruto):
+            for score in vectorized.score_rooms_for_block_group(
+                demanda.id, block_group, semester_id
+            ):
+                hits["hybrid"] += score.breakdown.hybrid_bonus_points > 0
+
+    assert all(hits.values()), hits
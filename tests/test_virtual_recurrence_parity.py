@@ -0,0 +1,128 @@
+"""
+Parity tests: virtual recurring reservations (rule + exceptions, expanded on
+demand) must read exactly like materialized ones (one row per date x block).
+"""
+
+import json
+from datetime import date
+
+import pytest
+
+from src.models.academic import Usuario
+from src.models.allocation import ReservaEvento
+from src.repositories.reserva_ocorrencia import ReservaOcorrenciaRepository
+from src.schemas.allocation import ReservaEventoCreate
+from src.services.reserva_evento_service import ReservaEventoService
+
+START = date(2030, 3, 4)
+RULES = {
+    "unica": ('{"tipo": "unica"}', ["M1", "M2"]),
+    "diaria": ('{"tipo": "diaria", "intervalo": 3, "fim": "2030-12-20"}', ["T1"]),
+    "semanal": (
+        '{"tipo": "semanal", "dias": [2, 4, 6], "fim": "2030-12-20"}',
+        ["M1", "M3"],
+    ),
+    "mensal": ('{"tipo": "mensal", "dia_mes": 20, "fim": "2030-12-20"}', ["T2"]),
+}
+
+
+@pytest.fixture(scope="module")
+def username(seeded_session):
+    seeded_session.add(Usuario(username="reservas", nome_completo="Teste Reservas"))
+    seeded_session.commit()
+    return "reservas"
+
+
+def _create_pair(session, username, rule_name, legacy_room, virtual_room):
+    """Create the same series in legacy and virtual storage."""
+    regra, blocos = RULES[rule_name]
+    service = ReservaEventoService(session)
+    occurrences = service._generate_occurrences(json.loads(regra), START, blocos)
+
+    def dto(sala_id):
+        return ReservaEventoCreate(
+            sala_id=sala_id,
+            titulo_evento=rule_name,
+            username_criador=username,
+            nome_solicitante="Ana Silva",
+            regra_recorrencia_json=regra,
+        )
+
+    legacy = service._create_event_with_occurrences(dto(legacy_room), occurrences)
+    virtual = service._create_virtual_event(dto(virtual_room), occurrences, blocos)
+    return legacy, virtual
+
+
+def _rows(occurrences):
+    return [(o.data_reserva, o.codigo_bloco, o.status_excecao) for o in occurrences]
+
+
+def _assert_same_reads(session, legacy, virtual):
+    repo = ReservaOcorrenciaRepository(session)
+
+    assert _rows(repo.get_by_evento(legacy.id)) == _rows(repo.get_by_evento(virtual.id))
+
+    window = ("2030-04-01", "2030-07-31")
+    assert repo.get_active_slots_in_date_range(
+        legacy.sala_id, *window
+    ) == repo.get_active_slots_in_date_range(virtual.sala_id, *window)
+    assert _rows(
+        repo.get_occurrences_in_date_range(legacy.sala_id, *window)
+    ) == _rows(repo.get_occurrences_in_date_range(virtual.sala_id, *window))
+
+    by_room = {}
+    for ocorrencia in repo.get_ocorrencias_by_date_range(
+        date(2030, 1, 1), date(2031, 12, 31), room_ids=[legacy.sala_id, virtual.sala_id]
+    ):
+        by_room.setdefault(ocorrencia.evento.sala_id, []).append(ocorrencia)
+    assert _rows(by_room.get(legacy.sala_id, [])) == _rows(
+        by_room.get(virtual.sala_id, [])
+    )
+
+
+@pytest.mark.parametrize("rule_name", sorted(RULES))
+def test_virtual_series_reads_like_materialized(seeded_session, username, rule_name):
+    room = 2 * sorted(RULES).index(rule_name) + 1
+    legacy, virtual = _create_pair(seeded_session, username, rule_name, room, room + 1)
+
+    _assert_same_reads(seeded_session, legacy, virtual)
+
+
+@pytest.mark.parametrize("rule_name", ["diaria", "semanal"])
+def test_virtual_exceptions_read_like_materialized(seeded_session, username, rule_name):
+    room = 11 + 2 * ["diaria", "semanal"].index(rule_name)
+    legacy, virtual = _create_pair(seeded_session, username, rule_name, room, room + 1)
+    service = ReservaEventoService(seeded_session)
+    occurrences = _rows(
+        ReservaOcorrenciaRepository(seeded_session).get_by_evento(legacy.id)
+    )
+
+    # Moves go to Sundays, which have no semester allocations
+    for evento in (legacy, virtual):
+        data, bloco, _ = occurrences[1]
+        assert service.cancelar_ocorrencia(evento.id, data, bloco)[0]
+        data, bloco, _ = occurrences[2]
+        assert service.mover_ocorrencia(evento.id, data, bloco, "2031-01-19", "M5")[0]
+        # A moved occurrence is addressed by its new date and block
+        assert service.mover_ocorrencia(evento.id, "2031-01-19", "M5", "2031-01-26")[0]
+        assert not service.cancelar_ocorrencia(evento.id, "2029-01-01", bloco)[0]
+
+    _assert_same_reads(seeded_session, legacy, virtual)
+
+
+@pytest.mark.parametrize("rule_name", ["unica", "semanal"])
+def test_virtual_move_before_series_start(seeded_session, username, rule_name):
+    room = 15 + 2 * ["unica", "semanal"].index(rule_name)
+    legacy, virtual = _create_pair(seeded_session, username, rule_name, room, room + 1)
+    service = ReservaEventoService(seeded_session)
+    data, bloco, _ = _rows(
+        ReservaOcorrenciaRepository(seeded_session).get_by_evento(legacy.id)
+    )[0]
+
+    # 2030-02-10 is a Sunday, weeks before the series starts
+    for evento in (legacy, virtual):
+        assert service.mover_ocorrencia(evento.id, data, bloco, "2030-02-10")[0]
+
+    _assert_same_reads(seeded_session, legacy, virtual)
+    # The rule anchor is unchanged
+    assert seeded_session.get(ReservaEvento, virtual.id).data_inicio == str(START)